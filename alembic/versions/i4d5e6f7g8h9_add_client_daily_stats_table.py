@@ -0,0 +1,53 @@
+"""Add client_daily_stats rollup table for client analytics
+
+Revision ID: i4d5e6f7g8h9
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i4d5e6f7g8h9'
+down_revision: Union[str, Sequence[str], None] = 'd8e9f0a1b2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add client_daily_stats table.
+
+    Populate history afterwards with: python scripts/backfill_client_stats.py
+    """
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'client_daily_stats' not in inspector.get_table_names():
+        op.create_table('client_daily_stats',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('client_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('messages_sent', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('messages_received', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('signups', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('claims', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('active_players', sa.Integer(), nullable=True),
+            sa.Column('direct_active_players', sa.Integer(), nullable=True),
+            sa.Column('total_players', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+            sa.ForeignKeyConstraint(['client_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('client_id', 'day', name='uq_client_daily_stats_client_day')
+        )
+        op.create_index(op.f('ix_client_daily_stats_id'), 'client_daily_stats', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove client_daily_stats table."""
+    op.drop_index(op.f('ix_client_daily_stats_id'), table_name='client_daily_stats')
+    op.drop_table('client_daily_stats')
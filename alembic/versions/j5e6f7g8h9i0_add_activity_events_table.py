@@ -0,0 +1,53 @@
+"""Add append-only activity_events table for dashboard feeds
+
+Revision ID: j5e6f7g8h9i0
+Revises: i4d5e6f7g8h9
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j5e6f7g8h9i0'
+down_revision: Union[str, Sequence[str], None] = 'i4d5e6f7g8h9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add activity_events table.
+
+    Populate recent history afterwards with: python scripts/backfill_activity_events.py
+    """
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'activity_events' not in inspector.get_table_names():
+        op.create_table('activity_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('owner_id', sa.Integer(), nullable=False),
+            sa.Column('event_type', sa.String(length=50), nullable=False),
+            sa.Column('actor_id', sa.Integer(), nullable=True),
+            sa.Column('actor_name', sa.String(), nullable=True),
+            sa.Column('subject_type', sa.String(length=50), nullable=True),
+            sa.Column('subject_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=50), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+            sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+            sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_activity_events_id'), 'activity_events', ['id'], unique=False)
+        op.create_index('ix_activity_events_owner_created', 'activity_events', ['owner_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove activity_events table."""
+    op.drop_index('ix_activity_events_owner_created', table_name='activity_events')
+    op.drop_index(op.f('ix_activity_events_id'), table_name='activity_events')
+    op.drop_table('activity_events')
@@ -0,0 +1,76 @@
+"""Add double-entry credit ledger tables
+
+Revision ID: k6f7g8h9i0j1
+Revises: j5e6f7g8h9i0
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k6f7g8h9i0j1'
+down_revision: Union[str, Sequence[str], None] = 'j5e6f7g8h9i0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add ledger_transactions and ledger_entries tables."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'ledger_transactions' not in existing_tables:
+        op.create_table('ledger_transactions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('idempotency_key', sa.String(length=100), nullable=True),
+            sa.Column('transaction_type', sa.String(length=50), nullable=False),
+            sa.Column('reference_type', sa.String(length=50), nullable=True),
+            sa.Column('reference_id', sa.Integer(), nullable=True),
+            sa.Column('description', sa.String(), nullable=True),
+            sa.Column('created_by_id', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+            sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('idempotency_key')
+        )
+        op.create_index(op.f('ix_ledger_transactions_id'), 'ledger_transactions', ['id'], unique=False)
+        op.create_index(op.f('ix_ledger_transactions_transaction_type'), 'ledger_transactions', ['transaction_type'], unique=False)
+        op.create_index(op.f('ix_ledger_transactions_created_at'), 'ledger_transactions', ['created_at'], unique=False)
+
+    if 'ledger_entries' not in existing_tables:
+        op.create_table('ledger_entries',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('transaction_id', sa.Integer(), nullable=False),
+            sa.Column('account', sa.String(length=50), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('amount', sa.Integer(), nullable=False),
+            sa.Column('balance_after', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+            sa.ForeignKeyConstraint(['transaction_id'], ['ledger_transactions.id'], ),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_ledger_entries_id'), 'ledger_entries', ['id'], unique=False)
+        op.create_index(op.f('ix_ledger_entries_transaction_id'), 'ledger_entries', ['transaction_id'], unique=False)
+        op.create_index('ix_ledger_entries_user_id_id', 'ledger_entries', ['user_id', 'id'], unique=False)
+        op.create_index('ix_ledger_entries_account', 'ledger_entries', ['account'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove ledger tables."""
+    op.drop_index('ix_ledger_entries_account', table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_user_id_id', table_name='ledger_entries')
+    op.drop_index(op.f('ix_ledger_entries_transaction_id'), table_name='ledger_entries')
+    op.drop_index(op.f('ix_ledger_entries_id'), table_name='ledger_entries')
+    op.drop_table('ledger_entries')
+
+    op.drop_index(op.f('ix_ledger_transactions_created_at'), table_name='ledger_transactions')
+    op.drop_index(op.f('ix_ledger_transactions_transaction_type'), table_name='ledger_transactions')
+    op.drop_index(op.f('ix_ledger_transactions_id'), table_name='ledger_transactions')
+    op.drop_table('ledger_transactions')
@@ -0,0 +1,37 @@
+"""Add reserved_budget to promotions for atomic claim reservation
+
+Revision ID: l7g8h9i0j1k2
+Revises: k6f7g8h9i0j1
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l7g8h9i0j1k2'
+down_revision: Union[str, Sequence[str], None] = 'k6f7g8h9i0j1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('promotions', sa.Column('reserved_budget', sa.Integer(), nullable=False, server_default='0'))
+
+    # Claims already waiting for approval hold their value from now on
+    op.execute("""
+        UPDATE promotions SET reserved_budget = COALESCE((
+            SELECT SUM(claimed_value) FROM promotion_claims
+            WHERE promotion_claims.promotion_id = promotions.id
+              AND promotion_claims.status = 'PENDING_APPROVAL'
+        ), 0)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('promotions', 'reserved_budget')
@@ -0,0 +1,98 @@
+"""Replace promotions.target_player_ids JSON with a promotion_targets table
+
+Revision ID: m8h9i0j1k2l3
+Revises: l7g8h9i0j1k2
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm8h9i0j1k2l3'
+down_revision: Union[str, Sequence[str], None] = 'l7g8h9i0j1k2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - move target lists into promotion_targets."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'promotion_targets' not in inspector.get_table_names():
+        op.create_table('promotion_targets',
+            sa.Column('promotion_id', sa.Integer(), nullable=False),
+            sa.Column('player_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['promotion_id'], ['promotions.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['player_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('promotion_id', 'player_id')
+        )
+        op.create_index('ix_promotion_targets_player_promotion', 'promotion_targets', ['player_id', 'promotion_id'], unique=False)
+
+    columns = [c['name'] for c in inspector.get_columns('promotions')]
+    if 'is_targeted' not in columns:
+        op.add_column('promotions', sa.Column('is_targeted', sa.Boolean(), nullable=False, server_default=sa.text('false')))
+
+    if 'target_player_ids' in columns:
+        # Copy each JSON list into rows, skipping ids that no longer exist
+        user_ids = {row[0] for row in conn.execute(sa.text("SELECT id FROM users"))}
+        promotions = conn.execute(sa.text(
+            "SELECT id, target_player_ids FROM promotions WHERE target_player_ids IS NOT NULL"
+        )).fetchall()
+
+        targeted_ids = []
+        rows = []
+        for promotion_id, raw in promotions:
+            try:
+                player_ids = {int(i) for i in json.loads(raw) or []}
+            except (ValueError, TypeError):
+                continue
+            if not player_ids:
+                continue
+            targeted_ids.append(promotion_id)
+            rows.extend(
+                {"promotion_id": promotion_id, "player_id": player_id}
+                for player_id in sorted(player_ids & user_ids)
+            )
+
+        if rows:
+            conn.execute(sa.text(
+                "INSERT INTO promotion_targets (promotion_id, player_id) VALUES (:promotion_id, :player_id)"
+            ), rows)
+        if targeted_ids:
+            conn.execute(
+                sa.text("UPDATE promotions SET is_targeted = :targeted WHERE id IN :ids")
+                .bindparams(sa.bindparam("ids", expanding=True)),
+                {"targeted": True, "ids": targeted_ids}
+            )
+
+        with op.batch_alter_table('promotions') as batch_op:
+            batch_op.drop_column('target_player_ids')
+
+
+def downgrade() -> None:
+    """Downgrade schema - rebuild the JSON column from promotion_targets."""
+    conn = op.get_bind()
+    op.add_column('promotions', sa.Column('target_player_ids', sa.Text(), nullable=True))
+
+    targets = {}
+    for promotion_id, player_id in conn.execute(sa.text(
+        "SELECT promotion_id, player_id FROM promotion_targets ORDER BY promotion_id, player_id"
+    )):
+        targets.setdefault(promotion_id, []).append(player_id)
+    for promotion_id, player_ids in targets.items():
+        conn.execute(
+            sa.text("UPDATE promotions SET target_player_ids = :ids WHERE id = :id"),
+            {"ids": json.dumps(player_ids), "id": promotion_id}
+        )
+
+    with op.batch_alter_table('promotions') as batch_op:
+        batch_op.drop_column('is_targeted')
+    op.drop_index('ix_promotion_targets_player_promotion', table_name='promotion_targets')
+    op.drop_table('promotion_targets')
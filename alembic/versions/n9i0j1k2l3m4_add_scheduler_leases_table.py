@@ -0,0 +1,50 @@
+"""Add scheduler_leases table and indexes for the expiry sweeps
+
+Revision ID: n9i0j1k2l3m4
+Revises: m8h9i0j1k2l3
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n9i0j1k2l3m4'
+down_revision: Union[str, Sequence[str], None] = 'm8h9i0j1k2l3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SWEEP_INDEXES = [
+    ('ix_promotions_status_end_date', 'promotions', ['status', 'end_date']),
+    ('ix_reports_status_warning_deadline', 'reports', ['status', 'warning_deadline']),
+    ('ix_referrals_status_created_at', 'referrals', ['status', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - add scheduler_leases table and sweep indexes."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'scheduler_leases' not in inspector.get_table_names():
+        op.create_table('scheduler_leases',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('holder', sa.String(length=255), nullable=False),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+    for name, table, columns in SWEEP_INDEXES:
+        if name not in {i['name'] for i in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove scheduler_leases table and sweep indexes."""
+    for name, table, _ in SWEEP_INDEXES:
+        op.drop_index(name, table_name=table)
+    op.drop_table('scheduler_leases')
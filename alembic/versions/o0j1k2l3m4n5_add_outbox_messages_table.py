@@ -0,0 +1,49 @@
+"""Add outbox_messages table for transactional side effects
+
+Revision ID: o0j1k2l3m4n5
+Revises: n9i0j1k2l3m4
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o0j1k2l3m4n5'
+down_revision: Union[str, Sequence[str], None] = 'n9i0j1k2l3m4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add outbox_messages table."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'outbox_messages' not in inspector.get_table_names():
+        op.create_table('outbox_messages',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=50), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.String(length=500), nullable=True),
+            sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_outbox_messages_id'), 'outbox_messages', ['id'], unique=False)
+        op.create_index('ix_outbox_messages_status_available', 'outbox_messages', ['status', 'available_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove outbox_messages table."""
+    op.drop_index('ix_outbox_messages_status_available', table_name='outbox_messages')
+    op.drop_index(op.f('ix_outbox_messages_id'), table_name='outbox_messages')
+    op.drop_table('outbox_messages')
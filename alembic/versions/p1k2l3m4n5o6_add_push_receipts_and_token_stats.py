@@ -0,0 +1,53 @@
+"""Add push_receipts table and delivery stats on push_tokens
+
+Revision ID: p1k2l3m4n5o6
+Revises: o0j1k2l3m4n5
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p1k2l3m4n5o6'
+down_revision: Union[str, Sequence[str], None] = 'o0j1k2l3m4n5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAT_COLUMNS = ['receipt_count', 'failure_count', 'consecutive_failures']
+
+
+def upgrade() -> None:
+    """Upgrade schema - add push_receipts table and push token stats."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'push_receipts' not in inspector.get_table_names():
+        op.create_table('push_receipts',
+            sa.Column('ticket_id', sa.String(length=64), nullable=False),
+            sa.Column('token', sa.String(length=255), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.PrimaryKeyConstraint('ticket_id')
+        )
+        op.create_index(op.f('ix_push_receipts_created_at'), 'push_receipts', ['created_at'], unique=False)
+
+    existing = {c['name'] for c in inspector.get_columns('push_tokens')}
+    for name in STAT_COLUMNS:
+        if name not in existing:
+            op.add_column('push_tokens', sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+    if 'last_error' not in existing:
+        op.add_column('push_tokens', sa.Column('last_error', sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove push_receipts table and push token stats."""
+    with op.batch_alter_table('push_tokens') as batch_op:
+        batch_op.drop_column('last_error')
+        for name in reversed(STAT_COLUMNS):
+            batch_op.drop_column(name)
+    op.drop_index(op.f('ix_push_receipts_created_at'), table_name='push_receipts')
+    op.drop_table('push_receipts')
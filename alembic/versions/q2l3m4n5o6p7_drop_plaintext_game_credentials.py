@@ -0,0 +1,60 @@
+"""Drop plaintext game credential columns
+
+Revision ID: q2l3m4n5o6p7
+Revises: p1k2l3m4n5o6
+Create Date: 2026-10-19 20:00:00.000000
+
+Run ``scripts/migrate_credentials.py`` first: the upgrade refuses to run
+while any row only has plaintext credentials. The downgrade restores the
+columns empty; the encrypted values remain the source of truth.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q2l3m4n5o6p7'
+down_revision: Union[str, Sequence[str], None] = 'p1k2l3m4n5o6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PLAINTEXT_COLUMNS = ['game_username', 'game_password']
+ENCRYPTED_COLUMNS = ['game_username_encrypted', 'game_password_encrypted']
+
+
+def upgrade() -> None:
+    """Upgrade schema - drop plaintext credential columns."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = {c['name'] for c in inspector.get_columns('game_credentials')}
+    if not columns.intersection(PLAINTEXT_COLUMNS):
+        return
+
+    unencrypted = conn.execute(sa.text(
+        "SELECT COUNT(*) FROM game_credentials "
+        "WHERE game_username_encrypted IS NULL OR game_password_encrypted IS NULL"
+    )).scalar()
+    if unencrypted:
+        raise RuntimeError(
+            f"{unencrypted} game credentials are not encrypted yet; "
+            "run scripts/migrate_credentials.py before upgrading"
+        )
+
+    with op.batch_alter_table('game_credentials') as batch_op:
+        for name in PLAINTEXT_COLUMNS:
+            if name in columns:
+                batch_op.drop_column(name)
+        for name in ENCRYPTED_COLUMNS:
+            batch_op.alter_column(name, existing_type=sa.Text(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore (empty) plaintext credential columns."""
+    with op.batch_alter_table('game_credentials') as batch_op:
+        for name in ENCRYPTED_COLUMNS:
+            batch_op.alter_column(name, existing_type=sa.Text(), nullable=True)
+        for name in PLAINTEXT_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.String(), nullable=True))
@@ -0,0 +1,46 @@
+"""Add composite indexes for keyset-paginated list endpoints
+
+Revision ID: r3m4n5o6p7q8
+Revises: q2l3m4n5o6p7
+Create Date: 2026-10-19 21:00:00.000000
+
+Each index matches the filter and ``(created_at, id)`` style ordering of a
+list endpoint (see app/pagination.py), so every page is an index range scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r3m4n5o6p7q8'
+down_revision: Union[str, Sequence[str], None] = 'q2l3m4n5o6p7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_messages_created_id', 'messages', ['created_at', 'id']),
+    ('ix_reviews_reviewee_created', 'reviews', ['reviewee_id', 'created_at', 'id']),
+    ('ix_reviews_reviewer_created', 'reviews', ['reviewer_id', 'created_at', 'id']),
+    ('ix_community_posts_visibility_created', 'community_posts', ['visibility', 'is_active', 'created_at', 'id']),
+    ('ix_community_posts_author_created', 'community_posts', ['author_id', 'created_at', 'id']),
+    ('ix_tickets_user_updated', 'tickets', ['user_id', 'updated_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - add keyset pagination indexes."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    for name, table, columns in INDEXES:
+        if name not in {idx['name'] for idx in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove keyset pagination indexes."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,54 @@
+"""Add account_purges table for background account deletion
+
+Revision ID: s4n5o6p7q8r9
+Revises: r3m4n5o6p7q8
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 's4n5o6p7q8r9'
+down_revision: Union[str, Sequence[str], None] = 'r3m4n5o6p7q8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add account_purges table."""
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'account_purges' not in inspector.get_table_names():
+        op.create_table('account_purges',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(), nullable=False),
+            sa.Column('requested_by_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('current_step', sa.String(length=50), nullable=True),
+            sa.Column('rows_deleted', sa.Integer(), nullable=False),
+            sa.Column('files_deleted', sa.Integer(), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.String(length=500), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_account_purges_id'), 'account_purges', ['id'], unique=False)
+        op.create_index(op.f('ix_account_purges_user_id'), 'account_purges', ['user_id'], unique=True)
+        op.create_index('ix_account_purges_status_id', 'account_purges', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove account_purges table."""
+    op.drop_index('ix_account_purges_status_id', table_name='account_purges')
+    op.drop_index(op.f('ix_account_purges_user_id'), table_name='account_purges')
+    op.drop_index(op.f('ix_account_purges_id'), table_name='account_purges')
+    op.drop_table('account_purges')
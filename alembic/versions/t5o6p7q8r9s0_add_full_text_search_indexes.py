@@ -0,0 +1,67 @@
+"""Add full-text search indexes for messages, ticket messages and posts
+
+Revision ID: t5o6p7q8r9s0
+Revises: s4n5o6p7q8r9
+Create Date: 2026-10-19 23:00:00.000000
+
+PostgreSQL gets GIN indexes on ``to_tsvector('english', content)``; SQLite
+gets FTS5 tables kept in sync by triggers, filled from the existing rows.
+Must stay in step with app/models/search_index.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't5o6p7q8r9s0'
+down_revision: Union[str, Sequence[str], None] = 's4n5o6p7q8r9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['messages', 'ticket_messages', 'community_posts']
+
+
+def _sqlite_upgrade(table: str) -> None:
+    fts = f'{table}_fts'
+    insert = f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content);"
+    remove = f"INSERT INTO {fts}({fts}, rowid, content) VALUES ('delete', old.id, old.content);"
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"content, content='{table}', content_rowid='id', tokenize='porter unicode61')"
+    )
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {remove} END")
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF content ON {table} "
+        f"BEGIN {remove} {insert} END"
+    )
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Upgrade schema - add full-text search indexes."""
+    dialect = op.get_bind().dialect.name
+
+    for table in TABLES:
+        if dialect == 'postgresql':
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_content_fts ON {table} "
+                f"USING gin (to_tsvector('english'::regconfig, content))"
+            )
+        elif dialect == 'sqlite':
+            _sqlite_upgrade(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove full-text search indexes."""
+    dialect = op.get_bind().dialect.name
+
+    for table in TABLES:
+        if dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_content_fts")
+        elif dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
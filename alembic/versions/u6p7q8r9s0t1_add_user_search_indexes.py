@@ -0,0 +1,43 @@
+"""Add user search indexes (pg_trgm on PostgreSQL, lower() on SQLite)
+
+Revision ID: u6p7q8r9s0t1
+Revises: t5o6p7q8r9s0
+Create Date: 2026-10-20 00:00:00.000000
+
+Must stay in step with app/models/search_index.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u6p7q8r9s0t1'
+down_revision: Union[str, Sequence[str], None] = 't5o6p7q8r9s0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ['username', 'full_name', 'user_id', 'email']
+
+
+def upgrade() -> None:
+    """Upgrade schema - add user search indexes."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in COLUMNS:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_users_{column}_trgm ON users USING gin ({column} gin_trgm_ops)"
+            )
+    else:
+        for column in COLUMNS:
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_lower ON users (lower({column}))")
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove user search indexes (pg_trgm stays installed)."""
+    suffix = 'trgm' if op.get_bind().dialect.name == 'postgresql' else 'lower'
+    for column in COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_users_{column}_{suffix}")
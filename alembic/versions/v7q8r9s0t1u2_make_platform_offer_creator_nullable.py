@@ -0,0 +1,54 @@
+"""make platform_offers.created_by nullable
+
+Revision ID: v7q8r9s0t1u2
+Revises: u6p7q8r9s0t1
+Create Date: 2026-10-20 01:00:00.000000
+
+The account purge clears the reference when the admin who created an
+offer is deleted, keeping the offer and its claims.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'v7q8r9s0t1u2'
+down_revision: Union[str, Sequence[str], None] = 'u6p7q8r9s0t1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Make platform_offers.created_by nullable"""
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+
+    if dialect == 'postgresql':
+        op.alter_column('platform_offers', 'created_by',
+                   existing_type=sa.Integer(),
+                   nullable=True)
+    else:
+        # SQLite requires recreating the table (handled by batch mode)
+        with op.batch_alter_table('platform_offers') as batch_op:
+            batch_op.alter_column('created_by',
+                           existing_type=sa.Integer(),
+                           nullable=True)
+
+
+def downgrade() -> None:
+    """Revert platform_offers.created_by to non-nullable"""
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+
+    if dialect == 'postgresql':
+        op.alter_column('platform_offers', 'created_by',
+                   existing_type=sa.Integer(),
+                   nullable=False)
+    else:
+        # SQLite requires recreating the table (handled by batch mode)
+        with op.batch_alter_table('platform_offers') as batch_op:
+            batch_op.alter_column('created_by',
+                           existing_type=sa.Integer(),
+                           nullable=False)
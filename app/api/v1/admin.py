@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Header, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
@@ -7,22 +7,55 @@ import string
 import os
 import uuid
 import shutil
-import asyncio
 from app import models, schemas, auth
 from app.database import get_db
 from app.models import UserType, ReferralStatus, REFERRAL_BONUS_CREDITS
-from app.services import send_referral_bonus_email
 from app.s3_storage import s3_storage
-from app.websocket import send_credit_update
-from app.services.push_notification_service import send_credit_notification
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
+from app.websocket import WSMessageType, credit_update_data
+from app.services.push_notification_service import credit_push
+from app.services.outbox import enqueue_ws, enqueue_push, enqueue_email
+from app.services.dashboard_stats import dashboard_stats
+from app.services import ledger
+from app.services.account_purge import is_being_purged, purge_status, request_purge
+from app.services.user_search import ADMIN_SEARCH_COLUMNS, match_users
+from app.services.ledger import InsufficientCreditsError
+from app.api.v1.referrals import credit_referral_bonus
+from app.models import LedgerTransactionType
+from app.core.serialization import fast_list_response, rows_to_dicts
+from app.pagination import KeysetParams, SortKey, keyset_pagination, newest_first
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Columns returned by the admin user table. Secrets (password hash, 2FA
+# secret, OTPs) are never projected.
+ADMIN_USER_PROJECTION = (
+    models.User.id,
+    models.User.user_id,
+    models.User.email,
+    models.User.username,
+    models.User.full_name,
+    models.User.user_type,
+    models.User.is_active,
+    models.User.is_approved,
+    models.User.created_at,
+    models.User.company_name,
+    models.User.player_level,
+    models.User.credits,
+    models.User.profile_picture,
+    models.User.is_online,
+    models.User.last_seen,
+    models.User.last_activity,
+    models.User.is_email_verified,
+    models.User.two_factor_enabled,
+    models.User.is_suspended,
+    models.User.suspended_until,
+    models.User.created_by_client_id,
+)
+
 def get_admin_user(current_user: models.User = Depends(auth.get_current_active_user)):
     """Ensure the current user is an admin"""
     if current_user.user_type != UserType.ADMIN:
@@ -37,72 +70,12 @@ def get_dashboard_stats(
     admin: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get overall platform statistics for admin dashboard"""
-
-    # User statistics
-    total_users = db.query(models.User).count()
-    total_clients = db.query(models.User).filter(models.User.user_type == UserType.CLIENT).count()
-    total_players = db.query(models.User).filter(models.User.user_type == UserType.PLAYER).count()
-    active_users = db.query(models.User).filter(models.User.is_active == True).count()
-    online_users = db.query(models.User).filter(models.User.is_online == True).count()
-    pending_approvals = db.query(models.User).filter(
-        models.User.is_approved == False,
-        models.User.user_type == UserType.CLIENT
-    ).count()
-
-    # Recent registrations (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_registrations = db.query(models.User).filter(
-        models.User.created_at >= seven_days_ago
-    ).count()
-
-    # Message statistics
-    total_messages = db.query(models.Message).count()
-    today_messages = db.query(models.Message).filter(
-        func.date(models.Message.created_at) == func.date(datetime.utcnow())
-    ).count()
-
-    # Promotion statistics
-    active_promotions = db.query(models.Promotion).filter(
-        models.Promotion.status == models.PromotionStatus.ACTIVE
-    ).count()
-    total_claims = db.query(models.PromotionClaim).count()
-
-    # Review statistics
-    total_reviews = db.query(models.Review).count()
-    avg_rating = db.query(func.avg(models.Review.rating)).scalar() or 0
-
-    # Report statistics
-    pending_reports = db.query(models.Report).filter(
-        models.Report.status == models.ReportStatus.PENDING
-    ).count()
-
-    return {
-        "users": {
-            "total": total_users,
-            "clients": total_clients,
-            "players": total_players,
-            "active": active_users,
-            "online": online_users,
-            "recent_registrations": recent_registrations,
-            "pending_approvals": pending_approvals
-        },
-        "messages": {
-            "total": total_messages,
-            "today": today_messages
-        },
-        "promotions": {
-            "active": active_promotions,
-            "total_claims": total_claims
-        },
-        "reviews": {
-            "total": total_reviews,
-            "average_rating": round(avg_rating, 2)
-        },
-        "reports": {
-            "pending": pending_reports
-        }
-    }
+    """
+    Get overall platform statistics for admin dashboard.
+    Served from a short-lived cache; join the "admin:dashboard" WebSocket
+    room to receive changes as they happen instead of polling.
+    """
+    return dashboard_stats.get(db)
 
 @router.get("/s3-diagnostics")
 def get_s3_diagnostics(
@@ -177,8 +150,8 @@ def _get_s3_recommendations(bucket_info: dict) -> list:
 
 @router.get("/users")
 def get_all_users(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=100, max_limit=500)),
     user_type: Optional[UserType] = None,
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
@@ -186,37 +159,35 @@ def get_all_users(
     admin: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all users with filtering options"""
-    query = db.query(models.User)
+    """Get all users with filtering options (with ``search``, best match first)"""
+    match = match_users(db, search, ADMIN_SEARCH_COLUMNS) if search else None
+    keys = [SortKey(models.User.id)]
+
+    if match is not None:
+        rank = match.rank.label("search_rank")
+        query = db.query(*ADMIN_USER_PROJECTION, rank).filter(match.condition)
+        keys.insert(0, SortKey(rank, descending=True, value=lambda row: row.search_rank))
+    else:
+        query = db.query(*ADMIN_USER_PROJECTION)
 
     if user_type:
         query = query.filter(models.User.user_type == user_type)
 
-    if search:
-        query = query.filter(
-            or_(
-                models.User.username.contains(search),
-                models.User.email.contains(search),
-                models.User.full_name.contains(search),
-                models.User.user_id.contains(search)
-            )
-        )
-
     if is_active is not None:
         query = query.filter(models.User.is_active == is_active)
 
     if is_approved is not None:
         query = query.filter(models.User.is_approved == is_approved)
 
-    users = query.offset(skip).limit(limit).all()
-    total = query.count()
+    users, next_cursor = page.paginate(query, keys, offset=skip if not page.cursor else 0)
 
-    return {
-        "users": users,
-        "total": total,
+    return fast_list_response({
+        "users": rows_to_dicts(users),
+        "total": page.count(query),
         "skip": skip,
-        "limit": limit
-    }
+        "limit": page.limit,
+        "next_cursor": next_cursor
+    })
 
 
 # Schema for creating client by admin
@@ -329,23 +300,18 @@ def approve_user(
             models.User.id == referral.referrer_id
         ).first()
 
-        if referrer:
-            referrer.credits = (referrer.credits or 0) + referral.bonus_amount
-            referral.status = ReferralStatus.COMPLETED
-            referral.completed_at = func.now()
+        if referrer and credit_referral_bonus(db, referral):
             referral_bonus_credited = True
 
-            # Send email notification to referrer about bonus
-            try:
-                if referrer.email:
-                    send_referral_bonus_email(
-                        to_email=referrer.email,
-                        username=referrer.username,
-                        referred_username=user.username,
-                        bonus_amount=referral.bonus_amount
-                    )
-            except Exception as e:
-                logger.error(f"Failed to send referral bonus email: {e}")
+            # Email the referrer about the bonus once the approval commits
+            if referrer.email:
+                enqueue_email(
+                    db, "referral_bonus",
+                    to_email=referrer.email,
+                    username=referrer.username,
+                    referred_username=user.username,
+                    bonus_amount=referral.bonus_amount
+                )
 
     db.commit()
     db.refresh(user)
@@ -426,6 +392,9 @@ def toggle_user_status(
             detail="Cannot deactivate your own admin account"
         )
 
+    if is_being_purged(db, user.id):
+        raise HTTPException(status_code=409, detail="This account is being deleted")
+
     user.is_active = not user.is_active
     db.commit()
     db.refresh(user)
@@ -435,13 +404,19 @@ def toggle_user_status(
         "user": user
     }
 
-@router.delete("/users/{user_id}")
+@router.delete("/users/{user_id}", status_code=status.HTTP_202_ACCEPTED)
 def delete_user(
     user_id: int,
     admin: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Delete a user account and all related data"""
+    """
+    Delete a user account and all related data
+
+    The account is disabled immediately; its data is deleted in the
+    background (see app/services/account_purge.py). Poll
+    GET /admin/users/{user_id}/purge for progress.
+    """
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -460,135 +435,86 @@ def delete_user(
             detail="Cannot delete other admin accounts"
         )
 
-    username = user.username
+    purge = request_purge(db, user, requested_by=admin)
+    return {
+        "message": f"User {purge.username} has been disabled and their data is being deleted",
+        "purge": purge_status(purge)
+    }
 
-    try:
-        # Delete related records in order to avoid foreign key constraint violations
-
-        # Delete messages (sent and received)
-        db.query(models.Message).filter(
-            or_(models.Message.sender_id == user_id, models.Message.receiver_id == user_id)
-        ).delete(synchronize_session=False)
-
-        # Delete friend requests (sent and received)
-        db.query(models.FriendRequest).filter(
-            or_(models.FriendRequest.sender_id == user_id, models.FriendRequest.receiver_id == user_id)
-        ).delete(synchronize_session=False)
-
-        # Delete reports (reported by or reported user)
-        db.query(models.Report).filter(
-            or_(models.Report.reporter_id == user_id, models.Report.reported_user_id == user_id)
-        ).delete(synchronize_session=False)
-
-        # Delete reviews
-        if hasattr(models, 'Review'):
-            db.query(models.Review).filter(
-                or_(models.Review.reviewer_id == user_id, models.Review.reviewed_user_id == user_id)
-            ).delete(synchronize_session=False)
-
-        # Delete tickets and ticket messages
-        if hasattr(models, 'TicketMessage'):
-            db.query(models.TicketMessage).filter(models.TicketMessage.sender_id == user_id).delete(synchronize_session=False)
-        if hasattr(models, 'Ticket'):
-            db.query(models.Ticket).filter(models.Ticket.user_id == user_id).delete(synchronize_session=False)
-
-        # Delete bet transactions
-        if hasattr(models, 'BetTransaction'):
-            db.query(models.BetTransaction).filter(models.BetTransaction.user_id == user_id).delete(synchronize_session=False)
-
-        # Delete game credentials (both as client and player)
-        if hasattr(models, 'GameCredentials'):
-            db.query(models.GameCredentials).filter(
-                or_(models.GameCredentials.client_id == user_id, models.GameCredentials.player_id == user_id)
-            ).delete(synchronize_session=False)
-
-        # Delete client games
-        if hasattr(models, 'ClientGame'):
-            db.query(models.ClientGame).filter(models.ClientGame.client_id == user_id).delete(synchronize_session=False)
-
-        # Delete promotion claims
-        if hasattr(models, 'PromotionClaim'):
-            db.query(models.PromotionClaim).filter(models.PromotionClaim.player_id == user_id).delete(synchronize_session=False)
-
-        # Delete promotions (if client)
-        if hasattr(models, 'Promotion'):
-            db.query(models.Promotion).filter(models.Promotion.client_id == user_id).delete(synchronize_session=False)
-
-        # Delete offer claims
-        if hasattr(models, 'OfferClaim'):
-            db.query(models.OfferClaim).filter(models.OfferClaim.player_id == user_id).delete(synchronize_session=False)
-
-        # Delete notifications
-        if hasattr(models, 'Notification'):
-            db.query(models.Notification).filter(models.Notification.user_id == user_id).delete(synchronize_session=False)
-
-        # Delete referrals (as referrer or referred)
-        if hasattr(models, 'Referral'):
-            db.query(models.Referral).filter(
-                or_(models.Referral.referrer_id == user_id, models.Referral.referred_id == user_id)
-            ).delete(synchronize_session=False)
-
-        # Finally delete the user
-        db.delete(user)
-        db.commit()
-
-        return {"message": f"User {username} and all related data deleted successfully"}
-
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to delete user {user_id}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to delete user: {str(e)}"
-        )
+@router.get("/users/{user_id}/purge")
+def get_user_purge(
+    user_id: int,
+    admin: models.User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Progress of a user account deletion"""
+    purge = db.query(models.AccountPurge).filter(models.AccountPurge.user_id == user_id).first()
+    if not purge:
+        raise HTTPException(status_code=404, detail="No deletion requested for this user")
+    return purge_status(purge)
 
 @router.get("/messages")
 def get_all_messages(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=100, max_limit=500, default_total="estimated")),
     admin: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
     """Get all messages in the system"""
-    from sqlalchemy.orm import joinedload
-
-    messages = db.query(models.Message)\
-        .options(joinedload(models.Message.sender), joinedload(models.Message.receiver))\
-        .order_by(models.Message.created_at.desc())\
-        .offset(skip).limit(limit).all()
-
-    total = db.query(models.Message).count()
+    from sqlalchemy.orm import aliased
+
+    sender = aliased(models.User)
+    receiver = aliased(models.User)
+
+    # Single projected query instead of hydrating Message + two User entities per row
+    query = db.query(
+        models.Message.id,
+        models.Message.content,
+        models.Message.is_read,
+        models.Message.created_at,
+        models.Message.sender_id,
+        models.Message.receiver_id,
+        sender.username.label("sender_username"),
+        sender.full_name.label("sender_full_name"),
+        sender.user_type.label("sender_user_type"),
+        receiver.username.label("receiver_username"),
+        receiver.full_name.label("receiver_full_name"),
+        receiver.user_type.label("receiver_user_type"),
+    ).outerjoin(sender, sender.id == models.Message.sender_id)\
+        .outerjoin(receiver, receiver.id == models.Message.receiver_id)
+    rows, next_cursor = page.paginate(query, newest_first(models.Message), offset=skip if not page.cursor else 0)
 
     # Format messages with sender and receiver info
     formatted_messages = []
-    for msg in messages:
+    for row in rows:
         formatted_messages.append({
-            "id": msg.id,
-            "content": msg.content,
-            "is_read": msg.is_read,
-            "created_at": msg.created_at,
-            "sender_id": msg.sender_id,
-            "receiver_id": msg.receiver_id,
+            "id": row.id,
+            "content": row.content,
+            "is_read": row.is_read,
+            "created_at": row.created_at,
+            "sender_id": row.sender_id,
+            "receiver_id": row.receiver_id,
             "sender": {
-                "id": msg.sender.id,
-                "username": msg.sender.username,
-                "full_name": msg.sender.full_name,
-                "user_type": msg.sender.user_type
-            } if msg.sender else None,
+                "id": row.sender_id,
+                "username": row.sender_username,
+                "full_name": row.sender_full_name,
+                "user_type": row.sender_user_type
+            } if row.sender_username is not None else None,
             "receiver": {
-                "id": msg.receiver.id,
-                "username": msg.receiver.username,
-                "full_name": msg.receiver.full_name,
-                "user_type": msg.receiver.user_type
-            } if msg.receiver else None
+                "id": row.receiver_id,
+                "username": row.receiver_username,
+                "full_name": row.receiver_full_name,
+                "user_type": row.receiver_user_type
+            } if row.receiver_username is not None else None
         })
 
-    return {
+    return fast_list_response({
         "messages": formatted_messages,
-        "total": total,
+        "total": page.count(db.query(models.Message)),
         "skip": skip,
-        "limit": limit
-    }
+        "limit": page.limit,
+        "next_cursor": next_cursor
+    })
 
 @router.get("/promotions")
 def get_all_promotions(
@@ -782,14 +708,15 @@ def reset_user_password(
 def add_credits_to_user(
     user_id: int,
     amount: int,
-    background_tasks: BackgroundTasks,
     reason: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     admin: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
     """
     Add or subtract credits from a user account (admin only).
     Use positive amount to add credits, negative to subtract.
+    Retries carrying the same Idempotency-Key header are applied only once.
     """
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -802,23 +729,40 @@ def add_credits_to_user(
             detail="Cannot modify admin credits"
         )
 
-    # Calculate new balance
-    current_credits = user.credits or 0
-    new_credits = current_credits + amount
-
-    # Prevent negative balance
-    if new_credits < 0:
+    # Apply through the ledger; the conditional update prevents a negative balance
+    try:
+        posted = ledger.credit_user(
+            db, user.id, amount, LedgerTransactionType.ADMIN_ADJUSTMENT,
+            idempotency_key=f"admin_adjustment:{user.id}:{idempotency_key}" if idempotency_key else None,
+            description=reason,
+            created_by_id=admin.id
+        )
+    except InsufficientCreditsError:
+        db.rollback()
         raise HTTPException(
             status_code=400,
-            detail=f"Cannot set negative credits. Current balance: {current_credits}, trying to subtract: {abs(amount)}"
+            detail=f"Cannot set negative credits. Current balance: {user.credits or 0}, trying to subtract: {abs(amount)}"
         )
 
-    # Update credits
-    user.credits = new_credits
+    new_credits = posted.balances[user.id]
+    current_credits = new_credits - amount
+    abs_amount = abs(amount)
+    response = {
+        "message": f"Successfully {'added' if amount > 0 else 'deducted'} {abs_amount} credits {'to' if amount > 0 else 'from'} {user.username}",
+        "user_id": user.id,
+        "username": user.username,
+        "previous_balance": current_credits,
+        "amount_changed": amount,
+        "new_balance": new_credits,
+        "reason": reason
+    }
+    if posted.replayed:
+        # Retried request: already applied and notified
+        db.rollback()
+        return response
 
     # Send notification message to user
     action = "added to" if amount > 0 else "deducted from"
-    abs_amount = abs(amount)
     dollar_value = abs_amount / 100  # 100 credits = $1
 
     message_content = f"💰 Credit Update\n\n{abs_amount} credits (${dollar_value:.2f}) have been {action} your account by admin."
@@ -835,42 +779,14 @@ def add_credits_to_user(
     )
     db.add(notification)
 
+    # Live balance update and push, delivered after commit
+    enqueue_ws(db, user.id, WSMessageType.CREDIT_UPDATE, credit_update_data(new_credits, amount, "admin_adjustment"))
+    enqueue_push(db, [user.id], credit_push(amount, reason or "admin adjustment", "Admin"))
+
     db.commit()
     db.refresh(user)
 
-    # Send real-time credit update via WebSocket
-    target_user_id = user.id
-    final_balance = new_credits
-
-    def send_ws_update():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(send_credit_update(target_user_id, final_balance, amount, "admin_adjustment"))
-        finally:
-            loop.close()
-
-    background_tasks.add_task(send_ws_update)
-
-    # Send push notification for credit change
-    background_tasks.add_task(
-        send_credit_notification,
-        db,
-        user.id,
-        amount,
-        reason or "admin adjustment",
-        "Admin",
-    )
-
-    return {
-        "message": f"Successfully {'added' if amount > 0 else 'deducted'} {abs_amount} credits {'to' if amount > 0 else 'from'} {user.username}",
-        "user_id": user.id,
-        "username": user.username,
-        "previous_balance": current_credits,
-        "amount_changed": amount,
-        "new_balance": new_credits,
-        "reason": reason
-    }
+    return response
 
 
 class BroadcastRequest(BaseModel):
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from typing import List, Optional
@@ -13,12 +13,28 @@ from app.database import get_db
 from app.websocket import manager, WSMessage, WSMessageType
 from app.s3_storage import s3_storage, save_upload_file_locally, is_s3_url
 from app.rate_limit import conditional_rate_limit, RateLimits
-from app.services.push_notification_service import send_message_notification
+from app.services.push_notification_service import message_push
+from app.services.outbox import enqueue_push
+from app.core.serialization import fast_list_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Columns of schemas.MessageResponse (minus the nested users)
+MESSAGE_PROJECTION = (
+    models.Message.id,
+    models.Message.sender_id,
+    models.Message.receiver_id,
+    models.Message.message_type,
+    models.Message.content,
+    models.Message.file_url,
+    models.Message.file_name,
+    models.Message.duration,
+    models.Message.is_read,
+    models.Message.created_at,
+)
+
 
 async def send_conversation_update(sender: models.User, receiver_id: int, message: models.Message, db: Session):
     """Send conversation update notification to receiver for their conversation list"""
@@ -83,7 +99,6 @@ def check_friendship(user1_id: int, user2_id: int, db: Session) -> bool:
 @conditional_rate_limit(RateLimits.SEND_MESSAGE)
 async def send_text_message(
     request: Request,
-    background_tasks: BackgroundTasks,
     receiver_id: int = Form(...),
     content: str = Form(...),
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -120,6 +135,10 @@ async def send_text_message(
     )
 
     db.add(message)
+    # Push notification for offline/background users, delivered after commit
+    sender_name = current_user.full_name or current_user.username
+    enqueue_push(db, [receiver_id], message_push(sender_name, content, current_user.id))
+
     db.commit()
     db.refresh(message)
 
@@ -144,24 +163,12 @@ async def send_text_message(
     # Send conversation update for the conversation list
     await send_conversation_update(current_user, receiver_id, message, db)
 
-    # Send push notification for offline/background users
-    sender_name = current_user.full_name or current_user.username
-    background_tasks.add_task(
-        send_message_notification,
-        db,
-        receiver_id,
-        sender_name,
-        content,
-        current_user.id,
-    )
-
     return message
 
 @router.post("/send/image", response_model=schemas.MessageResponse)
 @conditional_rate_limit(RateLimits.SEND_IMAGE)
 async def send_image_message(
     request: Request,
-    background_tasks: BackgroundTasks,
     receiver_id: int = Form(...),
     file: UploadFile = File(...),
     content: str = Form(None),  # Optional caption for the image
@@ -237,6 +244,11 @@ async def send_image_message(
     )
 
     db.add(message)
+    # Push notification for offline/background users, delivered after commit
+    sender_name = current_user.full_name or current_user.username
+    preview = f"📷 Image" + (f": {content[:50]}..." if content and len(content) > 50 else f": {content}" if content else "")
+    enqueue_push(db, [receiver_id], message_push(sender_name, preview, current_user.id))
+
     db.commit()
     db.refresh(message)
 
@@ -262,25 +274,12 @@ async def send_image_message(
     # Send conversation update for the conversation list
     await send_conversation_update(current_user, receiver_id, message, db)
 
-    # Send push notification for offline/background users
-    sender_name = current_user.full_name or current_user.username
-    preview = f"📷 Image" + (f": {content[:50]}..." if content and len(content) > 50 else f": {content}" if content else "")
-    background_tasks.add_task(
-        send_message_notification,
-        db,
-        receiver_id,
-        sender_name,
-        preview,
-        current_user.id,
-    )
-
     return message
 
 @router.post("/send/voice", response_model=schemas.MessageResponse)
 @conditional_rate_limit(RateLimits.SEND_VOICE)
 async def send_voice_message(
     request: Request,
-    background_tasks: BackgroundTasks,
     receiver_id: int = Form(...),
     duration: int = Form(...),
     file: UploadFile = File(...),
@@ -378,6 +377,11 @@ async def send_voice_message(
     )
 
     db.add(message)
+    # Push notification for offline/background users, delivered after commit
+    sender_name = current_user.full_name or current_user.username
+    preview = f"🎤 Voice message ({duration}s)"
+    enqueue_push(db, [receiver_id], message_push(sender_name, preview, current_user.id))
+
     db.commit()
     db.refresh(message)
 
@@ -404,18 +408,6 @@ async def send_voice_message(
     # Send conversation update for the conversation list
     await send_conversation_update(current_user, receiver_id, message, db)
 
-    # Send push notification for offline/background users
-    sender_name = current_user.full_name or current_user.username
-    preview = f"🎤 Voice message ({duration}s)"
-    background_tasks.add_task(
-        send_message_notification,
-        db,
-        receiver_id,
-        sender_name,
-        preview,
-        current_user.id,
-    )
-
     return message
 
 @router.get("/conversations", response_model=List[schemas.ConversationResponse])
@@ -538,8 +530,9 @@ async def get_messages(
             detail="User not found"
         )
 
-    # Get messages
-    messages = db.query(models.Message).filter(
+    # Get messages as a column projection - sender/receiver are always one of
+    # the two participants, so they are serialized once below instead of per row
+    messages = db.query(*MESSAGE_PROJECTION).filter(
         or_(
             and_(models.Message.sender_id == current_user.id,
                  models.Message.receiver_id == friend_id),
@@ -563,11 +556,24 @@ async def get_messages(
         models.Message.is_read == False
     ).count()
 
-    return {
-        "messages": list(reversed(messages)),  # Return in chronological order
-        "unread_count": unread_count
+    participants = {
+        current_user.id: schemas.UserResponse.model_validate(current_user).model_dump(mode="json"),
+        other_user.id: schemas.UserResponse.model_validate(other_user).model_dump(mode="json"),
     }
 
+    formatted_messages = []
+    for row in reversed(messages):  # Return in chronological order
+        item = dict(row._mapping)
+        item["sender"] = participants[item["sender_id"]]
+        item["receiver"] = participants[item["receiver_id"]]
+        formatted_messages.append(item)
+
+    # Rows are projected from validated columns; skip response_model re-validation
+    return fast_list_response({
+        "messages": formatted_messages,
+        "unread_count": unread_count
+    })
+
 @router.put("/messages/{message_id}/read")
 async def mark_message_read(
     message_id: int,
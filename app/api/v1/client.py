@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from app import models, schemas, auth
 from app.database import get_db
 from app.models import UserType, ReferralStatus, REFERRAL_BONUS_CREDITS
-from app.services import send_referral_bonus_email
+from app.services.outbox import enqueue_email
+from app.services.account_purge import is_being_purged
+from app.services.client_analytics import load_client_rollup, utc_today
+from app.api.v1.referrals import credit_referral_bonus
+from app.services.activity_feed import (
+    ANALYTICS_LABELS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, as_activity_items, get_feed
+)
 import random
 import string
 import logging
@@ -89,31 +95,28 @@ def register_player(
 
         if referrer and referrer.id != new_player.id:
             # Since client-created players are auto-approved, credit the bonus immediately
-            referrer.credits = (referrer.credits or 0) + REFERRAL_BONUS_CREDITS
-
-            # Create a completed referral record
             referral = models.Referral(
                 referrer_id=referrer.id,
                 referred_id=new_player.id,
-                status=ReferralStatus.COMPLETED,
+                status=ReferralStatus.PENDING,
                 bonus_amount=REFERRAL_BONUS_CREDITS
             )
             db.add(referral)
+            db.flush()
+            credit_referral_bonus(db, referral)
+
+            # Email the referrer about the bonus once it commits
+            if referrer.email:
+                enqueue_email(
+                    db, "referral_bonus",
+                    to_email=referrer.email,
+                    username=referrer.username,
+                    referred_username=new_player.username,
+                    bonus_amount=REFERRAL_BONUS_CREDITS
+                )
             db.commit()
             logger.info(f"Referral bonus credited: {referrer.username} referred {new_player.username}, {REFERRAL_BONUS_CREDITS} credits added")
 
-            # Send email notification to referrer about bonus
-            try:
-                if referrer.email:
-                    send_referral_bonus_email(
-                        to_email=referrer.email,
-                        username=referrer.username,
-                        referred_username=new_player.username,
-                        bonus_amount=REFERRAL_BONUS_CREDITS
-                    )
-            except Exception as e:
-                logger.error(f"Failed to send referral bonus email: {e}")
-
     # Automatically create a friend connection between client and player
     # This allows them to communicate
     if client.id not in [f.id for f in new_player.friends]:
@@ -342,13 +345,7 @@ async def get_analytics(
     db: Session = Depends(get_db)
 ):
     """Get comprehensive analytics data for the client dashboard"""
-    from datetime import datetime, timedelta
-    from sqlalchemy import or_
-
-    today = datetime.utcnow().date()
-    yesterday = today - timedelta(days=1)
-    last_week = today - timedelta(days=7)
-    two_weeks_ago = today - timedelta(days=14)
+    today = utc_today()
 
     # --- Total Friends ---
     total_friends = len(current_user.friends) if current_user.friends else 0
@@ -357,31 +354,17 @@ async def get_analytics(
     # Note: We'll approximate trends based on available data
     friends_trend = {"value": "+0%", "is_positive": True}
 
+    # Message, signup and player numbers come from the daily rollup table
+    rollup = load_client_rollup(db, current_user.id, today)
+
     # --- Total Messages ---
-    total_messages_sent = db.query(models.Message).filter(
-        models.Message.sender_id == current_user.id
-    ).count()
-    total_messages_received = db.query(models.Message).filter(
-        models.Message.receiver_id == current_user.id
-    ).count()
+    total_messages_sent = rollup["messages_sent"]
+    total_messages_received = rollup["messages_received"]
     total_messages = total_messages_sent + total_messages_received
 
     # Messages in last week vs week before for trend
-    messages_this_week = db.query(models.Message).filter(
-        or_(
-            models.Message.sender_id == current_user.id,
-            models.Message.receiver_id == current_user.id
-        ),
-        func.date(models.Message.created_at) >= last_week
-    ).count()
-    messages_last_week = db.query(models.Message).filter(
-        or_(
-            models.Message.sender_id == current_user.id,
-            models.Message.receiver_id == current_user.id
-        ),
-        func.date(models.Message.created_at) >= two_weeks_ago,
-        func.date(models.Message.created_at) < last_week
-    ).count()
+    messages_this_week = rollup["messages_this_week"]
+    messages_last_week = rollup["messages_last_week"]
 
     if messages_last_week > 0:
         msg_change = ((messages_this_week - messages_last_week) / messages_last_week) * 100
@@ -393,37 +376,22 @@ async def get_analytics(
         messages_trend = {"value": f"+{messages_this_week}", "is_positive": True}
 
     # --- Active Players ---
-    direct_active = db.query(models.User).filter(
-        models.User.created_by_client_id == current_user.id,
-        models.User.user_type == models.UserType.PLAYER,
-        models.User.is_active == True
-    ).count()
-
-    credential_active = db.query(models.User).join(
-        models.GameCredentials,
-        models.GameCredentials.player_id == models.User.id
-    ).filter(
-        models.GameCredentials.created_by_client_id == current_user.id,
-        models.User.user_type == models.UserType.PLAYER,
-        models.User.is_active == True,
-        models.User.created_by_client_id != current_user.id
-    ).distinct().count()
-
-    active_players = direct_active + credential_active
-    players_trend = {"value": "+0%", "is_positive": True}
+    direct_active = rollup["direct_active_players"]
+    active_players = rollup["active_players"]
+
+    players_last_week = rollup["active_players_last_week"]
+    if players_last_week:
+        players_change = ((active_players - players_last_week) / players_last_week) * 100
+        players_trend = {
+            "value": f"{'+' if players_change >= 0 else ''}{int(players_change)}%",
+            "is_positive": players_change >= 0
+        }
+    else:
+        players_trend = {"value": "+0%", "is_positive": True}
 
     # --- New Signups (today) ---
-    new_signups = db.query(models.User).filter(
-        models.User.created_by_client_id == current_user.id,
-        models.User.user_type == models.UserType.PLAYER,
-        func.date(models.User.created_at) == today
-    ).count()
-
-    signups_yesterday = db.query(models.User).filter(
-        models.User.created_by_client_id == current_user.id,
-        models.User.user_type == models.UserType.PLAYER,
-        func.date(models.User.created_at) == yesterday
-    ).count()
+    new_signups = rollup["signups_today"]
+    signups_yesterday = rollup["signups_yesterday"]
 
     if signups_yesterday > 0:
         signup_change = ((new_signups - signups_yesterday) / signups_yesterday) * 100
@@ -451,10 +419,7 @@ async def get_analytics(
         response_rate = 100.0
 
     # Player retention: active players / total players
-    total_direct = db.query(models.User).filter(
-        models.User.created_by_client_id == current_user.id,
-        models.User.user_type == models.UserType.PLAYER
-    ).count()
+    total_direct = rollup["total_players"]
 
     if total_direct > 0:
         player_retention = (direct_active / total_direct) * 100
@@ -474,54 +439,8 @@ async def get_analytics(
     }
 
     # --- Recent Activity ---
-    activities = []
-
-    # Friend requests received
-    friend_requests = db.query(models.FriendRequest).filter(
-        models.FriendRequest.receiver_id == current_user.id
-    ).order_by(models.FriendRequest.created_at.desc()).limit(3).all()
-
-    for fr in friend_requests:
-        activities.append({
-            "activity_type": "friend_request",
-            "description": "sent a friend request",
-            "user": fr.sender.username,
-            "timestamp": fr.created_at,
-            "status": fr.status.value.title()
-        })
-
-    # Recent player registrations
-    recent_players = db.query(models.User).filter(
-        models.User.created_by_client_id == current_user.id,
-        models.User.user_type == models.UserType.PLAYER
-    ).order_by(models.User.created_at.desc()).limit(3).all()
-
-    for player in recent_players:
-        activities.append({
-            "activity_type": "signup",
-            "description": "signed up",
-            "user": player.username,
-            "timestamp": player.created_at,
-            "status": "Active" if player.is_active else "Inactive"
-        })
-
-    # Recent messages
-    recent_msgs = db.query(models.Message).filter(
-        models.Message.receiver_id == current_user.id
-    ).order_by(models.Message.created_at.desc()).limit(3).all()
-
-    for msg in recent_msgs:
-        activities.append({
-            "activity_type": "message",
-            "description": "sent you a message",
-            "user": msg.sender.username,
-            "timestamp": msg.created_at,
-            "status": "Unread" if not msg.is_read else "Read"
-        })
-
-    # Sort and limit activities
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    activities = activities[:4]
+    rows, _ = get_feed(db, current_user.id, limit=4, event_types=list(ANALYTICS_LABELS))
+    activities = as_activity_items(rows, ANALYTICS_LABELS)
 
     # --- Top Performing Promotions ---
     top_promotions = []
@@ -571,72 +490,27 @@ async def get_recent_activity(
     limit: int = 10
 ):
     """Get recent activity for the client dashboard"""
-    from datetime import datetime, timedelta
+    rows, _ = get_feed(db, current_user.id, limit=min(max(limit, 1), MAX_PAGE_SIZE))
+    return {"activities": as_activity_items(rows)}
 
-    activities = []
-
-    # Get recent friend requests (sent and received)
-    friend_requests_sent = db.query(models.FriendRequest).filter(
-        models.FriendRequest.sender_id == current_user.id
-    ).order_by(models.FriendRequest.created_at.desc()).limit(5).all()
-
-    for fr in friend_requests_sent:
-        activities.append(schemas.ActivityItem(
-            activity_type="friend_request_sent",
-            description="Friend Request Sent",
-            user=fr.receiver.username,
-            timestamp=fr.created_at,
-            status=fr.status.value.title()
-        ))
-
-    friend_requests_received = db.query(models.FriendRequest).filter(
-        models.FriendRequest.receiver_id == current_user.id
-    ).order_by(models.FriendRequest.created_at.desc()).limit(5).all()
-
-    for fr in friend_requests_received:
-        activities.append(schemas.ActivityItem(
-            activity_type="friend_request_received",
-            description="Friend Request Received",
-            user=fr.sender.username,
-            timestamp=fr.created_at,
-            status=fr.status.value.title()
-        ))
-
-    # Get recently registered players by this client
-    recent_players = db.query(models.User).filter(
-        models.User.user_type == UserType.PLAYER,
-        models.User.created_by_client_id == current_user.id,
-        models.User.created_at >= datetime.now() - timedelta(days=7)
-    ).order_by(models.User.created_at.desc()).limit(5).all()
-
-    for player in recent_players:
-        activities.append(schemas.ActivityItem(
-            activity_type="player_registered",
-            description="Player Registered",
-            user=player.username,
-            timestamp=player.created_at,
-            status="Active" if player.is_active else "Inactive"
-        ))
-
-    # Get recent messages
-    recent_messages = db.query(models.Message).filter(
-        models.Message.receiver_id == current_user.id
-    ).order_by(models.Message.created_at.desc()).limit(5).all()
-
-    for msg in recent_messages:
-        activities.append(schemas.ActivityItem(
-            activity_type="message_received",
-            description="Message Received",
-            user=msg.sender.username,
-            timestamp=msg.created_at,
-            status="Unread" if not msg.is_read else "Read"
-        ))
-
-    # Sort all activities by timestamp and limit
-    activities.sort(key=lambda x: x.timestamp, reverse=True)
-    activities = activities[:limit]
-
-    return {"activities": activities}
+
+@router.get("/activity-feed", response_model=schemas.ActivityFeedResponse)
+def get_activity_feed(
+    current_user: models.User = Depends(get_client_user),
+    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Page through the client's activity feed, newest first.
+    Pass ``next_cursor`` from the previous page to continue; new events are
+    also pushed over the WebSocket as ``activity:new``.
+    """
+    try:
+        rows, next_cursor = get_feed(db, current_user.id, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"activities": as_activity_items(rows), "next_cursor": next_cursor}
 
 
 @router.get("/pending-players", response_model=List[schemas.UserResponse])
@@ -708,23 +582,18 @@ def approve_player(
             models.User.id == referral.referrer_id
         ).first()
 
-        if referrer:
-            referrer.credits = (referrer.credits or 0) + referral.bonus_amount
-            referral.status = ReferralStatus.COMPLETED
-            referral.completed_at = func.now()
+        if referrer and credit_referral_bonus(db, referral):
             referral_bonus_credited = True
 
-            # Send email notification to referrer about bonus
-            try:
-                if referrer.email:
-                    send_referral_bonus_email(
-                        to_email=referrer.email,
-                        username=referrer.username,
-                        referred_username=player.username,
-                        bonus_amount=referral.bonus_amount
-                    )
-            except Exception as e:
-                logger.error(f"Failed to send referral bonus email: {e}")
+            # Email the referrer about the bonus once the approval commits
+            if referrer.email:
+                enqueue_email(
+                    db, "referral_bonus",
+                    to_email=referrer.email,
+                    username=referrer.username,
+                    referred_username=player.username,
+                    bonus_amount=referral.bonus_amount
+                )
 
     db.commit()
     db.refresh(player)
@@ -812,6 +681,9 @@ def block_player(
             detail="You can only block players who are registered under your account"
         )
 
+    if is_being_purged(db, player.id):
+        raise HTTPException(status_code=409, detail="This account is being deleted")
+
     # Toggle the is_active status (block/unblock)
     player.is_active = not player.is_active
     action = "unblocked" if player.is_active else "blocked"
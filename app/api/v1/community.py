@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
 from typing import Optional
 import os
 import uuid
@@ -10,6 +9,7 @@ from io import BytesIO
 
 from app import models, schemas, auth
 from app.database import get_db
+from app.pagination import KeysetParams, keyset_pagination, newest_first
 from app.models import PostVisibility
 from app.s3_storage import s3_storage
 
@@ -69,43 +69,46 @@ def format_comment_response(comment: models.PostComment) -> dict:
     }
 
 
+def _post_page(query, page: int, pagination: KeysetParams, current_user_id: int) -> dict:
+    """Newest posts first; ``page`` is honoured for clients that predate cursors"""
+    offset = (page - 1) * pagination.limit if not pagination.cursor else 0
+    posts, next_cursor = pagination.paginate(
+        query.options(
+            joinedload(models.CommunityPost.author),
+            joinedload(models.CommunityPost.likes),
+            joinedload(models.CommunityPost.comments)
+        ),
+        newest_first(models.CommunityPost),
+        offset=offset
+    )
+
+    return {
+        "posts": [format_post_response(post, current_user_id) for post in posts],
+        "total": pagination.count(query),
+        "page": page,
+        "per_page": pagination.limit,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor
+    }
+
+
 # ============= POST ENDPOINTS =============
 
 @router.get("/posts")
 async def get_posts(
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=50),
+    page: int = Query(1, ge=1, description="Deprecated: use cursor"),
+    pagination: KeysetParams = Depends(keyset_pagination(default_limit=20, max_limit=50, limit_alias="per_page")),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get community posts for the user's community (player or client)"""
     visibility = get_visibility_for_user(current_user)
 
-    # Get total count
-    total = db.query(models.CommunityPost).filter(
+    query = db.query(models.CommunityPost).filter(
         models.CommunityPost.visibility == visibility,
         models.CommunityPost.is_active == True
-    ).count()
-
-    # Get paginated posts
-    posts = db.query(models.CommunityPost).filter(
-        models.CommunityPost.visibility == visibility,
-        models.CommunityPost.is_active == True
-    ).options(
-        joinedload(models.CommunityPost.author),
-        joinedload(models.CommunityPost.likes),
-        joinedload(models.CommunityPost.comments)
-    ).order_by(desc(models.CommunityPost.created_at)).offset(
-        (page - 1) * per_page
-    ).limit(per_page).all()
-
-    return {
-        "posts": [format_post_response(post, current_user.id) for post in posts],
-        "total": total,
-        "page": page,
-        "per_page": per_page,
-        "has_more": (page * per_page) < total
-    }
+    )
+    return _post_page(query, page, pagination, current_user.id)
 
 
 @router.post("/posts")
@@ -421,34 +424,14 @@ async def delete_comment(
 
 @router.get("/my-posts")
 async def get_my_posts(
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=50),
+    page: int = Query(1, ge=1, description="Deprecated: use cursor"),
+    pagination: KeysetParams = Depends(keyset_pagination(default_limit=20, max_limit=50, limit_alias="per_page")),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get current user's posts"""
-    # Get total count
-    total = db.query(models.CommunityPost).filter(
+    query = db.query(models.CommunityPost).filter(
         models.CommunityPost.author_id == current_user.id,
         models.CommunityPost.is_active == True
-    ).count()
-
-    # Get paginated posts
-    posts = db.query(models.CommunityPost).filter(
-        models.CommunityPost.author_id == current_user.id,
-        models.CommunityPost.is_active == True
-    ).options(
-        joinedload(models.CommunityPost.author),
-        joinedload(models.CommunityPost.likes),
-        joinedload(models.CommunityPost.comments)
-    ).order_by(desc(models.CommunityPost.created_at)).offset(
-        (page - 1) * per_page
-    ).limit(per_page).all()
-
-    return {
-        "posts": [format_post_response(post, current_user.id) for post in posts],
-        "total": total,
-        "page": page,
-        "per_page": per_page,
-        "has_more": (page * per_page) < total
-    }
+    )
+    return _post_page(query, page, pagination, current_user.id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import List, Optional
@@ -7,8 +7,9 @@ from datetime import datetime, timezone, timedelta
 from pydantic import BaseModel, Field
 from app import models, auth
 from app.database import get_db
-from app.models import UserType, AdminCryptoWallet, CreditPurchaseRequest, DEFAULT_CREDIT_RATES
+from app.models import UserType, AdminCryptoWallet, CreditPurchaseRequest, DEFAULT_CREDIT_RATES, LedgerTransactionType
 from app.websocket import send_credit_update
+from app.services import ledger
 import logging
 import secrets
 import string
@@ -471,22 +472,29 @@ def delete_admin_wallet(
 @router.get("/admin/purchases")
 def list_all_purchases(
     status_filter: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=500),
     admin: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """List all credit purchase requests (admin)"""
-    query = db.query(CreditPurchaseRequest).order_by(CreditPurchaseRequest.created_at.desc())
+    """
+    List credit purchase requests, newest first (admin)
+
+    Full history for accounting is streamed by /admin/exports/purchases.
+    """
+    query = db.query(CreditPurchaseRequest, models.User, AdminCryptoWallet)\
+        .outerjoin(models.User, models.User.id == CreditPurchaseRequest.client_id)\
+        .outerjoin(AdminCryptoWallet, AdminCryptoWallet.id == CreditPurchaseRequest.wallet_id)
 
     if status_filter:
         query = query.filter(CreditPurchaseRequest.status == status_filter)
 
-    purchases = query.all()
+    rows = query.order_by(
+        CreditPurchaseRequest.created_at.desc(), CreditPurchaseRequest.id.desc()
+    ).offset(skip).limit(limit).all()
 
     result = []
-    for p in purchases:
-        client = db.query(models.User).filter(models.User.id == p.client_id).first()
-        wallet = db.query(AdminCryptoWallet).filter(AdminCryptoWallet.id == p.wallet_id).first()
-
+    for p, client, wallet in rows:
         result.append({
             "id": p.id,
             "reference_code": f"CP{p.id:06d}",
@@ -539,8 +547,18 @@ async def confirm_purchase(
     purchase.admin_notes = action_data.admin_notes
 
     if action_data.action == "confirm":
-        # Add credits
-        client.credits += purchase.credits_amount
+        # Add credits; the key makes a concurrent second confirmation a no-op
+        posted = ledger.credit_user(
+            db, client.id, purchase.credits_amount, LedgerTransactionType.CRYPTO_PURCHASE,
+            source=ledger.SALES,
+            idempotency_key=f"crypto_purchase:{purchase.id}",
+            reference=("credit_purchase", purchase.id),
+            created_by_id=admin.id
+        )
+        if posted.replayed:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Purchase already processed")
+        new_balance = posted.balances[client.id]
         purchase.status = "confirmed"
 
         # Send real-time update
@@ -548,7 +566,7 @@ async def confirm_purchase(
         background_tasks.add_task(
             send_credit_update,
             client.id,
-            client.credits,
+            new_balance,
             purchase.credits_amount,
             f"Credit purchase confirmed (${usd_amount:.2f})"
         )
@@ -558,7 +576,7 @@ async def confirm_purchase(
         db.commit()
         return {
             "message": f"Confirmed! {purchase.credits_amount} credits added",
-            "new_balance": client.credits
+            "new_balance": new_balance
         }
 
     else:  # reject
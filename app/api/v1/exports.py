@@ -0,0 +1,187 @@
+"""
+Admin bulk exports
+
+Streams users, messages, bet transactions and credit purchases as NDJSON
+or CSV (optionally gzipped). Rows are read through a server-side cursor
+and written as they arrive; see app/services/data_export.py.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.api.v1.admin import ADMIN_USER_PROJECTION, get_admin_user
+from app.database import get_db
+from app.models import BetResult, GameType, MessageType, UserType
+from app.services.data_export import ExportFormat, ExportRequest, export_response
+from app.services.user_search import ADMIN_SEARCH_COLUMNS, match_users
+
+router = APIRouter(prefix="/admin/exports", tags=["admin"])
+
+
+def get_export_request(
+    format: ExportFormat = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Download as a .gz file")
+) -> ExportRequest:
+    return ExportRequest(format=format, gzip=gzip)
+
+
+class DateRange:
+    """``created_from`` (inclusive) / ``created_to`` (exclusive) filters"""
+
+    def __init__(
+        self,
+        created_from: Optional[datetime] = Query(None, description="Only rows created at or after this time"),
+        created_to: Optional[datetime] = Query(None, description="Only rows created before this time")
+    ):
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def apply(self, statement, column):
+        if self.created_from:
+            statement = statement.where(column >= self.created_from)
+        if self.created_to:
+            statement = statement.where(column < self.created_to)
+        return statement
+
+
+@router.get("/users")
+def export_users(
+    user_type: Optional[UserType] = None,
+    is_active: Optional[bool] = None,
+    is_approved: Optional[bool] = None,
+    search: Optional[str] = None,
+    dates: DateRange = Depends(),
+    options: ExportRequest = Depends(get_export_request),
+    admin: models.User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Export users (never includes password hashes or 2FA secrets)"""
+    statement = select(*ADMIN_USER_PROJECTION)
+    if user_type:
+        statement = statement.where(models.User.user_type == user_type)
+    if is_active is not None:
+        statement = statement.where(models.User.is_active == is_active)
+    if is_approved is not None:
+        statement = statement.where(models.User.is_approved == is_approved)
+    match = match_users(db, search, ADMIN_SEARCH_COLUMNS) if search else None
+    if match is not None:
+        statement = statement.where(match.condition)
+    statement = dates.apply(statement, models.User.created_at).order_by(models.User.id)
+    return export_response(db, "users", statement, options)
+
+
+@router.get("/messages")
+def export_messages(
+    sender_id: Optional[int] = None,
+    receiver_id: Optional[int] = None,
+    message_type: Optional[MessageType] = None,
+    dates: DateRange = Depends(),
+    options: ExportRequest = Depends(get_export_request),
+    admin: models.User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Export chat messages with sender and receiver usernames"""
+    sender = aliased(models.User)
+    receiver = aliased(models.User)
+    statement = select(
+        models.Message.id,
+        models.Message.sender_id,
+        sender.username.label("sender_username"),
+        models.Message.receiver_id,
+        receiver.username.label("receiver_username"),
+        models.Message.message_type,
+        models.Message.content,
+        models.Message.file_url,
+        models.Message.is_read,
+        models.Message.created_at,
+    ).outerjoin(sender, sender.id == models.Message.sender_id)\
+        .outerjoin(receiver, receiver.id == models.Message.receiver_id)
+    if sender_id:
+        statement = statement.where(models.Message.sender_id == sender_id)
+    if receiver_id:
+        statement = statement.where(models.Message.receiver_id == receiver_id)
+    if message_type:
+        statement = statement.where(models.Message.message_type == message_type)
+    statement = dates.apply(statement, models.Message.created_at).order_by(models.Message.id)
+    return export_response(db, "messages", statement, options)
+
+
+@router.get("/bet-transactions")
+def export_bet_transactions(
+    user_id: Optional[int] = None,
+    game_type: Optional[GameType] = None,
+    result: Optional[BetResult] = None,
+    dates: DateRange = Depends(),
+    options: ExportRequest = Depends(get_export_request),
+    admin: models.User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Export mini-game bet transactions"""
+    bet = models.BetTransaction
+    statement = select(
+        bet.id,
+        bet.user_id,
+        models.User.username,
+        bet.game_type,
+        bet.bet_amount,
+        bet.win_amount,
+        bet.result,
+        bet.balance_before,
+        bet.balance_after,
+        bet.game_data,
+        bet.created_at,
+    ).outerjoin(models.User, models.User.id == bet.user_id)
+    if user_id:
+        statement = statement.where(bet.user_id == user_id)
+    if game_type:
+        statement = statement.where(bet.game_type == game_type)
+    if result:
+        statement = statement.where(bet.result == result)
+    statement = dates.apply(statement, bet.created_at).order_by(bet.id)
+    return export_response(db, "bet-transactions", statement, options)
+
+
+def _purchase_row(row: dict) -> dict:
+    return {"reference_code": f"CP{row['id']:06d}", **row}
+
+
+@router.get("/purchases")
+def export_purchases(
+    status_filter: Optional[str] = None,
+    client_id: Optional[int] = None,
+    dates: DateRange = Depends(),
+    options: ExportRequest = Depends(get_export_request),
+    admin: models.User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Export credit purchase requests for accounting"""
+    purchase = models.CreditPurchaseRequest
+    statement = select(
+        purchase.id,
+        purchase.client_id,
+        models.User.username.label("client_username"),
+        purchase.currency,
+        purchase.network,
+        purchase.crypto_amount,
+        purchase.exchange_rate,
+        purchase.credits_amount,
+        models.AdminCryptoWallet.wallet_address,
+        purchase.sender_wallet_address,
+        purchase.transaction_hash,
+        purchase.status,
+        purchase.admin_notes,
+        purchase.created_at,
+        purchase.processed_at,
+    ).outerjoin(models.User, models.User.id == purchase.client_id)\
+        .outerjoin(models.AdminCryptoWallet, models.AdminCryptoWallet.id == purchase.wallet_id)
+    if status_filter:
+        statement = statement.where(purchase.status == status_filter)
+    if client_id:
+        statement = statement.where(purchase.client_id == client_id)
+    statement = dates.apply(statement, purchase.created_at).order_by(purchase.id)
+    columns = ["reference_code"] + [c.key for c in statement.selected_columns]
+    return export_response(db, "purchases", statement, options, transform=_purchase_row, columns=columns)
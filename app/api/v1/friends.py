@@ -1,19 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from typing import List, Optional
 from app import models, schemas, auth
 from app.database import get_db
 from app.rate_limit import conditional_rate_limit, RateLimits
 from app.models.enums import UserType
-from app.services.push_notification_service import (
-    send_friend_request_notification,
-    send_friend_request_accepted_notification,
-)
-from app.websocket import (
-    send_friend_request_notification as ws_send_friend_request_notification,
-    send_friend_accepted_notification as ws_send_friend_accepted_notification,
-)
+from app.services.push_notification_service import friend_request_push, friend_accepted_push
+from app.services.account_purge import is_being_purged
+from app.services.outbox import enqueue_ws, enqueue_push
+from app.services.user_search import FRIEND_SEARCH_COLUMNS, match_users, not_friends_of
+from app.websocket import WSMessageType, friend_request_data, friend_accepted_data
 
 router = APIRouter(prefix="/friends", tags=["friends"])
 
@@ -57,6 +53,22 @@ def validate_friend_request_permission(sender: models.User, receiver: models.Use
         )
 
 
+def enqueue_friend_request_notifications(db: Session, receiver_id: int, sender: models.User):
+    """Push and live-update the receiver of a friend request once the caller commits"""
+    enqueue_push(db, [receiver_id], friend_request_push(
+        sender.id, sender.full_name, sender.username, sender.user_type.value
+    ))
+    enqueue_ws(db, receiver_id, WSMessageType.FRIEND_REQUEST, friend_request_data(sender))
+
+
+def enqueue_friend_accepted_notifications(db: Session, sender_id: int, accepter: models.User):
+    """Push and live-update the original sender of an accepted request once the caller commits"""
+    enqueue_push(db, [sender_id], friend_accepted_push(
+        accepter.id, accepter.full_name, accepter.username, accepter.user_type.value
+    ))
+    enqueue_ws(db, sender_id, WSMessageType.FRIEND_ACCEPTED, friend_accepted_data(accepter))
+
+
 @router.get("/requests/pending", response_model=List[schemas.FriendRequestResponse])
 async def get_pending_friend_requests(
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -77,9 +89,6 @@ async def search_users_for_friends(
     db: Session = Depends(get_db)
 ):
     """Search for users to add as friends (filtered by role permissions)"""
-    # Escape SQL wildcards to prevent injection
-    escaped_q = q.replace("%", "\\%").replace("_", "\\_")
-
     # Determine which user types current user can send friend requests to
     # Player → Client, Client → Player, Admin → None (support channel)
     if current_user.user_type == UserType.ADMIN:
@@ -92,21 +101,16 @@ async def search_users_for_friends(
     else:
         allowed_types = []
 
-    # Search by username or full_name, filtered by allowed user types
-    users = db.query(models.User).filter(
-        models.User.id != current_user.id,
-        models.User.user_type.in_(allowed_types),
-        or_(
-            models.User.username.ilike(f"%{escaped_q}%"),
-            models.User.full_name.ilike(f"%{escaped_q}%")
-        )
-    ).limit(20).all()
-
-    # Filter out existing friends
-    friend_ids = [f.id for f in current_user.friends]
-    users = [u for u in users if u.id not in friend_ids]
+    match = match_users(db, q, FRIEND_SEARCH_COLUMNS)
+    if match is None:
+        return []
 
-    return users
+    # Search by username or full_name, best match first, existing friends excluded
+    return db.query(models.User).filter(
+        not_friends_of(current_user.id),
+        models.User.user_type.in_(allowed_types),
+        match.condition
+    ).order_by(match.rank.desc(), models.User.id).limit(20).all()
 
 
 @router.get("/search/unique", response_model=schemas.UserResponse)
@@ -143,14 +147,13 @@ async def search_user_by_unique_id(
 @conditional_rate_limit(RateLimits.FRIEND_REQUEST)
 async def send_friend_request_by_id(
     request: Request,
-    background_tasks: BackgroundTasks,
     user_id: int,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Send a friend request to a user by their ID"""
     receiver = db.query(models.User).filter(models.User.id == user_id).first()
-    if not receiver:
+    if not receiver or is_being_purged(db, receiver.id):
         raise HTTPException(status_code=404, detail="User not found")
 
     if receiver.id == current_user.id:
@@ -178,8 +181,6 @@ async def send_friend_request_by_id(
             existing_request.sender_id = current_user.id
             existing_request.receiver_id = receiver.id
             existing_request.status = models.FriendRequestStatus.PENDING
-            db.commit()
-            db.refresh(existing_request)
             friend_request = existing_request
         else:
             # ACCEPTED status - shouldn't happen since we checked friends above
@@ -190,24 +191,10 @@ async def send_friend_request_by_id(
             receiver_id=receiver.id
         )
         db.add(friend_request)
-        db.commit()
-
-    # Send push notification to receiver
-    background_tasks.add_task(
-        send_friend_request_notification,
-        receiver_id=receiver.id,
-        sender_id=current_user.id,
-        sender_name=current_user.full_name,
-        sender_username=current_user.username,
-        sender_type=current_user.user_type.value,
-    )
-
-    # Send WebSocket notification for real-time update
-    background_tasks.add_task(
-        ws_send_friend_request_notification,
-        to_user_id=receiver.id,
-        from_user=current_user,
-    )
+
+    # Notify the receiver once the request is committed
+    enqueue_friend_request_notifications(db, receiver.id, current_user)
+    db.commit()
 
     return {"message": "Friend request sent successfully"}
 
@@ -215,7 +202,6 @@ async def send_friend_request_by_id(
 @router.post("/accept/{request_id}")
 async def accept_friend_request(
     request_id: int,
-    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -236,25 +222,10 @@ async def accept_friend_request(
     current_user.friends.append(sender)
     sender.friends.append(current_user)
 
+    # Let the original sender know once the acceptance is committed
+    enqueue_friend_accepted_notifications(db, sender.id, current_user)
     db.commit()
 
-    # Send push notification to the original sender that request was accepted
-    background_tasks.add_task(
-        send_friend_request_accepted_notification,
-        sender_id=sender.id,
-        accepter_id=current_user.id,
-        accepter_name=current_user.full_name,
-        accepter_username=current_user.username,
-        accepter_type=current_user.user_type.value,
-    )
-
-    # Send WebSocket notification for real-time update
-    background_tasks.add_task(
-        ws_send_friend_accepted_notification,
-        to_user_id=sender.id,
-        friend=current_user,
-    )
-
     return {"message": "Friend request accepted"}
 
 
@@ -286,14 +257,13 @@ async def reject_friend_request(
 @conditional_rate_limit(RateLimits.FRIEND_REQUEST)
 async def send_friend_request(
     http_request: Request,
-    background_tasks: BackgroundTasks,
     request: schemas.FriendRequestCreate,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
     # Find receiver by user_id
     receiver = db.query(models.User).filter(models.User.user_id == request.receiver_user_id).first()
-    if not receiver:
+    if not receiver or is_being_purged(db, receiver.id):
         raise HTTPException(status_code=404, detail="User not found")
 
     # Can't send friend request to yourself
@@ -323,8 +293,6 @@ async def send_friend_request(
             existing_request.sender_id = current_user.id
             existing_request.receiver_id = receiver.id
             existing_request.status = models.FriendRequestStatus.PENDING
-            db.commit()
-            db.refresh(existing_request)
             friend_request = existing_request
         else:
             # ACCEPTED status - shouldn't happen since we checked friends above
@@ -336,25 +304,11 @@ async def send_friend_request(
             receiver_id=receiver.id
         )
         db.add(friend_request)
-        db.commit()
-        db.refresh(friend_request)
-
-    # Send push notification to receiver
-    background_tasks.add_task(
-        send_friend_request_notification,
-        receiver_id=receiver.id,
-        sender_id=current_user.id,
-        sender_name=current_user.full_name,
-        sender_username=current_user.username,
-        sender_type=current_user.user_type.value,
-    )
-
-    # Send WebSocket notification for real-time update
-    background_tasks.add_task(
-        ws_send_friend_request_notification,
-        to_user_id=receiver.id,
-        from_user=current_user,
-    )
+
+    # Notify the receiver once the request is committed
+    enqueue_friend_request_notifications(db, receiver.id, current_user)
+    db.commit()
+    db.refresh(friend_request)
 
     return friend_request
 
@@ -439,7 +393,6 @@ async def get_received_friend_requests(
 async def update_friend_request(
     request_id: int,
     update: schemas.FriendRequestUpdate,
-    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -462,22 +415,8 @@ async def update_friend_request(
         current_user.friends.append(sender)
         sender.friends.append(current_user)
 
-        # Send push notification to the original sender that request was accepted
-        background_tasks.add_task(
-            send_friend_request_accepted_notification,
-            sender_id=sender.id,
-            accepter_id=current_user.id,
-            accepter_name=current_user.full_name,
-            accepter_username=current_user.username,
-            accepter_type=current_user.user_type.value,
-        )
-
-        # Send WebSocket notification for real-time update
-        background_tasks.add_task(
-            ws_send_friend_accepted_notification,
-            to_user_id=sender.id,
-            friend=current_user,
-        )
+        # Let the original sender know once the acceptance is committed
+        enqueue_friend_accepted_notifications(db, sender.id, current_user)
 
     db.commit()
     db.refresh(friend_request)
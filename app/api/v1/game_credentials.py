@@ -1,15 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 import logging
 from app import models, schemas, auth
 from app.database import get_db
-from app.encryption import encrypt_credential, decrypt_credential
+from app.encryption import credential_encryption, decrypt_credentials_async
+from app.services.credential_provisioning import provision_credentials
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/game-credentials", tags=["game-credentials"])
 
+
+def _require_encryption():
+    """Credentials are only stored encrypted"""
+    if not credential_encryption.enabled:
+        logger.error("Credential encryption is not configured (CREDENTIAL_ENCRYPTION_KEY)")
+        raise HTTPException(status_code=503, detail="Game credentials are temporarily unavailable")
+
+
+def _credential_response(
+    credential: models.GameCredentials,
+    game: models.Game,
+    username: Optional[str],
+    password: Optional[str]
+) -> schemas.GameCredentialResponse:
+    return schemas.GameCredentialResponse(
+        id=credential.id,
+        player_id=credential.player_id,
+        game_id=credential.game_id,
+        game_name=game.name,
+        game_display_name=game.display_name,
+        game_username=username or "",
+        game_password=password or "",
+        created_by_client_id=credential.created_by_client_id,
+        created_at=credential.created_at,
+        updated_at=credential.updated_at
+    )
+
+
+async def _format_credentials(
+    rows: List[Tuple[models.GameCredentials, models.Game]]
+) -> List[schemas.GameCredentialResponse]:
+    """Build responses, decrypting every username and password in one batch"""
+    encrypted = []
+    for credential, _ in rows:
+        encrypted.append(credential.game_username_encrypted)
+        encrypted.append(credential.game_password_encrypted)
+    decrypted = await decrypt_credentials_async(encrypted)
+
+    formatted = []
+    for i, (credential, game) in enumerate(rows):
+        username, password = decrypted[2 * i], decrypted[2 * i + 1]
+        if username is None or password is None:
+            logger.error(f"Failed to decrypt credential {credential.id}")
+        formatted.append(_credential_response(credential, game, username, password))
+    return formatted
+
 @router.post("/", response_model=schemas.GameCredentialResponse)
 async def create_game_credential(
     credential: schemas.GameCredentialCreate,
@@ -51,35 +98,16 @@ async def create_game_credential(
             logger.warning(f"Credentials already exist for client {current_user.id}, player {credential.player_id} and game {credential.game_id}")
             raise HTTPException(status_code=400, detail="You have already created credentials for this player and game")
 
-        # Try to encrypt credentials (returns None if encryption is disabled)
-        encrypted_username = None
-        encrypted_password = None
-        try:
-            encrypted_username = encrypt_credential(credential.game_username)
-            encrypted_password = encrypt_credential(credential.game_password)
-        except Exception as e:
-            logger.error(f"Encryption failed: {e}")
-            # Continue without encryption
-
-        # Create new credentials with DUAL-WRITE pattern
-        # Store both plaintext (for backward compatibility) and encrypted versions
+        # Credentials are stored encrypted only
+        _require_encryption()
         db_credential = models.GameCredentials(
             player_id=credential.player_id,
             game_id=credential.game_id,
-            # OLD - keep for rollback safety
             game_username=credential.game_username,
             game_password=credential.game_password,
-            # NEW - encrypted versions (can be None)
-            game_username_encrypted=encrypted_username,
-            game_password_encrypted=encrypted_password,
             created_by_client_id=current_user.id
         )
-
-        # Log if encryption is active
-        if db_credential.game_username_encrypted:
-            logger.info(f"Created encrypted credentials for player {credential.player_id} game {credential.game_id}")
-        else:
-            logger.warning(f"Created plaintext credentials for player {credential.player_id} game {credential.game_id} (encryption disabled)")
+        logger.info(f"Created encrypted credentials for player {credential.player_id} game {credential.game_id}")
 
         db.add(db_credential)
         db.commit()
@@ -99,44 +127,8 @@ async def create_game_credential(
             logger.error(f"Failed to send notification message: {e}")
             # Continue - not critical for credential creation
 
-        # Prepare response with game info (DUAL-READ pattern)
-        # Prefer encrypted, fallback to plaintext
-        username = None
-        password = None
-
-        # Try to decrypt if encrypted versions exist
-        if db_credential.game_username_encrypted:
-            try:
-                username = decrypt_credential(db_credential.game_username_encrypted)
-            except Exception as e:
-                logger.error(f"Failed to decrypt username: {e}")
-
-        if db_credential.game_password_encrypted:
-            try:
-                password = decrypt_credential(db_credential.game_password_encrypted)
-            except Exception as e:
-                logger.error(f"Failed to decrypt password: {e}")
-
-        # Fallback to plaintext if decryption failed or not encrypted
-        if not username:
-            username = db_credential.game_username
-        if not password:
-            password = db_credential.game_password
-
-        response_data = {
-            "id": db_credential.id,
-            "player_id": db_credential.player_id,
-            "game_id": db_credential.game_id,
-            "game_name": game.name,
-            "game_display_name": game.display_name,
-            "game_username": username,
-            "game_password": password,
-            "created_by_client_id": db_credential.created_by_client_id,
-            "created_at": db_credential.created_at,
-            "updated_at": db_credential.updated_at
-        }
-
-        return schemas.GameCredentialResponse(**response_data)
+        # Respond with the submitted values rather than decrypting them again
+        return _credential_response(db_credential, game, credential.game_username, credential.game_password)
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -147,6 +139,25 @@ async def create_game_credential(
         # Return a generic error message to avoid exposing internals
         raise HTTPException(status_code=500, detail="An error occurred while creating game credentials")
 
+@router.post("/bulk", response_model=schemas.GameCredentialBulkResponse)
+async def bulk_create_game_credentials(
+    bulk: schemas.GameCredentialBulkCreate,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or overwrite game credentials for many players at once
+
+    Rows are validated, encrypted and saved in batches; each row gets its own
+    result, so one bad row does not reject the rest.
+    """
+    if current_user.user_type != models.UserType.CLIENT:
+        raise HTTPException(status_code=403, detail="Only clients can create game credentials")
+    _require_encryption()
+
+    logger.info(f"Client {current_user.id} provisioning {len(bulk.credentials)} credentials")
+    return await provision_credentials(db, current_user.id, bulk.credentials)
+
 @router.get("/player/{player_id}", response_model=schemas.GameCredentialListResponse)
 async def get_player_credentials(
     player_id: int,
@@ -180,47 +191,7 @@ async def get_player_credentials(
         if current_user.user_type == models.UserType.CLIENT:
             query = query.filter(models.GameCredentials.created_by_client_id == current_user.id)
 
-        credentials = query.all()
-
-        # Format response with DUAL-READ pattern
-        formatted_credentials = []
-        for credential, game in credentials:
-            # Prefer encrypted, fallback to plaintext
-            username = None
-            password = None
-
-            # Try to decrypt if encrypted versions exist
-            if credential.game_username_encrypted:
-                try:
-                    username = decrypt_credential(credential.game_username_encrypted)
-                except Exception as e:
-                    logger.error(f"Failed to decrypt username for credential {credential.id}: {e}")
-
-            if credential.game_password_encrypted:
-                try:
-                    password = decrypt_credential(credential.game_password_encrypted)
-                except Exception as e:
-                    logger.error(f"Failed to decrypt password for credential {credential.id}: {e}")
-
-            # Fallback to plaintext if decryption failed or not encrypted
-            if not username:
-                username = credential.game_username
-            if not password:
-                password = credential.game_password
-
-            formatted_credentials.append(schemas.GameCredentialResponse(
-                id=credential.id,
-                player_id=credential.player_id,
-                game_id=credential.game_id,
-                game_name=game.name,
-                game_display_name=game.display_name,
-                game_username=username,
-                game_password=password,
-                created_by_client_id=credential.created_by_client_id,
-                created_at=credential.created_at,
-                updated_at=credential.updated_at
-            ))
-
+        formatted_credentials = await _format_credentials(query.all())
         return schemas.GameCredentialListResponse(credentials=formatted_credentials)
 
     except HTTPException:
@@ -262,25 +233,11 @@ async def update_game_credential(
         # Get game info for notification
         game = db.query(models.Game).filter(models.Game.id == credential.game_id).first()
 
-        # Update the credential with DUAL-WRITE pattern
-        # Update both plaintext and encrypted versions
+        # Store the new values, encrypted
+        _require_encryption()
         credential.game_username = credential_update.game_username
         credential.game_password = credential_update.game_password
-
-        # Try to encrypt (returns None if encryption disabled)
-        try:
-            credential.game_username_encrypted = encrypt_credential(credential_update.game_username)
-            credential.game_password_encrypted = encrypt_credential(credential_update.game_password)
-        except Exception as e:
-            logger.error(f"Failed to encrypt updated credentials: {e}")
-            credential.game_username_encrypted = None
-            credential.game_password_encrypted = None
-
-        # Log encryption status
-        if credential.game_username_encrypted:
-            logger.info(f"Updated encrypted credentials for credential {credential_id}")
-        else:
-            logger.warning(f"Updated plaintext credentials for credential {credential_id} (encryption disabled)")
+        logger.info(f"Updated encrypted credentials for credential {credential_id}")
 
         db.commit()
         db.refresh(credential)
@@ -299,44 +256,8 @@ async def update_game_credential(
             logger.error(f"Failed to send notification message: {e}")
             # Continue - not critical
 
-        # Prepare response with DUAL-READ pattern
-        # Prefer encrypted, fallback to plaintext
-        username = None
-        password = None
-
-        # Try to decrypt if encrypted versions exist
-        if credential.game_username_encrypted:
-            try:
-                username = decrypt_credential(credential.game_username_encrypted)
-            except Exception as e:
-                logger.error(f"Failed to decrypt username: {e}")
-
-        if credential.game_password_encrypted:
-            try:
-                password = decrypt_credential(credential.game_password_encrypted)
-            except Exception as e:
-                logger.error(f"Failed to decrypt password: {e}")
-
-        # Fallback to plaintext if decryption failed or not encrypted
-        if not username:
-            username = credential.game_username
-        if not password:
-            password = credential.game_password
-
-        response_data = {
-            "id": credential.id,
-            "player_id": credential.player_id,
-            "game_id": credential.game_id,
-            "game_name": game.name,
-            "game_display_name": game.display_name,
-            "game_username": username,
-            "game_password": password,
-            "created_by_client_id": credential.created_by_client_id,
-            "created_at": credential.created_at,
-            "updated_at": credential.updated_at
-        }
-
-        return schemas.GameCredentialResponse(**response_data)
+        # Respond with the submitted values rather than decrypting them again
+        return _credential_response(credential, game, credential_update.game_username, credential_update.game_password)
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -407,45 +328,7 @@ async def get_my_credentials(
             models.Game, models.GameCredentials.game_id == models.Game.id
         ).filter(models.GameCredentials.player_id == current_user.id).all()
 
-        # Format response with DUAL-READ pattern
-        formatted_credentials = []
-        for credential, game in credentials:
-            # Prefer encrypted, fallback to plaintext
-            username = None
-            password = None
-
-            # Try to decrypt if encrypted versions exist
-            if credential.game_username_encrypted:
-                try:
-                    username = decrypt_credential(credential.game_username_encrypted)
-                except Exception as e:
-                    logger.error(f"Failed to decrypt username for credential {credential.id}: {e}")
-
-            if credential.game_password_encrypted:
-                try:
-                    password = decrypt_credential(credential.game_password_encrypted)
-                except Exception as e:
-                    logger.error(f"Failed to decrypt password for credential {credential.id}: {e}")
-
-            # Fallback to plaintext if decryption failed or not encrypted
-            if not username:
-                username = credential.game_username
-            if not password:
-                password = credential.game_password
-
-            formatted_credentials.append(schemas.GameCredentialResponse(
-                id=credential.id,
-                player_id=credential.player_id,
-                game_id=credential.game_id,
-                game_name=game.name,
-                game_display_name=game.display_name,
-                game_username=username,
-                game_password=password,
-                created_by_client_id=credential.created_by_client_id,
-                created_at=credential.created_at,
-                updated_at=credential.updated_at
-            ))
-
+        formatted_credentials = await _format_credentials(credentials)
         return schemas.GameCredentialListResponse(credentials=formatted_credentials)
 
     except HTTPException:
@@ -1,5 +1,3 @@
-import random
-import json
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
@@ -10,12 +8,18 @@ from app.models.enums import GameType, BetResult
 from app.config import (
     MIN_BET_AMOUNT,
     MAX_BET_AMOUNT,
-    DICE_MULTIPLIERS,
     DICE_MIN_PREDICTION,
     DICE_MAX_PREDICTION,
-    SLOTS_SYMBOLS,
-    SLOTS_SYMBOL_MULTIPLIERS,
-    SLOTS_TWO_MATCH_MULTIPLIER
+    LEADERBOARD_TOP_N
+)
+from app.services.bet_throttle import enforce_bet_throttle
+from app.services.leaderboard import leaderboard, PERIODS
+from app.services.bet_engine import (
+    BetOutcome,
+    InsufficientCreditsError,
+    roll_dice,
+    settle_bet,
+    spin_slots
 )
 from app.core import get_logger, get_game_logger, log_error_with_context, log_game_transaction
 
@@ -296,13 +300,15 @@ async def get_client_games(
 @router.post("/mini-game/bet", response_model=schemas.MiniGameBetResponse)
 async def place_mini_game_bet(
     bet_request: schemas.MiniGameBetRequest,
+    _throttle: None = Depends(enforce_bet_throttle),  # Must stay before current_user
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Place a bet on a mini game (dice or slots).
     Players can bet credits and win/lose based on the game outcome.
-    Uses row-level locking to prevent race conditions with concurrent bets.
+    Concurrent bets are serialized by a conditional balance UPDATE, so no
+    row lock is held while the outcome is computed.
     """
     logger.info(
         f"Bet request received | user_id={current_user.id} | "
@@ -326,27 +332,76 @@ async def place_mini_game_bet(
             detail=f"Maximum bet amount is {MAX_BET_AMOUNT} credits"
         )
 
-    # Get user with row-level lock to prevent concurrent bet race conditions
-    # This ensures that if two requests come in at the same time, they execute sequentially
-    locked_user = db.query(models.User).filter(
-        models.User.id == current_user.id
-    ).with_for_update().first()
-
-    if not locked_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Validate bet amount against locked user's current credits
-    if bet_request.bet_amount > locked_user.credits:
-        raise HTTPException(status_code=400, detail="Insufficient credits")
-
-    # Process based on game type (passing locked user)
+    # Process based on game type. Balance check, debit/credit and audit row
+    # all happen in a single conditional UPDATE + INSERT transaction.
     if bet_request.game_type == "dice":
-        return process_dice_game(bet_request, locked_user, db)
+        response = process_dice_game(bet_request, current_user, db)
     elif bet_request.game_type == "slots":
-        return process_slots_game(bet_request, locked_user, db)
+        response = process_slots_game(bet_request, current_user, db)
     else:
         raise HTTPException(status_code=400, detail="Invalid game type. Use 'dice' or 'slots'")
 
+    # Feed the winners ticker / leaderboards (never fails the bet)
+    await leaderboard.record_bet(
+        user_id=current_user.id,
+        username=current_user.username,
+        game_type=response["game_type"],
+        bet_amount=response["bet_amount"],
+        win_amount=response["win_amount"],
+        result=response["result"]
+    )
+    return response
+
+
+@router.get("/leaderboard")
+async def get_leaderboard(
+    period: str = "daily",
+    limit: int = LEADERBOARD_TOP_N,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Snapshot of the mini-game leaderboard and the recent big wins ticker.
+    Live updates are pushed to the "leaderboard" WebSocket room.
+    """
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail="Invalid period. Use 'daily' or 'weekly'")
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
+
+    return await leaderboard.snapshot(period, limit, db)
+
+
+def _settle(bet_request: schemas.MiniGameBetRequest, user: models.User, outcome: BetOutcome, db: Session):
+    """Settle a resolved bet, mapping engine errors to HTTP errors"""
+    game = "dice" if outcome.game_type == GameType.LUCKY_DICE else "slots"
+    try:
+        settled = settle_bet(db, user.id, bet_request.bet_amount, outcome)
+    except InsufficientCreditsError:
+        raise HTTPException(status_code=400, detail="Insufficient credits")
+    except Exception as e:
+        log_error_with_context(
+            logger,
+            e,
+            {"user_id": user.id, "game": game, "bet_amount": bet_request.bet_amount}
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to process {game} game: {str(e)}"
+        )
+
+    # Log successful game transaction
+    log_game_transaction(
+        game_logger,
+        game_type=game,
+        user_id=user.id,
+        bet_amount=bet_request.bet_amount,
+        result=outcome.result.value,
+        win_amount=outcome.win_amount,
+        balance_after=settled.balance_after
+    )
+    return settled
+
 
 def process_dice_game(bet_request: schemas.MiniGameBetRequest, user: models.User, db: Session):
     """Process a dice game bet"""
@@ -363,204 +418,46 @@ def process_dice_game(bet_request: schemas.MiniGameBetRequest, user: models.User
             detail=f"Prediction must be between {DICE_MIN_PREDICTION} and {DICE_MAX_PREDICTION}"
         )
 
-    try:
-        # Save balance before bet
-        balance_before = user.credits
-
-        # Roll the dice
-        dice1 = random.randint(1, 6)
-        dice2 = random.randint(1, 6)
-        total = dice1 + dice2
-
-        # Deduct bet amount first
-        user.credits -= bet_request.bet_amount
-
-        # Calculate winnings
-        win_amount = 0
-        result = "lose"
-        message = f"Rolled {total}. You bet on {bet_request.prediction}. "
-
-        if total == bet_request.prediction:
-            # Win! Payout based on probability from config
-            multiplier = DICE_MULTIPLIERS.get(bet_request.prediction, 6)
-            win_amount = int(bet_request.bet_amount * multiplier)
-            user.credits += win_amount
-            result = "win"
-            message += f"You won {win_amount} credits!"
-        else:
-            message += "Better luck next time!"
-
-        # Commit transaction
-        db.commit()
-        db.refresh(user)
+    outcome = roll_dice(bet_request.bet_amount, bet_request.prediction)
+    settled = _settle(bet_request, user, outcome, db)
 
-        # Create audit log entry (non-critical - don't fail bet if logging fails)
-        try:
-            bet_transaction = models.BetTransaction(
-                user_id=user.id,
-                game_type=GameType.LUCKY_DICE,
-                bet_amount=bet_request.bet_amount,
-                win_amount=win_amount,
-                result=BetResult.WIN if result == "win" else BetResult.LOSE,
-                balance_before=balance_before,
-                balance_after=user.credits,
-                game_data=json.dumps({
-                    "prediction": bet_request.prediction,
-                    "dice1": dice1,
-                    "dice2": dice2,
-                    "total": total,
-                    "multiplier": multiplier
-                })
-            )
-            db.add(bet_transaction)
-            db.commit()
-        except Exception as log_error:
-            # Log the error but don't fail the bet
-            logger.warning(f"Failed to log bet transaction | user_id={user.id} | error={str(log_error)}")
-            db.rollback()  # Rollback only the failed transaction log
-
-        # Log successful game transaction
-        log_game_transaction(
-            game_logger,
-            game_type="dice",
-            user_id=user.id,
-            bet_amount=bet_request.bet_amount,
-            result=result,
-            win_amount=win_amount,
-            balance_after=user.credits
-        )
+    message = f"Rolled {outcome.details['total']}. You bet on {bet_request.prediction}. "
+    if outcome.result == BetResult.WIN:
+        message += f"You won {outcome.win_amount} credits!"
+    else:
+        message += "Better luck next time!"
 
-        return {
-            "success": True,
-            "game_type": "dice",
-            "bet_amount": bet_request.bet_amount,
-            "win_amount": win_amount,
-            "result": result,
-            "details": {
-                "dice1": dice1,
-                "dice2": dice2,
-                "total": total,
-                "prediction": bet_request.prediction
-            },
-            "new_balance": user.credits,
-            "message": message
-        }
-    except HTTPException:
-        # Re-raise HTTP exceptions without rollback (validation errors)
-        raise
-    except Exception as e:
-        # Rollback transaction on any error
-        db.rollback()
-        log_error_with_context(
-            logger,
-            e,
-            {"user_id": user.id, "game": "dice", "bet_amount": bet_request.bet_amount}
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to process dice game: {str(e)}"
-        )
+    return {
+        "success": True,
+        "game_type": "dice",
+        "bet_amount": bet_request.bet_amount,
+        "win_amount": outcome.win_amount,
+        "result": outcome.result.value,
+        "details": outcome.details,
+        "new_balance": settled.balance_after,
+        "message": message
+    }
 
 
 def process_slots_game(bet_request: schemas.MiniGameBetRequest, user: models.User, db: Session):
     """Process a slots game bet"""
-    try:
-        # Save balance before bet
-        balance_before = user.credits
-
-        # Spin the reels
-        reel1 = random.choice(SLOTS_SYMBOLS)
-        reel2 = random.choice(SLOTS_SYMBOLS)
-        reel3 = random.choice(SLOTS_SYMBOLS)
-
-        # Deduct bet amount first
-        user.credits -= bet_request.bet_amount
-
-        # Calculate winnings
-        win_amount = 0
-        result = "lose"
-        message = ""
-        multiplier = 0
-
-        if reel1 == reel2 == reel3:
-            # Jackpot! All three match
-            multiplier = SLOTS_SYMBOL_MULTIPLIERS.get(reel1, 10)
-            win_amount = bet_request.bet_amount * multiplier
-            user.credits += win_amount
-            result = "jackpot"
-            message = f"JACKPOT! Three {reel1}s! You won {win_amount} credits!"
-        elif reel1 == reel2 or reel2 == reel3 or reel1 == reel3:
-            # Two matching symbols
-            multiplier = SLOTS_TWO_MATCH_MULTIPLIER
-            win_amount = bet_request.bet_amount * multiplier
-            user.credits += win_amount
-            result = "win"
-            message = f"Two matching symbols! You won {win_amount} credits!"
-        else:
-            message = "No match. Try again!"
-
-        # Commit transaction
-        db.commit()
-        db.refresh(user)
+    outcome = spin_slots(bet_request.bet_amount)
+    settled = _settle(bet_request, user, outcome, db)
 
-        # Create audit log entry (non-critical - don't fail bet if logging fails)
-        try:
-            bet_result = BetResult.JACKPOT if result == "jackpot" else (BetResult.WIN if result == "win" else BetResult.LOSE)
-            bet_transaction = models.BetTransaction(
-                user_id=user.id,
-                game_type=GameType.LUCKY_SLOTS,
-                bet_amount=bet_request.bet_amount,
-                win_amount=win_amount,
-                result=bet_result,
-                balance_before=balance_before,
-                balance_after=user.credits,
-                game_data=json.dumps({
-                    "symbols": [reel1, reel2, reel3],
-                    "multiplier": multiplier
-                })
-            )
-            db.add(bet_transaction)
-            db.commit()
-        except Exception as log_error:
-            # Log the error but don't fail the bet
-            logger.warning(f"Failed to log bet transaction | user_id={user.id} | error={str(log_error)}")
-            db.rollback()  # Rollback only the failed transaction log
-
-        # Log successful game transaction
-        log_game_transaction(
-            game_logger,
-            game_type="slots",
-            user_id=user.id,
-            bet_amount=bet_request.bet_amount,
-            result=result,
-            win_amount=win_amount,
-            balance_after=user.credits
-        )
+    if outcome.result == BetResult.JACKPOT:
+        message = f"JACKPOT! Three {outcome.details['reels'][0]}s! You won {outcome.win_amount} credits!"
+    elif outcome.result == BetResult.WIN:
+        message = f"Two matching symbols! You won {outcome.win_amount} credits!"
+    else:
+        message = "No match. Try again!"
 
-        return {
-            "success": True,
-            "game_type": "slots",
-            "bet_amount": bet_request.bet_amount,
-            "win_amount": win_amount,
-            "result": result,
-            "details": {
-                "reels": [reel1, reel2, reel3]
-            },
-            "new_balance": user.credits,
-            "message": message
-        }
-    except HTTPException:
-        # Re-raise HTTP exceptions without rollback (validation errors)
-        raise
-    except Exception as e:
-        # Rollback transaction on any error
-        db.rollback()
-        log_error_with_context(
-            logger,
-            e,
-            {"user_id": user.id, "game": "slots", "bet_amount": bet_request.bet_amount}
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to process slots game: {str(e)}"
-        )
+    return {
+        "success": True,
+        "game_type": "slots",
+        "bet_amount": bet_request.bet_amount,
+        "win_amount": outcome.win_amount,
+        "result": outcome.result.value,
+        "details": outcome.details,
+        "new_balance": settled.balance_after,
+        "message": message
+    }
@@ -4,7 +4,7 @@ Health check and monitoring endpoints
 from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, func
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import psutil
@@ -12,9 +12,11 @@ import platform
 import os
 import logging
 from app.database import get_db
-from app.models import User, Message, Promotion, Review
+from app.models import User, Message, Promotion, Review, UserType, OutboxMessage, OutboxStatus
 from app.auth import get_current_active_user
 from app.config import settings
+from app.services.scheduler import scheduler
+from app.services.outbox import dispatcher as outbox_dispatcher
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
@@ -302,6 +304,68 @@ def get_metrics(
         )
 
 
+@router.get("/scheduler")
+def get_scheduler_status(
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Background job status (requires admin auth)
+
+    Returns:
+        Whether this worker holds the scheduler lease, and for every job its
+        interval, run/failure counts, last and average duration, and the
+        outcome of its last run. Job history is per worker; only the leader
+        runs jobs.
+    """
+    if current_user.user_type != UserType.ADMIN:
+        return JSONResponse(
+            status_code=status.HTTP_403_FORBIDDEN,
+            content={"detail": "Admin access required"}
+        )
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "enabled": settings.SCHEDULER_ENABLED,
+        **scheduler.status()
+    }
+
+
+@router.get("/outbox")
+def get_outbox_status(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Side-effect outbox status (requires admin auth)
+
+    Returns:
+        Row counts by status, when the oldest still-undelivered message was
+        enqueued, and this worker's dispatcher counters.
+    """
+    if current_user.user_type != UserType.ADMIN:
+        return JSONResponse(
+            status_code=status.HTTP_403_FORBIDDEN,
+            content={"detail": "Admin access required"}
+        )
+
+    counts = {
+        row_status.value: count
+        for row_status, count in db.query(OutboxMessage.status, func.count(OutboxMessage.id))
+        .group_by(OutboxMessage.status)
+    }
+    oldest_pending = db.query(func.min(OutboxMessage.created_at)).filter(
+        OutboxMessage.status.in_([OutboxStatus.PENDING, OutboxStatus.PROCESSING])
+    ).scalar()
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "enabled": settings.OUTBOX_DISPATCHER_ENABLED,
+        "counts": counts,
+        "oldest_undelivered_at": oldest_pending.isoformat() if oldest_pending else None,
+        "dispatcher": outbox_dispatcher.status()
+    }
+
+
 @router.post("/test-error/{error_type}")
 def test_error_handling(
     error_type: str,
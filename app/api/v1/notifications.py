@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 from app import models, auth
 from app.database import get_db
 from app.models.push_token import DevicePlatform
+from app.services.push_tokens import token_cache
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -70,6 +71,7 @@ async def register_push_token(
 
     if existing_token:
         # Update existing token (might be re-registering from different account)
+        previous_user_id = existing_token.user_id
         if existing_token.user_id != current_user.id:
             # Token is being transferred to a new user (user logged out and new user logged in)
             existing_token.user_id = current_user.id
@@ -77,8 +79,10 @@ async def register_push_token(
         existing_token.platform = platform
         existing_token.device_type = request.device_type
         existing_token.is_active = True
+        existing_token.consecutive_failures = 0
         existing_token.last_used_at = datetime.now(timezone.utc)
         db.commit()
+        token_cache.invalidate(previous_user_id, current_user.id)
 
         return RegisterTokenResponse(
             success=True,
@@ -96,6 +100,7 @@ async def register_push_token(
 
     db.add(new_token)
     db.commit()
+    token_cache.invalidate(current_user.id)
 
     return RegisterTokenResponse(
         success=True,
@@ -121,6 +126,7 @@ async def unregister_push_token(
         # Deactivate instead of delete to handle re-registration
         existing_token.is_active = False
         db.commit()
+        token_cache.invalidate(current_user.id)
 
     return {"success": True, "message": "Push token unregistered"}
 
@@ -146,6 +152,8 @@ async def get_my_tokens(
                 "platform": t.platform.value,
                 "device_type": t.device_type,
                 "is_active": t.is_active,
+                "failure_rate": round(t.failure_rate, 3),
+                "last_error": t.last_error,
                 "created_at": t.created_at.isoformat() if t.created_at else None,
                 "last_used_at": t.last_used_at.isoformat() if t.last_used_at else None,
             }
@@ -175,18 +183,16 @@ async def test_push_notification(
             detail="No registered push tokens found. Please enable notifications in the app first."
         )
 
-    success_count = 0
-    for token in tokens:
-        result = await push_service.send_notification(
-            token=token.token,
-            title="Test Notification",
-            body="This is a test notification from GoldenAce!",
-            data={"test": True},
-            category="system",
-            channel_id="default",
-        )
-        if result:
-            success_count += 1
+    result = await push_service.send_notifications_bulk(
+        tokens=[token.token for token in tokens],
+        title="Test Notification",
+        body="This is a test notification from GoldenAce!",
+        data={"test": True},
+        category="system",
+        channel_id="default",
+        db=db,
+    )
+    success_count = result["success_count"]
 
     return {
         "success": True,
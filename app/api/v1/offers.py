@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import List, Optional
 from app import models, schemas, auth
 from app.database import get_db
-from app.models import UserType, OfferStatus, OfferClaimStatus, OfferType, MessageType
-from app.websocket import send_credit_update
-from app.services.push_notification_service import send_credit_notification
+from app.models import UserType, OfferStatus, OfferClaimStatus, OfferType, MessageType, LedgerTransactionType
+from app.websocket import WSMessageType, credit_update_data
+from app.services.push_notification_service import credit_push
+from app.services.outbox import enqueue_ws, enqueue_push
+from app.services import ledger
+from app.services.ledger import InsufficientCreditsError
 from datetime import datetime, timezone
 from decimal import Decimal, ROUND_DOWN
-import asyncio
 
 router = APIRouter(prefix="/offers", tags=["offers"])
 
@@ -250,10 +252,22 @@ def admin_process_claim(
         bonus_credits = claim.bonus_amount
         dollar_value = credits_to_dollars(bonus_credits)
 
-        # Add credits to player
-        if player:
-            player.credits = (player.credits or 0) + bonus_credits
+        # Credit player and client in one ledger transaction, keyed by claim
+        recipients = [u for u in (player, client) if u]
+        if recipients:
+            posted = ledger.post(
+                db, LedgerTransactionType.OFFER_BONUS,
+                [ledger.system_posting(ledger.ISSUANCE, -bonus_credits * len(recipients))]
+                + [ledger.user_posting(u.id, bonus_credits) for u in recipients],
+                idempotency_key=f"offer_claim:{claim.id}",
+                reference=("offer_claim", claim.id),
+                created_by_id=admin.id
+            )
+            if posted.replayed:
+                db.rollback()
+                raise HTTPException(status_code=400, detail="Claim has already been processed")
 
+        if player:
             # Send message to player about approved bonus
             player_message = models.Message(
                 sender_id=admin.id,
@@ -263,10 +277,7 @@ def admin_process_claim(
             )
             db.add(player_message)
 
-        # Add credits to client (if associated)
         if client:
-            client.credits = (client.credits or 0) + bonus_credits
-
             # Send message to client about bonus
             client_message = models.Message(
                 sender_id=admin.id,
@@ -487,7 +498,7 @@ def claim_offer(
 @router.post("/transfer-credits")
 def transfer_credits_to_client(
     transfer_data: schemas.CreditTransfer,
-    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     player: models.User = Depends(get_player_user),
     db: Session = Depends(get_db)
 ):
@@ -495,18 +506,12 @@ def transfer_credits_to_client(
     Transfer credits from player to client (one-way transaction).
     This is used for game transactions where players pay clients to play.
     Rate: 100 credits = $1
+    Retries carrying the same Idempotency-Key header are applied only once.
     """
     # Validate transfer amount
     if transfer_data.amount <= 0:
         raise HTTPException(status_code=400, detail="Transfer amount must be positive")
 
-    # Check player has enough credits
-    if (player.credits or 0) < transfer_data.amount:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Insufficient credits. You have {player.credits or 0} credits, trying to send {transfer_data.amount}"
-        )
-
     # Get the client
     client = db.query(models.User).filter(
         models.User.id == transfer_data.client_id,
@@ -528,9 +533,32 @@ def transfer_credits_to_client(
     credits_amount = transfer_data.amount
     dollar_value = credits_to_dollars(credits_amount)
 
-    # Perform the transfer
-    player.credits = (player.credits or 0) - credits_amount
-    client.credits = (client.credits or 0) + credits_amount
+    # Perform the transfer; the player's debit is checked by the balance update itself
+    try:
+        posted = ledger.transfer(
+            db, player.id, client.id, credits_amount, LedgerTransactionType.CREDIT_TRANSFER,
+            idempotency_key=f"credit_transfer:{player.id}:{idempotency_key}" if idempotency_key else None
+        )
+    except InsufficientCreditsError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient credits. You have {player.credits or 0} credits, trying to send {transfer_data.amount}"
+        )
+
+    response = {
+        "message": "Transfer successful",
+        "credits_transferred": credits_amount,
+        "dollar_value": dollar_value,
+        "player_new_balance": posted.balances[player.id],
+        "client_new_balance": posted.balances[client.id],
+        "from_player": player.username,
+        "to_client": client.company_name or client.username
+    }
+    if posted.replayed:
+        # Retried request: already transferred and notified
+        db.rollback()
+        return response
 
     # Create transaction message for player (sender)
     player_message = models.Message(
@@ -554,46 +582,16 @@ def transfer_credits_to_client(
     )
     db.add(client_message)
 
-    db.commit()
+    # Live balance updates for both sides and a push to the client, delivered after commit
+    enqueue_ws(db, player.id, WSMessageType.CREDIT_UPDATE,
+               credit_update_data(posted.balances[player.id], -credits_amount, "transfer_sent"))
+    enqueue_ws(db, client.id, WSMessageType.CREDIT_UPDATE,
+               credit_update_data(posted.balances[client.id], credits_amount, "transfer_received"))
+    enqueue_push(db, [client.id], credit_push(credits_amount, "credit transfer", player.full_name or player.username))
 
-    # Send real-time credit updates via WebSocket
-    player_id = player.id
-    client_id = client.id
-    player_balance = player.credits
-    client_balance = client.credits
-
-    def send_updates():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(send_credit_update(player_id, player_balance, -credits_amount, "transfer_sent"))
-            loop.run_until_complete(send_credit_update(client_id, client_balance, credits_amount, "transfer_received"))
-        finally:
-            loop.close()
-
-    background_tasks.add_task(send_updates)
-
-    # Send push notification to client about received credits
-    client_name = client.company_name or client.username
-    player_name = player.full_name or player.username
-    background_tasks.add_task(
-        send_credit_notification,
-        db,
-        client_id,
-        credits_amount,
-        "credit transfer",
-        player_name,
-    )
+    db.commit()
 
-    return {
-        "message": "Transfer successful",
-        "credits_transferred": credits_amount,
-        "dollar_value": dollar_value,
-        "player_new_balance": player.credits,
-        "client_new_balance": client.credits,
-        "from_player": player.username,
-        "to_client": client.company_name or client.username
-    }
+    return response
 
 @router.get("/my-balance")
 def get_my_balance(
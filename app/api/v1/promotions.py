@@ -1,14 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, func
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 import json
 from app import models, schemas, auth
 from app.database import get_db
-from app.models import UserType, PromotionStatus, PromotionType, ClaimStatus, MessageType
+from app.models import UserType, PromotionStatus, PromotionType, ClaimStatus, MessageType, LedgerTransactionType
 from app.websocket import manager, WSMessage, WSMessageType, send_credit_update
-from app.services.push_notification_service import send_promotion_notification, send_claim_notification
+from app.services.push_notification_service import promotion_push, claim_push
+from app.services.outbox import enqueue_push
+from app.services import ledger
+from app.services.ledger import InsufficientCreditsError
+from app.services.promotion_claims import (
+    commit_reservation,
+    decide_claim,
+    insert_claim,
+    mark_depleted_if_exhausted,
+    release_reservation,
+    reserve_budget,
+    set_targets,
+    is_offered_to,
+    eligible_promotions_query,
+    claim_counts,
+    offered_promotion_ids
+)
 
 router = APIRouter(prefix="/promotions", tags=["promotions"])
 
@@ -52,50 +68,42 @@ async def create_promotion(
         min_player_level=promotion.min_player_level,
         requires_screenshot=promotion.requires_screenshot,
         end_date=promotion.end_date,
-        target_player_ids=json.dumps(promotion.target_player_ids) if promotion.target_player_ids else None,
         terms=promotion.terms,
         wagering_requirement=promotion.wagering_requirement
     )
+    set_targets(db_promotion, promotion.target_player_ids)
 
     db.add(db_promotion)
-    db.commit()
-    db.refresh(db_promotion)
+    db.flush()
 
-    # Send push notifications to eligible players
-    try:
-        # Get eligible player IDs
-        if promotion.target_player_ids:
-            # Targeted promotion - notify specific players
-            eligible_player_ids = promotion.target_player_ids
-        else:
-            # Get all players connected to this client
-            connected_players = db.query(models.User.id).join(
-                models.friends_association,
-                or_(
-                    and_(models.friends_association.c.user_id == current_user.id,
-                         models.friends_association.c.friend_id == models.User.id),
-                    and_(models.friends_association.c.friend_id == current_user.id,
-                         models.friends_association.c.user_id == models.User.id)
-                )
-            ).filter(
-                models.User.user_type == UserType.PLAYER,
-                models.User.player_level >= db_promotion.min_player_level
-            ).all()
-            eligible_player_ids = [p[0] for p in connected_players]
-
-        if eligible_player_ids:
-            # Send push notifications in background
-            await send_promotion_notification(
-                db=db,
-                user_ids=eligible_player_ids,
-                promotion_title=db_promotion.title,
-                promotion_value=db_promotion.value,
-                client_name=current_user.full_name or current_user.username,
-                promotion_id=db_promotion.id,
+    # Push to eligible players once the promotion commits
+    if promotion.target_player_ids:
+        # Targeted promotion - notify specific players
+        eligible_player_ids = promotion.target_player_ids
+    else:
+        # Get all players connected to this client
+        connected_players = db.query(models.User.id).join(
+            models.friends_association,
+            or_(
+                and_(models.friends_association.c.user_id == current_user.id,
+                     models.friends_association.c.friend_id == models.User.id),
+                and_(models.friends_association.c.friend_id == current_user.id,
+                     models.friends_association.c.user_id == models.User.id)
             )
-    except Exception as e:
-        # Don't fail promotion creation if notifications fail
-        print(f"[Promotions] Error sending push notifications: {e}")
+        ).filter(
+            models.User.user_type == UserType.PLAYER,
+            models.User.player_level >= db_promotion.min_player_level
+        ).all()
+        eligible_player_ids = [p[0] for p in connected_players]
+
+    if eligible_player_ids:
+        enqueue_push(db, eligible_player_ids, promotion_push(
+            db_promotion.title, db_promotion.value,
+            current_user.full_name or current_user.username, db_promotion.id
+        ))
+
+    db.commit()
+    db.refresh(db_promotion)
 
     return _format_promotion_response(db_promotion, current_user, db)
 
@@ -117,7 +125,7 @@ async def get_my_promotions(
 
     promotions = query.order_by(models.Promotion.created_at.desc()).all()
 
-    return [_format_promotion_response(p, current_user, db) for p in promotions]
+    return _format_promotion_responses(promotions, current_user, db)
 
 
 @router.get("/stats/{promotion_id}", response_model=schemas.PromotionStatsResponse)
@@ -148,9 +156,10 @@ async def get_promotion_stats(
     total_value_claimed = sum(c.claimed_value for c in claims)
 
     # Calculate eligible players count for claim rate
-    if promotion.target_player_ids:
-        target_ids = json.loads(promotion.target_player_ids)
-        eligible_count = len(target_ids)
+    if promotion.is_targeted:
+        eligible_count = db.query(func.count(models.PromotionTarget.player_id)).filter(
+            models.PromotionTarget.promotion_id == promotion.id
+        ).scalar()
     else:
         # Count all players connected to this client
         eligible_count = db.query(models.User).join(
@@ -172,7 +181,7 @@ async def get_promotion_stats(
         total_claims=total_claims,
         unique_players=unique_players,
         total_value_claimed=total_value_claimed,
-        remaining_budget=promotion.total_budget - promotion.used_budget if promotion.total_budget else None,
+        remaining_budget=promotion.total_budget - (promotion.used_budget or 0) - promotion.reserved_budget if promotion.total_budget else None,
         claim_rate=claim_rate,
         avg_claim_value=avg_claim_value,
         status=promotion.status
@@ -191,52 +200,20 @@ async def get_available_promotions(
     if current_user.user_type != UserType.PLAYER:
         raise HTTPException(status_code=403, detail="Only players can view available promotions")
 
-    # Get all clients connected to this player
-    connected_clients = db.query(models.User).join(
-        models.friends_association,
-        or_(
-            and_(models.friends_association.c.user_id == current_user.id,
-                 models.friends_association.c.friend_id == models.User.id),
-            and_(models.friends_association.c.friend_id == current_user.id,
-                 models.friends_association.c.user_id == models.User.id)
-        )
-    ).filter(models.User.user_type == UserType.CLIENT)
+    # Connection, status, expiry, level and targeting are all filtered in SQL
+    query = eligible_promotions_query(db, current_user)
 
     if client_id:
-        connected_clients = connected_clients.filter(models.User.id == client_id)
-
-    client_ids = [c.id for c in connected_clients.all()]
-
-    if not client_ids:
-        return []
-
-    # Get active promotions from connected clients
-    # Use UTC now for comparison (database stores timezone-aware datetimes)
-    now_utc = datetime.now(timezone.utc)
-    query = db.query(models.Promotion).filter(
-        models.Promotion.client_id.in_(client_ids),
-        models.Promotion.status == PromotionStatus.ACTIVE,
-        models.Promotion.end_date > now_utc
-    )
+        query = query.filter(models.Promotion.client_id == client_id)
 
     if promotion_type:
         query = query.filter(models.Promotion.promotion_type == promotion_type)
 
-    # Filter by player level
-    query = query.filter(models.Promotion.min_player_level <= current_user.player_level)
-
-    promotions = query.order_by(models.Promotion.created_at.desc()).all()
-
-    # Filter by target players if specified
-    eligible_promotions = []
-    for promo in promotions:
-        if promo.target_player_ids:
-            target_ids = json.loads(promo.target_player_ids)
-            if current_user.id not in target_ids:
-                continue
-        eligible_promotions.append(promo)
+    eligible_promotions = query.options(
+        joinedload(models.Promotion.client)
+    ).order_by(models.Promotion.created_at.desc()).all()
 
-    return [_format_promotion_response(p, current_user, db) for p in eligible_promotions]
+    return _format_promotion_responses(eligible_promotions, current_user, db)
 
 
 @router.post("/claim", response_model=schemas.PromotionClaimResponse)
@@ -266,8 +243,11 @@ async def claim_promotion(
             message="Promotion not found or inactive"
         )
 
-    # Check if promotion has expired (database stores timezone-aware datetimes)
-    if promotion.end_date < datetime.now(timezone.utc):
+    # Check if promotion has expired (SQLite returns naive datetimes)
+    end_date = promotion.end_date
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+    if end_date < datetime.now(timezone.utc):
         promotion.status = PromotionStatus.EXPIRED
         db.commit()
         return schemas.PromotionClaimResponse(
@@ -298,27 +278,12 @@ async def claim_promotion(
             message=f"Minimum level {promotion.min_player_level} required"
         )
 
-    # Check if already has a pending or approved claim
-    existing_claim = db.query(models.PromotionClaim).filter(
-        models.PromotionClaim.promotion_id == claim_request.promotion_id,
-        models.PromotionClaim.player_id == current_user.id
-    ).first()
-
-    if existing_claim:
-        if existing_claim.status == ClaimStatus.PENDING_APPROVAL:
-            return schemas.PromotionClaimResponse(
-                success=False,
-                message="You already have a pending claim for this promotion. Please wait for approval."
-            )
-        elif existing_claim.status in [ClaimStatus.APPROVED, ClaimStatus.CLAIMED]:
-            return schemas.PromotionClaimResponse(
-                success=False,
-                message="You have already claimed this promotion"
-            )
-        elif existing_claim.status == ClaimStatus.REJECTED:
-            # Allow re-claiming if previously rejected
-            db.delete(existing_claim)
-            db.flush()
+    # Check target list
+    if not is_offered_to(db, promotion, current_user.id):
+        return schemas.PromotionClaimResponse(
+            success=False,
+            message="This promotion is not available to you"
+        )
 
     # Check if promotion requires screenshot and validate
     if promotion.requires_screenshot and not claim_request.screenshot_url:
@@ -328,38 +293,32 @@ async def claim_promotion(
             requires_screenshot=True
         )
 
-    # Check budget if applicable (reserve the budget)
-    if promotion.total_budget:
-        if promotion.used_budget >= promotion.total_budget:
-            promotion.status = PromotionStatus.DEPLETED
-            db.commit()
-            return schemas.PromotionClaimResponse(
-                success=False,
-                message="Promotion budget depleted"
-            )
+    # Cheap early exit; the reservation below is the authoritative check
+    if promotion.total_budget and (promotion.used_budget or 0) >= promotion.total_budget:
+        mark_depleted_if_exhausted(db, promotion.id)
+        db.commit()
+        return schemas.PromotionClaimResponse(
+            success=False,
+            message="Promotion budget depleted"
+        )
 
-        # Check if remaining budget is enough
-        if promotion.used_budget + promotion.value > promotion.total_budget:
+    # Create the claim with PENDING_APPROVAL status (insert-on-conflict:
+    # a player's existing pending or approved claim wins)
+    inserted = insert_claim(db, promotion, current_user.id, claim_request.screenshot_url)
+    if inserted.claim_id is None:
+        db.rollback()
+        if inserted.existing_status == ClaimStatus.PENDING_APPROVAL:
             return schemas.PromotionClaimResponse(
                 success=False,
-                message="Insufficient promotion budget remaining"
+                message="You already have a pending claim for this promotion. Please wait for approval."
             )
+        return schemas.PromotionClaimResponse(
+            success=False,
+            message="You have already claimed this promotion"
+        )
 
-    # Create the claim with PENDING_APPROVAL status
-    wagering_required = promotion.value * promotion.wagering_requirement
-
-    claim = models.PromotionClaim(
-        promotion_id=promotion.id,
-        player_id=current_user.id,
-        client_id=promotion.client_id,
-        claimed_value=promotion.value,
-        status=ClaimStatus.PENDING_APPROVAL,
-        screenshot_url=claim_request.screenshot_url,
-        wagering_required=wagering_required
-    )
-
-    db.add(claim)
-    db.flush()  # Get the claim ID
+    claim = db.get(models.PromotionClaim, inserted.claim_id)
+    wagering_required = claim.wagering_required
 
     # Create approval request message to the client
     now = datetime.now(timezone.utc)
@@ -391,6 +350,15 @@ async def claim_promotion(
 
     # Link message to claim
     claim.approval_message_id = approval_message.id
+    db.flush()
+
+    # Reserve budget last so a hot promotion's row lock is held only until commit
+    if not reserve_budget(db, promotion.id, promotion.value):
+        db.rollback()
+        return schemas.PromotionClaimResponse(
+            success=False,
+            message="Insufficient promotion budget remaining"
+        )
 
     db.commit()
 
@@ -588,65 +556,75 @@ async def cancel_promotion(
     return {"message": "Promotion cancelled successfully"}
 
 
-# Helper function to format promotion response
+# Helpers to format promotion responses
 def _format_promotion_response(promotion: models.Promotion, current_user: models.User, db: Session) -> schemas.PromotionResponse:
-    client = promotion.client
-    claims_count = len(promotion.claims)
-
-    # Check if current user can claim
-    can_claim = False
-    already_claimed = False
-
-    if current_user.user_type == UserType.PLAYER:
-        # Check if already claimed
-        existing_claim = db.query(models.PromotionClaim).filter(
-            models.PromotionClaim.promotion_id == promotion.id,
-            models.PromotionClaim.player_id == current_user.id
-        ).count()
-
-        already_claimed = existing_claim > 0
-        # Make end_date timezone-aware if it isn't
-        end_date = promotion.end_date
-        if end_date.tzinfo is None:
-            end_date = end_date.replace(tzinfo=timezone.utc)
-        can_claim = (
-            not already_claimed and
-            existing_claim < promotion.max_claims_per_player and
-            promotion.status == PromotionStatus.ACTIVE and
-            end_date > datetime.now(timezone.utc) and
-            current_user.player_level >= promotion.min_player_level
-        )
+    return _format_promotion_responses([promotion], current_user, db)[0]
 
-        # Check if in target players
-        if promotion.target_player_ids:
-            target_ids = json.loads(promotion.target_player_ids)
-            if current_user.id not in target_ids:
-                can_claim = False
-
-    return schemas.PromotionResponse(
-        id=promotion.id,
-        client_id=promotion.client_id,
-        client_name=client.full_name or client.username,
-        client_company=client.company_name,
-        title=promotion.title,
-        description=promotion.description,
-        promotion_type=promotion.promotion_type,
-        value=promotion.value,
-        max_claims_per_player=promotion.max_claims_per_player,
-        total_budget=promotion.total_budget,
-        used_budget=promotion.used_budget,
-        min_player_level=promotion.min_player_level,
-        requires_screenshot=promotion.requires_screenshot,
-        start_date=promotion.start_date,
-        end_date=promotion.end_date,
-        status=promotion.status,
-        terms=promotion.terms,
-        wagering_requirement=promotion.wagering_requirement,
-        claims_count=claims_count,
-        created_at=promotion.created_at,
-        can_claim=can_claim,
-        already_claimed=already_claimed
-    )
+
+def _format_promotion_responses(
+    promotions: List[models.Promotion],
+    current_user: models.User,
+    db: Session
+) -> List[schemas.PromotionResponse]:
+    """
+    Build responses for a list of promotions with a fixed number of queries:
+    one grouped claim count (including the viewer's own claims) and, for
+    players, one target lookup. Callers should eager-load ``client``.
+    """
+    is_player = current_user.user_type == UserType.PLAYER
+    counts = claim_counts(db, [p.id for p in promotions], current_user.id if is_player else None)
+    offered = offered_promotion_ids(db, promotions, current_user.id) if is_player else set()
+    now = datetime.now(timezone.utc)
+
+    responses = []
+    for promotion in promotions:
+        client = promotion.client
+        claims_count, existing_claim = counts.get(promotion.id, (0, 0))
+
+        # Check if current user can claim
+        can_claim = False
+        already_claimed = False
+
+        if is_player:
+            already_claimed = existing_claim > 0
+            # Make end_date timezone-aware if it isn't
+            end_date = promotion.end_date
+            if end_date.tzinfo is None:
+                end_date = end_date.replace(tzinfo=timezone.utc)
+            can_claim = (
+                not already_claimed and
+                existing_claim < promotion.max_claims_per_player and
+                promotion.status == PromotionStatus.ACTIVE and
+                end_date > now and
+                current_user.player_level >= promotion.min_player_level and
+                promotion.id in offered
+            )
+
+        responses.append(schemas.PromotionResponse(
+            id=promotion.id,
+            client_id=promotion.client_id,
+            client_name=client.full_name or client.username,
+            client_company=client.company_name,
+            title=promotion.title,
+            description=promotion.description,
+            promotion_type=promotion.promotion_type,
+            value=promotion.value,
+            max_claims_per_player=promotion.max_claims_per_player,
+            total_budget=promotion.total_budget,
+            used_budget=promotion.used_budget,
+            min_player_level=promotion.min_player_level,
+            requires_screenshot=promotion.requires_screenshot,
+            start_date=promotion.start_date,
+            end_date=promotion.end_date,
+            status=promotion.status,
+            terms=promotion.terms,
+            wagering_requirement=promotion.wagering_requirement,
+            claims_count=claims_count,
+            created_at=promotion.created_at,
+            can_claim=can_claim,
+            already_claimed=already_claimed
+        ))
+    return responses
 
 
 @router.get("/pending-approvals", response_model=List[dict])
@@ -714,34 +692,36 @@ async def approve_promotion_claim(
     promotion = claim.promotion
     player = claim.player
 
-    # Check budget
-    if promotion.total_budget and promotion.used_budget + claim.claimed_value > promotion.total_budget:
-        raise HTTPException(status_code=400, detail="Insufficient promotion budget")
+    # Claim the decision first; a concurrent reject (or approve) finds nothing pending
+    if not decide_claim(db, claim, ClaimStatus.APPROVED,
+                        approved_at=datetime.now(timezone.utc), approved_by_id=current_user.id):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Claim has already been decided")
 
-    # Check if client has enough credits
-    if current_user.credits < claim.claimed_value:
+    # Move credits from client to player; the client's balance is checked by the update itself
+    try:
+        posted = ledger.transfer(
+            db, current_user.id, player.id, claim.claimed_value, LedgerTransactionType.PROMOTION_CLAIM,
+            idempotency_key=f"promotion_claim:{claim.id}",
+            reference=("promotion_claim", claim.id),
+            created_by_id=current_user.id
+        )
+    except InsufficientCreditsError:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Insufficient credits. You have {current_user.credits} but need {claim.claimed_value}"
         )
+    if posted.replayed:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Pending claim not found")
+    client_balance = posted.balances[current_user.id]
+    player_balance = posted.balances[player.id]
 
-    # Deduct credits from client
-    current_user.credits -= claim.claimed_value
-
-    # Add credits to player
-    player.credits = (player.credits or 0) + claim.claimed_value
-
-    # Update claim status to APPROVED
-    claim.status = ClaimStatus.APPROVED
-    claim.approved_at = datetime.now(timezone.utc)
-    claim.approved_by_id = current_user.id
-
-    # Update promotion used budget
-    promotion.used_budget += claim.claimed_value
-
-    # Check if promotion should be marked as depleted
-    if promotion.total_budget and promotion.used_budget >= promotion.total_budget:
-        promotion.status = PromotionStatus.DEPLETED
+    # Move the claim's reservation into used budget (marks the promotion depleted when exhausted)
+    if not commit_reservation(db, promotion.id, claim.claimed_value):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Insufficient promotion budget")
 
     # Create response message to the player
     now = datetime.now(timezone.utc)
@@ -754,7 +734,7 @@ async def approve_promotion_claim(
         "value": claim.claimed_value,
         "client_id": current_user.id,
         "client_name": current_user.full_name or current_user.username,
-        "player_new_balance": player.credits
+        "player_new_balance": player_balance
     })
 
     response_message = models.Message(
@@ -767,6 +747,11 @@ async def approve_promotion_claim(
     )
 
     db.add(response_message)
+
+    # Push to the player once the decision commits
+    enqueue_push(db, [player.id], claim_push(
+        promotion.title, "approved", claim.claimed_value, current_user.full_name or current_user.username
+    ))
     db.commit()
 
     # Send WebSocket notification to the player
@@ -808,21 +793,8 @@ async def approve_promotion_claim(
     ))
 
     # Send real-time credit updates to both client and player
-    await send_credit_update(current_user.id, current_user.credits, -claim.claimed_value, "promotion_given")
-    await send_credit_update(player.id, player.credits, claim.claimed_value, "promotion_received")
-
-    # Send push notification to player
-    try:
-        await send_claim_notification(
-            db=db,
-            player_id=player.id,
-            promotion_title=promotion.title,
-            status="approved",
-            value=claim.claimed_value,
-            client_name=current_user.full_name or current_user.username,
-        )
-    except Exception as e:
-        print(f"[Promotions] Error sending push notification for claim approval: {e}")
+    await send_credit_update(current_user.id, client_balance, -claim.claimed_value, "promotion_given")
+    await send_credit_update(player.id, player_balance, claim.claimed_value, "promotion_received")
 
     return {
         "success": True,
@@ -860,9 +832,11 @@ async def reject_promotion_claim(
     promotion = claim.promotion
     player = claim.player
 
-    # Update claim status to REJECTED
-    claim.status = ClaimStatus.REJECTED
-    claim.rejection_reason = reason
+    # Update claim status to REJECTED and return its reservation to the budget
+    if not decide_claim(db, claim, ClaimStatus.REJECTED, rejection_reason=reason):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Claim has already been decided")
+    release_reservation(db, promotion.id, claim.claimed_value)
 
     # Create response message to the player
     now = datetime.now(timezone.utc)
@@ -888,6 +862,11 @@ async def reject_promotion_claim(
     )
 
     db.add(response_message)
+
+    # Push to the player once the decision commits
+    enqueue_push(db, [player.id], claim_push(
+        promotion.title, "rejected", claim.claimed_value, current_user.full_name or current_user.username
+    ))
     db.commit()
 
     # Send WebSocket notification to the player
@@ -929,19 +908,6 @@ async def reject_promotion_claim(
         }
     ))
 
-    # Send push notification to player
-    try:
-        await send_claim_notification(
-            db=db,
-            player_id=player.id,
-            promotion_title=promotion.title,
-            status="rejected",
-            value=claim.claimed_value,
-            client_name=current_user.full_name or current_user.username,
-        )
-    except Exception as e:
-        print(f"[Promotions] Error sending push notification for claim rejection: {e}")
-
     return {
         "success": True,
         "message": "Claim rejected",
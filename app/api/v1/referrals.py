@@ -23,8 +23,9 @@ from app.schemas.referral import (
     ReferredUserInfo,
     ReferralResponse
 )
-from app.models import ReferralStatus, REFERRAL_BONUS_CREDITS
+from app.models import ReferralStatus, REFERRAL_BONUS_CREDITS, LedgerTransactionType
 from app.config import settings
+from app.services import ledger
 
 router = APIRouter(prefix="/referrals", tags=["referrals"])
 
@@ -202,6 +203,29 @@ async def get_referral_bonus_info():
     }
 
 
+def credit_referral_bonus(db: Session, referral: models.Referral) -> bool:
+    """
+    Credit a referral's bonus to the referrer through the ledger and mark the
+    referral completed. Does not commit.
+
+    The ledger transaction is keyed by the referral id, so two approvals
+    racing on the same referral credit the bonus only once.
+
+    Returns True if the bonus was credited by this call.
+    """
+    posted = ledger.credit_user(
+        db, referral.referrer_id, referral.bonus_amount, LedgerTransactionType.REFERRAL_BONUS,
+        idempotency_key=f"referral:{referral.id}",
+        reference=("referral", referral.id)
+    )
+    if posted.replayed:
+        return False
+
+    referral.status = ReferralStatus.COMPLETED
+    referral.completed_at = func.now()
+    return True
+
+
 def process_referral_bonus(db: Session, referred_user: models.User) -> bool:
     """
     Process referral bonus when a referred user gets approved.
@@ -226,12 +250,10 @@ def process_referral_bonus(db: Session, referred_user: models.User) -> bool:
     if not referrer:
         return False
 
-    # Credit the bonus to the referrer
-    referrer.credits = (referrer.credits or 0) + referral.bonus_amount
-
-    # Update referral status
-    referral.status = ReferralStatus.COMPLETED
-    referral.completed_at = func.now()
+    # Credit the bonus to the referrer and update referral status
+    if not credit_referral_bonus(db, referral):
+        db.rollback()
+        return False
 
     db.commit()
 
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import case
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
 from app import models, schemas, auth
 from app.database import get_db
+from app.pagination import KeysetParams, SortKey, keyset_pagination, newest_first
 from app.models.enums import ReportStatus, TicketCategory, TicketStatus, TicketPriority
+from app.services.scheduler import expire_report_warnings
 import uuid
 
 # Warning period in days
@@ -264,8 +267,8 @@ def delete_report(
 
 @router.get("/admin/pending", response_model=schemas.ReportInvestigationListResponse)
 def get_pending_reports(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=20)),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     current_user: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
@@ -284,13 +287,13 @@ def get_pending_reports(
             raise HTTPException(status_code=400, detail=f"Invalid status: {status_filter}")
 
     # Order by pending first, then by creation date
-    reports_query = reports_query.order_by(
-        models.Report.status == ReportStatus.PENDING,
-        models.Report.created_at.desc()
-    )
-
-    total_count = reports_query.count()
-    reports = reports_query.offset(skip).limit(limit).all()
+    reports, next_cursor = page.paginate(reports_query, (
+        SortKey(
+            case((models.Report.status == ReportStatus.PENDING, 0), else_=1),
+            value=lambda report: 0 if report.status == ReportStatus.PENDING else 1
+        ),
+        *newest_first(models.Report)
+    ), offset=skip if not page.cursor else 0)
 
     # Format reports with details
     formatted_reports = []
@@ -310,7 +313,8 @@ def get_pending_reports(
 
     return {
         "reports": formatted_reports,
-        "total_count": total_count,
+        "total_count": page.count(reports_query),
+        "next_cursor": next_cursor,
         "pending_count": pending_count,
         "investigating_count": investigating_count,
         "warning_count": warning_count,
@@ -589,25 +593,13 @@ def check_expired_warnings(
     current_user: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Check and auto-validate reports with expired warning periods (admin only)"""
-
-    now = datetime.now(timezone.utc)
-
-    # Find all warning reports with expired deadlines
-    expired_reports = db.query(models.Report).filter(
-        models.Report.status == ReportStatus.WARNING,
-        models.Report.warning_deadline < now
-    ).all()
-
-    validated_count = 0
+    """
+    Check and auto-validate reports with expired warning periods (admin only)
 
-    for report in expired_reports:
-        report.status = ReportStatus.VALID
-        report.auto_validated = 1
-        report.action_taken = (report.action_taken or "") + " | Auto-validated: User did not resolve within deadline"
-        validated_count += 1
-
-    db.commit()
+    The scheduler runs the same transition every few minutes; this endpoint
+    forces it immediately.
+    """
+    validated_count = expire_report_warnings(db)
 
     return {
         "message": f"Processed {validated_count} expired warnings",
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 from typing import Optional
 from datetime import datetime, timezone
 from app import models, schemas, auth
 from app.database import get_db
+from app.pagination import KeysetParams, SortKey, keyset_pagination, newest_first
 from app.models.enums import ReviewStatus, TicketCategory, TicketStatus, TicketPriority
 import uuid
 
@@ -88,8 +89,8 @@ async def create_review(
 @router.get("/user/{user_id}", response_model=schemas.ReviewListResponse)
 async def get_user_reviews(
     user_id: int,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=50),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=10, max_limit=50)),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -104,10 +105,9 @@ async def get_user_reviews(
     reviews_query = db.query(models.Review).filter(
         models.Review.reviewee_id == user_id,
         models.Review.status == ReviewStatus.APPROVED
-    ).order_by(models.Review.created_at.desc())
-
-    total_count = reviews_query.count()
-    reviews = reviews_query.offset(skip).limit(limit).all()
+    )
+    reviews, next_cursor = page.paginate(reviews_query, newest_first(models.Review),
+                                         offset=skip if not page.cursor else 0)
 
     # Calculate average rating (only from approved reviews)
     avg_rating = db.query(func.avg(models.Review.rating)).filter(
@@ -117,14 +117,15 @@ async def get_user_reviews(
 
     return {
         "reviews": reviews,
-        "total_count": total_count,
-        "average_rating": float(avg_rating) if avg_rating else None
+        "total_count": page.count(reviews_query),
+        "average_rating": float(avg_rating) if avg_rating else None,
+        "next_cursor": next_cursor
     }
 
 @router.get("/my-reviews", response_model=schemas.ReviewListResponse)
 async def get_my_reviews(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=50),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=10, max_limit=50)),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -132,10 +133,9 @@ async def get_my_reviews(
 
     reviews_query = db.query(models.Review).filter(
         models.Review.reviewee_id == current_user.id
-    ).order_by(models.Review.created_at.desc())
-
-    total_count = reviews_query.count()
-    reviews = reviews_query.offset(skip).limit(limit).all()
+    )
+    reviews, next_cursor = page.paginate(reviews_query, newest_first(models.Review),
+                                         offset=skip if not page.cursor else 0)
 
     # Calculate average rating
     avg_rating = db.query(func.avg(models.Review.rating)).filter(
@@ -144,14 +144,15 @@ async def get_my_reviews(
 
     return {
         "reviews": reviews,
-        "total_count": total_count,
-        "average_rating": float(avg_rating) if avg_rating else None
+        "total_count": page.count(reviews_query),
+        "average_rating": float(avg_rating) if avg_rating else None,
+        "next_cursor": next_cursor
     }
 
 @router.get("/given", response_model=schemas.ReviewListResponse)
 async def get_given_reviews(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=50),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=10, max_limit=50)),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -159,14 +160,14 @@ async def get_given_reviews(
 
     reviews_query = db.query(models.Review).filter(
         models.Review.reviewer_id == current_user.id
-    ).order_by(models.Review.created_at.desc())
-
-    total_count = reviews_query.count()
-    reviews = reviews_query.offset(skip).limit(limit).all()
+    )
+    reviews, next_cursor = page.paginate(reviews_query, newest_first(models.Review),
+                                         offset=skip if not page.cursor else 0)
 
     return {
         "reviews": reviews,
-        "total_count": total_count,
+        "total_count": page.count(reviews_query),
+        "next_cursor": next_cursor,
         "average_rating": None  # Not applicable for given reviews
     }
 
@@ -305,8 +306,8 @@ async def can_review_user(
 
 @router.get("/admin/pending", response_model=schemas.ReviewModerationListResponse)
 async def get_pending_reviews(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=20)),
     status_filter: Optional[str] = Query(None, description="Filter by status: pending, approved, rejected, disputed"),
     current_user: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
@@ -325,13 +326,13 @@ async def get_pending_reviews(
             raise HTTPException(status_code=400, detail=f"Invalid status: {status_filter}")
 
     # Order by pending first, then by creation date
-    reviews_query = reviews_query.order_by(
-        models.Review.status == ReviewStatus.PENDING,
-        models.Review.created_at.desc()
-    )
-
-    total_count = reviews_query.count()
-    reviews = reviews_query.offset(skip).limit(limit).all()
+    reviews, next_cursor = page.paginate(reviews_query, (
+        SortKey(
+            case((models.Review.status == ReviewStatus.PENDING, 0), else_=1),
+            value=lambda review: 0 if review.status == ReviewStatus.PENDING else 1
+        ),
+        *newest_first(models.Review)
+    ), offset=skip if not page.cursor else 0)
 
     # Get counts by status
     pending_count = db.query(models.Review).filter(models.Review.status == ReviewStatus.PENDING).count()
@@ -341,7 +342,8 @@ async def get_pending_reviews(
 
     return {
         "reviews": reviews,
-        "total_count": total_count,
+        "total_count": page.count(reviews_query),
+        "next_cursor": next_cursor,
         "pending_count": pending_count,
         "approved_count": approved_count,
         "rejected_count": rejected_count,
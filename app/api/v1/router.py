@@ -17,6 +17,7 @@ from app.api.v1 import (
     online_status,
     reports,
     admin,
+    exports,
     client,
     monitoring,
     offers,
@@ -27,7 +28,8 @@ from app.api.v1 import (
     community,
     settings,
     crypto,
-    notifications
+    notifications,
+    search
 )
 
 # Create main API v1 router
@@ -47,6 +49,7 @@ api_router.include_router(game_credentials.router, tags=["game-credentials"])
 api_router.include_router(online_status.router, tags=["online-status"])
 api_router.include_router(reports.router, tags=["reports"])
 api_router.include_router(admin.router, tags=["admin"])
+api_router.include_router(exports.router, tags=["admin"])
 api_router.include_router(client.router, tags=["client"])
 api_router.include_router(monitoring.router, tags=["monitoring"])
 api_router.include_router(offers.router, tags=["offers"])
@@ -58,3 +61,4 @@ api_router.include_router(community.router, tags=["community"])
 api_router.include_router(settings.router, tags=["settings"])
 api_router.include_router(crypto.router, tags=["crypto"])
 api_router.include_router(notifications.router, tags=["notifications"])
+api_router.include_router(search.router, tags=["search"])
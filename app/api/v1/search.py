@@ -0,0 +1,132 @@
+"""
+Full-text search over chat messages, support tickets and community posts
+
+Results are ranked best match first and paged with ``next_cursor``. Users
+only see their own conversations and tickets (without internal notes) and
+posts of their own community; admins can search everything. See
+app/services/search.py for the backends.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, aliased
+
+from app import auth, models
+from app.api.v1.community import get_visibility_for_user
+from app.database import get_db
+from app.models import UserType
+from app.pagination import KeysetParams, keyset_pagination
+from app.services.search import search, search_keys
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+search_pagination = keyset_pagination(default_limit=20, max_limit=50, default_total="none")
+
+
+def _empty() -> dict:
+    return {"results": [], "total": 0, "next_cursor": None}
+
+
+def _page(pagination: KeysetParams, query, hits, index_name: str, format_row) -> dict:
+    rows, next_cursor = pagination.paginate(query, search_keys(index_name, hits))
+    return {
+        "results": [format_row(row) for row in rows],
+        "total": pagination.count(query),
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/messages")
+def search_messages(
+    q: str = Query(..., min_length=2, max_length=200, description="Words to search for"),
+    with_user_id: Optional[int] = Query(None, description="Only the conversation with this user"),
+    pagination: KeysetParams = Depends(search_pagination),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search chat messages in the current user's conversations"""
+    found = search(db, "messages", q)
+    if found is None:
+        return _empty()
+    query, hits = found
+    M = models.Message
+
+    if current_user.user_type != UserType.ADMIN:
+        query = query.filter(or_(M.sender_id == current_user.id, M.receiver_id == current_user.id))
+    if with_user_id is not None:
+        query = query.filter(or_(M.sender_id == with_user_id, M.receiver_id == with_user_id))
+
+    return _page(pagination, query, hits, "messages", lambda row: {
+        "id": row.Message.id,
+        "sender_id": row.Message.sender_id,
+        "receiver_id": row.Message.receiver_id,
+        "message_type": row.Message.message_type.value,
+        "content": row.Message.content,
+        "created_at": row.Message.created_at,
+        "rank": row.rank,
+    })
+
+
+@router.get("/tickets")
+def search_tickets(
+    q: str = Query(..., min_length=2, max_length=200, description="Words to search for"),
+    pagination: KeysetParams = Depends(search_pagination),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search support ticket messages (admins: all tickets and internal notes)"""
+    ticket = aliased(models.Ticket)
+    found = search(db, "ticket_messages", q, ticket.ticket_number, ticket.subject, ticket.status)
+    if found is None:
+        return _empty()
+    query, hits = found
+    query = query.join(ticket, ticket.id == models.TicketMessage.ticket_id)
+
+    if current_user.user_type != UserType.ADMIN:
+        query = query.filter(ticket.user_id == current_user.id, models.TicketMessage.is_internal_note == 0)
+
+    return _page(pagination, query, hits, "ticket_messages", lambda row: {
+        "id": row.TicketMessage.id,
+        "ticket_id": row.TicketMessage.ticket_id,
+        "ticket_number": row.ticket_number,
+        "subject": row.subject,
+        "status": row.status.value,
+        "sender_id": row.TicketMessage.sender_id,
+        "content": row.TicketMessage.content,
+        "is_internal_note": bool(row.TicketMessage.is_internal_note),
+        "created_at": row.TicketMessage.created_at,
+        "rank": row.rank,
+    })
+
+
+@router.get("/posts")
+def search_posts(
+    q: str = Query(..., min_length=2, max_length=200, description="Words to search for"),
+    pagination: KeysetParams = Depends(search_pagination),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search posts in the current user's community"""
+    author = aliased(models.User)
+    found = search(db, "community_posts", q, author.username, author.profile_picture)
+    if found is None:
+        return _empty()
+    query, hits = found
+    P = models.CommunityPost
+    query = query.join(author, author.id == P.author_id).filter(P.is_active == True)
+
+    if current_user.user_type != UserType.ADMIN:
+        query = query.filter(P.visibility == get_visibility_for_user(current_user))
+
+    return _page(pagination, query, hits, "community_posts", lambda row: {
+        "id": row.CommunityPost.id,
+        "author_id": row.CommunityPost.author_id,
+        "author_username": row.username,
+        "author_profile_picture": row.profile_picture,
+        "content": row.CommunityPost.content,
+        "image_url": row.CommunityPost.image_url,
+        "visibility": row.CommunityPost.visibility.value,
+        "created_at": row.CommunityPost.created_at,
+        "rank": row.rank,
+    })
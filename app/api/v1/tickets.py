@@ -7,6 +7,7 @@ import uuid
 
 from app import models, schemas, auth
 from app.database import get_db
+from app.pagination import KeysetParams, SortKey, keyset_pagination
 from app.models.enums import TicketStatus, TicketPriority, TicketCategory, UserType
 
 router = APIRouter(prefix="/tickets", tags=["support-tickets"])
@@ -143,8 +144,8 @@ async def create_ticket(
 @router.get("/my-tickets", response_model=schemas.TicketListResponse)
 async def get_my_tickets(
     status_filter: Optional[TicketStatus] = None,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=20)),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -155,7 +156,6 @@ async def get_my_tickets(
     if status_filter:
         query = query.filter(models.Ticket.status == status_filter)
 
-    total_count = query.count()
     open_count = db.query(models.Ticket).filter(
         models.Ticket.user_id == current_user.id,
         models.Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.WAITING_USER])
@@ -165,11 +165,15 @@ async def get_my_tickets(
         models.Ticket.status.in_([TicketStatus.RESOLVED, TicketStatus.CLOSED])
     ).count()
 
-    tickets = query.order_by(models.Ticket.updated_at.desc()).offset(skip).limit(limit).all()
+    tickets, next_cursor = page.paginate(query, (
+        SortKey(models.Ticket.updated_at, descending=True),
+        SortKey(models.Ticket.id, descending=True)
+    ), offset=skip if not page.cursor else 0)
 
     return {
         "tickets": [format_ticket_response(t, db) for t in tickets],
-        "total_count": total_count,
+        "total_count": page.count(query),
+        "next_cursor": next_cursor,
         "open_count": open_count,
         "resolved_count": resolved_count
     }
@@ -307,8 +311,8 @@ async def get_all_tickets(
     category_filter: Optional[TicketCategory] = None,
     assigned_to_me: bool = False,
     unassigned: bool = False,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    page: KeysetParams = Depends(keyset_pagination(default_limit=20)),
     current_user: models.User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
@@ -327,7 +331,6 @@ async def get_all_tickets(
     if unassigned:
         query = query.filter(models.Ticket.assigned_admin_id == None)
 
-    total_count = query.count()
     open_count = db.query(models.Ticket).filter(
         models.Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.WAITING_USER])
     ).count()
@@ -336,14 +339,16 @@ async def get_all_tickets(
     ).count()
 
     # Order by priority (urgent first) then by creation date
-    tickets = query.order_by(
-        models.Ticket.priority.desc(),
-        models.Ticket.created_at.asc()
-    ).offset(skip).limit(limit).all()
+    tickets, next_cursor = page.paginate(query, (
+        SortKey(models.Ticket.priority, descending=True),
+        SortKey(models.Ticket.created_at),
+        SortKey(models.Ticket.id)
+    ), offset=skip if not page.cursor else 0)
 
     return {
         "tickets": [format_ticket_response(t, db) for t in tickets],
-        "total_count": total_count,
+        "total_count": page.count(query),
+        "next_cursor": next_cursor,
         "open_count": open_count,
         "resolved_count": resolved_count
     }
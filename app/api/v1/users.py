@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, Body
+from fastapi import APIRouter, Depends, Query, HTTPException, Body, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from typing import Optional, List
 from app import models, schemas, auth
 from app.database import get_db
 from app.websocket import manager
+from app.services.account_purge import request_purge
+from app.services.user_search import DIRECTORY_SEARCH_COLUMNS, match_users
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,11 +21,9 @@ async def search_users(
 ):
     users_query = db.query(models.User).filter(models.User.id != current_user.id)
 
-    if query:
-        users_query = users_query.filter(
-            (models.User.username.ilike(f"%{query}%")) |
-            (models.User.user_id.ilike(f"%{query}%"))
-        )
+    match = match_users(db, query, DIRECTORY_SEARCH_COLUMNS) if query else None
+    if match is not None:
+        users_query = users_query.filter(match.condition).order_by(match.rank.desc(), models.User.id)
 
     if user_type:
         users_query = users_query.filter(models.User.user_type == user_type)
@@ -34,11 +33,17 @@ async def search_users(
 
 @router.get("/all")
 async def get_all_users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    user_type: Optional[models.UserType] = Query(None, description="Filter by user type"),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all users in the system"""
-    users = db.query(models.User).all()
+    """Get users in the system, one page at a time (admins export everyone via /admin/exports/users)"""
+    users_query = db.query(models.User)
+    if user_type:
+        users_query = users_query.filter(models.User.user_type == user_type)
+    users = users_query.order_by(models.User.id).offset(skip).limit(limit).all()
     return [schemas.UserResponse.from_orm(user) for user in users]
 
 @router.get("/online-status")
@@ -80,13 +85,18 @@ async def check_user_online(
     return {"user_id": user_id, "is_online": manager.is_user_online(user_id)}
 
 
-@router.delete("/me")
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
 async def delete_my_account(
     password: str = Body(..., embed=True),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Delete the current user's account and all associated data"""
+    """
+    Delete the current user's account and all associated data
+
+    The account is disabled immediately and its data is deleted in the
+    background (see app/services/account_purge.py).
+    """
     # Verify password
     if not auth.verify_password(password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
@@ -98,86 +108,6 @@ async def delete_my_account(
             detail="Admin accounts cannot be deleted through this endpoint"
         )
 
-    user_id = current_user.id
-    username = current_user.username
-
-    try:
-        # Delete related records in order to avoid foreign key constraint violations
-
-        # Delete messages (sent and received)
-        db.query(models.Message).filter(
-            or_(models.Message.sender_id == user_id, models.Message.receiver_id == user_id)
-        ).delete(synchronize_session=False)
-
-        # Delete friend requests (sent and received)
-        db.query(models.FriendRequest).filter(
-            or_(models.FriendRequest.sender_id == user_id, models.FriendRequest.receiver_id == user_id)
-        ).delete(synchronize_session=False)
-
-        # Delete reports (reported by or reported user)
-        db.query(models.Report).filter(
-            or_(models.Report.reporter_id == user_id, models.Report.reported_user_id == user_id)
-        ).delete(synchronize_session=False)
-
-        # Delete reviews
-        if hasattr(models, 'Review'):
-            db.query(models.Review).filter(
-                or_(models.Review.reviewer_id == user_id, models.Review.reviewed_user_id == user_id)
-            ).delete(synchronize_session=False)
-
-        # Delete tickets and ticket messages
-        if hasattr(models, 'TicketMessage'):
-            db.query(models.TicketMessage).filter(models.TicketMessage.sender_id == user_id).delete(synchronize_session=False)
-        if hasattr(models, 'Ticket'):
-            db.query(models.Ticket).filter(models.Ticket.user_id == user_id).delete(synchronize_session=False)
-
-        # Delete bet transactions
-        if hasattr(models, 'BetTransaction'):
-            db.query(models.BetTransaction).filter(models.BetTransaction.user_id == user_id).delete(synchronize_session=False)
-
-        # Delete game credentials (both as client and player)
-        if hasattr(models, 'GameCredential'):
-            db.query(models.GameCredential).filter(
-                or_(models.GameCredential.client_id == user_id, models.GameCredential.player_id == user_id)
-            ).delete(synchronize_session=False)
-
-        # Delete client games
-        if hasattr(models, 'ClientGame'):
-            db.query(models.ClientGame).filter(models.ClientGame.client_id == user_id).delete(synchronize_session=False)
-
-        # Delete promotion claims
-        if hasattr(models, 'PromotionClaim'):
-            db.query(models.PromotionClaim).filter(models.PromotionClaim.player_id == user_id).delete(synchronize_session=False)
-
-        # Delete promotions (if client)
-        if hasattr(models, 'Promotion'):
-            db.query(models.Promotion).filter(models.Promotion.client_id == user_id).delete(synchronize_session=False)
-
-        # Delete offer claims
-        if hasattr(models, 'OfferClaim'):
-            db.query(models.OfferClaim).filter(models.OfferClaim.player_id == user_id).delete(synchronize_session=False)
-
-        # Delete notifications
-        if hasattr(models, 'Notification'):
-            db.query(models.Notification).filter(models.Notification.user_id == user_id).delete(synchronize_session=False)
-
-        # Delete referrals (as referrer or referee)
-        if hasattr(models, 'Referral'):
-            db.query(models.Referral).filter(
-                or_(models.Referral.referrer_id == user_id, models.Referral.referee_id == user_id)
-            ).delete(synchronize_session=False)
-
-        # Finally delete the user
-        db.delete(current_user)
-        db.commit()
-
-        logger.info(f"User {username} (ID: {user_id}) deleted their account")
-        return {"message": "Your account has been deleted successfully"}
-
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to delete user account {user_id}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to delete account: {str(e)}"
-        )
\ No newline at end of file
+    purge = request_purge(db, current_user)
+    logger.info(f"User {purge.username} (ID: {purge.user_id}) deleted their account")
+    return {"message": "Your account has been deleted successfully"}
\ No newline at end of file
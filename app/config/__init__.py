@@ -6,12 +6,19 @@ from app.config.game_config import (
     MIN_BET_AMOUNT,
     MAX_BET_AMOUNT,
     BET_COOLDOWN_MS,
+    BET_COOLDOWN_GRACE_MS,
+    BET_BURST_LIMIT,
+    BET_SUSTAINED_INTERVAL_MS,
     DICE_MULTIPLIERS,
     SLOTS_SYMBOL_MULTIPLIERS,
     SLOTS_TWO_MATCH_MULTIPLIER,
     SLOTS_SYMBOLS,
     DICE_MIN_PREDICTION,
     DICE_MAX_PREDICTION,
+    LEADERBOARD_TOP_N,
+    LEADERBOARD_RECENT_WINS,
+    LEADERBOARD_BIG_WIN_MULTIPLIER,
+    LEADERBOARD_PUSH_INTERVAL_MS,
     get_frontend_config
 )
 
@@ -23,11 +30,18 @@ __all__ = [
     "MIN_BET_AMOUNT",
     "MAX_BET_AMOUNT",
     "BET_COOLDOWN_MS",
+    "BET_COOLDOWN_GRACE_MS",
+    "BET_BURST_LIMIT",
+    "BET_SUSTAINED_INTERVAL_MS",
     "DICE_MULTIPLIERS",
     "SLOTS_SYMBOL_MULTIPLIERS",
     "SLOTS_TWO_MATCH_MULTIPLIER",
     "SLOTS_SYMBOLS",
     "DICE_MIN_PREDICTION",
     "DICE_MAX_PREDICTION",
+    "LEADERBOARD_TOP_N",
+    "LEADERBOARD_RECENT_WINS",
+    "LEADERBOARD_BIG_WIN_MULTIPLIER",
+    "LEADERBOARD_PUSH_INTERVAL_MS",
     "get_frontend_config"
 ]
@@ -8,7 +8,13 @@ MIN_BET_AMOUNT = 10  # Minimum bet in credits
 MAX_BET_AMOUNT = 10000  # Maximum bet in credits
 
 # Debounce Settings
-BET_COOLDOWN_MS = 500  # Milliseconds between bets
+BET_COOLDOWN_MS = 500  # Milliseconds between bets (enforced server-side too)
+
+# Server-side bet throttle - derived from BET_COOLDOWN_MS so the frontend
+# debounce and the server limits can never disagree
+BET_COOLDOWN_GRACE_MS = 50  # Allowance for network jitter on back-to-back bets
+BET_BURST_LIMIT = 20  # Bets allowed back-to-back before the sustained rate applies
+BET_SUSTAINED_INTERVAL_MS = BET_COOLDOWN_MS * 2  # Token refill interval
 
 # Lucky Dice Game Configuration
 DICE_MIN_PREDICTION = 2
@@ -47,6 +53,12 @@ SLOTS_SYMBOL_MULTIPLIERS = {
 # Slot payout multiplier for 2 matching symbols
 SLOTS_TWO_MATCH_MULTIPLIER = 2
 
+# Live winners ticker / leaderboards
+LEADERBOARD_TOP_N = 10  # Entries per daily/weekly leaderboard
+LEADERBOARD_RECENT_WINS = 50  # Size of the recent big wins ring buffer
+LEADERBOARD_BIG_WIN_MULTIPLIER = 10  # Minimum multiplier for the ticker
+LEADERBOARD_PUSH_INTERVAL_MS = 1000  # Leaderboard pushes are coalesced to this interval
+
 # Frontend Configuration Export (JSON-serializable)
 def get_frontend_config():
     """Get game configuration for frontend"""
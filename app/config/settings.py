@@ -26,6 +26,72 @@ class Settings(BaseSettings):
     # Logging configuration
     LOG_LEVEL: str = "INFO"
 
+    # Redis (optional) - shared state for multi-worker deployments
+    REDIS_URL: Optional[str] = None
+
+    # Mini-game bet throttle backend: "memory" (per worker) or "redis"
+    BET_THROTTLE_BACKEND: str = "memory"
+
+    # Winners ticker / leaderboard backend: "memory" (per worker) or "redis"
+    LEADERBOARD_BACKEND: str = "memory"
+
+    # Admin dashboard stats cache and live push interval
+    DASHBOARD_STATS_TTL_SECONDS: int = 30
+    DASHBOARD_STATS_LIVE_INTERVAL_SECONDS: int = 5
+
+    # Background job scheduler (see app/services/scheduler.py)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TICK_SECONDS: int = 5
+    SCHEDULER_LEASE_SECONDS: int = 60  # Another worker takes over after this long without renewal
+    SCHEDULER_CHUNK_SIZE: int = 500  # Rows per bulk UPDATE batch
+    REFERRAL_PENDING_EXPIRY_DAYS: int = 30
+
+    # Transactional outbox for WebSocket/push/email side effects (see app/services/outbox.py)
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    OUTBOX_POLL_SECONDS: float = 2.0  # Fallback poll; commits wake the dispatcher immediately
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_LOCK_SECONDS: int = 60  # Undelivered claims are retried by any worker after this
+    OUTBOX_RETENTION_DAYS: int = 7  # Delivered rows are purged by the scheduler after this
+
+    # Expo push dispatcher (see app/services/push_dispatcher.py)
+    PUSH_BATCH_SIZE: int = 100  # Expo's per-request maximum
+    PUSH_FLUSH_SECONDS: float = 0.05  # Longest a message waits for its batch to fill
+    PUSH_MAX_CONNECTIONS: int = 4  # Pooled connections to Expo (HTTP/2 multiplexes on each)
+    PUSH_TOKEN_CACHE_SECONDS: int = 300  # Active tokens per user; other workers see changes after this
+    PUSH_RECEIPT_DELAY_SECONDS: int = 900  # Expo recommends reading receipts ~15 minutes after sending
+    PUSH_MAX_CONSECUTIVE_FAILURES: int = 5  # A token failing this often in a row is deactivated
+
+    # Background email queue (see app/services/email_queue.py)
+    EMAIL_WORKERS: int = 4
+    EMAIL_BATCH_SIZE: int = 50  # Resend accepts up to 100 emails per batch request
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 2.0  # Doubles with each failed attempt
+
+    # List pagination (see app/pagination.py)
+    PAGINATION_COUNT_CACHE_SECONDS: int = 30  # How long an ?total=estimated count is reused
+
+    # Streaming admin exports (see app/services/data_export.py)
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the server-side cursor per chunk
+
+    # Background account deletion (see app/services/account_purge.py)
+    ACCOUNT_PURGE_BATCH_SIZE: int = 500  # Rows deleted per transaction
+    ACCOUNT_PURGE_MAX_BATCHES_PER_RUN: int = 100  # Per scheduler run, shared by all queued purges
+    ACCOUNT_PURGE_MAX_ATTEMPTS: int = 5
+
+    # Response compression (gzip always, brotli when installed)
+    ENABLE_COMPRESSION: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ENABLE_BROTLI: bool = True
+
+    # WebSocket permessage-deflate (see app/core/ws_protocol.py)
+    WS_DEFLATE_ENABLED: bool = True
+    WS_DEFLATE_LEVEL: int = 6
+    WS_DEFLATE_MEMORY_LEVEL: int = 5  # zlib memLevel 1-9, ~2^(memLevel+9) bytes per connection
+    WS_DEFLATE_MAX_WINDOW_BITS: int = 12  # 9-15, compression window per connection
+
     # Encryption key for credentials
     CREDENTIAL_ENCRYPTION_KEY: Optional[str] = None
 
@@ -37,8 +103,15 @@ class Settings(BaseSettings):
     # Base URL for links in emails
     BASE_URL: str = "http://127.0.0.1:8000"
 
-    # Contact form email
+    # Contact form email (sent over SMTP, Gmail by default)
     CONTACT_EMAIL: Optional[str] = None
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_FROM_EMAIL: Optional[str] = None
+    SMTP_FROM_NAME: str = "Casino Royal"
+    SMTP_USE_TLS: bool = True  # STARTTLS before login
 
     # App/Frontend URL for referral links, etc.
     APP_URL: str = "http://localhost:5173"
@@ -100,4 +173,9 @@ class Settings(BaseSettings):
         """Check if Resend is properly configured"""
         return bool(self.RESEND_API_KEY)
 
+    @property
+    def smtp_configured(self) -> bool:
+        """Check if SMTP is configured for the contact form"""
+        return bool(self.SMTP_USERNAME and self.SMTP_PASSWORD and self.SMTP_FROM_EMAIL)
+
 settings = Settings()
@@ -5,11 +5,25 @@ from app.core.logging_config import (
     log_error_with_context,
     log_game_transaction
 )
+from app.core.serialization import (
+    FastJSONResponse,
+    dumps,
+    dumps_str,
+    loads,
+    rows_to_dicts,
+    fast_list_response
+)
 
 __all__ = [
     "setup_logging",
     "get_logger",
     "get_game_logger",
     "log_error_with_context",
-    "log_game_transaction"
+    "log_game_transaction",
+    "FastJSONResponse",
+    "dumps",
+    "dumps_str",
+    "loads",
+    "rows_to_dicts",
+    "fast_list_response"
 ]
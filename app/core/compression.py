@@ -0,0 +1,227 @@
+"""
+Response Compression
+Streaming gzip/brotli compression for JSON and text responses
+
+Only responses whose content type is on the allowlist and whose body is at
+least ``minimum_size`` bytes are compressed. Streaming responses are
+compressed chunk by chunk with a sync flush after every chunk, so clients
+receive data as soon as the app emits it.
+
+Brotli is used when the ``brotli`` package is installed and the client
+advertises ``br``; gzip is always available.
+"""
+
+import zlib
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+BROTLI_AVAILABLE = brotli is not None
+
+# Content types worth compressing (prefix match on the mime type)
+DEFAULT_COMPRESSIBLE_TYPES: Tuple[str, ...] = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    Parse an Accept-Encoding header into {coding: q-value}
+
+    Args:
+        header: Raw header value, e.g. "gzip, br;q=0.9, *;q=0"
+
+    Returns:
+        Mapping of lower-cased coding names to their q-values
+    """
+    codings = {}
+    for part in header.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[name.strip().lower()] = q
+    return codings
+
+
+def select_encoding(accept_encoding: str, allow_brotli: bool = True) -> Optional[str]:
+    """
+    Pick the response encoding for a request
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding request header
+        allow_brotli: Whether brotli may be used
+
+    Returns:
+        "br", "gzip" or None when the response should not be compressed
+    """
+    codings = parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+
+    if allow_brotli and BROTLI_AVAILABLE and codings.get("br", wildcard) > 0:
+        return "br"
+    if codings.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _GzipEncoder:
+    """Incremental gzip encoder"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    """Incremental brotli encoder"""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing eligible HTTP responses.
+
+    Usage:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        enable_brotli: bool = True,
+        compressible_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enable_brotli = enable_brotli
+        self.compressible_types = tuple(compressible_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            allow_brotli=self.enable_brotli
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def is_compressible(self, headers: Headers) -> bool:
+        """Check content type and existing encoding of a response"""
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.compressible_types)
+
+    def make_encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper that decides on and applies compression"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk is seen
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = Headers(raw=self.start_message["headers"])
+            status_code = self.start_message["status"]
+            if (
+                status_code < 200
+                or status_code in (204, 304)
+                or not self.middleware.is_compressible(headers)
+                or (not more_body and len(body) < self.middleware.minimum_size)
+            ):
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.encoder = self.middleware.make_encoder(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                # Whole body available: compress in one go with an exact length
+                compressed = self.encoder.finish(body)
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming: length is unknown up front
+            del headers["Content-Length"]
+            await self._send(self.start_message)
+
+        if more_body:
+            chunk = self.encoder.compress(body)
+            if chunk:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self.encoder.finish(body)})
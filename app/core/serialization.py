@@ -0,0 +1,120 @@
+"""
+Fast JSON Serialization
+orjson-backed encoding for REST responses and WebSocket frames
+
+orjson natively handles datetime, date, UUID, Enum and dataclasses, so
+payloads built from row projections can be encoded without first walking
+them through FastAPI's jsonable_encoder. Falls back to the stdlib json
+module when orjson is not installed.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, List
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+if ORJSON_AVAILABLE:
+    # Game config uses int dict keys (dice multipliers)
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Encode types that neither orjson nor json handle natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to compact JSON bytes
+
+    Args:
+        obj: JSON-compatible object (dicts, lists, datetimes, enums, ...)
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize an object to a JSON string (for WebSocket text frames)"""
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class for the API.
+
+    Renders with orjson when available. Content returned through a
+    response_model has already been converted to plain Python by FastAPI,
+    so this only replaces the final encoding step.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_to_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Convert SQLAlchemy row projections (``db.query(col1, col2, ...)``) to dicts
+
+    Args:
+        rows: Result rows exposing ``_mapping``
+
+    Returns:
+        List of plain dicts keyed by column label
+    """
+    return [dict(row._mapping) for row in rows]
+
+
+def fast_list_response(payload: Dict[str, Any], status_code: int = 200) -> FastJSONResponse:
+    """
+    Opt-in fast path for large list endpoints.
+
+    Returns a response that skips response_model validation and
+    jsonable_encoder. Only use it with payloads built from explicit column
+    projections whose shape already matches the documented response.
+
+    Args:
+        payload: Response body made of plain dicts/lists/scalars
+        status_code: HTTP status code
+
+    Returns:
+        FastJSONResponse ready to be returned from the endpoint
+    """
+    return FastJSONResponse(content=payload, status_code=status_code)
@@ -0,0 +1,48 @@
+"""
+WebSocket Protocol with tunable permessage-deflate
+
+uvicorn always negotiates permessage-deflate with library defaults. This
+protocol class replaces the extension factory with one configured from
+settings, so the per-connection zlib memory (memLevel / window bits) can be
+traded against compression ratio.
+
+Usage:
+    uvicorn app.main:app --ws app.core.ws_protocol:DeflateWebSocketProtocol
+"""
+
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+
+from app.config import settings
+
+try:
+    # uvicorn >= 0.35 - sans-I/O implementation, connection state lives on self.conn
+    from uvicorn.protocols.websockets.websockets_sansio_impl import (
+        WebSocketsSansIOProtocol as _BaseProtocol,
+    )
+    _SANSIO = True
+except ImportError:  # pragma: no cover - older uvicorn
+    from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol as _BaseProtocol
+    _SANSIO = False
+
+
+def build_deflate_factory() -> ServerPerMessageDeflateFactory:
+    """Create the permessage-deflate factory from settings"""
+    return ServerPerMessageDeflateFactory(
+        server_max_window_bits=settings.WS_DEFLATE_MAX_WINDOW_BITS,
+        compress_settings={
+            "level": settings.WS_DEFLATE_LEVEL,
+            "memLevel": settings.WS_DEFLATE_MEMORY_LEVEL,
+        },
+    )
+
+
+class DeflateWebSocketProtocol(_BaseProtocol):
+    """uvicorn websockets protocol negotiating a tuned permessage-deflate"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        extensions = [build_deflate_factory()] if settings.WS_DEFLATE_ENABLED else []
+        if _SANSIO:
+            self.conn.available_extensions = extensions
+        else:
+            self.available_extensions = extensions
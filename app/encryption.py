@@ -1,51 +1,91 @@
 """
 Encryption utilities for sensitive data (game credentials, etc.)
 Using Fernet symmetric encryption for simplicity and security
+
+CREDENTIAL_ENCRYPTION_KEY may hold several comma-separated keys (MultiFernet):
+the first one encrypts, all of them decrypt. To rotate without downtime,
+put a new key first and deploy, run ``scripts/migrate_credentials.py --rotate``
+to re-encrypt stored values, then remove the old key.
 """
-from cryptography.fernet import Fernet
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 import os
 import logging
-from typing import Optional
+from typing import List, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
+# Lists shorter than this are encrypted/decrypted inline; longer ones are
+# split across the thread pool in chunks of CHUNK_SIZE
+PARALLEL_THRESHOLD = 64
+CHUNK_SIZE = 32
+CRYPTO_WORKERS = 4
+
 
 class CredentialEncryption:
     """Handle encryption and decryption of sensitive credentials"""
 
-    def __init__(self):
-        """Initialize the encryption handler with the encryption key"""
-        self.cipher = None
-        self.initialize_cipher()
+    def __init__(self, keys: Optional[str] = None):
+        """Initialize the encryption handler with the encryption key(s)"""
+        self.cipher = None  # MultiFernet over all keys
+        self.primary = None  # Fernet for the first key
+        self._executor = None
+        self.initialize_cipher(keys)
 
-    def initialize_cipher(self):
-        """Initialize the cipher with the encryption key from environment"""
-        try:
-            # Get the encryption key from environment
-            encryption_key = os.getenv("CREDENTIAL_ENCRYPTION_KEY")
+    def initialize_cipher(self, keys: Optional[str] = None):
+        """Initialize the cipher with the encryption key(s), by default from environment"""
+        # Get the encryption key(s) from environment
+        encryption_key = keys if keys is not None else os.getenv("CREDENTIAL_ENCRYPTION_KEY")
+        env = os.getenv('ENVIRONMENT', 'development')
 
+        # Validate the key format
+        valid_keys = []
+        for key in (k.strip() for k in (encryption_key or "").split(",")):
+            if self.is_valid_key(key):
+                valid_keys.append(key)
+            elif key:
+                logger.warning("Ignoring invalid key in CREDENTIAL_ENCRYPTION_KEY.")
+
+        if encryption_key and not valid_keys and env != 'development':
+            # Encrypting with a throwaway key would make every stored credential unreadable
+            raise ValueError("CREDENTIAL_ENCRYPTION_KEY is set but contains no valid Fernet key")
+
+        try:
             if not encryption_key:
-                env = os.getenv('ENVIRONMENT', 'development')
                 if env == 'development':
                     logger.info("CREDENTIAL_ENCRYPTION_KEY not set. Encryption disabled for development mode.")
                 else:
                     logger.warning("CREDENTIAL_ENCRYPTION_KEY not set. Encryption will be disabled.")
                 return
 
-            # Validate the key format
-            if not self.is_valid_key(encryption_key):
-                # If invalid key format, generate a new one and log warning
+            if not valid_keys:
+                # Only reached in development: use a throwaway key and log warning
                 logger.warning("Invalid encryption key format. Generating new key for development.")
-                encryption_key = self.generate_key()
-                logger.warning(f"Generated development key: {encryption_key}")
+                generated = self.generate_key()
+                logger.warning(f"Generated development key: {generated}")
                 logger.warning("DO NOT use this in production! Set a proper CREDENTIAL_ENCRYPTION_KEY")
+                valid_keys = [generated]
 
-            self.cipher = Fernet(encryption_key.encode() if isinstance(encryption_key, str) else encryption_key)
-            logger.info("Credential encryption initialized successfully")
+            fernets = [Fernet(key.encode()) for key in valid_keys]
+            self.primary = fernets[0]
+            self.cipher = MultiFernet(fernets)
+            logger.info(f"Credential encryption initialized successfully with {len(fernets)} key(s)")
 
         except Exception as e:
             logger.error(f"Failed to initialize encryption: {e}")
             self.cipher = None
+            self.primary = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.cipher is not None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=CRYPTO_WORKERS, thread_name_prefix="credential-crypto")
+        return self._executor
 
     @staticmethod
     def generate_key() -> str:
@@ -109,6 +149,86 @@ class CredentialEncryption:
             logger.error(f"Failed to decrypt data: {e}")
             return None
 
+    def encrypt_many(self, values: Sequence[str]) -> List[Optional[str]]:
+        """
+        Encrypt a list of strings
+
+        Long lists are encrypted in chunks on the thread pool.
+
+        Returns:
+            Encrypted strings in the same order (None where encryption fails)
+        """
+        return self._map(self._encrypt_chunk, values)
+
+    async def encrypt_many_async(self, values: Sequence[str]) -> List[Optional[str]]:
+        """``encrypt_many`` for request handlers: long lists are encrypted off the event loop"""
+        return await self._map_async(self._encrypt_chunk, values)
+
+    def decrypt_many(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """
+        Decrypt a list of encrypted strings
+
+        Long lists are decrypted in chunks on the thread pool.
+
+        Returns:
+            Decrypted strings in the same order (None where decryption fails)
+        """
+        return self._map(self._decrypt_chunk, values)
+
+    async def decrypt_many_async(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """``decrypt_many`` for request handlers: long lists are decrypted off the event loop"""
+        return await self._map_async(self._decrypt_chunk, values)
+
+    def _encrypt_chunk(self, values: Sequence[str]) -> List[Optional[str]]:
+        return [self.encrypt(value) for value in values]
+
+    def _decrypt_chunk(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        return [self.decrypt(value) for value in values]
+
+    def _map(self, func, values):
+        if len(values) < PARALLEL_THRESHOLD:
+            return func(values)
+        return [value for chunk in self.executor.map(func, _chunked(values)) for value in chunk]
+
+    async def _map_async(self, func, values):
+        if len(values) < PARALLEL_THRESHOLD:
+            return func(values)
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, func, chunk) for chunk in _chunked(values)
+        ))
+        return [value for chunk in chunks for value in chunk]
+
+    def needs_rotation(self, encrypted: str) -> bool:
+        """Whether a value was encrypted with a key other than the first one"""
+        if not self.primary or not encrypted:
+            return False
+        try:
+            self.primary.decrypt(encrypted.encode())
+            return False
+        except InvalidToken:
+            return True
+
+    def rotate(self, encrypted: str) -> Optional[str]:
+        """
+        Re-encrypt a value with the first key
+
+        Returns:
+            Re-encrypted string or None if no key can decrypt it
+        """
+        if not self.cipher or not encrypted:
+            return None
+
+        try:
+            return self.cipher.rotate(encrypted.encode()).decode()
+        except InvalidToken:
+            logger.error("Failed to rotate data: no key can decrypt it")
+            return None
+
+
+def _chunked(values: Sequence[Optional[str]]) -> List[Sequence[Optional[str]]]:
+    return [values[i:i + CHUNK_SIZE] for i in range(0, len(values), CHUNK_SIZE)]
+
 
 # Create a singleton instance
 credential_encryption = CredentialEncryption()
@@ -120,11 +240,26 @@ def encrypt_credential(plaintext: str) -> Optional[str]:
     return credential_encryption.encrypt(plaintext)
 
 
+async def encrypt_credentials_async(plaintexts: Sequence[str]) -> List[Optional[str]]:
+    """Encrypt a list of credential strings without blocking the event loop"""
+    return await credential_encryption.encrypt_many_async(plaintexts)
+
+
 def decrypt_credential(encrypted: str) -> Optional[str]:
     """Decrypt a credential string"""
     return credential_encryption.decrypt(encrypted)
 
 
+def decrypt_credentials(encrypted: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """Decrypt a list of credential strings"""
+    return credential_encryption.decrypt_many(encrypted)
+
+
+async def decrypt_credentials_async(encrypted: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """Decrypt a list of credential strings without blocking the event loop"""
+    return await credential_encryption.decrypt_many_async(encrypted)
+
+
 def generate_encryption_key() -> str:
     """Generate a new encryption key for setup"""
     return CredentialEncryption.generate_key()
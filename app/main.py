@@ -6,7 +6,12 @@ from app.models import Base  # Import from models package
 from app.api.v1.router import api_router  # Import v1 router
 from app.websocket import websocket_endpoint
 from app.config import settings
-from app.core import setup_logging, get_logger
+from app.core import setup_logging, get_logger, FastJSONResponse
+from app.services.scheduler import scheduler
+from app.services.outbox import dispatcher as outbox_dispatcher
+from app.services.push_dispatcher import push_dispatcher
+from app.services.email_queue import email_queue
+from contextlib import asynccontextmanager
 import os
 
 # Setup comprehensive logging
@@ -59,12 +64,31 @@ logger = get_logger(__name__)
 #
 # run_migrations()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers with the app and stop them on shutdown"""
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.start()
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        await outbox_dispatcher.start()
+    await email_queue.start()
+    try:
+        yield
+    finally:
+        await outbox_dispatcher.stop()
+        await push_dispatcher.stop()
+        await email_queue.stop()
+        await scheduler.stop()
+
+
 app = FastAPI(
     title="Casino Royal SaaS API",
     version="1.0.0",
     description="Multi-tenant casino platform API",
+    default_response_class=FastJSONResponse,  # orjson-backed encoding
     docs_url="/docs" if settings.is_development else None,  # Disable docs in production
-    redoc_url="/redoc" if settings.is_development else None  # Disable redoc in production
+    redoc_url="/redoc" if settings.is_development else None,  # Disable redoc in production
+    lifespan=lifespan
 )
 
 # Log environment on startup
@@ -119,6 +143,17 @@ setup_rate_limiting(app)
 from app.exceptions import setup_exception_handlers
 setup_exception_handlers(app)
 
+# Compress JSON/text responses (outermost so it sees final headers)
+if settings.ENABLE_COMPRESSION:
+    from app.core.compression import CompressionMiddleware
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        enable_brotli=settings.COMPRESSION_ENABLE_BROTLI,
+    )
+
 # Include API v1 router with /api/v1 prefix
 app.include_router(api_router, prefix="/api/v1")
 
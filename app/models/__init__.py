@@ -19,7 +19,10 @@ from app.models.enums import (
     TicketCategory,
     ReferralStatus,
     GameType,
-    BetResult
+    BetResult,
+    LedgerTransactionType,
+    OutboxStatus,
+    AccountPurgeStatus
 )
 
 # Import models - order matters for relationships
@@ -27,7 +30,7 @@ from app.models.user import User, friends_association
 from app.models.friend import FriendRequest
 from app.models.message import Message
 from app.models.review import Review
-from app.models.promotion import Promotion, PromotionClaim
+from app.models.promotion import Promotion, PromotionClaim, PromotionTarget
 from app.models.game import Game, ClientGame, GameCredentials
 from app.models.wallet import PlayerWallet
 from app.models.payment import PaymentMethod, ClientPaymentMethod, PlayerPaymentPreference
@@ -39,6 +42,14 @@ from app.models.bet_transaction import BetTransaction
 from app.models.community import CommunityPost, PostComment, PostLike, PostVisibility
 from app.models.crypto import AdminCryptoWallet, CreditPurchaseRequest, DEFAULT_CREDIT_RATES
 from app.models.push_token import PushToken, DevicePlatform
+from app.models.client_stats import ClientDailyStats
+from app.models.activity_event import ActivityEvent
+from app.models.ledger import LedgerTransaction, LedgerEntry
+from app.models.scheduler_lease import SchedulerLease
+from app.models.outbox import OutboxMessage
+from app.models.push_receipt import PushReceipt
+from app.models.account_purge import AccountPurge
+from app.models.search_index import SearchIndex, SEARCH_INDEXES, SEARCH_CONFIG, USER_SEARCH_COLUMNS
 
 __all__ = [
     # Base
@@ -61,6 +72,9 @@ __all__ = [
     "ReferralStatus",
     "GameType",
     "BetResult",
+    "LedgerTransactionType",
+    "OutboxStatus",
+    "AccountPurgeStatus",
     # Models
     "User",
     "friends_association",
@@ -69,6 +83,7 @@ __all__ = [
     "Review",
     "Promotion",
     "PromotionClaim",
+    "PromotionTarget",
     "Game",
     "ClientGame",
     "GameCredentials",
@@ -93,4 +108,16 @@ __all__ = [
     "DEFAULT_CREDIT_RATES",
     "PushToken",
     "DevicePlatform",
+    "ClientDailyStats",
+    "ActivityEvent",
+    "LedgerTransaction",
+    "LedgerEntry",
+    "SchedulerLease",
+    "OutboxMessage",
+    "PushReceipt",
+    "AccountPurge",
+    "SearchIndex",
+    "SEARCH_INDEXES",
+    "SEARCH_CONFIG",
+    "USER_SEARCH_COLUMNS",
 ]
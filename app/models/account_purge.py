@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+from app.models.enums import AccountPurgeStatus
+
+
+class AccountPurge(Base):
+    """
+    Progress of deleting one user account and everything that references it.
+
+    The account is disabled when the row is created; the scheduler job in
+    app/services/account_purge.py then deletes dependent rows in bounded
+    batches, recording the step it is on so a crashed purge resumes where
+    it stopped. ``user_id`` is deliberately not a foreign key: the row
+    outlives the user as a record of the deletion.
+    """
+    __tablename__ = "account_purges"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(Integer, nullable=False, unique=True, index=True)
+    username = Column(String, nullable=False)
+    # Admin who deleted the account, or None when users deleted themselves
+    requested_by_id = Column(Integer, nullable=True)
+
+    status = Column(Enum(AccountPurgeStatus), default=AccountPurgeStatus.PENDING, nullable=False)
+    # Name of the step in progress (see PURGE_STEPS)
+    current_step = Column(String(50), nullable=True)
+    rows_deleted = Column(Integer, default=0, nullable=False)
+    files_deleted = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String(500), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_account_purges_status_id', 'status', 'id'),
+    )
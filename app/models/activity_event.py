@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+class ActivityEvent(Base):
+    """
+    Append-only activity feed entry for a user's dashboard.
+
+    Rows are written alongside the change they describe (see
+    app/services/activity_feed.py) and carry the actor's username and the
+    status at the time of the event, so reading a feed is a single indexed
+    query with no joins or lazy loads.
+    """
+    __tablename__ = "activity_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Whose feed this event belongs to
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # e.g. "message_received", "friend_request_sent", "player_registered"
+    event_type = Column(String(50), nullable=False)
+
+    # Who caused the event (denormalized for display)
+    actor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    actor_name = Column(String, nullable=True)
+
+    # The row the event is about
+    subject_type = Column(String(50), nullable=True)
+    subject_id = Column(Integer, nullable=True)
+
+    # Status when the event was recorded ("Pending", "Unread", ...)
+    status = Column(String(50), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_activity_events_owner_created', 'owner_id', 'created_at', 'id'),
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+class ClientDailyStats(Base):
+    """
+    Pre-aggregated per-client dashboard counters, one row per client per
+    UTC day.
+
+    Counters are incremented in the same transaction as the rows they count
+    (see app/services/client_analytics.py) and rebuilt from the source tables
+    by the backfill/compaction command. Player gauges are snapshots written
+    by compaction (or lazily by the analytics endpoint).
+    """
+    __tablename__ = "client_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+
+    # Counters
+    messages_sent = Column(Integer, nullable=False, default=0, server_default="0")
+    messages_received = Column(Integer, nullable=False, default=0, server_default="0")
+    signups = Column(Integer, nullable=False, default=0, server_default="0")
+    claims = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Gauges (null until snapshotted for the day)
+    active_players = Column(Integer, nullable=True)
+    direct_active_players = Column(Integer, nullable=True)
+    total_players = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('client_id', 'day', name='uq_client_daily_stats_client_day'),
+    )
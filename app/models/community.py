@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -30,6 +30,11 @@ class CommunityPost(Base):
     comments = relationship("PostComment", back_populates="post", cascade="all, delete-orphan")
     likes = relationship("PostLike", back_populates="post", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_community_posts_visibility_created', 'visibility', 'is_active', 'created_at', 'id'),
+        Index('ix_community_posts_author_created', 'author_id', 'created_at', 'id'),
+    )
+
     @property
     def likes_count(self):
         return len(self.likes) if self.likes else 0
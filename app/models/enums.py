@@ -110,3 +110,27 @@ class BetResult(str, enum.Enum):
     WIN = "win"
     LOSE = "lose"
     JACKPOT = "jackpot"
+
+
+class LedgerTransactionType(str, enum.Enum):
+    ADMIN_ADJUSTMENT = "admin_adjustment"
+    OFFER_BONUS = "offer_bonus"
+    CREDIT_TRANSFER = "credit_transfer"
+    CRYPTO_PURCHASE = "crypto_purchase"
+    REFERRAL_BONUS = "referral_bonus"
+    PROMOTION_CLAIM = "promotion_claim"
+    BET = "bet"
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"  # Waiting for delivery (or for its next retry)
+    PROCESSING = "processing"  # Claimed by a dispatcher until locked_until
+    DELIVERED = "delivered"
+    FAILED = "failed"  # Gave up after OUTBOX_MAX_ATTEMPTS
+
+
+class AccountPurgeStatus(str, enum.Enum):
+    PENDING = "pending"  # Account disabled, no rows deleted yet
+    RUNNING = "running"  # Part way through the purge steps
+    COMPLETED = "completed"  # User row deleted
+    FAILED = "failed"  # Gave up after ACCOUNT_PURGE_MAX_ATTEMPTS
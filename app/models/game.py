@@ -1,6 +1,8 @@
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from typing import Optional
+from app.encryption import decrypt_credential, encrypt_credential
 from app.models.base import Base
 
 class Game(Base):
@@ -46,10 +48,8 @@ class GameCredentials(Base):
     id = Column(Integer, primary_key=True, index=True)
     player_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
-    game_username = Column(String, nullable=False)  # Keep for backward compatibility
-    game_password = Column(String, nullable=False)  # Keep for backward compatibility
-    game_username_encrypted = Column(Text, nullable=True)  # New encrypted column
-    game_password_encrypted = Column(Text, nullable=True)  # New encrypted column
+    game_username_encrypted = Column(Text, nullable=False)
+    game_password_encrypted = Column(Text, nullable=False)
     created_by_client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -64,3 +64,28 @@ class GameCredentials(Base):
     __table_args__ = (
         UniqueConstraint('player_id', 'game_id', 'created_by_client_id', name='unique_client_player_game_credential'),
     )
+
+    # Only the encrypted values are stored; these encrypt on write and
+    # decrypt on read. Lists should use decrypt_credentials_async instead.
+    @property
+    def game_username(self) -> Optional[str]:
+        return decrypt_credential(self.game_username_encrypted)
+
+    @game_username.setter
+    def game_username(self, value: str):
+        self.game_username_encrypted = _encrypt(value)
+
+    @property
+    def game_password(self) -> Optional[str]:
+        return decrypt_credential(self.game_password_encrypted)
+
+    @game_password.setter
+    def game_password(self, value: str):
+        self.game_password_encrypted = _encrypt(value)
+
+
+def _encrypt(value: str) -> str:
+    encrypted = encrypt_credential(value)
+    if encrypted is None:
+        raise ValueError("Credential encryption is not configured (set CREDENTIAL_ENCRYPTION_KEY)")
+    return encrypted
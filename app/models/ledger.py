@@ -0,0 +1,65 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.models.base import Base
+from app.models.enums import LedgerTransactionType
+
+
+class LedgerTransaction(Base):
+    """
+    One balanced credit movement (a journal header).
+
+    Its entries always sum to zero: credits leaving one account arrive in
+    another, where platform-side counterparties are named system accounts.
+    Rows are append-only; corrections are posted as new transactions.
+    """
+    __tablename__ = "ledger_transactions"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Caller-supplied key; replaying a key returns the original transaction
+    idempotency_key = Column(String(100), nullable=True, unique=True)
+
+    transaction_type = Column(Enum(LedgerTransactionType), nullable=False, index=True)
+
+    # The row that caused the movement, e.g. ("credit_purchase", 12)
+    reference_type = Column(String(50), nullable=True)
+    reference_id = Column(Integer, nullable=True)
+
+    description = Column(String, nullable=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    entries = relationship("LedgerEntry", back_populates="transaction", order_by="LedgerEntry.id")
+
+
+class LedgerEntry(Base):
+    """
+    A signed amount posted to one account.
+
+    User accounts have ``account == "user"`` and ``user_id`` set, and record
+    the resulting ``users.credits`` in ``balance_after``. System accounts
+    (e.g. "house", "issuance") have no stored balance; theirs is the sum
+    of their entries.
+    """
+    __tablename__ = "ledger_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    transaction_id = Column(Integer, ForeignKey("ledger_transactions.id"), nullable=False, index=True)
+
+    account = Column(String(50), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Positive credits the account, negative debits it
+    amount = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    transaction = relationship("LedgerTransaction", back_populates="entries")
+
+    __table_args__ = (
+        Index('ix_ledger_entries_user_id_id', 'user_id', 'id'),
+        Index('ix_ledger_entries_account', 'account'),
+    )
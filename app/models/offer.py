@@ -26,7 +26,7 @@ class PlatformOffer(Base):
     end_date = Column(DateTime(timezone=True), nullable=True)  # null = no expiry
 
     # Tracking
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)  # Admin who created
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # Admin who created (NULL once purged)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+from app.models.enums import OutboxStatus
+
+
+class OutboxMessage(Base):
+    """
+    A side effect (WebSocket event, push notification, email) recorded in
+    the same transaction as the change that causes it.
+
+    The dispatcher in app/services/outbox.py delivers pending rows after the
+    transaction commits and retries failures with backoff, so a side effect
+    is neither lost when the process dies nor sent for a rolled-back change.
+    """
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Handler name: "ws", "push" or "email"
+    kind = Column(String(50), nullable=False)
+
+    # Handler arguments (JSON string)
+    payload = Column(Text, nullable=False)
+
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String(500), nullable=True)
+
+    # Earliest time of the next delivery attempt
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # A PROCESSING row whose dispatcher died is reclaimed after this
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_outbox_messages_status_available', 'status', 'available_at', 'id'),
+    )
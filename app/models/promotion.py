@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, UniqueConstraint, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, UniqueConstraint, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -18,6 +18,7 @@ class Promotion(Base):
     max_claims_per_player = Column(Integer, default=1)
     total_budget = Column(Integer)  # Total budget for this promotion
     used_budget = Column(Integer, default=0)  # Track used budget
+    reserved_budget = Column(Integer, default=0, nullable=False, server_default='0')  # Held by pending claims
     min_player_level = Column(Integer, default=1)
     requires_screenshot = Column(Boolean, default=False, nullable=False)  # Whether player must submit screenshot proof
 
@@ -26,8 +27,8 @@ class Promotion(Base):
     end_date = Column(DateTime(timezone=True), nullable=False)
     status = Column(Enum(PromotionStatus), default=PromotionStatus.ACTIVE)
 
-    # Target audience (null = all players)
-    target_player_ids = Column(Text)  # JSON array of player IDs
+    # Target audience: when set, only players listed in promotion_targets may claim
+    is_targeted = Column(Boolean, default=False, nullable=False, server_default='false')
 
     # Terms and conditions
     terms = Column(Text)
@@ -39,6 +40,27 @@ class Promotion(Base):
     # Relationships
     client = relationship("User", foreign_keys=[client_id], backref="created_promotions")
     claims = relationship("PromotionClaim", back_populates="promotion", cascade="all, delete-orphan")
+    targets = relationship("PromotionTarget", back_populates="promotion", cascade="all, delete-orphan")
+
+    # Serves the scheduler's expiry sweep
+    __table_args__ = (
+        Index('ix_promotions_status_end_date', 'status', 'end_date'),
+    )
+
+
+class PromotionTarget(Base):
+    """A player a targeted promotion is offered to"""
+    __tablename__ = "promotion_targets"
+
+    promotion_id = Column(Integer, ForeignKey("promotions.id", ondelete="CASCADE"), primary_key=True)
+    player_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    promotion = relationship("Promotion", back_populates="targets")
+
+    # The primary key serves promotion -> players; this serves player -> promotions
+    __table_args__ = (
+        Index('ix_promotion_targets_player_promotion', 'player_id', 'promotion_id'),
+    )
 
 
 class PromotionClaim(Base):
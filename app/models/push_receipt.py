@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+class PushReceipt(Base):
+    """
+    An accepted Expo push ticket whose delivery receipt has not been read yet.
+
+    Expo only reports whether a message reached the device (or that the app
+    was uninstalled) in a receipt fetched later by ticket id. The receipt
+    poller in app/services/push_tokens.py reads these in batches, updates
+    the token's failure stats and deletes the row.
+    """
+    __tablename__ = "push_receipts"
+
+    ticket_id = Column(String(64), primary_key=True)
+
+    # Token the message was sent to (not a foreign key: tokens move between users)
+    token = Column(String(255), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
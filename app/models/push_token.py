@@ -33,9 +33,20 @@ class PushToken(Base):
     # Token status
     is_active = Column(Boolean, default=True)  # Can be deactivated if token becomes invalid
 
+    # Delivery outcomes from Expo tickets/receipts (see app/services/push_tokens.py)
+    receipt_count = Column(Integer, default=0, nullable=False, server_default="0")
+    failure_count = Column(Integer, default=0, nullable=False, server_default="0")
+    consecutive_failures = Column(Integer, default=0, nullable=False, server_default="0")
+    last_error = Column(String(100), nullable=True)  # Expo error code, e.g. DeviceNotRegistered
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_used_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", backref="push_tokens")
+
+    @property
+    def failure_rate(self) -> float:
+        """Share of known delivery outcomes that failed"""
+        return self.failure_count / self.receipt_count if self.receipt_count else 0.0
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -37,3 +37,8 @@ class Referral(Base):
     # Relationships
     referrer = relationship("User", foreign_keys=[referrer_id], backref="referrals_made")
     referred = relationship("User", foreign_keys=[referred_id], backref="referred_by")
+
+    # Serves the scheduler's pending-referral expiry sweep
+    __table_args__ = (
+        Index('ix_referrals_status_created_at', 'status', 'created_at'),
+    )
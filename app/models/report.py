@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, Enum, UniqueConstraint, String, Float
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, Enum, UniqueConstraint, String, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -43,4 +43,6 @@ class Report(Base):
     # Constraints - one report per reporter per reported user
     __table_args__ = (
         UniqueConstraint('reporter_id', 'reported_user_id', name='unique_report_per_pair'),
+        # Serves the scheduler's warning expiry sweep
+        Index('ix_reports_status_warning_deadline', 'status', 'warning_deadline'),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, CheckConstraint, UniqueConstraint, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, CheckConstraint, UniqueConstraint, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -34,4 +34,6 @@ class Review(Base):
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='rating_range'),
         UniqueConstraint('reviewer_id', 'reviewee_id', name='unique_review_per_pair'),
+        Index('ix_reviews_reviewee_created', 'reviewee_id', 'created_at', 'id'),
+        Index('ix_reviews_reviewer_created', 'reviewer_id', 'created_at', 'id'),
     )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime
+from app.models.base import Base
+
+
+class SchedulerLease(Base):
+    """
+    Time-limited lock naming the worker that runs background jobs.
+
+    Every worker starts a scheduler, but only the current holder of an
+    unexpired lease runs jobs (see app/services/scheduler.py). The holder
+    renews the lease on every tick; if it dies, another worker takes over
+    once ``expires_at`` passes.
+    """
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)
+
+    # "<hostname>:<pid>:<random>" of the worker holding the lease
+    holder = Column(String(255), nullable=False)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False)
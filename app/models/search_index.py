@@ -0,0 +1,112 @@
+"""
+Search indexes
+
+Full-text indexes over message, ticket message and community post text.
+The database keeps these up to date on every write, so no application
+code has to remember to reindex:
+
+- PostgreSQL: a GIN expression index on ``to_tsvector(config, column)``;
+  searches use the same expression and the planner picks the index
+- SQLite (development and tests): an FTS5 table over the column,
+  maintained by insert/update/delete triggers on the source table
+
+User search indexes over the ``USER_SEARCH_COLUMNS`` of ``users``:
+
+- PostgreSQL: ``pg_trgm`` GIN indexes, which serve ``ILIKE '%q%'``
+- SQLite: ``lower(column)`` indexes, which serve prefix range scans
+
+The DDL runs when ``create_all`` creates the source table; existing
+databases get it from the matching Alembic migrations.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+from sqlalchemy import DDL, Table, event
+
+from app.models.community import CommunityPost
+from app.models.message import Message
+from app.models.ticket import TicketMessage
+from app.models.user import User
+
+# Text search configuration for PostgreSQL (stemming and stop words)
+SEARCH_CONFIG = "english"
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """A text column with a full-text index"""
+    model: type
+    column: str
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
+
+    @property
+    def fts_table(self) -> str:
+        """SQLite FTS5 table name"""
+        return f"{self.table.name}_fts"
+
+    @property
+    def gin_index(self) -> str:
+        """PostgreSQL index name"""
+        return f"ix_{self.table.name}_{self.column}_fts"
+
+    def postgresql_ddl(self) -> List[str]:
+        return [
+            f"CREATE INDEX IF NOT EXISTS {self.gin_index} ON {self.table.name} "
+            f"USING gin (to_tsvector('{SEARCH_CONFIG}'::regconfig, {self.column}))"
+        ]
+
+    def sqlite_ddl(self) -> List[str]:
+        table, fts, column = self.table.name, self.fts_table, self.column
+        insert = f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});"
+        remove = f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{column}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {remove} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} "
+            f"BEGIN {remove} {insert} END",
+        ]
+
+
+SEARCH_INDEXES: Dict[str, SearchIndex] = {
+    "messages": SearchIndex(Message, "content"),
+    "ticket_messages": SearchIndex(TicketMessage, "content"),
+    "community_posts": SearchIndex(CommunityPost, "content"),
+}
+
+
+for _index in SEARCH_INDEXES.values():
+    for _statement in _index.postgresql_ddl():
+        event.listen(_index.table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+    for _statement in _index.sqlite_ddl():
+        event.listen(_index.table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    # The FTS table is not dropped with its source table
+    event.listen(_index.table, "after_drop",
+                 DDL(f"DROP TABLE IF EXISTS {_index.fts_table}").execute_if(dialect="sqlite"))
+
+
+# ============= User search =============
+
+USER_SEARCH_COLUMNS = ("username", "full_name", "user_id", "email")
+
+
+def user_search_ddl(dialect: str) -> List[str]:
+    if dialect == "postgresql":
+        return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+            f"CREATE INDEX IF NOT EXISTS ix_users_{column}_trgm ON users USING gin ({column} gin_trgm_ops)"
+            for column in USER_SEARCH_COLUMNS
+        ]
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_users_{column}_lower ON users (lower({column}))"
+        for column in USER_SEARCH_COLUMNS
+    ]
+
+
+for _dialect in ("postgresql", "sqlite"):
+    for _statement in user_search_ddl(_dialect):
+        event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -35,6 +35,10 @@ class Ticket(Base):
     assigned_admin = relationship("User", foreign_keys=[assigned_admin_id], backref="tickets_assigned")
     messages = relationship("TicketMessage", back_populates="ticket", order_by="TicketMessage.created_at")
 
+    __table_args__ = (
+        Index('ix_tickets_user_updated', 'user_id', 'updated_at', 'id'),
+    )
+
 
 class TicketMessage(Base):
     """Messages within a support ticket"""
@@ -1,15 +1,43 @@
 """
 Pagination utilities for API endpoints
 Provides both offset-based and cursor-based pagination
+
+Keyset pagination (``paginate_keyset``) orders by a composite key such as
+``(created_at, id)`` and continues after the last row of the previous page,
+so deep pages cost the same as the first one. Its cursors are signed with
+SECRET_KEY and scoped to one endpoint. Totals can be exact, estimated
+(``estimate_count``) or skipped altogether.
 """
-from typing import Generic, TypeVar, List, Optional, Dict, Any
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Generic, List, Literal, Optional, Sequence, Tuple, TypeVar
 from pydantic import BaseModel, Field, ConfigDict
+from sqlalchemy import DateTime, and_, func, literal, or_, text, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Query
-from fastapi import Query as FastAPIQuery
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.schema import Table
+from fastapi import HTTPException, Request, Query as FastAPIQuery
+import base64
+import enum
+import hashlib
+import hmac
+import json
+import logging
 import math
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# How list endpoints report their total: a full COUNT, a cheap estimate, or nothing
+TotalMode = Literal["exact", "estimated", "none"]
+
 
 class PaginationParams(BaseModel):
     """Parameters for pagination"""
@@ -92,8 +120,9 @@ class PagedResponse(BaseModel, Generic[T]):
 def paginate_query(
     query: Query,
     page: int = 1,
-    page_size: int = 50
-) -> tuple[List, int]:
+    page_size: int = 50,
+    total: TotalMode = "exact"
+) -> tuple[List, Optional[int]]:
     """
     Apply pagination to a SQLAlchemy query
 
@@ -101,16 +130,17 @@ def paginate_query(
         query: SQLAlchemy query object
         page: Page number (1-indexed)
         page_size: Items per page
+        total: How to count the matching rows (see ``count_total``)
 
     Returns:
-        Tuple of (items, total_count)
+        Tuple of (items, total_count) - total_count is None when total="none"
     """
     # Validate inputs
     page = max(1, page)
     page_size = min(max(1, page_size), 100)  # Cap at 100 items
 
     # Get total count
-    total = query.count()
+    total_count = count_total(query, total)
 
     # Calculate offset
     offset = (page - 1) * page_size
@@ -118,7 +148,7 @@ def paginate_query(
     # Apply pagination
     items = query.offset(offset).limit(page_size).all()
 
-    return items, total
+    return items, total_count
 
 
 class CursorPaginationParams(BaseModel):
@@ -127,14 +157,13 @@ class CursorPaginationParams(BaseModel):
     limit: int = Field(default=50, ge=1, le=100, description="Items per page")
     direction: str = Field(default="next", pattern="^(next|prev)$", description="Pagination direction")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "cursor": "eyJpZCI6IDEyMzR9",
-                "limit": 50,
-                "direction": "next"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "cursor": "eyJpZCI6IDEyMzR9",
+            "limit": 50,
+            "direction": "next"
         }
+    })
 
 
 class CursorPagedResponse(BaseModel, Generic[T]):
@@ -145,16 +174,15 @@ class CursorPagedResponse(BaseModel, Generic[T]):
     has_next: bool = Field(description="Whether there are more items")
     has_previous: bool = Field(description="Whether there are previous items")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "items": [],
-                "next_cursor": "eyJpZCI6IDEyMzR9",
-                "prev_cursor": None,
-                "has_next": True,
-                "has_previous": False
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "items": [],
+            "next_cursor": "eyJpZCI6IDEyMzR9",
+            "prev_cursor": None,
+            "has_next": True,
+            "has_previous": False
         }
+    })
 
 
 def encode_cursor(data: Dict[str, Any]) -> str:
@@ -196,6 +224,204 @@ def decode_cursor(cursor: str) -> Dict[str, Any]:
         return {}
 
 
+# ============= Keyset pagination =============
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed, was altered, or was issued for another listing"""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    One column of a keyset ordering
+
+    The last key of an ordering must be unique (normally the primary key)
+    so rows sharing the earlier values still have a stable order. Key
+    columns must not be NULL.
+
+    Attributes:
+        column: Column or SQL expression to order by
+        descending: Sort direction
+        value: Reads the key from a result row; defaults to the attribute
+            named after the column
+    """
+    column: Any
+    descending: bool = False
+    value: Optional[Callable[[Any], Any]] = None
+
+    def read(self, row: Any) -> Any:
+        if self.value is not None:
+            return self.value(row)
+        return getattr(row, self.column.key)
+
+
+def newest_first(model) -> Tuple[SortKey, SortKey]:
+    """``(created_at, id)`` descending, the ordering of most list endpoints"""
+    return SortKey(model.created_at, descending=True), SortKey(model.id, descending=True)
+
+
+def _signature(payload: str, scope: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"{scope}|{payload}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode()
+
+
+def sign_cursor(data: Dict[str, Any], scope: str = "") -> str:
+    """
+    Encode cursor data as an opaque string clients cannot alter
+
+    Args:
+        data: JSON-serializable cursor data
+        scope: Listing the cursor belongs to (e.g. the request path)
+
+    Returns:
+        ``<base64 payload>.<HMAC-SHA256 signature>``
+    """
+    raw = json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+    payload = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    return f"{payload}.{_signature(payload, scope)}"
+
+
+def unsign_cursor(cursor: str, scope: str = "") -> Dict[str, Any]:
+    """
+    Decode a cursor made by ``sign_cursor`` for the same scope
+
+    Raises:
+        InvalidCursor: if the cursor is malformed, altered or from another scope
+    """
+    payload, _, signature = cursor.partition(".")
+    if not hmac.compare_digest(signature.encode(), _signature(payload, scope).encode()):
+        raise InvalidCursor("Invalid cursor")
+    try:
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(data, dict):
+        raise InvalidCursor("Invalid cursor")
+    return data
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load_value(key: SortKey, value: Any) -> Any:
+    """Turn a JSON cursor value back into the key column's Python type"""
+    if value is None:
+        raise InvalidCursor("Invalid cursor")
+    try:
+        python_type = key.column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+    try:
+        if issubclass(python_type, datetime):
+            return datetime.fromisoformat(value)
+        if issubclass(python_type, date):
+            return date.fromisoformat(value)
+        if issubclass(python_type, (enum.Enum, Decimal)):
+            return python_type(value)
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    return value
+
+
+def _dialect_name(query: Query) -> str:
+    return query.session.get_bind().dialect.name
+
+
+def _sql_key(key: SortKey, dialect: str, value: Any = None, bind: bool = False):
+    """
+    The key column (or a bound value for it) as compared in SQL
+
+    SQLite keeps DateTime values as text in whatever format they were
+    written (``CURRENT_TIMESTAMP`` drops the fraction, Python values keep
+    microseconds), so both sides are normalized to one format there.
+    """
+    expression = literal(value, key.column.type) if bind else key.column
+    if dialect == "sqlite" and isinstance(key.column.type, DateTime):
+        return func.strftime("%Y-%m-%d %H:%M:%f", expression)
+    return expression
+
+
+def keyset_filter(keys: Sequence[SortKey], values: Sequence[Any], dialect: str = ""):
+    """
+    Condition matching the rows after ``values`` in the ``keys`` ordering
+
+    When every key sorts the same way PostgreSQL gets a row-value
+    comparison, ``(created_at, id) < (:created_at, :id)``, which walks a
+    composite index directly. Mixed directions use the equivalent
+    ``a > x OR (a = x AND b < y)`` chain.
+    """
+    columns = [_sql_key(key, dialect) for key in keys]
+    bounds = [_sql_key(key, dialect, value, bind=True) for key, value in zip(keys, values)]
+
+    if dialect == "postgresql" and len({key.descending for key in keys}) == 1:
+        if keys[0].descending:
+            return tuple_(*columns) < tuple_(*bounds)
+        return tuple_(*columns) > tuple_(*bounds)
+
+    clauses = []
+    for i, key in enumerate(keys):
+        after = columns[i] < bounds[i] if key.descending else columns[i] > bounds[i]
+        clauses.append(and_(*(c == b for c, b in zip(columns[:i], bounds[:i])), after))
+    return or_(*clauses)
+
+
+def paginate_keyset(
+    query: Query,
+    keys: Sequence[SortKey],
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    scope: str = "",
+    offset: int = 0
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of ``query`` ordered by ``keys``, starting after ``cursor``
+
+    Any ordering already on the query is replaced. One extra row is fetched
+    to learn whether another page exists; the next cursor holds the last
+    row's key values and is signed for ``scope``.
+
+    Args:
+        query: SQLAlchemy query without ORDER BY/LIMIT requirements of its own
+        keys: Ordering, ending with a unique key
+        limit: Page size
+        cursor: ``next_cursor`` from the previous page
+        scope: Listing the cursors belong to
+        offset: Rows to skip first (only for clients still sending page numbers)
+
+    Returns:
+        (items, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        InvalidCursor: if the cursor is malformed, altered or from another scope
+    """
+    dialect = _dialect_name(query)
+    if cursor:
+        values = unsign_cursor(cursor, scope).get("k")
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise InvalidCursor("Invalid cursor")
+        values = [_load_value(key, value) for key, value in zip(keys, values)]
+        query = query.filter(keyset_filter(keys, values, dialect))
+
+    ordering = [_sql_key(key, dialect) for key in keys]
+    query = query.order_by(None).order_by(*(
+        column.desc() if key.descending else column.asc() for key, column in zip(keys, ordering)
+    ))
+    items = query.offset(offset or None).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = sign_cursor({"k": [_dump_value(key.read(items[-1])) for key in keys]}, scope)
+    return items, next_cursor
+
+
 def paginate_cursor_query(
     query: Query,
     cursor: Optional[str] = None,
@@ -204,7 +430,10 @@ def paginate_cursor_query(
     direction: str = "next"
 ) -> tuple[List, Optional[str], Optional[str], bool, bool]:
     """
-    Apply cursor-based pagination to a SQLAlchemy query
+    Apply cursor-based pagination on a single unique column
+
+    New endpoints should call ``paginate_keyset`` with a composite key such
+    as ``newest_first(Model)`` instead.
 
     Args:
         query: SQLAlchemy query object
@@ -215,56 +444,142 @@ def paginate_cursor_query(
 
     Returns:
         Tuple of (items, next_cursor, prev_cursor, has_next, has_prev)
+
+    Raises:
+        InvalidCursor: if the cursor is malformed or altered
     """
     # Validate limit
     limit = min(max(1, limit), 100)
 
-    # Decode cursor if provided
-    cursor_data = decode_cursor(cursor) if cursor else {}
-
-    # Apply cursor filter if provided
-    if cursor_data and order_column:
-        cursor_value = cursor_data.get("value")
-        if cursor_value:
-            if direction == "next":
-                query = query.filter(order_column > cursor_value)
-            else:
-                query = query.filter(order_column < cursor_value)
-
-    # Order by the column
-    if order_column:
-        if direction == "next":
-            query = query.order_by(order_column.asc())
-        else:
-            query = query.order_by(order_column.desc())
-
-    # Fetch one extra item to check if there are more
-    items = query.limit(limit + 1).all()
-
-    # Check if there are more items
-    has_more = len(items) > limit
-    if has_more:
-        items = items[:-1]  # Remove the extra item
-
-    # Generate cursors
-    next_cursor = None
+    if order_column is None:
+        items = query.limit(limit + 1).all()
+        return items[:limit], None, None, len(items) > limit, False
+
+    key = SortKey(order_column, descending=direction == "prev")
+    items, next_cursor = paginate_keyset(query, [key], limit, cursor)
+
+    # Previous cursor based on first item, only if we're not on the first page
     prev_cursor = None
+    if items and cursor:
+        prev_cursor = sign_cursor({"k": [_dump_value(key.read(items[0]))]})
+
+    return items, next_cursor, prev_cursor, next_cursor is not None, bool(cursor)
+
 
-    if items and order_column:
-        # Next cursor based on last item
-        if has_more:
-            last_item = items[-1]
-            last_value = getattr(last_item, order_column.name)
-            next_cursor = encode_cursor({"value": last_value})
+# ============= Totals =============
 
-        # Previous cursor based on first item
-        if cursor:  # Only if we're not on the first page
-            first_item = items[0]
-            first_value = getattr(first_item, order_column.name)
-            prev_cursor = encode_cursor({"value": first_value})
+COUNT_CACHE_MAX_ENTRIES = 1024
 
-    return items, next_cursor, prev_cursor, has_more, bool(cursor)
+_RELTUPLES = text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)")
 
+# (SQL, parameters) -> (expires_at, count)
+_count_cache: Dict[Tuple[str, Tuple], Tuple[float, int]] = {}
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, with its bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _planner_estimate(query: Query) -> Optional[int]:
+    """PostgreSQL's own row estimate, or None when it has no statistics"""
+    db = query.session
+    statement = query.statement
+    try:
+        froms = statement.get_final_froms()
+        if statement.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            reltuples = db.execute(_RELTUPLES, {"name": froms[0].fullname}).scalar()
+            return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+        plan = db.execute(_Explain(statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (SQLAlchemyError, LookupError, TypeError, ValueError) as e:
+        logger.warning(f"Row estimate failed, counting instead: {e}")
+        return None
+
+
+def _cached_count(query: Query) -> int:
+    compiled = query.statement.compile()
+    key = (str(compiled), tuple(sorted((name, repr(value)) for name, value in compiled.params.items())))
+    now = time.monotonic()
+    hit = _count_cache.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+
+    total = query.count()
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (now + settings.PAGINATION_COUNT_CACHE_SECONDS, total)
+    return total
+
+
+def clear_count_cache() -> None:
+    _count_cache.clear()
+
+
+def estimate_count(query: Query) -> int:
+    """
+    Approximate number of rows matched by ``query``
+
+    - PostgreSQL, whole table: ``pg_class.reltuples``
+    - PostgreSQL, filtered: the planner's row estimate from ``EXPLAIN``
+    - otherwise, or before PostgreSQL has statistics: an exact count,
+      reused for ``PAGINATION_COUNT_CACHE_SECONDS``
+    """
+    query = query.order_by(None)
+    if _dialect_name(query) == "postgresql":
+        estimate = _planner_estimate(query)
+        if estimate is not None:
+            return estimate
+    return _cached_count(query)
+
+
+def count_total(query: Query, mode: TotalMode = "exact") -> Optional[int]:
+    """
+    Total for a list response
+
+    Args:
+        query: Query matching every row of the listing
+        mode: "exact" (COUNT), "estimated" (see ``estimate_count``) or "none"
+
+    Returns:
+        Row count, or None for mode="none"
+    """
+    if mode == "none":
+        return None
+    if mode == "estimated":
+        return estimate_count(query)
+    return query.order_by(None).count()
+
+
+@dataclass(frozen=True)
+class KeysetParams:
+    """Pagination parameters of one request (see ``keyset_pagination``)"""
+    cursor: Optional[str]
+    limit: int
+    total: TotalMode
+    scope: str
+
+    def paginate(self, query: Query, keys: Sequence[SortKey], offset: int = 0) -> Tuple[List, Optional[str]]:
+        """``paginate_keyset`` for this request; a bad cursor is a 400"""
+        try:
+            return paginate_keyset(query, keys, self.limit, self.cursor, self.scope, offset)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def count(self, query: Query) -> Optional[int]:
+        """``count_total`` in the mode the client asked for"""
+        return count_total(query, self.total)
 
 # Dependency for FastAPI endpoints
 def get_pagination_params(
@@ -295,4 +610,40 @@ def get_cursor_pagination_params(
         def get_messages(pagination: CursorPaginationParams = Depends(get_cursor_pagination_params)):
             ...
     """
-    return CursorPaginationParams(cursor=cursor, limit=limit, direction=direction)
\ No newline at end of file
+    return CursorPaginationParams(cursor=cursor, limit=limit, direction=direction)
+
+
+def keyset_pagination(
+    default_limit: int = 50,
+    max_limit: int = 100,
+    default_total: TotalMode = "exact",
+    limit_alias: Optional[str] = None
+) -> Callable[..., KeysetParams]:
+    """
+    Build a FastAPI dependency reading ``cursor``, ``limit`` and ``total``
+
+    Cursors are scoped to the request path, so one issued by
+    ``/reviews/user/1`` is rejected by ``/reviews/user/2``.
+
+    Args:
+        default_limit: Page size when the client sends none
+        max_limit: Largest page size accepted
+        default_total: Total mode when the client sends none
+        limit_alias: Query parameter name for the page size, if not ``limit``
+
+    Usage:
+        @router.get("/items")
+        def get_items(page: KeysetParams = Depends(keyset_pagination(default_limit=20))):
+            query = db.query(models.Item)
+            items, next_cursor = page.paginate(query, newest_first(models.Item))
+            return {"items": items, "total": page.count(query), "next_cursor": next_cursor}
+    """
+    def get_keyset_params(
+        request: Request,
+        cursor: Optional[str] = FastAPIQuery(None, description="next_cursor from the previous page"),
+        limit: int = FastAPIQuery(default_limit, ge=1, le=max_limit, alias=limit_alias, description="Items per page"),
+        total: TotalMode = FastAPIQuery(default_total, description="exact, estimated or none")
+    ) -> KeysetParams:
+        return KeysetParams(cursor=cursor, limit=limit, total=total, scope=request.url.path)
+
+    return get_keyset_params
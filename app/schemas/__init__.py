@@ -54,6 +54,9 @@ from app.schemas.game import (
     GameCredentialUpdate,
     GameCredentialResponse,
     GameCredentialListResponse,
+    GameCredentialBulkCreate,
+    GameCredentialBulkResult,
+    GameCredentialBulkResponse,
     MiniGameBetRequest,
     MiniGameBetResponse
 )
@@ -92,7 +95,7 @@ from app.schemas.offer import (
     OfferClaimProcess,
     CreditTransfer
 )
-from app.schemas.activity import ActivityItem, RecentActivityResponse, TrendData, QuickStats, PromotionStats, AnalyticsResponse
+from app.schemas.activity import ActivityItem, RecentActivityResponse, ActivityFeedResponse, TrendData, QuickStats, PromotionStats, AnalyticsResponse
 from app.schemas.password import (
     ChangePasswordRequest,
     AdminResetPasswordRequest,
@@ -182,6 +185,9 @@ __all__ = [
     "GameCredentialUpdate",
     "GameCredentialResponse",
     "GameCredentialListResponse",
+    "GameCredentialBulkCreate",
+    "GameCredentialBulkResult",
+    "GameCredentialBulkResponse",
     "MiniGameBetRequest",
     "MiniGameBetResponse",
     # Payment
@@ -225,6 +231,7 @@ __all__ = [
     # Activity
     "ActivityItem",
     "RecentActivityResponse",
+    "ActivityFeedResponse",
     "TrendData",
     "QuickStats",
     "PromotionStats",
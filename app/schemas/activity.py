@@ -16,6 +16,11 @@ class RecentActivityResponse(BaseModel):
     activities: List[ActivityItem]
 
 
+class ActivityFeedResponse(BaseModel):
+    activities: List[ActivityItem]
+    next_cursor: Optional[str] = None  # Pass back to fetch the next page
+
+
 class TrendData(BaseModel):
     value: str
     is_positive: bool
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -78,6 +78,24 @@ class GameCredentialResponse(BaseModel):
 class GameCredentialListResponse(BaseModel):
     credentials: List[GameCredentialResponse]
 
+class GameCredentialBulkCreate(BaseModel):
+    # Existing credentials for the same player and game are overwritten
+    credentials: List[GameCredentialCreate] = Field(..., min_length=1, max_length=5000)
+
+class GameCredentialBulkResult(BaseModel):
+    index: int  # Position in the request
+    player_id: int
+    game_id: int
+    status: str  # "created", "updated" or "error"
+    credential_id: Optional[int] = None
+    error: Optional[str] = None
+
+class GameCredentialBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[GameCredentialBulkResult]
+
 # Mini Game Betting Schemas
 class MiniGameBetRequest(BaseModel):
     game_type: str  # 'dice' or 'slots'
@@ -91,7 +91,8 @@ class ReportListResponse(BaseModel):
 class ReportInvestigationListResponse(BaseModel):
     """List response for admin report investigation"""
     reports: List[ReportDetailResponse]
-    total_count: int
+    total_count: Optional[int]
+    next_cursor: Optional[str] = None
     pending_count: int
     investigating_count: int
     warning_count: int
@@ -68,14 +68,16 @@ class ReviewDetailResponse(BaseModel):
 
 class ReviewListResponse(BaseModel):
     reviews: List[ReviewResponse]
-    total_count: int
+    total_count: Optional[int]  # None when requested with total=none
     average_rating: Optional[float]
+    next_cursor: Optional[str] = None
 
 
 class ReviewModerationListResponse(BaseModel):
     """List response for admin review moderation"""
     reviews: List[ReviewDetailResponse]
-    total_count: int
+    total_count: Optional[int]
+    next_cursor: Optional[str] = None
     pending_count: int
     approved_count: int
     rejected_count: int
@@ -83,7 +83,8 @@ class TicketDetailResponse(TicketResponse):
 class TicketListResponse(BaseModel):
     """Response for list of tickets"""
     tickets: List[TicketResponse]
-    total_count: int
+    total_count: Optional[int]
+    next_cursor: Optional[str] = None
     open_count: int
     resolved_count: int
 
@@ -1,5 +1,6 @@
 from .email_service import (
     generate_otp,
+    render_email,
     send_email,
     send_otp_email,
     send_welcome_email,
@@ -8,6 +9,7 @@ from .email_service import (
 
 __all__ = [
     "generate_otp",
+    "render_email",
     "send_email",
     "send_otp_email",
     "send_welcome_email",
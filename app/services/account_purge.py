@@ -0,0 +1,402 @@
+"""
+Background Account Purge
+
+Deleting an account touches every table that references ``users.id`` —
+for an active player or client that is tens of thousands of messages,
+bets and ledger rows. Doing it inside the DELETE request held locks on all
+of them for the length of one transaction and failed outright on any row
+the hand-written list missed. Instead:
+
+- ``request_purge`` disables the account (login, push) and records an
+  ``AccountPurge`` row in the request's transaction
+- the ``purge_accounts`` scheduler job walks ``PURGE_STEPS`` in order,
+  deleting (or detaching) at most ``ACCOUNT_PURGE_BATCH_SIZE`` rows per
+  transaction and storing its progress in the same commit
+- uploaded media referenced by a batch (chat and ticket attachments, post
+  images, payment screenshots, the profile picture) is removed from S3 or
+  ``uploads/`` before the batch's rows are deleted, so no file is left
+  unreferenced
+- the user row itself goes last
+
+Every step selects what is still left, so a purge interrupted by a crash
+or deploy resumes from its recorded step on the next run. A purge that
+keeps failing is marked FAILED after ``ACCOUNT_PURGE_MAX_ATTEMPTS`` and can
+be retried by deleting the account again.
+
+Financial records are kept: ledger entries and transactions stay with
+their user reference cleared, as do rows where the user only acted as an
+admin or approver (including platform offers an admin created).
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Table, delete, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app import models
+from app.config import settings
+from app.core import get_logger
+from app.models import AccountPurge, AccountPurgeStatus
+from app.s3_storage import is_s3_url, s3_storage
+from app.services.push_tokens import token_cache
+
+logger = get_logger(__name__)
+
+UPLOAD_DIR = "uploads"
+
+
+# ============= Steps =============
+
+@dataclass(frozen=True)
+class PurgeStep:
+    """
+    One table's share of a purge
+
+    ``where(user_id)`` selects the rows still to handle. They are deleted,
+    or with ``detach`` the named column is set to NULL instead (the
+    condition must then stop matching). ``media`` names a column holding
+    an uploaded file URL to remove along with the row.
+    """
+    name: str
+    table: Table
+    where: Callable[[int], ColumnElement]
+    detach: Optional[str] = None
+    media: Optional[str] = None
+
+
+def _posts_of(user_id: int):
+    return select(models.CommunityPost.id).where(models.CommunityPost.author_id == user_id)
+
+
+def _promotions_of(user_id: int):
+    return select(models.Promotion.id).where(models.Promotion.client_id == user_id)
+
+
+def _tickets_of(user_id: int):
+    return select(models.Ticket.id).where(models.Ticket.user_id == user_id)
+
+
+def _messages_of(user_id: int):
+    M = models.Message
+    return select(M.id).where(or_(M.sender_id == user_id, M.receiver_id == user_id))
+
+
+def _delete(name: str, model, where, media: Optional[str] = None) -> PurgeStep:
+    return PurgeStep(name, model.__table__, where, media=media)
+
+
+def _detach(name: str, model, column: str) -> PurgeStep:
+    col = getattr(model, column)
+    return PurgeStep(name, model.__table__, lambda u: col == u, detach=column)
+
+
+P, C, L = models.CommunityPost, models.PostComment, models.PostLike
+PC, PT = models.PromotionClaim, models.PromotionTarget
+R, RV, T, TM = models.Report, models.Review, models.Ticket, models.TicketMessage
+friends = models.friends_association
+
+# Children before parents; every step's rows must be free of references
+# from tables purged by later steps.
+PURGE_STEPS: List[PurgeStep] = [
+    # Community
+    _delete("post_likes", L, lambda u: or_(L.user_id == u, L.post_id.in_(_posts_of(u)))),
+    _delete("post_comments", C, lambda u: or_(C.author_id == u, C.post_id.in_(_posts_of(u)))),
+    _delete("community_posts", P, lambda u: P.author_id == u, media="image_url"),
+
+    # Promotions and offers
+    PurgeStep("promotion_claim_messages", PC.__table__,
+              lambda u: PC.approval_message_id.in_(_messages_of(u)), detach="approval_message_id"),
+    _delete("promotion_claims", PC, lambda u: or_(
+        PC.player_id == u, PC.client_id == u, PC.promotion_id.in_(_promotions_of(u))
+    )),
+    _detach("promotion_claim_approvals", PC, "approved_by_id"),
+    _delete("promotion_targets", PT, lambda u: or_(PT.player_id == u, PT.promotion_id.in_(_promotions_of(u)))),
+    _delete("promotions", models.Promotion, lambda u: models.Promotion.client_id == u),
+    _delete("offer_claims", models.OfferClaim, lambda u: models.OfferClaim.player_id == u),
+    _detach("offer_claim_clients", models.OfferClaim, "client_id"),
+    _detach("offer_claim_processors", models.OfferClaim, "processed_by"),
+
+    # Social
+    _delete("messages", models.Message, lambda u: or_(
+        models.Message.sender_id == u, models.Message.receiver_id == u
+    ), media="file_url"),
+    _delete("friend_requests", models.FriendRequest, lambda u: or_(
+        models.FriendRequest.sender_id == u, models.FriendRequest.receiver_id == u
+    )),
+    PurgeStep("friends", friends, lambda u: or_(friends.c.user_id == u, friends.c.friend_id == u)),
+    _delete("reports", R, lambda u: or_(R.reporter_id == u, R.reported_user_id == u)),
+    _detach("report_reviewers", R, "reviewed_by"),
+    _delete("reviews", RV, lambda u: or_(RV.reviewer_id == u, RV.reviewee_id == u)),
+    _detach("review_moderators", RV, "moderated_by"),
+
+    # Support tickets (appeals filed by others may point at them)
+    _delete("ticket_messages", TM, lambda u: or_(TM.sender_id == u, TM.ticket_id.in_(_tickets_of(u))),
+            media="file_url"),
+    PurgeStep("report_appeals", R.__table__, lambda u: R.appeal_ticket_id.in_(_tickets_of(u)),
+              detach="appeal_ticket_id"),
+    PurgeStep("review_appeals", RV.__table__, lambda u: RV.appeal_ticket_id.in_(_tickets_of(u)),
+              detach="appeal_ticket_id"),
+    _delete("tickets", T, lambda u: T.user_id == u),
+    _detach("ticket_assignments", T, "assigned_admin_id"),
+
+    # Games and payments
+    _delete("bet_transactions", models.BetTransaction, lambda u: models.BetTransaction.user_id == u),
+    _delete("game_credentials", models.GameCredentials, lambda u: or_(
+        models.GameCredentials.player_id == u, models.GameCredentials.created_by_client_id == u
+    )),
+    _delete("client_games", models.ClientGame, lambda u: models.ClientGame.client_id == u),
+    _delete("client_payment_methods", models.ClientPaymentMethod,
+            lambda u: models.ClientPaymentMethod.client_id == u),
+    _delete("player_payment_preferences", models.PlayerPaymentPreference,
+            lambda u: models.PlayerPaymentPreference.player_id == u),
+    _delete("player_wallets", models.PlayerWallet, lambda u: models.PlayerWallet.player_id == u),
+    _delete("credit_purchase_requests", models.CreditPurchaseRequest,
+            lambda u: models.CreditPurchaseRequest.client_id == u, media="proof_screenshot"),
+    _detach("credit_purchase_approvals", models.CreditPurchaseRequest, "admin_id"),
+    _delete("client_daily_stats", models.ClientDailyStats, lambda u: models.ClientDailyStats.client_id == u),
+
+    # Account
+    _delete("push_tokens", models.PushToken, lambda u: models.PushToken.user_id == u),
+    _delete("activity_events", models.ActivityEvent, lambda u: models.ActivityEvent.owner_id == u),
+    _detach("activity_actors", models.ActivityEvent, "actor_id"),
+    _delete("referrals", models.Referral, lambda u: or_(
+        models.Referral.referrer_id == u, models.Referral.referred_id == u
+    )),
+    _detach("ledger_entries", models.LedgerEntry, "user_id"),
+    _detach("ledger_transactions", models.LedgerTransaction, "created_by_id"),
+    _detach("created_players", models.User, "created_by_client_id"),
+    _detach("platform_offers", models.PlatformOffer, "created_by"),
+    _delete("user", models.User, lambda u: models.User.id == u, media="profile_picture"),
+]
+
+STEP_NAMES = [step.name for step in PURGE_STEPS]
+
+
+# ============= Media =============
+
+def delete_media(url: Optional[str]) -> bool:
+    """
+    Remove an uploaded file from S3 or the local ``uploads/`` directory
+
+    Missing files count as removed; URLs pointing elsewhere are ignored.
+
+    Returns:
+        True if a file was deleted
+    """
+    if not url:
+        return False
+    if is_s3_url(url):
+        return s3_storage.delete_file(url)
+    if url.startswith("http"):
+        return False
+
+    # Only delete inside the upload directory (prevent path traversal)
+    abs_upload_dir = os.path.abspath(UPLOAD_DIR)
+    abs_file_path = os.path.abspath(url.lstrip("/"))
+    if not abs_file_path.startswith(abs_upload_dir + os.sep) or not os.path.exists(abs_file_path):
+        return False
+    try:
+        os.remove(abs_file_path)
+    except OSError as e:
+        logger.error(f"Failed to delete file {abs_file_path}: {e}")
+        return False
+    return True
+
+
+# ============= Running =============
+
+def _run_batch(db: Session, purge: AccountPurge, step: PurgeStep, batch_size: int) -> int:
+    """
+    Handle one batch of ``step`` and record progress in the same commit
+
+    Returns:
+        Number of rows deleted or detached (0 once the step is done)
+    """
+    table = step.table
+    keys = list(table.primary_key.columns)
+    condition = step.where(purge.user_id)
+    media = [table.c[step.media]] if step.media else []
+
+    rows = db.execute(
+        select(*keys, *media).where(condition).order_by(*keys).limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    files = sum(1 for row in rows if media and delete_media(row[-1]))
+
+    if len(keys) == 1:
+        target = keys[0].in_([row[0] for row in rows])
+    else:
+        target = tuple_(*keys).in_([tuple(row[:len(keys)]) for row in rows])
+    if step.detach:
+        statement = update(table).where(target, condition).values({step.detach: None})
+    else:
+        statement = delete(table).where(target)
+    db.execute(statement.execution_options(synchronize_session=False))
+
+    purge.rows_deleted += len(rows)
+    purge.files_deleted += files
+    db.commit()
+    return len(rows)
+
+
+def run_purge(db: Session, purge: AccountPurge, max_batches: Optional[int] = None) -> int:
+    """
+    Continue ``purge`` from its recorded step for at most ``max_batches``
+    batches. Steps are idempotent: a batch that was rolled back is simply
+    selected again.
+
+    Returns:
+        Number of batches run
+    """
+    max_batches = max_batches or settings.ACCOUNT_PURGE_MAX_BATCHES_PER_RUN
+    batch_size = settings.ACCOUNT_PURGE_BATCH_SIZE
+    start = STEP_NAMES.index(purge.current_step) if purge.current_step in STEP_NAMES else 0
+
+    purge.status = AccountPurgeStatus.RUNNING
+    batches = 0
+    for step in PURGE_STEPS[start:]:
+        if purge.current_step != step.name:
+            purge.current_step = step.name
+            db.commit()
+        while batches < max_batches:
+            batches += 1
+            if _run_batch(db, purge, step, batch_size) < batch_size:
+                break
+        else:
+            return batches
+
+    purge.status = AccountPurgeStatus.COMPLETED
+    purge.current_step = None
+    purge.completed_at = datetime.now(timezone.utc)
+    db.commit()
+    logger.info(
+        f"Purged account {purge.username} (ID: {purge.user_id}): "
+        f"{purge.rows_deleted} rows, {purge.files_deleted} files"
+    )
+    return batches
+
+
+def purge_accounts(db: Session, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """
+    Scheduler job: advance every unfinished purge, oldest first, sharing
+    ``max_batches`` between them
+    """
+    budget = max_batches or settings.ACCOUNT_PURGE_MAX_BATCHES_PER_RUN
+    result = {"completed": 0, "failed": 0, "batches": 0}
+    purges = db.execute(
+        select(AccountPurge)
+        .where(AccountPurge.status.in_([AccountPurgeStatus.PENDING, AccountPurgeStatus.RUNNING]))
+        .order_by(AccountPurge.id)
+    ).scalars().all()
+
+    for purge in purges:
+        if result["batches"] >= budget:
+            break
+        try:
+            result["batches"] += run_purge(db, purge, budget - result["batches"])
+        except Exception as e:
+            db.rollback()
+            purge.attempts += 1
+            purge.last_error = str(e)[:500]
+            if purge.attempts >= settings.ACCOUNT_PURGE_MAX_ATTEMPTS:
+                purge.status = AccountPurgeStatus.FAILED
+                result["failed"] += 1
+            db.commit()
+            logger.error(f"Account purge {purge.id} failed at {purge.current_step}: {e}")
+            continue
+        if purge.status == AccountPurgeStatus.COMPLETED:
+            result["completed"] += 1
+    return result
+
+
+# ============= Requesting =============
+
+def request_purge(db: Session, user: models.User, requested_by: Optional[models.User] = None) -> AccountPurge:
+    """
+    Disable ``user`` now and queue the deletion of their data
+
+    Friendships and pending friend requests are removed at once so no new
+    messages can reach the account. Requesting again for an account already
+    being purged returns the existing purge; a FAILED purge is restarted
+    from its first step. Commits.
+    """
+    user.is_active = False
+    user.is_online = False
+    db.execute(
+        update(models.PushToken)
+        .where(models.PushToken.user_id == user.id)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    # Unfriend now: friends can message each other, and a message arriving
+    # after the messages step would block deleting the user row
+    db.execute(
+        delete(friends)
+        .where(or_(friends.c.user_id == user.id, friends.c.friend_id == user.id))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(models.FriendRequest)
+        .where(
+            or_(models.FriendRequest.sender_id == user.id, models.FriendRequest.receiver_id == user.id),
+            models.FriendRequest.status == models.FriendRequestStatus.PENDING
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    purge = db.query(AccountPurge).filter(AccountPurge.user_id == user.id).first()
+    if purge is None:
+        purge = AccountPurge(
+            user_id=user.id,
+            username=user.username,
+            requested_by_id=requested_by.id if requested_by else None,
+            rows_deleted=0,
+            files_deleted=0,
+            attempts=0
+        )
+        db.add(purge)
+    elif purge.status == AccountPurgeStatus.FAILED:
+        # Start over: whatever blocked the failed step may belong to an earlier one
+        purge.status = AccountPurgeStatus.PENDING
+        purge.current_step = None
+        purge.attempts = 0
+        purge.last_error = None
+
+    db.commit()
+    db.refresh(purge)
+    token_cache.invalidate(user.id)
+    logger.info(f"Queued account purge {purge.id} for {user.username} (ID: {user.id})")
+    return purge
+
+
+def is_being_purged(db: Session, user_id: int) -> bool:
+    """Whether a purge has been requested for the user"""
+    return db.query(AccountPurge.id).filter(AccountPurge.user_id == user_id).first() is not None
+
+
+def purge_status(purge: AccountPurge) -> Dict:
+    """API representation of a purge's progress"""
+    step = purge.current_step
+    return {
+        "id": purge.id,
+        "user_id": purge.user_id,
+        "username": purge.username,
+        "status": purge.status.value,
+        "current_step": step,
+        "steps_done": STEP_NAMES.index(step) if step in STEP_NAMES else (
+            len(STEP_NAMES) if purge.status == AccountPurgeStatus.COMPLETED else 0
+        ),
+        "steps_total": len(STEP_NAMES),
+        "rows_deleted": purge.rows_deleted,
+        "files_deleted": purge.files_deleted,
+        "attempts": purge.attempts,
+        "last_error": purge.last_error,
+        "created_at": purge.created_at,
+        "completed_at": purge.completed_at,
+    }
@@ -0,0 +1,312 @@
+"""
+Activity Feed
+
+Appends ``activity_events`` rows alongside the changes they describe and
+serves each user's feed with one keyset-paginated query on
+``(owner_id, created_at, id)``.
+
+Events are written by an ``after_flush`` listener, so every write path
+(REST, WebSocket chat, notifications) records them in the same transaction:
+
+- new Message            -> receiver: message_received
+- new FriendRequest      -> receiver: friend_request_received,
+                            sender:   friend_request_sent
+- FriendRequest accepted -> sender:   friend_request_accepted
+  / rejected             -> sender:   friend_request_rejected
+- new player created by a client -> client: player_registered
+
+Only owners whose dashboards show a feed (clients) get events. After the
+transaction commits, new events are pushed to the owner's open sockets as
+``activity:new``.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, event, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import get_history
+
+from app import models
+from app.models import ActivityEvent, FriendRequestStatus, UserType
+from app.pagination import newest_first, paginate_keyset
+
+logger = logging.getLogger(__name__)
+
+# Users whose dashboards show an activity feed
+FEED_OWNER_TYPES = (UserType.CLIENT,)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_PENDING_KEY = "activity_events_pending"
+
+# event_type -> (activity_type, description) for the recent activity list
+FEED_LABELS = {
+    "friend_request_sent": ("friend_request_sent", "Friend Request Sent"),
+    "friend_request_received": ("friend_request_received", "Friend Request Received"),
+    "friend_request_accepted": ("friend_request_accepted", "Friend Request Accepted"),
+    "friend_request_rejected": ("friend_request_rejected", "Friend Request Rejected"),
+    "player_registered": ("player_registered", "Player Registered"),
+    "message_received": ("message_received", "Message Received"),
+}
+
+# Short labels used by the analytics summary card
+ANALYTICS_LABELS = {
+    "friend_request_received": ("friend_request", "sent a friend request"),
+    "player_registered": ("signup", "signed up"),
+    "message_received": ("message", "sent you a message"),
+}
+
+# Columns returned by feed queries
+FEED_PROJECTION = (
+    ActivityEvent.id,
+    ActivityEvent.event_type,
+    ActivityEvent.actor_id,
+    ActivityEvent.actor_name,
+    ActivityEvent.subject_type,
+    ActivityEvent.subject_id,
+    ActivityEvent.status,
+    ActivityEvent.created_at,
+)
+
+
+# ============= Writing =============
+
+def _status_label(status) -> Optional[str]:
+    return status.value.title() if status is not None else None
+
+
+def _collect_events(session: Session) -> List[Dict]:
+    """Build event rows for the objects in this flush"""
+    # (owner_id, event_type, actor_id, subject_type, subject_id, status)
+    drafts: List[Tuple] = []
+    new_players: Dict[int, str] = {}
+
+    for obj in session.new:
+        if isinstance(obj, models.Message):
+            drafts.append((obj.receiver_id, "message_received", obj.sender_id, "message", obj.id, "Unread"))
+        elif isinstance(obj, models.FriendRequest):
+            status = _status_label(obj.status or FriendRequestStatus.PENDING)
+            drafts.append((obj.receiver_id, "friend_request_received", obj.sender_id, "friend_request", obj.id, status))
+            drafts.append((obj.sender_id, "friend_request_sent", obj.receiver_id, "friend_request", obj.id, status))
+        elif (
+            isinstance(obj, models.User)
+            and obj.created_by_client_id
+            and obj.user_type == UserType.PLAYER
+        ):
+            new_players[obj.id] = obj.username
+            drafts.append((
+                obj.created_by_client_id, "player_registered", obj.id, "user", obj.id,
+                "Active" if obj.is_active is not False else "Inactive"
+            ))
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.FriendRequest):
+            continue
+        added = get_history(obj, "status").added
+        if not added:
+            continue
+        status = added[0]
+        if status in (FriendRequestStatus.ACCEPTED, FriendRequestStatus.REJECTED):
+            drafts.append((
+                obj.sender_id, f"friend_request_{status.value}", obj.receiver_id,
+                "friend_request", obj.id, _status_label(status)
+            ))
+        elif status == FriendRequestStatus.PENDING:
+            # A rejected request was re-sent
+            label = _status_label(status)
+            drafts.append((obj.receiver_id, "friend_request_received", obj.sender_id, "friend_request", obj.id, label))
+            drafts.append((obj.sender_id, "friend_request_sent", obj.receiver_id, "friend_request", obj.id, label))
+
+    if not drafts:
+        return []
+
+    # One lookup for owner types and actor names
+    user_ids = {d[0] for d in drafts} | {d[2] for d in drafts if d[2]}
+    users = {
+        row.id: row
+        for row in session.connection().execute(
+            select(models.User.id, models.User.username, models.User.user_type)
+            .where(models.User.id.in_(user_ids))
+        )
+    }
+
+    now = datetime.now(timezone.utc)
+    events = []
+    for owner_id, event_type, actor_id, subject_type, subject_id, status in drafts:
+        owner = users.get(owner_id)
+        if owner is None or owner.user_type not in FEED_OWNER_TYPES:
+            continue
+        actor = users.get(actor_id)
+        events.append({
+            "owner_id": owner_id,
+            "event_type": event_type,
+            "actor_id": actor_id,
+            "actor_name": actor.username if actor else new_players.get(actor_id),
+            "subject_type": subject_type,
+            "subject_id": subject_id,
+            "status": status,
+            "created_at": now,
+        })
+    return events
+
+
+@event.listens_for(Session, "after_flush")
+def _append_activity_events(session: Session, flush_context):
+    """Append feed events for rows written by this flush"""
+    if not session.new and not session.dirty:
+        return
+    try:
+        events = _collect_events(session)
+        if events:
+            connection = session.connection()
+            # Savepoint: a failed insert must not abort the caller's transaction
+            with connection.begin_nested():
+                connection.execute(insert(ActivityEvent.__table__), events)
+            session.info.setdefault(_PENDING_KEY, []).extend(events)
+    except Exception as e:
+        logger.warning(f"Failed to append activity events: {e}")
+
+
+@event.listens_for(Session, "after_commit")
+def _push_activity_events(session: Session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if not events:
+        return
+    from app.websocket import manager, WSMessage, WSMessageType
+
+    for e in events:
+        manager.send_to_user_threadsafe(e["owner_id"], WSMessage(
+            type=WSMessageType.ACTIVITY_NEW,
+            data=serialize_event(e)
+        ))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_activity_events(session: Session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ============= Backfill =============
+
+def rebuild_events(db: Session) -> int:
+    """
+    Replace the feed with events reconstructed from the source tables, using
+    each row's own ``created_at``. Intermediate friend request transitions are
+    not recoverable, so requests appear once per side with their current status.
+
+    Returns:
+        Number of events written
+    """
+    User, Message, FriendRequest = models.User, models.Message, models.FriendRequest
+    owner, actor = aliased(User), aliased(User)
+    table = ActivityEvent.__table__
+    columns = ["owner_id", "event_type", "actor_id", "actor_name",
+               "subject_type", "subject_id", "status", "created_at"]
+
+    def status_label(column):
+        return case(
+            *[(column == s, _status_label(s)) for s in FriendRequestStatus],
+            else_=None
+        )
+
+    def source(owner_col, event_type, actor_col, subject_type, subject_id, status, created_at, *filters):
+        return (
+            select(
+                owner_col, literal(event_type), actor_col, actor.username,
+                literal(subject_type), subject_id, status, created_at
+            )
+            .join_from(owner, actor, actor.id == actor_col)
+            .where(owner.id == owner_col, owner.user_type.in_(FEED_OWNER_TYPES), *filters)
+        )
+
+    sources = [
+        source(Message.receiver_id, "message_received", Message.sender_id, "message",
+               Message.id, literal("Unread"), Message.created_at),
+        source(FriendRequest.receiver_id, "friend_request_received", FriendRequest.sender_id,
+               "friend_request", FriendRequest.id, status_label(FriendRequest.status),
+               FriendRequest.created_at),
+        source(FriendRequest.sender_id, "friend_request_sent", FriendRequest.receiver_id,
+               "friend_request", FriendRequest.id, status_label(FriendRequest.status),
+               FriendRequest.created_at),
+        source(actor.created_by_client_id, "player_registered", actor.id, "user", actor.id,
+               case((actor.is_active == False, "Inactive"), else_="Active"), actor.created_at,
+               actor.user_type == UserType.PLAYER),
+    ]
+
+    written = 0
+    try:
+        db.execute(table.delete())
+        for stmt in sources:
+            written += db.execute(insert(table).from_select(columns, stmt)).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+# ============= Reading =============
+
+def serialize_event(row) -> Dict:
+    """Event row (ORM row, projection or dict) as a JSON-ready dict"""
+    get = row.get if isinstance(row, dict) else lambda key: getattr(row, key)
+    return {
+        "id": get("id"),
+        "event_type": get("event_type"),
+        "actor_id": get("actor_id"),
+        "actor_name": get("actor_name"),
+        "subject_type": get("subject_type"),
+        "subject_id": get("subject_id"),
+        "status": get("status"),
+        "created_at": get("created_at"),
+    }
+
+
+def as_activity_items(rows, labels: Dict[str, Tuple[str, str]] = FEED_LABELS) -> List[Dict]:
+    """Feed rows in the ``ActivityItem`` shape"""
+    items = []
+    for row in rows:
+        activity_type, description = labels.get(row.event_type, (row.event_type, row.event_type))
+        items.append({
+            "activity_type": activity_type,
+            "description": description,
+            "user": row.actor_name or "",
+            "timestamp": row.created_at,
+            "status": row.status,
+        })
+    return items
+
+
+def get_feed(
+    db: Session,
+    owner_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    event_types: Optional[Sequence[str]] = None
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of a user's feed, newest first
+
+    Args:
+        db: Database session
+        owner_id: Feed owner
+        limit: Page size
+        cursor: ``next_cursor`` from the previous page
+        event_types: Only include these event types
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        InvalidCursor: (a ValueError) if the cursor is malformed or was
+            issued for another user's feed
+    """
+    query = db.query(*FEED_PROJECTION).filter(ActivityEvent.owner_id == owner_id)
+    if event_types:
+        query = query.filter(ActivityEvent.event_type.in_(event_types))
+    return paginate_keyset(
+        query, newest_first(ActivityEvent), limit, cursor, scope=f"activity-feed:{owner_id}"
+    )
@@ -0,0 +1,215 @@
+"""
+Mini-game bet engine
+
+Settles a bet in a single transaction:
+
+1. The outcome (dice roll / slot reels) is drawn and resolved by the pure
+   payout functions below, before touching the database.
+2. The stake and winnings are posted to the credit ledger against the house
+   account. The balance changes in one conditional
+   ``UPDATE users SET credits = credits + :net WHERE id = :id AND
+   credits >= :bet RETURNING credits``. No ``SELECT ... FOR UPDATE`` round
+   trip is needed - the condition makes the update itself the check.
+3. The ``BetTransaction`` audit row is inserted in the same transaction,
+   so a balance change can never be committed without its audit rows.
+
+The payout functions are shared with the RTP simulator so the simulated
+and live payout tables can never drift apart.
+"""
+
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    DICE_MULTIPLIERS,
+    SLOTS_SYMBOLS,
+    SLOTS_SYMBOL_MULTIPLIERS,
+    SLOTS_TWO_MATCH_MULTIPLIER
+)
+from app.models.enums import GameType, BetResult, LedgerTransactionType
+from app.services import ledger
+from app.services.ledger import InsufficientCreditsError, PostedTransaction
+
+# Multiplier used if a prediction/symbol is missing from the config tables
+DEFAULT_DICE_MULTIPLIER = 6
+DEFAULT_SLOTS_MULTIPLIER = 10
+
+
+@dataclass
+class BetOutcome:
+    """Resolved result of a single bet, independent of any balance"""
+    game_type: GameType
+    result: BetResult
+    multiplier: float
+    win_amount: int
+    details: Dict
+    game_data: Dict = field(default_factory=dict)
+
+
+@dataclass
+class SettledBet:
+    """A bet after the balance update and audit insert"""
+    outcome: BetOutcome
+    bet_amount: int
+    balance_before: int
+    balance_after: int
+    transaction_id: Optional[int] = None
+
+
+# ============= Pure payout functions =============
+
+def dice_multiplier(prediction: int, total: int) -> float:
+    """Payout multiplier for a dice bet (0 on a loss)"""
+    if total != prediction:
+        return 0
+    return DICE_MULTIPLIERS.get(prediction, DEFAULT_DICE_MULTIPLIER)
+
+
+def slots_multiplier(reels: Sequence[str]) -> float:
+    """Payout multiplier for a three-reel spin (0 on a loss)"""
+    reel1, reel2, reel3 = reels
+    if reel1 == reel2 == reel3:
+        return SLOTS_SYMBOL_MULTIPLIERS.get(reel1, DEFAULT_SLOTS_MULTIPLIER)
+    if reel1 == reel2 or reel2 == reel3 or reel1 == reel3:
+        return SLOTS_TWO_MATCH_MULTIPLIER
+    return 0
+
+
+def resolve_dice(bet_amount: int, prediction: int, dice1: int, dice2: int) -> BetOutcome:
+    """Resolve a dice bet for a given roll"""
+    total = dice1 + dice2
+    multiplier = dice_multiplier(prediction, total)
+    win_amount = int(bet_amount * multiplier)
+
+    return BetOutcome(
+        game_type=GameType.LUCKY_DICE,
+        result=BetResult.WIN if multiplier else BetResult.LOSE,
+        multiplier=multiplier,
+        win_amount=win_amount,
+        details={
+            "dice1": dice1,
+            "dice2": dice2,
+            "total": total,
+            "prediction": prediction
+        },
+        game_data={
+            "prediction": prediction,
+            "dice1": dice1,
+            "dice2": dice2,
+            "total": total,
+            "multiplier": multiplier
+        }
+    )
+
+
+def resolve_slots(bet_amount: int, reels: Sequence[str]) -> BetOutcome:
+    """Resolve a slots bet for a given spin"""
+    reels = list(reels)
+    multiplier = slots_multiplier(reels)
+    win_amount = int(bet_amount * multiplier)
+
+    if multiplier and reels[0] == reels[1] == reels[2]:
+        result = BetResult.JACKPOT
+    elif multiplier:
+        result = BetResult.WIN
+    else:
+        result = BetResult.LOSE
+
+    return BetOutcome(
+        game_type=GameType.LUCKY_SLOTS,
+        result=result,
+        multiplier=multiplier,
+        win_amount=win_amount,
+        details={"reels": reels},
+        game_data={"symbols": reels, "multiplier": multiplier}
+    )
+
+
+def roll_dice(bet_amount: int, prediction: int, rng: random.Random = random) -> BetOutcome:
+    """Draw a dice roll and resolve it"""
+    return resolve_dice(bet_amount, prediction, rng.randint(1, 6), rng.randint(1, 6))
+
+
+def spin_slots(bet_amount: int, rng: random.Random = random) -> BetOutcome:
+    """Draw a slot spin and resolve it"""
+    reels: List[str] = [rng.choice(SLOTS_SYMBOLS) for _ in range(3)]
+    return resolve_slots(bet_amount, reels)
+
+
+# ============= Settlement =============
+
+def apply_bet_delta(db: Session, user_id: int, bet_amount: int, net_delta: int) -> PostedTransaction:
+    """
+    Debit the stake and credit the winnings as one ledger transaction against
+    the house account: a single conditional UPDATE on the balance plus the
+    journal rows.
+
+    Args:
+        db: Database session (the caller owns the transaction)
+        user_id: Betting user
+        bet_amount: Stake that must be covered by the current balance
+        net_delta: win_amount - bet_amount
+
+    Returns:
+        The posted ledger transaction (``balances[user_id]`` is the new balance)
+
+    Raises:
+        InsufficientCreditsError: if the balance does not cover the stake
+    """
+    return ledger.post(db, LedgerTransactionType.BET, [
+        ledger.user_posting(user_id, net_delta, required=bet_amount),
+        ledger.system_posting(ledger.HOUSE, -net_delta),
+    ], reference=("bet_transaction", None))
+
+
+def settle_bet(db: Session, user_id: int, bet_amount: int, outcome: BetOutcome) -> SettledBet:
+    """
+    Apply a resolved bet to the user's balance and write its audit row,
+    committing both together.
+
+    Raises:
+        InsufficientCreditsError: if the balance does not cover the stake
+    """
+    net_delta = outcome.win_amount - bet_amount
+    try:
+        posted = apply_bet_delta(db, user_id, bet_amount, net_delta)
+        balance_after = posted.balances[user_id]
+        balance_before = balance_after - net_delta
+
+        bet_transaction = models.BetTransaction(
+            user_id=user_id,
+            game_type=outcome.game_type,
+            bet_amount=bet_amount,
+            win_amount=outcome.win_amount,
+            result=outcome.result,
+            balance_before=balance_before,
+            balance_after=balance_after,
+            game_data=json.dumps(outcome.game_data)
+        )
+        db.add(bet_transaction)
+        db.flush()
+        transaction_id = bet_transaction.id
+        db.execute(
+            update(models.LedgerTransaction)
+            .where(models.LedgerTransaction.id == posted.transaction_id)
+            .values(reference_id=transaction_id)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return SettledBet(
+        outcome=outcome,
+        bet_amount=bet_amount,
+        balance_before=balance_before,
+        balance_after=balance_after,
+        transaction_id=transaction_id
+    )
@@ -0,0 +1,240 @@
+"""
+Server-side bet throttle
+
+Enforces ``BET_COOLDOWN_MS`` (the same value the frontend debounces with)
+plus a per-user token bucket in front of ``/games/mini-game/bet``, so
+scripted clients are rejected before any database work or row contention.
+
+Two backends:
+- memory: per-process dict, suitable for a single worker
+- redis: atomic Lua script shared by all workers (BET_THROTTLE_BACKEND=redis)
+
+If Redis is configured but unreachable the throttle falls back to the
+in-memory backend rather than blocking bets.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends
+from jose import JWTError, jwt
+
+from app.auth import oauth2_scheme
+from app.config import (
+    settings,
+    BET_COOLDOWN_MS,
+    BET_COOLDOWN_GRACE_MS,
+    BET_BURST_LIMIT,
+    BET_SUSTAINED_INTERVAL_MS
+)
+from app.core import get_logger
+from app.exceptions import RateLimitError
+
+logger = get_logger(__name__)
+
+# Idle entries are dropped once the bucket would be full again
+_STATE_TTL_MS = BET_BURST_LIMIT * BET_SUSTAINED_INTERVAL_MS + BET_COOLDOWN_MS
+
+
+@dataclass
+class ThrottleDecision:
+    """Result of a throttle check"""
+    allowed: bool
+    retry_after_ms: int = 0
+    reason: Optional[str] = None
+
+
+@dataclass
+class _BucketState:
+    last_bet_ms: float
+    tokens: float
+    updated_ms: float
+
+
+def _now_ms() -> float:
+    return time.monotonic() * 1000
+
+
+def evaluate(
+    state: Optional[_BucketState],
+    now_ms: float,
+    cooldown_ms: int = BET_COOLDOWN_MS - BET_COOLDOWN_GRACE_MS,
+    capacity: int = BET_BURST_LIMIT,
+    refill_ms: int = BET_SUSTAINED_INTERVAL_MS
+) -> Tuple[ThrottleDecision, _BucketState]:
+    """
+    Pure cooldown + token bucket step
+
+    Args:
+        state: Previous state for the user (None for first bet)
+        now_ms: Current time in milliseconds
+
+    Returns:
+        Tuple of (decision, new state)
+    """
+    if state is None:
+        return ThrottleDecision(True), _BucketState(now_ms, capacity - 1, now_ms)
+
+    since_last = now_ms - state.last_bet_ms
+    if since_last < cooldown_ms:
+        return ThrottleDecision(False, math.ceil(cooldown_ms - since_last), "cooldown"), state
+
+    tokens = min(capacity, state.tokens + (now_ms - state.updated_ms) / refill_ms)
+    if tokens < 1:
+        wait = math.ceil((1 - tokens) * refill_ms)
+        return ThrottleDecision(False, wait, "rate"), _BucketState(state.last_bet_ms, tokens, now_ms)
+
+    return ThrottleDecision(True), _BucketState(now_ms, tokens - 1, now_ms)
+
+
+class MemoryBetThrottle:
+    """Per-process throttle state"""
+
+    def __init__(self):
+        self._states: Dict[int, _BucketState] = {}
+        self._lock = threading.Lock()
+        self._last_prune_ms = _now_ms()
+
+    async def check(self, user_id: int) -> ThrottleDecision:
+        now = _now_ms()
+        with self._lock:
+            decision, self._states[user_id] = evaluate(self._states.get(user_id), now)
+            if now - self._last_prune_ms > _STATE_TTL_MS:
+                self._prune(now)
+        return decision
+
+    def _prune(self, now: float):
+        stale = [uid for uid, s in self._states.items() if now - s.updated_ms > _STATE_TTL_MS]
+        for uid in stale:
+            del self._states[uid]
+        self._last_prune_ms = now
+
+    def reset(self):
+        with self._lock:
+            self._states.clear()
+
+
+# KEYS[1] = throttle key
+# ARGV = now_ms, cooldown_ms, capacity, refill_ms, ttl_ms
+# Returns {allowed (0/1), retry_after_ms, reason}
+_REDIS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cooldown = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local refill = tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+
+local s = redis.call('HMGET', KEYS[1], 'last', 'tokens', 'ts')
+local last, tokens, ts = tonumber(s[1]), tonumber(s[2]), tonumber(s[3])
+
+if last == nil then
+    redis.call('HSET', KEYS[1], 'last', now, 'tokens', capacity - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], ttl)
+    return {1, 0, ''}
+end
+
+if now - last < cooldown then
+    return {0, math.ceil(cooldown - (now - last)), 'cooldown'}
+end
+
+tokens = math.min(capacity, tokens + (now - ts) / refill)
+if tokens < 1 then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], ttl)
+    return {0, math.ceil((1 - tokens) * refill), 'rate'}
+end
+
+redis.call('HSET', KEYS[1], 'last', now, 'tokens', tostring(tokens - 1), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], ttl)
+return {1, 0, ''}
+"""
+
+
+class RedisBetThrottle:
+    """Throttle state shared across workers through Redis"""
+
+    key_prefix = "bet_throttle:"
+
+    def __init__(self, url: str, fallback: MemoryBetThrottle):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_SCRIPT)
+        self._fallback = fallback
+
+    async def check(self, user_id: int) -> ThrottleDecision:
+        try:
+            # Redis TIME keeps all workers on the same clock
+            seconds, micros = await self._client.time()
+            now = seconds * 1000 + micros // 1000
+            allowed, retry_after, reason = await self._script(
+                keys=[f"{self.key_prefix}{user_id}"],
+                args=[
+                    now,
+                    BET_COOLDOWN_MS - BET_COOLDOWN_GRACE_MS,
+                    BET_BURST_LIMIT,
+                    BET_SUSTAINED_INTERVAL_MS,
+                    _STATE_TTL_MS
+                ]
+            )
+        except Exception as e:
+            logger.warning(f"Redis bet throttle unavailable, using in-memory fallback: {e}")
+            return await self._fallback.check(user_id)
+
+        if isinstance(reason, bytes):
+            reason = reason.decode()
+        return ThrottleDecision(bool(allowed), int(retry_after), reason or None)
+
+    def reset(self):
+        self._fallback.reset()
+
+
+def _build_throttle():
+    memory = MemoryBetThrottle()
+    if settings.BET_THROTTLE_BACKEND == "redis":
+        if settings.REDIS_URL:
+            logger.info("Bet throttle using Redis backend")
+            return RedisBetThrottle(settings.REDIS_URL, memory)
+        logger.warning("BET_THROTTLE_BACKEND=redis but REDIS_URL is not set; using memory")
+    return memory
+
+
+bet_throttle = _build_throttle()
+
+
+def _user_id_from_token(token: str) -> Optional[int]:
+    """Read the user id from a JWT without touching the database"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("user_id")
+
+
+async def enforce_bet_throttle(token: str = Depends(oauth2_scheme)):
+    """
+    FastAPI dependency rejecting bets that arrive faster than the cooldown
+    or token bucket allow. Declare it before the user dependency so it runs
+    before any database work.
+
+    Invalid tokens pass through untouched; authentication rejects them next.
+    """
+    user_id = _user_id_from_token(token)
+    if user_id is None:
+        return
+
+    decision = await bet_throttle.check(user_id)
+    if not decision.allowed:
+        logger.info(
+            f"Bet throttled | user_id={user_id} | reason={decision.reason} | "
+            f"retry_after_ms={decision.retry_after_ms}"
+        )
+        detail = (
+            f"Please wait {BET_COOLDOWN_MS}ms between bets"
+            if decision.reason == "cooldown"
+            else "Too many bets, please slow down"
+        )
+        raise RateLimitError(detail=detail, retry_after=max(1, math.ceil(decision.retry_after_ms / 1000)))
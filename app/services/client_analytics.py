@@ -0,0 +1,351 @@
+"""
+Client Analytics Rollups
+
+Maintains ``client_daily_stats`` - one row per client per UTC day - so the
+client dashboard reads a few pre-aggregated rows instead of counting
+messages, signups and claims on every load.
+
+- Counters (messages sent/received, signups, claims) are incremented by an
+  ``after_flush`` listener in the same transaction as the rows they count,
+  so every write path (REST, WebSocket, notifications) is covered.
+- Player gauges (active / total players) are snapshots written by
+  ``compact`` or, if missing for the day, by the analytics endpoint.
+- ``rebuild_daily_stats`` recomputes counters from the source tables using
+  ``created_at`` range filters; it backs the backfill/compaction command:
+
+    python scripts/backfill_client_stats.py            # full history
+    python scripts/backfill_client_stats.py --compact  # last 2 days + gauges
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, case, event, func, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.models import ClientDailyStats, UserType
+
+logger = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = ("messages_sent", "messages_received", "signups", "claims")
+GAUGE_COLUMNS = ("active_players", "direct_active_players", "total_players")
+
+_Key = Tuple[int, date]
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _as_date(value) -> date:
+    # func.date() returns a string on SQLite and a date on PostgreSQL
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+# ============= Upserts =============
+
+def _dialect_insert(connection):
+    name = connection.dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def _upsert(connection, rows: Dict[_Key, Dict[str, int]], columns: Iterable[str], add: bool):
+    """
+    Insert or update rollup rows
+
+    Args:
+        connection: Connection in the caller's transaction
+        rows: {(client_id, day): {column: value}}
+        columns: Columns to write (missing values default to 0)
+        add: Add to existing values (counters) instead of replacing (gauges)
+    """
+    if not rows:
+        return
+    columns = tuple(columns)
+    table = ClientDailyStats.__table__
+    params = [
+        {"client_id": client_id, "day": day, **{c: values.get(c, 0) for c in columns}}
+        for (client_id, day), values in rows.items()
+    ]
+
+    insert = _dialect_insert(connection)
+    if insert is not None:
+        stmt = insert(table)
+        set_ = {
+            c: (table.c[c] + stmt.excluded[c]) if add else stmt.excluded[c]
+            for c in columns
+        }
+        set_["updated_at"] = func.now()
+        connection.execute(
+            stmt.on_conflict_do_update(index_elements=["client_id", "day"], set_=set_),
+            params
+        )
+        return
+
+    # Generic fallback: update, then insert the rows that did not exist
+    for row in params:
+        values = {c: (table.c[c] + row[c]) if add else row[c] for c in columns}
+        result = connection.execute(
+            update(table)
+            .where(table.c.client_id == row["client_id"], table.c.day == row["day"])
+            .values(**values)
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+# ============= Incremental updates =============
+
+def _collect_increments(session: Session) -> Dict[_Key, Dict[str, int]]:
+    today = utc_today()
+    increments: Dict[_Key, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    message_sides = []
+
+    for obj in session.new:
+        if isinstance(obj, models.Message):
+            message_sides.append((obj.sender_id, "messages_sent"))
+            message_sides.append((obj.receiver_id, "messages_received"))
+        elif isinstance(obj, models.PromotionClaim) and obj.client_id:
+            increments[(obj.client_id, today)]["claims"] += 1
+        elif (
+            isinstance(obj, models.User)
+            and obj.created_by_client_id
+            and obj.user_type == UserType.PLAYER
+        ):
+            increments[(obj.created_by_client_id, today)]["signups"] += 1
+
+    if message_sides:
+        # Only clients have dashboards; one PK lookup per flush with messages
+        user_ids = {uid for uid, _ in message_sides if uid}
+        client_ids = set(session.connection().execute(
+            select(models.User.id).where(
+                models.User.id.in_(user_ids),
+                models.User.user_type == UserType.CLIENT
+            )
+        ).scalars())
+        for user_id, column in message_sides:
+            if user_id in client_ids:
+                increments[(user_id, today)][column] += 1
+
+    return increments
+
+
+def increment_counters(connection, client_id: int, **counts: int):
+    """
+    Increment today's counters for rows written without the ORM unit of work
+    (e.g. claims inserted with INSERT ... ON CONFLICT), which the flush
+    listener cannot see.
+    """
+    _upsert(connection, {(client_id, utc_today()): counts}, counts.keys(), add=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_rollups_after_flush(session: Session, flush_context):
+    """Increment rollup counters for rows inserted by this flush"""
+    if not session.new:
+        return
+    try:
+        increments = _collect_increments(session)
+        if increments:
+            # Savepoint: a failed upsert must not abort the caller's transaction
+            connection = session.connection()
+            with connection.begin_nested():
+                _upsert(connection, increments, COUNTER_COLUMNS, add=True)
+    except Exception as e:
+        # Analytics must never block the write itself; compaction repairs drift
+        logger.warning(f"Failed to update client rollups: {e}")
+
+
+# ============= Rebuild / compaction =============
+
+def _grouped_counts(db: Session, owner_col, created_col, start: datetime, end: datetime, *filters):
+    day_col = func.date(created_col)
+    return (
+        db.query(owner_col, day_col, func.count())
+        .filter(created_col >= start, created_col < end, *filters)
+        .group_by(owner_col, day_col)
+        .all()
+    )
+
+
+def rebuild_daily_stats(db: Session, start: date, end: date) -> int:
+    """
+    Recompute rollup counters for days in [start, end) from the source tables.
+
+    Existing counters in the range are replaced, so this is safe to re-run.
+
+    Returns:
+        Number of (client, day) rows written
+    """
+    start_dt, end_dt = _day_start(start), _day_start(end)
+    Message, User, Claim = models.Message, models.User, models.PromotionClaim
+
+    clients = select(User.id).where(User.user_type == UserType.CLIENT)
+    sources = {
+        "messages_sent": _grouped_counts(
+            db, Message.sender_id, Message.created_at, start_dt, end_dt,
+            Message.sender_id.in_(clients)
+        ),
+        "messages_received": _grouped_counts(
+            db, Message.receiver_id, Message.created_at, start_dt, end_dt,
+            Message.receiver_id.in_(clients)
+        ),
+        "signups": _grouped_counts(
+            db, User.created_by_client_id, User.created_at, start_dt, end_dt,
+            User.created_by_client_id.isnot(None), User.user_type == UserType.PLAYER
+        ),
+        "claims": _grouped_counts(db, Claim.client_id, Claim.claimed_at, start_dt, end_dt),
+    }
+
+    rows: Dict[_Key, Dict[str, int]] = defaultdict(dict)
+    for column, results in sources.items():
+        for client_id, day, count in results:
+            rows[(client_id, _as_date(day))][column] = count
+
+    try:
+        # Zero the range first so counters for rows with no source data reset
+        db.execute(
+            update(ClientDailyStats)
+            .where(ClientDailyStats.day >= start, ClientDailyStats.day < end)
+            .values(**{c: 0 for c in COUNTER_COLUMNS})
+        )
+        _upsert(db.connection(), rows, COUNTER_COLUMNS, add=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
+
+
+def snapshot_player_gauges(
+    db: Session,
+    client_ids: Optional[Iterable[int]] = None,
+    day: Optional[date] = None,
+    commit: bool = True
+) -> Dict[int, Dict[str, int]]:
+    """
+    Store today's player gauges for the given clients (default: all clients)
+
+    Returns:
+        {client_id: {active_players, direct_active_players, total_players}}
+    """
+    day = day or utc_today()
+    User, Creds = models.User, models.GameCredentials
+
+    direct_q = db.query(
+        User.created_by_client_id,
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active == True, 1), else_=0)), 0)
+    ).filter(User.user_type == UserType.PLAYER, User.created_by_client_id.isnot(None))
+
+    credential_q = db.query(
+        Creds.created_by_client_id,
+        func.count(func.distinct(User.id))
+    ).join(User, Creds.player_id == User.id).filter(
+        User.user_type == UserType.PLAYER,
+        User.is_active == True,
+        User.created_by_client_id != Creds.created_by_client_id
+    )
+
+    if client_ids is not None:
+        client_ids = list(client_ids)
+        direct_q = direct_q.filter(User.created_by_client_id.in_(client_ids))
+        credential_q = credential_q.filter(Creds.created_by_client_id.in_(client_ids))
+        gauges = {cid: {c: 0 for c in GAUGE_COLUMNS} for cid in client_ids}
+    else:
+        gauges = {
+            cid: {c: 0 for c in GAUGE_COLUMNS}
+            for (cid,) in db.query(User.id).filter(User.user_type == UserType.CLIENT)
+        }
+
+    for client_id, total, active in direct_q.group_by(User.created_by_client_id):
+        gauge = gauges.setdefault(client_id, {c: 0 for c in GAUGE_COLUMNS})
+        gauge["total_players"] = total
+        gauge["direct_active_players"] = int(active)
+        gauge["active_players"] += int(active)
+
+    for client_id, active in credential_q.group_by(Creds.created_by_client_id):
+        gauge = gauges.setdefault(client_id, {c: 0 for c in GAUGE_COLUMNS})
+        gauge["active_players"] += active
+
+    _upsert(db.connection(), {(cid, day): g for cid, g in gauges.items()}, GAUGE_COLUMNS, add=False)
+    if commit:
+        db.commit()
+    return gauges
+
+
+def compact(db: Session, days: int = 2) -> int:
+    """
+    Periodic compaction: rebuild the last ``days`` days of counters (repairs
+    any drift from failed increments) and refresh today's player gauges.
+    """
+    today = utc_today()
+    written = rebuild_daily_stats(db, today - timedelta(days=days - 1), today + timedelta(days=1))
+    snapshot_player_gauges(db)
+    return written
+
+
+# ============= Reads =============
+
+def load_client_rollup(db: Session, client_id: int, today: date) -> Dict[str, int]:
+    """
+    Dashboard numbers for a client from the rollup table: one aggregate
+    query over the client's rows plus the gauge rows for today and a week ago.
+    """
+    S = ClientDailyStats
+    last_week = today - timedelta(days=7)
+    two_weeks_ago = today - timedelta(days=14)
+    yesterday = today - timedelta(days=1)
+    messages = S.messages_sent + S.messages_received
+
+    def window_sum(column, condition):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    totals = db.query(
+        func.coalesce(func.sum(S.messages_sent), 0),
+        func.coalesce(func.sum(S.messages_received), 0),
+        window_sum(messages, S.day >= last_week),
+        window_sum(messages, and_(S.day >= two_weeks_ago, S.day < last_week)),
+        window_sum(S.signups, S.day == today),
+        window_sum(S.signups, S.day == yesterday)
+    ).filter(S.client_id == client_id).one()
+
+    gauge_rows = {
+        day: row
+        for day, *row in db.query(
+            S.day, S.active_players, S.direct_active_players, S.total_players
+        ).filter(S.client_id == client_id, S.day.in_([today, last_week]))
+    }
+
+    today_gauges = gauge_rows.get(today)
+    if today_gauges is None or today_gauges[0] is None:
+        gauge = snapshot_player_gauges(db, [client_id], today)[client_id]
+        today_gauges = [gauge[c] for c in GAUGE_COLUMNS]
+
+    week_ago_gauges = gauge_rows.get(last_week)
+
+    return {
+        "messages_sent": int(totals[0]),
+        "messages_received": int(totals[1]),
+        "messages_this_week": int(totals[2]),
+        "messages_last_week": int(totals[3]),
+        "signups_today": int(totals[4]),
+        "signups_yesterday": int(totals[5]),
+        "active_players": today_gauges[0],
+        "direct_active_players": today_gauges[1],
+        "total_players": today_gauges[2],
+        "active_players_last_week": week_ago_gauges[0] if week_ago_gauges else None,
+    }
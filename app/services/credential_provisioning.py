@@ -0,0 +1,205 @@
+"""
+Bulk game credential provisioning
+
+``provision_credentials`` handles a client's batch of (player, game,
+username, password) rows in a fixed number of round trips:
+
+- players and games are validated with one ``IN`` query each
+- usernames and passwords are encrypted together on the encryption thread
+  pool (see app/encryption.py)
+- rows are upserted ``UPSERT_CHUNK_SIZE`` at a time with one
+  ``INSERT ... ON CONFLICT`` on ``unique_client_player_game_credential``
+  per chunk, each chunk in its own transaction
+- players are notified with one bulk message insert per chunk, counted
+  in the client's daily ``messages_sent`` rollup in the same transaction
+
+Every row gets a result: created, updated (the client already had
+credentials for that player and game) or an error explaining why it was
+skipped. A failed chunk does not undo the chunks before it.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import get_logger
+from app.encryption import encrypt_credentials_async
+from app.services.client_analytics import increment_counters
+
+logger = get_logger(__name__)
+
+UPSERT_CHUNK_SIZE = 500
+
+_Key = Tuple[int, int]  # (player_id, game_id)
+
+
+def _dialect_insert(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:  # pragma: no cover - both supported databases have ON CONFLICT
+        raise NotImplementedError(f"Bulk credential upsert is not supported on {name}")
+    return dialect_insert
+
+
+def _validate(
+    db: Session, rows: List[schemas.GameCredentialCreate]
+) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """Row errors by index, and display names of the games referenced"""
+    player_ids = {row.player_id for row in rows}
+    game_ids = {row.game_id for row in rows}
+    players: Set[int] = set(db.execute(
+        select(models.User.id).where(
+            models.User.id.in_(player_ids),
+            models.User.user_type == models.UserType.PLAYER
+        )
+    ).scalars())
+    games: Dict[int, str] = dict(db.execute(
+        select(models.Game.id, models.Game.display_name).where(models.Game.id.in_(game_ids))
+    ).all())
+
+    errors: Dict[int, str] = {}
+    seen: Set[_Key] = set()
+    for index, row in enumerate(rows):
+        key = (row.player_id, row.game_id)
+        if row.player_id not in players:
+            errors[index] = "Player not found"
+        elif row.game_id not in games:
+            errors[index] = "Game not found"
+        elif not row.game_username or not row.game_password:
+            errors[index] = "Username and password are required"
+        elif key in seen:
+            errors[index] = "Duplicate of an earlier row for this player and game"
+        seen.add(key)
+    return errors, games
+
+
+def _existing_keys(db: Session, client_id: int, keys: List[_Key]) -> Set[_Key]:
+    C = models.GameCredentials
+    return {
+        (player_id, game_id)
+        for player_id, game_id in db.execute(
+            select(C.player_id, C.game_id).where(
+                C.created_by_client_id == client_id,
+                C.player_id.in_({player_id for player_id, _ in keys}),
+                C.game_id.in_({game_id for _, game_id in keys})
+            )
+        )
+    }
+
+
+async def provision_credentials(
+    db: Session,
+    client_id: int,
+    rows: List[schemas.GameCredentialCreate],
+    chunk_size: Optional[int] = None
+) -> schemas.GameCredentialBulkResponse:
+    """Create or overwrite the client's credentials for each row"""
+    chunk_size = chunk_size or UPSERT_CHUNK_SIZE
+    errors, games = _validate(db, rows)
+
+    valid = [index for index in range(len(rows)) if index not in errors]
+    plaintexts = []
+    for index in valid:
+        plaintexts += [rows[index].game_username, rows[index].game_password]
+    encrypted = await encrypt_credentials_async(plaintexts)
+
+    to_write: List[Tuple[int, str, str]] = []
+    for position, index in enumerate(valid):
+        username, password = encrypted[2 * position], encrypted[2 * position + 1]
+        if username is None or password is None:
+            errors[index] = "Encryption failed"
+        else:
+            to_write.append((index, username, password))
+
+    credential_ids: Dict[int, int] = {}
+    updated: Set[int] = set()
+    table = models.GameCredentials.__table__
+    dialect_insert = _dialect_insert(db)
+
+    for start in range(0, len(to_write), chunk_size):
+        chunk = to_write[start:start + chunk_size]
+        keys = [(rows[index].player_id, rows[index].game_id) for index, _, _ in chunk]
+        try:
+            existing = _existing_keys(db, client_id, keys)
+            stmt = dialect_insert(table).values([
+                {
+                    "player_id": rows[index].player_id,
+                    "game_id": rows[index].game_id,
+                    "game_username_encrypted": username,
+                    "game_password_encrypted": password,
+                    "created_by_client_id": client_id,
+                }
+                for index, username, password in chunk
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["player_id", "game_id", "created_by_client_id"],
+                set_={
+                    "game_username_encrypted": stmt.excluded.game_username_encrypted,
+                    "game_password_encrypted": stmt.excluded.game_password_encrypted,
+                    "updated_at": func.now(),
+                }
+            ).returning(table.c.id, table.c.player_id, table.c.game_id)
+            ids = {(player_id, game_id): id for id, player_id, game_id in db.execute(stmt)}
+
+            db.execute(insert(models.Message), [
+                {
+                    "sender_id": client_id,
+                    "receiver_id": rows[index].player_id,
+                    "message_type": models.MessageType.TEXT,
+                    "content": _notification(rows[index], games[rows[index].game_id], key in existing),
+                }
+                for (index, _, _), key in zip(chunk, keys)
+            ])
+            # Core insert: the rollup flush listener never sees these messages
+            increment_counters(db.connection(), client_id, messages_sent=len(chunk))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Credential upsert chunk failed for client {client_id}: {e}")
+            for index, _, _ in chunk:
+                errors[index] = "Could not be saved"
+            continue
+
+        for (index, _, _), key in zip(chunk, keys):
+            credential_ids[index] = ids[key]
+            if key in existing:
+                updated.add(index)
+
+    results = []
+    for index, row in enumerate(rows):
+        if index in errors:
+            result_status, error = "error", errors[index]
+        else:
+            result_status, error = ("updated" if index in updated else "created"), None
+        results.append(schemas.GameCredentialBulkResult(
+            index=index,
+            player_id=row.player_id,
+            game_id=row.game_id,
+            status=result_status,
+            credential_id=credential_ids.get(index),
+            error=error
+        ))
+
+    logger.info(f"Client {client_id} provisioned {len(credential_ids)} credentials "
+                f"({len(updated)} updated), {len(errors)} rows failed")
+    return schemas.GameCredentialBulkResponse(
+        created=len(credential_ids) - len(updated),
+        updated=len(updated),
+        failed=len(errors),
+        results=results
+    )
+
+
+def _notification(row: schemas.GameCredentialCreate, game_name: str, updated: bool) -> str:
+    # Same wording as the single create/update endpoints
+    if updated:
+        return (f"Your {game_name} game credentials have been updated:\n"
+                f"New Username: {row.game_username}\nNew Password: {row.game_password}")
+    return (f"Your {game_name} game credentials have been created:\n"
+            f"Username: {row.game_username}\nPassword: {row.game_password}")
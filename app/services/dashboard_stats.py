@@ -0,0 +1,211 @@
+"""
+Admin Dashboard Statistics
+
+Computes the admin dashboard snapshot with three aggregate statements
+(users, messages, and one statement of scalar subqueries for promotions,
+claims, reviews and reports) instead of fourteen separate counts, and caches
+it for ``DASHBOARD_STATS_TTL_SECONDS``.
+
+Live mode: admins join the ``admin:dashboard`` WebSocket room. They receive
+the full snapshot on join; afterwards a background refresher recomputes the
+snapshot every ``DASHBOARD_STATS_LIVE_INTERVAL_SECONDS`` and pushes only the
+values that changed. The refresher runs only while the room has members.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.core import get_logger
+from app.database import SessionLocal
+from app.models import UserType
+from app.websocket import manager, WSMessage, WSMessageType
+
+logger = get_logger(__name__)
+
+DASHBOARD_ROOM = "admin:dashboard"
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def compute_dashboard_stats(db: Session) -> Dict[str, Any]:
+    """
+    Compute the dashboard snapshot
+
+    Returns:
+        Dict in the shape served by GET /admin/dashboard-stats
+    """
+    User = models.User
+    now = datetime.utcnow()
+    seven_days_ago = now - timedelta(days=7)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    users = db.query(
+        func.count(User.id),
+        _count_if(User.user_type == UserType.CLIENT),
+        _count_if(User.user_type == UserType.PLAYER),
+        _count_if(User.is_active == True),
+        _count_if(User.is_online == True),
+        _count_if(User.created_at >= seven_days_ago),
+        _count_if((User.is_approved == False) & (User.user_type == UserType.CLIENT))
+    ).one()
+
+    # Range filter instead of func.date() so the created_at index stays usable
+    messages = db.query(
+        func.count(models.Message.id),
+        _count_if(models.Message.created_at >= today_start)
+    ).one()
+
+    others = db.execute(select(
+        select(func.count(models.Promotion.id))
+        .where(models.Promotion.status == models.PromotionStatus.ACTIVE)
+        .scalar_subquery(),
+        select(func.count(models.PromotionClaim.id)).scalar_subquery(),
+        select(func.count(models.Review.id)).scalar_subquery(),
+        select(func.avg(models.Review.rating)).scalar_subquery(),
+        select(func.count(models.Report.id))
+        .where(models.Report.status == models.ReportStatus.PENDING)
+        .scalar_subquery()
+    )).one()
+
+    return {
+        "users": {
+            "total": users[0],
+            "clients": int(users[1]),
+            "players": int(users[2]),
+            "active": int(users[3]),
+            "online": int(users[4]),
+            "recent_registrations": int(users[5]),
+            "pending_approvals": int(users[6])
+        },
+        "messages": {
+            "total": messages[0],
+            "today": int(messages[1])
+        },
+        "promotions": {
+            "active": others[0],
+            "total_claims": others[1]
+        },
+        "reviews": {
+            "total": others[2],
+            "average_rating": round(float(others[3] or 0), 2)
+        },
+        "reports": {
+            "pending": others[4]
+        }
+    }
+
+
+def diff_stats(old: Optional[Dict], new: Dict) -> Dict[str, Any]:
+    """
+    Changed leaf values between two snapshots
+
+    Returns:
+        {"users.online": 12, ...} for every value that differs
+    """
+    changes = {}
+    for section, values in new.items():
+        old_values = (old or {}).get(section, {})
+        for key, value in values.items():
+            if old_values.get(key) != value:
+                changes[f"{section}.{key}"] = value
+    return changes
+
+
+class DashboardStatsCache:
+    """Cached dashboard snapshot with an optional live refresher"""
+
+    def __init__(self, ttl_seconds: float, live_interval_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.live_interval_seconds = live_interval_seconds
+        self._lock = threading.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self):
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.computed_at = 0.0
+        if self._refresher is not None and not self._refresher.done():
+            self._refresher.cancel()
+        self._refresher = None
+
+    def _is_fresh(self) -> bool:
+        return self.snapshot is not None and time.monotonic() - self.computed_at < self.ttl_seconds
+
+    def get(self, db: Session) -> Dict[str, Any]:
+        """Return the cached snapshot, recomputing it once the TTL has passed"""
+        if self._is_fresh():
+            return self.snapshot
+        with self._lock:
+            # Another request may have refreshed while we waited
+            if not self._is_fresh():
+                self._store(compute_dashboard_stats(db))
+            return self.snapshot
+
+    def refresh(self, db: Optional[Session] = None) -> Dict[str, Any]:
+        """
+        Recompute unconditionally
+
+        Returns:
+            Values that changed since the previous snapshot
+        """
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            with self._lock:
+                previous = self.snapshot
+                self._store(compute_dashboard_stats(db))
+                return diff_stats(previous, self.snapshot)
+        finally:
+            if own_session:
+                db.close()
+
+    def _store(self, snapshot: Dict[str, Any]):
+        self.snapshot = snapshot
+        self.computed_at = time.monotonic()
+
+    # ============= Live mode =============
+
+    async def subscribe(self, user_id: int):
+        """Send the current snapshot to a new subscriber and start the refresher"""
+        if not self._is_fresh():
+            await asyncio.to_thread(self.refresh)
+        await manager.send_to_user(user_id, WSMessage(
+            type=WSMessageType.ADMIN_STATS,
+            data={"stats": self.snapshot, "full": True}
+        ))
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._run_refresher())
+
+    async def _run_refresher(self):
+        logger.info("Dashboard stats live refresher started")
+        try:
+            while manager.rooms.get(DASHBOARD_ROOM):
+                await asyncio.sleep(self.live_interval_seconds)
+                try:
+                    changes = await asyncio.to_thread(self.refresh)
+                except Exception as e:
+                    logger.warning(f"Dashboard stats refresh failed: {e}")
+                    continue
+                if changes:
+                    await manager.send_to_room(DASHBOARD_ROOM, WSMessage(
+                        type=WSMessageType.ADMIN_STATS,
+                        data={"changes": changes, "full": False}
+                    ))
+        finally:
+            logger.info("Dashboard stats live refresher stopped")
+
+
+dashboard_stats = DashboardStatsCache(
+    ttl_seconds=settings.DASHBOARD_STATS_TTL_SECONDS,
+    live_interval_seconds=settings.DASHBOARD_STATS_LIVE_INTERVAL_SECONDS
+)
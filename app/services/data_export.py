@@ -0,0 +1,177 @@
+"""
+Streaming Data Exports
+
+Admin exports (users, messages, bet transactions, credit purchases) are
+written to the response while they are read, so an export of millions of
+rows runs in constant memory:
+
+- the SELECT is executed with ``yield_per``, which uses a server-side
+  cursor on PostgreSQL and hands rows over ``EXPORT_BATCH_SIZE`` at a time
+- each batch is encoded (NDJSON or CSV) and sent as one chunk; CSV text
+  cells that a spreadsheet would evaluate as formulas are prefixed with ``'``
+- with ``gzip`` the chunks go through one streaming compressor and the
+  client receives a ``.gz`` file
+
+Exports read on their own session bound to the request's engine, because
+the streaming body outlives the request's ``get_db`` session.
+"""
+
+import csv
+import io
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import get_logger
+from app.core.serialization import dumps
+
+logger = get_logger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+GZIP_LEVEL = 6
+
+# Spreadsheets evaluate cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_NUMBER = re.compile(r"[+-]?\d+(\.\d+)?")
+
+
+@dataclass(frozen=True)
+class ExportRequest:
+    """Output options shared by every export endpoint"""
+    format: ExportFormat = "ndjson"
+    gzip: bool = False
+
+
+def _cell(value: Any) -> Any:
+    """Export representation of a column value (amounts stay exact)"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(
+    db: Session,
+    statement: Select,
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    batch_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Run ``statement`` on a new session and yield its rows batch by batch
+
+    Args:
+        db: Request session; only its engine is used
+        statement: SELECT with labelled columns
+        transform: Optional per-row rewrite (computed or renamed fields)
+        batch_size: Rows per fetch (default ``EXPORT_BATCH_SIZE``)
+
+    Yields:
+        Lists of row dicts with export-ready values
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    session = Session(bind=db.get_bind())
+    try:
+        result = session.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.mappings().partitions():
+            rows = [{key: _cell(value) for key, value in row.items()} for row in partition]
+            yield [transform(row) for row in rows] if transform else rows
+    finally:
+        session.close()
+
+
+def encode_ndjson(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """One JSON object per line, one chunk per batch"""
+    for rows in batches:
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _csv_cell(value: Any) -> Any:
+    """Prefix ``'`` to text a spreadsheet would run as a formula (numbers like -5.00 are left alone)"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) and not _NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+def encode_csv(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str]) -> Iterator[bytes]:
+    """Header row first, then one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore")
+    writer.writeheader()
+    for rows in batches:
+        writer.writerows({key: _csv_cell(value) for key, value in row.items()} for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compress a chunk stream into a single gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    db: Session,
+    name: str,
+    statement: Select,
+    options: ExportRequest,
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    columns: Optional[Sequence[str]] = None
+) -> StreamingResponse:
+    """
+    Stream ``statement`` as a file download
+
+    Args:
+        db: Request session (for its engine)
+        name: File name stem, e.g. "users"
+        statement: SELECT with labelled columns, already filtered and ordered
+        options: Format and compression requested by the client
+        transform: Optional per-row rewrite
+        columns: CSV header; defaults to the statement's column labels
+
+    Returns:
+        StreamingResponse with a Content-Disposition attachment header
+    """
+    batches = iter_rows(db, statement, transform)
+    if options.format == "csv":
+        chunks = encode_csv(batches, columns or [c.key for c in statement.selected_columns])
+    else:
+        chunks = encode_ndjson(batches)
+
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{options.format}"
+    media_type = MEDIA_TYPES[options.format]
+    if options.gzip:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    logger.info(f"Streaming {name} export as {filename}")
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,289 @@
+"""
+Background Email Queue
+
+Request handlers render a message and hand it to the queue instead of
+talking to the provider themselves:
+
+    email_queue.submit(render_email("welcome", user.email, username=user.username))
+
+``EMAIL_WORKERS`` worker tasks take messages off the queue in groups of up
+to ``EMAIL_BATCH_SIZE``. Resend messages in a group go out in one batch
+request; SMTP messages share one connection. A failed send is retried with
+exponential backoff (``EMAIL_RETRY_BASE_SECONDS``, doubling) until
+``EMAIL_MAX_ATTEMPTS``, then dropped and logged.
+
+The queue is in memory: ``stop`` (app shutdown) sends what is still queued,
+but a crash loses it. Emails that must not be lost go through the outbox,
+which persists them and calls ``send_now`` with its own retries.
+
+``submit`` may be called from the event loop or from a worker thread (sync
+endpoints). Without a running loop, e.g. in scripts, it sends inline.
+The workers belong to the event loop that first uses them, as with
+push_dispatcher.
+"""
+
+import asyncio
+import smtplib
+from dataclasses import dataclass
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Tuple
+
+import resend
+
+from app.config import settings
+from app.core import get_logger
+from app.services.email_service import EmailMessage, render_email, resend_params
+
+logger = get_logger(__name__)
+
+RESEND_MAX_BATCH = 100  # Resend rejects larger batch requests
+
+
+class EmailSendError(Exception):
+    """A provider did not accept a message"""
+
+
+# ============= Transports =============
+
+def _mime_message(message: EmailMessage) -> MIMEMultipart:
+    mime = MIMEMultipart("alternative")
+    mime["Subject"] = message.subject
+    mime["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
+    mime["To"] = message.to_email
+    if message.reply_to:
+        mime["Reply-To"] = message.reply_to
+    if message.text:
+        mime.attach(MIMEText(message.text, "plain"))
+    mime.attach(MIMEText(message.html, "html"))
+    return mime
+
+
+def _send_resend(messages: List[EmailMessage]) -> List[Tuple[EmailMessage, str]]:
+    """Send through Resend, batched where possible; returns (message, error) failures"""
+    if not settings.resend_configured:
+        logger.warning(f"Resend API not configured; dropping {len(messages)} email(s)")
+        return []
+    resend.api_key = settings.RESEND_API_KEY
+    failures = []
+    for start in range(0, len(messages), RESEND_MAX_BATCH):
+        chunk = messages[start:start + RESEND_MAX_BATCH]
+        try:
+            # A batch request is accepted or rejected as a whole
+            if len(chunk) == 1:
+                resend.Emails.send(resend_params(chunk[0]))
+            else:
+                resend.Batch.send([resend_params(message) for message in chunk])
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            failures.extend((message, error) for message in chunk)
+    return failures
+
+
+def _send_smtp(messages: List[EmailMessage]) -> List[Tuple[EmailMessage, str]]:
+    """Send over one SMTP connection; returns (message, error) failures"""
+    if not settings.smtp_configured:
+        logger.warning(f"SMTP not configured; dropping {len(messages)} email(s)")
+        return []
+    sent = 0
+    try:
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30) as server:
+            if settings.SMTP_USE_TLS:
+                server.starttls()
+            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+            for message in messages:
+                server.sendmail(settings.SMTP_FROM_EMAIL, message.to_email, _mime_message(message).as_string())
+                sent += 1
+    except smtplib.SMTPAuthenticationError as e:
+        logger.error(f"SMTP authentication failed: {e}")
+        error = f"SMTP authentication failed: {e}"
+    except (smtplib.SMTPException, OSError) as e:
+        error = f"{type(e).__name__}: {e}"
+    else:
+        return []
+    # Messages before the failure were accepted and must not be sent twice
+    return [(message, error) for message in messages[sent:]]
+
+
+_TRANSPORTS = {
+    "resend": _send_resend,
+    "smtp": _send_smtp,
+}
+
+
+def send_messages(messages: List[EmailMessage]) -> List[Tuple[EmailMessage, str]]:
+    """Send messages now, grouped by transport (blocking); returns failures"""
+    groups: Dict[str, List[EmailMessage]] = {}
+    for message in messages:
+        groups.setdefault(message.transport, []).append(message)
+    failures = []
+    for transport, group in groups.items():
+        failures.extend(_TRANSPORTS[transport](group))
+    return failures
+
+
+# ============= Queue =============
+
+@dataclass
+class _Job:
+    message: EmailMessage
+    attempts: int = 0
+
+
+class EmailQueue:
+    """In-memory email queue with a worker pool and retries"""
+
+    def __init__(
+        self,
+        workers: int = settings.EMAIL_WORKERS,
+        batch_size: int = settings.EMAIL_BATCH_SIZE,
+        max_attempts: int = settings.EMAIL_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.EMAIL_RETRY_BASE_SECONDS
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: Dict[asyncio.TimerHandle, _Job] = {}
+        self._stopping = False
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Anything owned by a previous loop is unusable here
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._workers = []
+            self._retries = {}
+        if not self._workers:
+            self._stopping = False
+            self._workers = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def start(self):
+        """Start the workers on the running loop (app startup)"""
+        self._bind_loop()
+
+    def submit(self, message: EmailMessage):
+        """Queue a message for background sending; returns immediately"""
+        job = _Job(message)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            loop = self._loop
+            if loop is not None and loop.is_running() and not self._stopping:
+                loop.call_soon_threadsafe(self._put, job)
+            else:
+                # No loop to hand off to (scripts, shutdown): one attempt inline
+                for _, error in send_messages([message]):
+                    self.failed += 1
+                    logger.error(f"Email to {message.to_email} failed: {error}")
+            return
+        self._put(job)
+
+    def _put(self, job: _Job):
+        self._bind_loop()
+        self._queue.put_nowait(job)
+
+    async def _work(self):
+        while True:
+            jobs = [await self._queue.get()]
+            while len(jobs) < self.batch_size and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            try:
+                await self._send(jobs)
+            except Exception as e:
+                logger.error(f"Email worker error: {e}")
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    async def _send(self, jobs: List[_Job]):
+        by_message = {id(job.message): job for job in jobs}
+        failures = await asyncio.to_thread(send_messages, [job.message for job in jobs])
+        self.batches += 1
+        self.sent += len(jobs) - len(failures)
+        for message, error in failures:
+            job = by_message[id(message)]
+            job.attempts += 1
+            if job.attempts >= self.max_attempts or self._stopping:
+                self.failed += 1
+                logger.error(f"Email to {message.to_email} failed after {job.attempts} attempt(s): {error}")
+                continue
+            self.retried += 1
+            delay = self.retry_base_seconds * 2 ** (job.attempts - 1)
+            logger.warning(f"Email to {message.to_email} failed ({error}); retrying in {delay:.0f}s")
+            self._schedule_retry(job, delay)
+
+    def _schedule_retry(self, job: _Job, delay: float):
+        def retry():
+            self._retries.pop(handle, None)
+            self._queue.put_nowait(job)
+
+        handle = self._loop.call_later(delay, retry)
+        self._retries[handle] = job
+
+    async def send_now(self, message: EmailMessage):
+        """
+        Send one message, bypassing the queue (for callers with their own retries)
+
+        Raises:
+            EmailSendError: the provider did not accept it
+        """
+        failures = await asyncio.to_thread(send_messages, [message])
+        if failures:
+            raise EmailSendError(failures[0][1])
+
+    async def flush(self):
+        """Send everything queued, including pending retries, and wait for it"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            for handle, job in list(self._retries.items()):
+                handle.cancel()
+                self._queue.put_nowait(job)
+            self._retries.clear()
+
+    async def stop(self, timeout: float = 10.0):
+        """Give queued messages a last attempt and stop the workers (app shutdown)"""
+        if self._loop is not asyncio.get_running_loop():
+            self._loop = None
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Email queue stopped with {self._queue.qsize()} unsent message(s)")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "awaiting_retry": len(self._retries),
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+email_queue = EmailQueue()
+
+
+def enqueue_template(template: str, to_email: str, **params):
+    """Render a precompiled template and queue it"""
+    email_queue.submit(render_email(template, to_email, **params))
@@ -1,9 +1,19 @@
-"""Email service for sending emails via Resend."""
+"""Email service for sending emails via Resend.
 
+Templates are compiled once at startup (the brand name is baked in) and
+rendered per message with HTML-escaped parameters. ``send_email`` and the
+``send_*_email`` helpers send immediately; request handlers should use
+app/services/email_queue.py instead, which sends in the background with
+retries and batching.
+"""
+
+import html
 import resend
 import random
 import string
-from typing import Optional
+from dataclasses import dataclass
+from string import Template
+from typing import Dict, Optional
 import logging
 
 from app.config import settings
@@ -20,82 +30,50 @@ def generate_otp(length: int = 6) -> str:
     return ''.join(random.choices(string.digits, k=length))
 
 
-def send_email(
-    to_email: str,
-    subject: str,
-    html_content: str,
-    text_content: Optional[str] = None
-) -> bool:
-    """
-    Send an email using Resend API.
+# ============= Templates =============
 
-    This function is designed to NEVER crash the app - all errors are caught
-    and logged, returning False on failure.
+@dataclass
+class EmailMessage:
+    """A rendered email, ready to send"""
+    to_email: str
+    subject: str
+    html: str
+    text: Optional[str] = None
+    reply_to: Optional[str] = None
+    transport: str = "resend"  # "resend" or "smtp" (see email_queue)
 
-    Args:
-        to_email: Recipient email address
-        subject: Email subject
-        html_content: HTML body content
-        text_content: Plain text body content (fallback)
 
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    # Early return if Resend not configured - this is not an error in development
-    if not settings.resend_configured:
-        logger.warning(f"Resend API not configured. API Key set: {bool(settings.RESEND_API_KEY)}")
-        return False
+@dataclass(frozen=True)
+class EmailTemplate:
+    """Subject, HTML and text bodies with ``$name`` placeholders"""
+    subject: Template
+    html: Template
+    text: Template
 
-    logger.info(f"Resend configured - attempting to send email to {to_email}")
+    def render(self, to_email: str, **params) -> EmailMessage:
+        plain = {name: str(value) for name, value in params.items()}
+        escaped = {name: html.escape(value) for name, value in plain.items()}
+        return EmailMessage(
+            to_email=to_email,
+            subject=self.subject.substitute(plain),
+            html=self.html.substitute(escaped),
+            text=self.text.substitute(plain)
+        )
 
-    try:
-        # Validate email address format
-        if not to_email or '@' not in to_email:
-            logger.warning(f"Invalid email address: {to_email}")
-            return False
-
-        # Build the email params
-        params: resend.Emails.SendParams = {
-            "from": f"{settings.RESEND_FROM_NAME} <{settings.RESEND_FROM_EMAIL}>",
-            "to": [to_email],
-            "subject": subject,
-            "html": html_content,
-        }
-
-        # Add text content if provided
-        if text_content:
-            params["text"] = text_content
-
-        # Send the email
-        email_response = resend.Emails.send(params)
-
-        logger.info(f"Email sent successfully to {to_email}, response: {email_response}")
-        return True
 
-    except resend.exceptions.ResendError as e:
-        logger.error(f"Resend API error: {e}")
-        return False
-    except Exception as e:
-        # Catch-all to ensure we never crash the app
-        logger.error(f"Unexpected error sending email: {type(e).__name__}: {e}")
-        return False
-
-
-def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
-    """
-    Send an OTP verification email.
+def compile_template(subject: str, html_source: str, text_source: str, brand: str) -> EmailTemplate:
+    """Substitute the brand once, leaving the per-message placeholders"""
+    def bake(source: str, value: str) -> Template:
+        return Template(Template(source).safe_substitute(brand=value.replace("$", "$$")))
 
-    Args:
-        to_email: Recipient email address
-        otp: The OTP code to send
-        username: User's name for personalization
+    return EmailTemplate(
+        subject=bake(subject, brand),
+        html=bake(html_source, html.escape(brand)),
+        text=bake(text_source, brand)
+    )
 
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    subject = f"Your Verification Code - {settings.RESEND_FROM_NAME}"
 
-    html_content = f"""
+_OTP_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -111,7 +89,7 @@ def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
                         <tr>
                             <td style="background: linear-gradient(135deg, #d4af37 0%, #f4e5b2 50%, #d4af37 100%); padding: 30px; text-align: center;">
                                 <h1 style="margin: 0; color: #1a1a2e; font-size: 28px; font-weight: bold;">
-                                    {settings.RESEND_FROM_NAME}
+                                    ${brand}
                                 </h1>
                             </td>
                         </tr>
@@ -123,7 +101,7 @@ def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
                                     Email Verification
                                 </h2>
                                 <p style="margin: 0 0 20px; color: #e0e0e0; font-size: 16px; line-height: 1.6;">
-                                    Hello {username},
+                                    Hello ${username},
                                 </p>
                                 <p style="margin: 0 0 30px; color: #e0e0e0; font-size: 16px; line-height: 1.6;">
                                     Please use the following verification code to verify your email address:
@@ -135,7 +113,7 @@ def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
                                         <td align="center">
                                             <div style="background-color: #0f3460; border: 2px solid #d4af37; border-radius: 8px; padding: 20px 40px; display: inline-block;">
                                                 <span style="font-family: 'Courier New', monospace; font-size: 36px; font-weight: bold; color: #d4af37; letter-spacing: 8px;">
-                                                    {otp}
+                                                    ${otp}
                                                 </span>
                                             </div>
                                         </td>
@@ -155,7 +133,7 @@ def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
                         <tr>
                             <td style="background-color: #0f3460; padding: 20px 30px; text-align: center;">
                                 <p style="margin: 0 0 10px; color: #9e9e9e; font-size: 12px;">
-                                    This is an automated message from {settings.RESEND_FROM_NAME}.
+                                    This is an automated message from ${brand}.
                                 </p>
                                 <p style="margin: 0; color: #9e9e9e; font-size: 12px;">
                                     Please do not reply to this email.
@@ -170,41 +148,25 @@ def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
     </html>
     """
 
-    text_content = f"""
-    {settings.RESEND_FROM_NAME} - Email Verification
+_OTP_TEXT = """
+    ${brand} - Email Verification
 
-    Hello {username},
+    Hello ${username},
 
     Please use the following verification code to verify your email address:
 
-    {otp}
+    ${otp}
 
     This code will expire in 10 minutes.
 
     If you didn't request this verification, please ignore this email.
 
     ---
-    This is an automated message from {settings.RESEND_FROM_NAME}.
+    This is an automated message from ${brand}.
     Please do not reply to this email.
     """
 
-    return send_email(to_email, subject, html_content, text_content)
-
-
-def send_welcome_email(to_email: str, username: str) -> bool:
-    """
-    Send a welcome email to new users.
-
-    Args:
-        to_email: Recipient email address
-        username: User's name for personalization
-
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    subject = f"Welcome to {settings.RESEND_FROM_NAME}!"
-
-    html_content = f"""
+_WELCOME_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -220,7 +182,7 @@ def send_welcome_email(to_email: str, username: str) -> bool:
                         <tr>
                             <td style="background: linear-gradient(135deg, #d4af37 0%, #f4e5b2 50%, #d4af37 100%); padding: 30px; text-align: center;">
                                 <h1 style="margin: 0; color: #1a1a2e; font-size: 28px; font-weight: bold;">
-                                    Welcome to {settings.RESEND_FROM_NAME}!
+                                    Welcome to ${brand}!
                                 </h1>
                             </td>
                         </tr>
@@ -229,10 +191,10 @@ def send_welcome_email(to_email: str, username: str) -> bool:
                         <tr>
                             <td style="padding: 40px 30px;">
                                 <h2 style="margin: 0 0 20px; color: #d4af37; font-size: 24px;">
-                                    Hello {username}!
+                                    Hello ${username}!
                                 </h2>
                                 <p style="margin: 0 0 20px; color: #e0e0e0; font-size: 16px; line-height: 1.6;">
-                                    Thank you for joining {settings.RESEND_FROM_NAME}. We're excited to have you!
+                                    Thank you for joining ${brand}. We're excited to have you!
                                 </p>
                                 <p style="margin: 0 0 20px; color: #e0e0e0; font-size: 16px; line-height: 1.6;">
                                     Your account is currently pending approval. Once approved, you'll be able to access all features.
@@ -247,7 +209,7 @@ def send_welcome_email(to_email: str, username: str) -> bool:
                         <tr>
                             <td style="background-color: #0f3460; padding: 20px 30px; text-align: center;">
                                 <p style="margin: 0 0 10px; color: #9e9e9e; font-size: 12px;">
-                                    This is an automated message from {settings.RESEND_FROM_NAME}.
+                                    This is an automated message from ${brand}.
                                 </p>
                                 <p style="margin: 0; color: #9e9e9e; font-size: 12px;">
                                     Please do not reply to this email.
@@ -262,41 +224,23 @@ def send_welcome_email(to_email: str, username: str) -> bool:
     </html>
     """
 
-    text_content = f"""
-    Welcome to {settings.RESEND_FROM_NAME}!
+_WELCOME_TEXT = """
+    Welcome to ${brand}!
 
-    Hello {username}!
+    Hello ${username}!
 
-    Thank you for joining {settings.RESEND_FROM_NAME}. We're excited to have you!
+    Thank you for joining ${brand}. We're excited to have you!
 
     Your account is currently pending approval. Once approved, you'll be able to access all features.
 
     In the meantime, make sure to verify your email address to unlock special bonuses!
 
     ---
-    This is an automated message from {settings.RESEND_FROM_NAME}.
+    This is an automated message from ${brand}.
     Please do not reply to this email.
     """
 
-    return send_email(to_email, subject, html_content, text_content)
-
-
-def send_referral_bonus_email(to_email: str, username: str, referred_username: str, bonus_amount: int) -> bool:
-    """
-    Send notification email when user earns a referral bonus.
-
-    Args:
-        to_email: Recipient email address
-        username: User's name for personalization
-        referred_username: Username of the person who was referred
-        bonus_amount: Amount of credits earned
-
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    subject = f"You've earned {bonus_amount} credits! - {settings.RESEND_FROM_NAME}"
-
-    html_content = f"""
+_REFERRAL_BONUS_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -321,10 +265,10 @@ def send_referral_bonus_email(to_email: str, username: str, referred_username: s
                         <tr>
                             <td style="padding: 40px 30px;">
                                 <h2 style="margin: 0 0 20px; color: #d4af37; font-size: 24px;">
-                                    Congratulations {username}!
+                                    Congratulations ${username}!
                                 </h2>
                                 <p style="margin: 0 0 20px; color: #e0e0e0; font-size: 16px; line-height: 1.6;">
-                                    Great news! Your referral <strong style="color: #d4af37;">{referred_username}</strong> has been approved.
+                                    Great news! Your referral <strong style="color: #d4af37;">${referred_username}</strong> has been approved.
                                 </p>
 
                                 <!-- Bonus Box -->
@@ -335,7 +279,7 @@ def send_referral_bonus_email(to_email: str, username: str, referred_username: s
                                                 <span style="font-size: 18px; color: #9e9e9e;">You've earned</span>
                                                 <br>
                                                 <span style="font-size: 42px; font-weight: bold; color: #d4af37;">
-                                                    +{bonus_amount}
+                                                    +${bonus_amount}
                                                 </span>
                                                 <br>
                                                 <span style="font-size: 18px; color: #9b59b6;">credits</span>
@@ -354,7 +298,7 @@ def send_referral_bonus_email(to_email: str, username: str, referred_username: s
                         <tr>
                             <td style="background-color: #0f3460; padding: 20px 30px; text-align: center;">
                                 <p style="margin: 0 0 10px; color: #9e9e9e; font-size: 12px;">
-                                    This is an automated message from {settings.RESEND_FROM_NAME}.
+                                    This is an automated message from ${brand}.
                                 </p>
                                 <p style="margin: 0; color: #9e9e9e; font-size: 12px;">
                                     Please do not reply to this email.
@@ -369,20 +313,160 @@ def send_referral_bonus_email(to_email: str, username: str, referred_username: s
     </html>
     """
 
-    text_content = f"""
-    Referral Bonus - {settings.RESEND_FROM_NAME}
+_REFERRAL_BONUS_TEXT = """
+    Referral Bonus - ${brand}
 
-    Congratulations {username}!
+    Congratulations ${username}!
 
-    Great news! Your referral {referred_username} has been approved.
+    Great news! Your referral ${referred_username} has been approved.
 
-    You've earned +{bonus_amount} credits!
+    You've earned +${bonus_amount} credits!
 
     Keep sharing your referral code to earn more credits!
 
     ---
-    This is an automated message from {settings.RESEND_FROM_NAME}.
+    This is an automated message from ${brand}.
     Please do not reply to this email.
     """
 
-    return send_email(to_email, subject, html_content, text_content)
+
+def compile_templates() -> Dict[str, EmailTemplate]:
+    brand = settings.RESEND_FROM_NAME
+    return {
+        "otp": compile_template("Your Verification Code - ${brand}", _OTP_HTML, _OTP_TEXT, brand),
+        "welcome": compile_template("Welcome to ${brand}!", _WELCOME_HTML, _WELCOME_TEXT, brand),
+        "referral_bonus": compile_template(
+            "You've earned ${bonus_amount} credits! - ${brand}", _REFERRAL_BONUS_HTML, _REFERRAL_BONUS_TEXT, brand
+        ),
+    }
+
+
+TEMPLATES = compile_templates()
+
+
+def render_email(template: str, to_email: str, **params) -> EmailMessage:
+    """
+    Render a precompiled template
+
+    Raises:
+        KeyError: unknown template or missing parameter
+    """
+    return TEMPLATES[template].render(to_email, **params)
+
+
+# ============= Sending =============
+
+def resend_params(message: EmailMessage) -> Dict:
+    """Resend API parameters for a message"""
+    params: resend.Emails.SendParams = {
+        "from": f"{settings.RESEND_FROM_NAME} <{settings.RESEND_FROM_EMAIL}>",
+        "to": [message.to_email],
+        "subject": message.subject,
+        "html": message.html,
+    }
+    if message.text:
+        params["text"] = message.text
+    if message.reply_to:
+        params["reply_to"] = message.reply_to
+    return params
+
+
+def send_email(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None
+) -> bool:
+    """
+    Send an email using Resend API.
+
+    This function is designed to NEVER crash the app - all errors are caught
+    and logged, returning False on failure.
+
+    Args:
+        to_email: Recipient email address
+        subject: Email subject
+        html_content: HTML body content
+        text_content: Plain text body content (fallback)
+
+    Returns:
+        True if email sent successfully, False otherwise
+    """
+    # Early return if Resend not configured - this is not an error in development
+    if not settings.resend_configured:
+        logger.warning(f"Resend API not configured. API Key set: {bool(settings.RESEND_API_KEY)}")
+        return False
+
+    logger.info(f"Resend configured - attempting to send email to {to_email}")
+
+    try:
+        # Validate email address format
+        if not to_email or '@' not in to_email:
+            logger.warning(f"Invalid email address: {to_email}")
+            return False
+
+        # Send the email
+        email_response = resend.Emails.send(resend_params(EmailMessage(to_email, subject, html_content, text_content)))
+
+        logger.info(f"Email sent successfully to {to_email}, response: {email_response}")
+        return True
+
+    except resend.exceptions.ResendError as e:
+        logger.error(f"Resend API error: {e}")
+        return False
+    except Exception as e:
+        # Catch-all to ensure we never crash the app
+        logger.error(f"Unexpected error sending email: {type(e).__name__}: {e}")
+        return False
+
+
+def _send_rendered(message: EmailMessage) -> bool:
+    return send_email(message.to_email, message.subject, message.html, message.text)
+
+
+def send_otp_email(to_email: str, otp: str, username: str = "User") -> bool:
+    """
+    Send an OTP verification email.
+
+    Args:
+        to_email: Recipient email address
+        otp: The OTP code to send
+        username: User's name for personalization
+
+    Returns:
+        True if email sent successfully, False otherwise
+    """
+    return _send_rendered(render_email("otp", to_email, otp=otp, username=username))
+
+
+def send_welcome_email(to_email: str, username: str) -> bool:
+    """
+    Send a welcome email to new users.
+
+    Args:
+        to_email: Recipient email address
+        username: User's name for personalization
+
+    Returns:
+        True if email sent successfully, False otherwise
+    """
+    return _send_rendered(render_email("welcome", to_email, username=username))
+
+
+def send_referral_bonus_email(to_email: str, username: str, referred_username: str, bonus_amount: int) -> bool:
+    """
+    Send notification email when user earns a referral bonus.
+
+    Args:
+        to_email: Recipient email address
+        username: User's name for personalization
+        referred_username: Username of the person who was referred
+        bonus_amount: Amount of credits earned
+
+    Returns:
+        True if email sent successfully, False otherwise
+    """
+    return _send_rendered(render_email(
+        "referral_bonus", to_email,
+        username=username, referred_username=referred_username, bonus_amount=bonus_amount
+    ))
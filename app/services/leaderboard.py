@@ -0,0 +1,400 @@
+"""
+Live Winners Ticker and Leaderboards
+
+Incremental aggregates fed by the bet engine, so neither the ticker nor the
+leaderboards ever scan ``bet_transactions``:
+
+- recent big wins: bounded ring buffer (``LEADERBOARD_RECENT_WINS``)
+- daily / weekly top winners by net winnings: per-period score maps with a
+  lazily-invalidated heap, O(log N) per bet
+
+Two backends, selected by ``LEADERBOARD_BACKEND``:
+- memory: per-process, warmed from the database on first read
+- redis: sorted sets + a capped list shared by all workers
+
+Big wins are pushed to the ``leaderboard`` WebSocket room immediately;
+leaderboard snapshots are pushed at most once per
+``LEADERBOARD_PUSH_INTERVAL_MS``. Clients subscribe with the existing
+``room:join`` message (``{"room_id": "leaderboard"}``).
+"""
+
+import asyncio
+import heapq
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    settings,
+    LEADERBOARD_TOP_N,
+    LEADERBOARD_RECENT_WINS,
+    LEADERBOARD_BIG_WIN_MULTIPLIER,
+    LEADERBOARD_PUSH_INTERVAL_MS
+)
+from app.core import get_logger, dumps_str, loads
+from app.websocket import manager, WSMessage, WSMessageType
+
+logger = get_logger(__name__)
+
+LEADERBOARD_ROOM = "leaderboard"
+PERIODS = ("daily", "weekly")
+
+# Redis keys outlive their period slightly so late readers still see them
+_REDIS_PERIOD_TTL = {"daily": 2 * 86400, "weekly": 8 * 86400}
+
+
+@dataclass
+class WinEvent:
+    """A single settled winning bet shown on the ticker"""
+    user_id: int
+    username: str
+    game_type: str
+    bet_amount: int
+    win_amount: int
+    multiplier: float
+    result: str
+    created_at: str
+
+
+def period_key(period: str, at: datetime) -> str:
+    """
+    Bucket key for a period
+
+    Args:
+        period: "daily" or "weekly"
+        at: Timestamp (UTC)
+
+    Returns:
+        "2026-10-19" for daily, "2026-W43" for weekly (ISO week)
+    """
+    if period == "daily":
+        return at.strftime("%Y-%m-%d")
+    iso = at.isocalendar()
+    return f"{iso[0]}-W{iso[1]:02d}"
+
+
+def period_start(period: str, at: datetime) -> datetime:
+    """Start of the period containing ``at``"""
+    start = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "weekly":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def is_big_win(bet_amount: int, win_amount: int) -> bool:
+    return bet_amount > 0 and win_amount >= bet_amount * LEADERBOARD_BIG_WIN_MULTIPLIER
+
+
+class RankedBoard:
+    """
+    Scores for one period with O(log N) updates.
+
+    Every update pushes (−score, user_id) onto a heap; entries whose score no
+    longer matches the current score are discarded when reading. The heap is
+    rebuilt when stale entries outnumber live ones.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.scores: Dict[int, int] = {}
+        self._heap: List[Tuple[int, int]] = []
+
+    def add(self, user_id: int, delta: int) -> int:
+        score = self.scores.get(user_id, 0) + delta
+        self.scores[user_id] = score
+        heapq.heappush(self._heap, (-score, user_id))
+        if len(self._heap) > 2 * len(self.scores) + 64:
+            self._heap = [(-s, uid) for uid, s in self.scores.items()]
+            heapq.heapify(self._heap)
+        return score
+
+    def set_scores(self, scores: Dict[int, int]):
+        self.scores = dict(scores)
+        self._heap = [(-s, uid) for uid, s in self.scores.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n: int) -> List[Tuple[int, int]]:
+        """Top ``n`` (user_id, score) pairs with a positive score"""
+        result: List[Tuple[int, int]] = []
+        kept: List[Tuple[int, int]] = []
+        seen = set()
+        while self._heap and len(result) < n:
+            entry = heapq.heappop(self._heap)
+            neg_score, user_id = entry
+            if user_id in seen or self.scores.get(user_id) != -neg_score:
+                continue  # stale or duplicate entry
+            seen.add(user_id)
+            kept.append(entry)
+            if -neg_score <= 0:
+                break
+            result.append((user_id, -neg_score))
+        for entry in kept:
+            heapq.heappush(self._heap, entry)
+        return result
+
+
+class MemoryLeaderboard:
+    """Per-process ticker and leaderboards"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._recent: Deque[WinEvent] = deque(maxlen=LEADERBOARD_RECENT_WINS)
+            self._boards: Dict[str, RankedBoard] = {}
+            self._usernames: Dict[int, str] = {}
+            self.warmed = False
+
+    def _board(self, period: str, at: datetime) -> RankedBoard:
+        key = period_key(period, at)
+        board = self._boards.get(period)
+        if board is None or board.key != key:
+            # New period: the previous board is dropped
+            board = self._boards[period] = RankedBoard(key)
+        return board
+
+    async def record(self, event: WinEvent, net: int, at: datetime):
+        with self._lock:
+            self._usernames[event.user_id] = event.username
+            for period in PERIODS:
+                self._board(period, at).add(event.user_id, net)
+            if is_big_win(event.bet_amount, event.win_amount):
+                self._recent.appendleft(event)
+
+    async def top(self, period: str, limit: int, at: datetime) -> Tuple[str, List[Dict]]:
+        with self._lock:
+            board = self._board(period, at)
+            return board.key, [
+                {"user_id": uid, "username": self._usernames.get(uid), "net_winnings": score}
+                for uid, score in board.top(limit)
+            ]
+
+    async def recent(self, limit: int) -> List[Dict]:
+        with self._lock:
+            return [asdict(e) for e in list(self._recent)[:limit]]
+
+    def warm(self, db: Session, at: datetime):
+        """
+        Load the current periods from the database (one grouped query per
+        period over the indexed created_at range, plus the latest big wins).
+        Replaces in-memory state, so bets recorded earlier are not counted twice.
+        """
+        boards = {}
+        usernames = {}
+        for period in PERIODS:
+            rows = (
+                db.query(
+                    models.BetTransaction.user_id,
+                    models.User.username,
+                    func.sum(models.BetTransaction.win_amount - models.BetTransaction.bet_amount)
+                )
+                .join(models.User, models.User.id == models.BetTransaction.user_id)
+                .filter(models.BetTransaction.created_at >= period_start(period, at))
+                .group_by(models.BetTransaction.user_id, models.User.username)
+                .all()
+            )
+            board = RankedBoard(period_key(period, at))
+            board.set_scores({user_id: int(net or 0) for user_id, _, net in rows})
+            boards[period] = board
+            usernames.update({user_id: username for user_id, username, _ in rows})
+
+        wins = (
+            db.query(models.BetTransaction, models.User.username)
+            .join(models.User, models.User.id == models.BetTransaction.user_id)
+            .filter(
+                models.BetTransaction.created_at >= period_start("weekly", at),
+                models.BetTransaction.win_amount
+                >= models.BetTransaction.bet_amount * LEADERBOARD_BIG_WIN_MULTIPLIER
+            )
+            .order_by(models.BetTransaction.id.desc())
+            .limit(LEADERBOARD_RECENT_WINS)
+            .all()
+        )
+        recent = deque(
+            (_event_from_transaction(tx, username) for tx, username in wins),
+            maxlen=LEADERBOARD_RECENT_WINS
+        )
+
+        with self._lock:
+            self._boards = boards
+            self._usernames.update(usernames)
+            self._recent = recent
+            self.warmed = True
+
+
+def _event_from_transaction(tx: models.BetTransaction, username: str) -> WinEvent:
+    return WinEvent(
+        user_id=tx.user_id,
+        username=username,
+        game_type="dice" if tx.game_type == models.GameType.LUCKY_DICE else "slots",
+        bet_amount=tx.bet_amount,
+        win_amount=tx.win_amount,
+        multiplier=tx.win_amount / tx.bet_amount if tx.bet_amount else 0,
+        result=tx.result.value,
+        created_at=tx.created_at.isoformat() if tx.created_at else None
+    )
+
+
+class RedisLeaderboard:
+    """Ticker and leaderboards shared across workers through Redis"""
+
+    warmed = True  # Redis state survives restarts
+    prefix = "leaderboard:"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.Redis.from_url(url, decode_responses=True)
+
+    async def record(self, event: WinEvent, net: int, at: datetime):
+        pipe = self._client.pipeline(transaction=False)
+        pipe.hset(f"{self.prefix}usernames", event.user_id, event.username)
+        for period in PERIODS:
+            key = f"{self.prefix}{period}:{period_key(period, at)}"
+            pipe.zincrby(key, net, event.user_id)
+            pipe.expire(key, _REDIS_PERIOD_TTL[period])
+        if is_big_win(event.bet_amount, event.win_amount):
+            pipe.lpush(f"{self.prefix}recent", dumps_str(asdict(event)))
+            pipe.ltrim(f"{self.prefix}recent", 0, LEADERBOARD_RECENT_WINS - 1)
+        await pipe.execute()
+
+    async def top(self, period: str, limit: int, at: datetime) -> Tuple[str, List[Dict]]:
+        key = period_key(period, at)
+        entries = await self._client.zrevrangebyscore(
+            f"{self.prefix}{period}:{key}", "+inf", "(0", start=0, num=limit, withscores=True
+        )
+        if not entries:
+            return key, []
+        names = await self._client.hmget(f"{self.prefix}usernames", [uid for uid, _ in entries])
+        return key, [
+            {"user_id": int(uid), "username": name, "net_winnings": int(score)}
+            for (uid, score), name in zip(entries, names)
+        ]
+
+    async def recent(self, limit: int) -> List[Dict]:
+        return [loads(item) for item in await self._client.lrange(f"{self.prefix}recent", 0, limit - 1)]
+
+    def warm(self, db: Session, at: datetime):
+        pass
+
+    def reset(self):
+        pass
+
+
+class LeaderboardService:
+    """Feeds the backend and pushes updates to the leaderboard room"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._push_task: Optional[asyncio.Task] = None
+
+    def reset(self):
+        self.backend.reset()
+        self._push_task = None
+
+    async def record_bet(
+        self,
+        user_id: int,
+        username: str,
+        game_type: str,
+        bet_amount: int,
+        win_amount: int,
+        result: str,
+        at: Optional[datetime] = None
+    ):
+        """
+        Record a settled bet. Never raises - a leaderboard failure must not
+        fail the bet that has already been committed.
+        """
+        at = at or datetime.now(timezone.utc)
+        event = WinEvent(
+            user_id=user_id,
+            username=username,
+            game_type=game_type,
+            bet_amount=bet_amount,
+            win_amount=win_amount,
+            multiplier=win_amount / bet_amount if bet_amount else 0,
+            result=result,
+            created_at=at.isoformat()
+        )
+        try:
+            await self.backend.record(event, win_amount - bet_amount, at)
+            if self._has_subscribers():
+                if is_big_win(bet_amount, win_amount):
+                    await self._send(WSMessageType.LEADERBOARD_WIN, asdict(event))
+                self._schedule_push()
+        except Exception as e:
+            logger.warning(f"Leaderboard update failed | user_id={user_id} | error={e}")
+
+    async def snapshot(
+        self,
+        period: str = "daily",
+        limit: int = LEADERBOARD_TOP_N,
+        db: Optional[Session] = None
+    ) -> Dict:
+        """
+        Current leaderboard for a period plus the recent big wins
+
+        Args:
+            period: "daily" or "weekly"
+            limit: Number of leaderboard entries
+            db: Session used once to warm the in-memory backend
+        """
+        at = datetime.now(timezone.utc)
+        if db is not None and not self.backend.warmed:
+            self.backend.warm(db, at)
+
+        key, entries = await self.backend.top(period, limit, at)
+        for rank, entry in enumerate(entries, start=1):
+            entry["rank"] = rank
+        return {
+            "period": period,
+            "period_key": key,
+            "leaders": entries,
+            "recent_wins": await self.backend.recent(LEADERBOARD_RECENT_WINS)
+        }
+
+    async def publish_snapshot(self):
+        """Push both leaderboards to the room"""
+        if not self._has_subscribers():
+            return
+        data = {period: await self.snapshot(period) for period in PERIODS}
+        await self._send(WSMessageType.LEADERBOARD_UPDATE, data)
+
+    def _has_subscribers(self) -> bool:
+        return bool(manager.rooms.get(LEADERBOARD_ROOM))
+
+    async def _send(self, message_type: str, data: Dict):
+        await manager.send_to_room(LEADERBOARD_ROOM, WSMessage(type=message_type, data=data))
+
+    def _schedule_push(self):
+        # Coalesce: at most one pending push, sent after the interval
+        if self._push_task is not None and not self._push_task.done():
+            return
+        self._push_task = asyncio.create_task(self._delayed_push())
+
+    async def _delayed_push(self):
+        await asyncio.sleep(LEADERBOARD_PUSH_INTERVAL_MS / 1000)
+        try:
+            await self.publish_snapshot()
+        except Exception as e:
+            logger.warning(f"Leaderboard push failed: {e}")
+
+
+def _build_backend():
+    if settings.LEADERBOARD_BACKEND == "redis":
+        if settings.REDIS_URL:
+            logger.info("Leaderboard using Redis backend")
+            return RedisLeaderboard(settings.REDIS_URL)
+        logger.warning("LEADERBOARD_BACKEND=redis but REDIS_URL is not set; using memory")
+    return MemoryLeaderboard()
+
+leaderboard = LeaderboardService(_build_backend())
@@ -0,0 +1,358 @@
+"""
+Credit Ledger
+
+Every change to ``users.credits`` goes through ``post``, which in the
+caller's transaction:
+
+1. Claims the idempotency key (if any) by inserting the journal header with
+   ``ON CONFLICT DO NOTHING``. If the key already exists the original
+   transaction is returned with ``replayed=True`` and nothing is applied.
+2. Applies each user's delta with one conditional
+   ``UPDATE users SET credits = credits + :d WHERE id = :id AND credits >= :required
+   RETURNING credits`` (``required`` defaults to ``-d``, i.e. the balance may
+   not go negative). Users are updated in id order so concurrent transfers
+   cannot deadlock.
+3. Appends one entry per account. Entries of a transaction always sum to
+   zero; platform-side counterparties are the system accounts below.
+
+``post`` never commits - the caller commits its own rows (claim status,
+notification messages) together with the ledger rows.
+
+``reconcile`` checks that every user's balance matches their ledger chain
+and that every journal transaction balances:
+
+    python scripts/reconcile_ledger.py
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app import models
+from app.models import LedgerEntry, LedgerTransaction, LedgerTransactionType
+
+logger = logging.getLogger(__name__)
+
+# ============= Accounts =============
+
+USER = "user"
+
+# Counterparty for game stakes and winnings
+HOUSE = "house"
+# Credits granted by the platform (admin adjustments, offer and referral bonuses)
+ISSUANCE = "issuance"
+# Credits sold to clients for crypto
+SALES = "sales"
+
+
+class LedgerError(Exception):
+    """Base class for ledger failures"""
+
+
+class InsufficientCreditsError(LedgerError):
+    """Raised when a conditional balance update matches no row"""
+
+    def __init__(self, user_id: Optional[int] = None, message: str = "Insufficient credits"):
+        super().__init__(message)
+        self.user_id = user_id
+
+
+class UnbalancedTransactionError(LedgerError):
+    """Raised when postings do not sum to zero"""
+
+
+@dataclass
+class Posting:
+    """One leg of a transaction"""
+    amount: int
+    user_id: Optional[int] = None
+    account: str = USER
+    # Minimum balance before applying (users only); defaults to -amount
+    required: Optional[int] = None
+
+
+def user_posting(user_id: int, amount: int, required: Optional[int] = None) -> Posting:
+    return Posting(amount=amount, user_id=user_id, required=required)
+
+
+def system_posting(account: str, amount: int) -> Posting:
+    return Posting(amount=amount, account=account)
+
+
+@dataclass
+class PostedTransaction:
+    """Result of ``post``"""
+    transaction_id: int
+    balances: Dict[int, int] = field(default_factory=dict)  # user_id -> balance after
+    replayed: bool = False
+
+
+# ============= Balance updates =============
+
+def apply_delta(db: Session, user_id: int, delta: int, required: Optional[int] = None) -> int:
+    """
+    Change one user's balance with a single conditional UPDATE.
+
+    Args:
+        db: Database session (the caller owns the transaction)
+        user_id: Account owner
+        delta: Signed change
+        required: Balance the user must have before the change
+            (default: ``-delta``, so the balance cannot go negative)
+
+    Returns:
+        The balance after the update
+
+    Raises:
+        InsufficientCreditsError: if the balance does not cover ``required``
+            or the user does not exist
+    """
+    if required is None:
+        required = max(-delta, 0)
+
+    stmt = (
+        update(models.User)
+        .where(models.User.id == user_id, models.User.credits >= required)
+        .values(credits=models.User.credits + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.get_bind().dialect.update_returning:
+        new_balance = db.execute(stmt.returning(models.User.credits)).scalar()
+    else:  # pragma: no cover - every supported backend has RETURNING
+        matched = db.execute(stmt).rowcount
+        new_balance = None
+        if matched:
+            new_balance = db.query(models.User.credits).filter(models.User.id == user_id).scalar()
+
+    if new_balance is None:
+        raise InsufficientCreditsError(user_id)
+
+    # Keep an already-loaded User in step without marking it dirty
+    user = db.identity_map.get(identity_key(models.User, user_id))
+    if user is not None:
+        set_committed_value(user, "credits", new_balance)
+    return new_balance
+
+
+# ============= Posting =============
+
+def _claim_header(db: Session, values: Dict) -> Optional[int]:
+    """
+    Insert the journal header.
+
+    Returns:
+        The new transaction id, or None if the idempotency key already exists
+    """
+    table = LedgerTransaction.__table__
+    dialect = db.get_bind().dialect.name
+    if values.get("idempotency_key") and dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(**values).on_conflict_do_nothing(
+            index_elements=["idempotency_key"]
+        )
+        return db.execute(stmt.returning(table.c.id)).scalar()
+    return db.execute(insert(table).values(**values).returning(table.c.id)).scalar()
+
+
+def _replay(db: Session, idempotency_key: str) -> PostedTransaction:
+    transaction_id = db.execute(
+        select(LedgerTransaction.id).where(LedgerTransaction.idempotency_key == idempotency_key)
+    ).scalar_one()
+    balances = dict(db.execute(
+        select(LedgerEntry.user_id, LedgerEntry.balance_after)
+        .where(LedgerEntry.transaction_id == transaction_id, LedgerEntry.account == USER)
+        .order_by(LedgerEntry.id)
+    ).all())
+    return PostedTransaction(transaction_id=transaction_id, balances=balances, replayed=True)
+
+
+def post(
+    db: Session,
+    transaction_type: LedgerTransactionType,
+    postings: Iterable[Posting],
+    idempotency_key: Optional[str] = None,
+    reference: Optional[Tuple[str, Optional[int]]] = None,
+    description: Optional[str] = None,
+    created_by_id: Optional[int] = None
+) -> PostedTransaction:
+    """
+    Post a balanced transaction and apply it to user balances.
+
+    Args:
+        db: Database session (the caller commits or rolls back)
+        transaction_type: What kind of movement this is
+        postings: Legs of the transaction; amounts must sum to zero
+        idempotency_key: Replaying a key returns the original transaction
+        reference: (reference_type, reference_id) of the causing row
+        description: Free-text note
+        created_by_id: Acting user (e.g. the admin)
+
+    Returns:
+        PostedTransaction with each user's new balance
+
+    Raises:
+        UnbalancedTransactionError: if the postings do not sum to zero
+        InsufficientCreditsError: if a user's balance does not cover their leg;
+            the caller must roll back
+    """
+    postings = list(postings)
+    if sum(p.amount for p in postings) != 0:
+        raise UnbalancedTransactionError(
+            f"Postings sum to {sum(p.amount for p in postings)}, expected 0"
+        )
+    if any(p.account == USER and p.user_id is None for p in postings):
+        raise LedgerError("User postings need a user_id")
+
+    reference_type, reference_id = reference or (None, None)
+    transaction_id = _claim_header(db, {
+        "idempotency_key": idempotency_key,
+        "transaction_type": transaction_type,
+        "reference_type": reference_type,
+        "reference_id": reference_id,
+        "description": description,
+        "created_by_id": created_by_id,
+    })
+    if transaction_id is None:
+        logger.info(f"Ledger replay for idempotency key {idempotency_key}")
+        return _replay(db, idempotency_key)
+
+    balances: Dict[int, int] = {}
+    # Lock order by user id: concurrent transfers between the same users cannot deadlock
+    for p in sorted((p for p in postings if p.account == USER), key=lambda p: p.user_id):
+        balances[p.user_id] = apply_delta(db, p.user_id, p.amount, p.required)
+
+    db.execute(insert(LedgerEntry.__table__), [
+        {
+            "transaction_id": transaction_id,
+            "account": p.account,
+            "user_id": p.user_id,
+            "amount": p.amount,
+            "balance_after": balances.get(p.user_id) if p.account == USER else None,
+        }
+        for p in postings
+    ])
+    return PostedTransaction(transaction_id=transaction_id, balances=balances)
+
+
+def credit_user(
+    db: Session,
+    user_id: int,
+    amount: int,
+    transaction_type: LedgerTransactionType,
+    source: str = ISSUANCE,
+    **kwargs
+) -> PostedTransaction:
+    """Move ``amount`` (may be negative) between a system account and a user"""
+    return post(db, transaction_type, [
+        system_posting(source, -amount),
+        user_posting(user_id, amount),
+    ], **kwargs)
+
+
+def transfer(
+    db: Session,
+    from_user_id: int,
+    to_user_id: int,
+    amount: int,
+    transaction_type: LedgerTransactionType,
+    **kwargs
+) -> PostedTransaction:
+    """Move ``amount`` credits from one user to another"""
+    return post(db, transaction_type, [
+        user_posting(from_user_id, -amount),
+        user_posting(to_user_id, amount),
+    ], **kwargs)
+
+
+# ============= Reconciliation =============
+
+@dataclass
+class ReconciliationReport:
+    users_checked: int = 0
+    # {user_id, credits, ledger_balance, expected_from_entries}
+    balance_mismatches: List[Dict] = field(default_factory=list)
+    unbalanced_transactions: List[int] = field(default_factory=list)
+    system_balances: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.balance_mismatches and not self.unbalanced_transactions
+
+
+def reconcile(db: Session) -> ReconciliationReport:
+    """
+    Check the ledger against ``users.credits``.
+
+    For every user with entries:
+    - ``credits`` must equal the ``balance_after`` of their latest entry
+      (otherwise the balance was changed outside the ledger), and
+    - the opening balance (first entry's balance before it) plus the sum of
+      all their entries must equal that latest balance (no entry was altered
+      or removed).
+
+    Users without entries still hold their signup balance and are skipped.
+    """
+    report = ReconciliationReport()
+    E = LedgerEntry
+    first, last = aliased(LedgerEntry), aliased(LedgerEntry)
+
+    chains = (
+        select(
+            E.user_id,
+            func.sum(E.amount).label("total"),
+            func.min(E.id).label("first_id"),
+            func.max(E.id).label("last_id")
+        )
+        .where(E.account == USER)
+        .group_by(E.user_id)
+        .subquery()
+    )
+
+    rows = db.execute(
+        select(
+            models.User.id,
+            models.User.credits,
+            chains.c.total,
+            first.balance_after - first.amount,
+            last.balance_after
+        )
+        .join(chains, chains.c.user_id == models.User.id)
+        .join(first, first.id == chains.c.first_id)
+        .join(last, last.id == chains.c.last_id)
+    )
+    for user_id, credits, total, opening, latest in rows:
+        report.users_checked += 1
+        if credits != latest or opening + total != latest:
+            report.balance_mismatches.append({
+                "user_id": user_id,
+                "credits": credits,
+                "ledger_balance": latest,
+                "expected_from_entries": opening + total,
+            })
+
+    report.unbalanced_transactions = list(db.execute(
+        select(E.transaction_id).group_by(E.transaction_id).having(func.sum(E.amount) != 0)
+    ).scalars())
+
+    report.system_balances = {
+        account: int(total)
+        for account, total in db.execute(
+            select(E.account, func.sum(E.amount)).where(E.account != USER).group_by(E.account)
+        )
+    }
+
+    if not report.ok:
+        logger.warning(
+            f"Ledger reconciliation found {len(report.balance_mismatches)} balance mismatches "
+            f"and {len(report.unbalanced_transactions)} unbalanced transactions"
+        )
+    return report
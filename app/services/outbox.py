@@ -0,0 +1,385 @@
+"""
+Transactional Outbox
+
+Side effects of a request (WebSocket events, push notifications, emails)
+are written as ``outbox_messages`` rows in the same transaction as the
+change that causes them:
+
+    outbox.enqueue_ws(db, user.id, WSMessageType.CREDIT_UPDATE, credit_update_data(...))
+    outbox.enqueue_push(db, [user.id], credit_push(...))
+    outbox.enqueue_email(db, "referral_bonus", to_email=..., ...)
+    db.commit()
+
+A rolled-back change therefore never notifies anyone, and a committed one
+is delivered even if the process dies right after the commit. Requests only
+pay for an INSERT.
+
+``OutboxDispatcher`` runs on the app's event loop (started with the app).
+It is woken right after a commit that enqueued messages and otherwise polls
+every ``OUTBOX_POLL_SECONDS``. Each pass claims up to ``OUTBOX_BATCH_SIZE``
+due rows with one conditional UPDATE (safe with several workers), delivers
+them, and records all outcomes in one transaction. Failed deliveries are
+retried with exponential backoff up to ``OUTBOX_MAX_ATTEMPTS``; rows whose
+dispatcher died mid-delivery are reclaimed after ``OUTBOX_LOCK_SECONDS``.
+Delivery is at-least-once.
+
+WebSocket events reach sockets connected to the worker that delivers them,
+as before; the commit hook wakes the local dispatcher so that is normally
+the worker that handled the request.
+"""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, delete, event, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import get_logger
+from app.database import SessionLocal
+from app.models import OutboxMessage, OutboxStatus
+from app.services.email_queue import email_queue, EmailSendError
+from app.services.email_service import TEMPLATES as EMAIL_TEMPLATES, render_email
+from app.services.push_notification_service import send_to_users
+from app.websocket import manager, WSMessage, WSMessageType
+
+logger = get_logger(__name__)
+
+_WAKE_KEY = "outbox_wake"
+
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 600
+
+
+class DeliveryError(Exception):
+    """Raised by a handler when delivery failed and should be retried"""
+
+
+# ============= Handlers =============
+
+# kind -> async handler(db, payload)
+_HANDLERS: Dict[str, Callable[[Session, Dict[str, Any]], Awaitable[None]]] = {}
+
+
+def handler(kind: str):
+    def register(func):
+        _HANDLERS[kind] = func
+        return func
+    return register
+
+
+@handler("ws")
+async def _deliver_ws(db: Session, payload: Dict[str, Any]):
+    # Best effort: an offline user simply misses the live event
+    await manager.send_to_user(payload["user_id"], WSMessage(
+        type=WSMessageType(payload["type"]),
+        data=payload["data"]
+    ))
+
+
+@handler("push")
+async def _deliver_push(db: Session, payload: Dict[str, Any]):
+    content = dict(payload)
+    user_ids = content.pop("user_ids")
+    result = await send_to_users(db, user_ids, content)
+    if result.get("error"):
+        raise DeliveryError(result["error"])
+
+
+@handler("email")
+async def _deliver_email(db: Session, payload: Dict[str, Any]):
+    if not settings.resend_configured:
+        logger.info(f"Email provider not configured; dropping {payload['template']} email")
+        return
+    # The outbox retries on its own, so this bypasses the email queue's retries
+    try:
+        await email_queue.send_now(render_email(payload["template"], **payload["params"]))
+    except EmailSendError as e:
+        raise DeliveryError(f"{payload['template']} email was not accepted: {e}")
+
+
+# ============= Enqueueing =============
+
+def enqueue(db: Session, kind: str, payload: Dict[str, Any]) -> OutboxMessage:
+    """
+    Add a message to the caller's transaction (delivered after commit)
+
+    Raises:
+        ValueError: if no handler is registered for ``kind``
+    """
+    if kind not in _HANDLERS:
+        raise ValueError(f"Unknown outbox message kind: {kind}")
+    message = OutboxMessage(
+        kind=kind,
+        payload=json.dumps(payload, default=str),
+        status=OutboxStatus.PENDING,
+        attempts=0,
+        available_at=datetime.now(timezone.utc)
+    )
+    db.add(message)
+    db.info[_WAKE_KEY] = True
+    return message
+
+
+def enqueue_ws(db: Session, user_id: int, message_type: WSMessageType, data: Dict[str, Any]) -> OutboxMessage:
+    return enqueue(db, "ws", {"user_id": user_id, "type": message_type.value, "data": data})
+
+
+def enqueue_push(db: Session, user_ids: List[int], content: Dict[str, Any]) -> OutboxMessage:
+    """``content`` comes from a push_notification_service builder (``credit_push`` etc.)"""
+    return enqueue(db, "push", {"user_ids": list(user_ids), **content})
+
+
+def enqueue_email(db: Session, template: str, **params) -> OutboxMessage:
+    if template not in EMAIL_TEMPLATES:
+        raise ValueError(f"Unknown email template: {template}")
+    return enqueue(db, "email", {"template": template, "params": params})
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session):
+    if session.info.pop(_WAKE_KEY, False):
+        dispatcher.wake()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_wake(session: Session, previous_transaction):
+    session.info.pop(_WAKE_KEY, None)
+
+
+# ============= Dispatching =============
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number ``attempts`` (exponential with jitter)"""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxDispatcher:
+    """Delivers outbox rows in batches on the app's event loop"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_seconds: float = settings.OUTBOX_POLL_SECONDS,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        lock_seconds: float = settings.OUTBOX_LOCK_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.lock_seconds = lock_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_batch_at: Optional[datetime] = None
+
+    def _claimable(self, now: datetime):
+        M = OutboxMessage
+        return or_(
+            and_(M.status == OutboxStatus.PENDING, M.available_at <= now),
+            and_(M.status == OutboxStatus.PROCESSING, M.locked_until < now)
+        )
+
+    def claim_batch(self) -> List:
+        """Lock up to ``batch_size`` due rows for this dispatcher"""
+        M = OutboxMessage
+        now = datetime.now(timezone.utc)
+        db = self.session_factory()
+        try:
+            ids = db.execute(
+                select(M.id).where(self._claimable(now)).order_by(M.id).limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                return []
+            # Re-checking the condition makes a concurrent claim of the same row a no-op
+            rows = db.execute(
+                update(M)
+                .where(M.id.in_(ids), self._claimable(now))
+                .values(
+                    status=OutboxStatus.PROCESSING,
+                    locked_until=now + timedelta(seconds=self.lock_seconds),
+                    attempts=M.attempts + 1
+                )
+                .returning(M.id, M.kind, M.payload, M.attempts)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            return sorted(rows, key=lambda row: row.id)
+        finally:
+            db.close()
+
+    def record_outcomes(self, outcomes: List):
+        """Mark delivered rows done and schedule retries for the rest, in one transaction"""
+        M = OutboxMessage
+        now = datetime.now(timezone.utc)
+        delivered = [row.id for row, error in outcomes if error is None]
+        db = self.session_factory()
+        try:
+            if delivered:
+                db.execute(
+                    update(M)
+                    .where(M.id.in_(delivered))
+                    .values(status=OutboxStatus.DELIVERED, delivered_at=now, locked_until=None, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+            for row, error in outcomes:
+                if error is None:
+                    continue
+                message = f"{type(error).__name__}: {error}"[:500]
+                if row.attempts >= self.max_attempts:
+                    values = {"status": OutboxStatus.FAILED, "locked_until": None}
+                    self.failed += 1
+                    logger.error(f"Outbox message {row.id} ({row.kind}) failed permanently: {message}")
+                else:
+                    values = {
+                        "status": OutboxStatus.PENDING,
+                        "locked_until": None,
+                        "available_at": now + timedelta(seconds=backoff_seconds(row.attempts)),
+                    }
+                    self.retried += 1
+                    logger.warning(f"Outbox message {row.id} ({row.kind}) attempt {row.attempts} failed: {message}")
+                db.execute(
+                    update(M).where(M.id == row.id).values(last_error=message, **values)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            self.delivered += len(delivered)
+        finally:
+            db.close()
+
+    async def _deliver(self, db: Session, row) -> Optional[BaseException]:
+        try:
+            deliver = _HANDLERS.get(row.kind)
+            if deliver is None:
+                raise LookupError(f"No handler for {row.kind}")
+            await deliver(db, json.loads(row.payload))
+            return None
+        except Exception as e:
+            return e
+
+    async def dispatch_once(self) -> int:
+        """
+        Claim and deliver one batch
+
+        Returns:
+            Number of messages attempted
+        """
+        rows = await asyncio.to_thread(self.claim_batch)
+        if not rows:
+            return 0
+
+        db = self.session_factory()
+        try:
+            # Socket writes are cheap and keep their order; network sends run concurrently
+            errors: Dict[int, Optional[BaseException]] = {}
+            for row in rows:
+                if row.kind == "ws":
+                    errors[row.id] = await self._deliver(db, row)
+            others = [row for row in rows if row.kind != "ws"]
+            results = await asyncio.gather(*(self._deliver(db, row) for row in others))
+            errors.update(zip((row.id for row in others), results))
+        finally:
+            db.close()
+
+        await asyncio.to_thread(self.record_outcomes, [(row, errors[row.id]) for row in rows])
+        self.last_batch_at = datetime.now(timezone.utc)
+        return len(rows)
+
+    async def drain(self) -> int:
+        """Deliver batches until nothing is due"""
+        total = 0
+        while True:
+            count = await self.dispatch_once()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    # ============= Lifecycle =============
+
+    def wake(self):
+        """Deliver soon; callable from any thread"""
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wake.set()
+        else:
+            loop.call_soon_threadsafe(wake.set)
+
+    async def _run_loop(self):
+        logger.info("Outbox dispatcher started")
+        try:
+            while True:
+                self._wake.clear()
+                try:
+                    if await self.dispatch_once() >= self.batch_size:
+                        continue  # More rows are waiting
+                except Exception as e:
+                    logger.warning(f"Outbox dispatch failed: {e}")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            logger.info("Outbox dispatcher stopped")
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = self._wake = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_batch_at": self.last_batch_at.isoformat() if self.last_batch_at else None,
+        }
+
+
+def purge_delivered(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Delete delivered rows older than ``OUTBOX_RETENTION_DAYS``, a chunk per transaction"""
+    M = OutboxMessage
+    chunk_size = chunk_size or settings.SCHEDULER_CHUNK_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    conditions = [M.status == OutboxStatus.DELIVERED, M.delivered_at < cutoff]
+    total = 0
+    while True:
+        ids = db.execute(select(M.id).where(*conditions).order_by(M.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            return total
+        total += db.execute(
+            delete(M).where(M.id.in_(ids)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+
+dispatcher = OutboxDispatcher()
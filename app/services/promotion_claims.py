@@ -0,0 +1,347 @@
+"""
+Promotion Claims and Budget Reservation
+
+Claiming a promotion never reads-then-writes shared state:
+
+- The claim row is inserted with ``INSERT ... ON CONFLICT DO NOTHING`` on
+  ``(promotion_id, player_id)``, so two simultaneous claims by one player
+  produce one row. A previously rejected claim is re-opened in place with a
+  conditional UPDATE.
+- Budget is reserved with one conditional
+  ``UPDATE promotions SET reserved_budget = reserved_budget + :v
+  WHERE used_budget + reserved_budget + :v <= total_budget``. Pending claims
+  hold a reservation; approval moves it to ``used_budget`` and rejection
+  releases it, so the budget can never be overcommitted.
+- Approving or rejecting first flips the claim out of PENDING_APPROVAL
+  with a conditional UPDATE (``decide_claim``), so a claim is decided once.
+
+Callers should reserve last, just before committing, so the row lock on a
+hot promotion is held as briefly as possible.
+
+Eligibility (connected client, active, not expired, player level, target
+list) is evaluated in SQL by ``eligible_promotions_query``; targeted
+promotions list their players in the indexed ``promotion_targets`` table.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, case, exists, func, insert, or_, select, update
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm.util import identity_key
+
+from app import models
+from app.models import ClaimStatus, PromotionStatus, PromotionTarget
+from app.services.client_analytics import increment_counters
+
+logger = logging.getLogger(__name__)
+
+_BUDGET_ATTRS = ["used_budget", "reserved_budget", "status"]
+
+
+@dataclass
+class ClaimInsert:
+    """Result of ``insert_claim``"""
+    claim_id: Optional[int] = None
+    # Status of the player's existing claim when none was created
+    existing_status: Optional[ClaimStatus] = None
+
+
+def _expire_promotion(db: Session, promotion_id: int):
+    # Budget columns were changed by a Core UPDATE; reload them on next access
+    promotion = db.identity_map.get(identity_key(models.Promotion, promotion_id))
+    if promotion is not None:
+        db.expire(promotion, _BUDGET_ATTRS)
+
+
+def _unlimited(P=models.Promotion):
+    # A missing or zero total_budget means the promotion has no budget cap
+    return or_(P.total_budget.is_(None), P.total_budget == 0)
+
+
+# ============= Eligibility =============
+
+def set_targets(promotion: models.Promotion, player_ids: Optional[Iterable[int]]):
+    """Restrict a promotion to the given players (None or empty: all players)"""
+    player_ids = sorted(set(player_ids or ()))
+    promotion.is_targeted = bool(player_ids)
+    promotion.targets = [PromotionTarget(player_id=player_id) for player_id in player_ids]
+
+
+def targets_player(player_id: int, P=models.Promotion):
+    """SQL condition: the promotion is untargeted or lists this player"""
+    return or_(
+        P.is_targeted == False,
+        exists().where(
+            PromotionTarget.promotion_id == P.id,
+            PromotionTarget.player_id == player_id
+        )
+    )
+
+
+def is_offered_to(db: Session, promotion: models.Promotion, player_id: int) -> bool:
+    """Whether the promotion's target list (if any) includes the player"""
+    if not promotion.is_targeted:
+        return True
+    return db.query(exists().where(
+        PromotionTarget.promotion_id == promotion.id,
+        PromotionTarget.player_id == player_id
+    )).scalar()
+
+
+def connected_to_client(player_id: int, P=models.Promotion):
+    """SQL condition: the player and the promotion's client are friends"""
+    fa = models.friends_association
+    return exists().where(or_(
+        and_(fa.c.user_id == player_id, fa.c.friend_id == P.client_id),
+        and_(fa.c.friend_id == player_id, fa.c.user_id == P.client_id)
+    ))
+
+
+def offered_promotion_ids(db: Session, promotions: Sequence[models.Promotion], player_id: int) -> Set[int]:
+    """Ids of the given promotions whose target list (if any) includes the player"""
+    offered = {p.id for p in promotions if not p.is_targeted}
+    targeted = [p.id for p in promotions if p.is_targeted]
+    if targeted:
+        offered.update(db.execute(
+            select(PromotionTarget.promotion_id).where(
+                PromotionTarget.player_id == player_id,
+                PromotionTarget.promotion_id.in_(targeted)
+            )
+        ).scalars())
+    return offered
+
+
+def eligible_promotions_query(db: Session, player: models.User) -> Query:
+    """
+    Promotions the player may claim right now: active, not expired, from a
+    connected client, within the player's level, and untargeted or
+    targeting this player. Callers add ordering and further filters.
+    """
+    P = models.Promotion
+    return db.query(P).filter(
+        P.status == PromotionStatus.ACTIVE,
+        P.end_date > datetime.now(timezone.utc),
+        P.min_player_level <= player.player_level,
+        connected_to_client(player.id),
+        targets_player(player.id)
+    )
+
+
+# ============= Claims =============
+
+def insert_claim(
+    db: Session,
+    promotion: models.Promotion,
+    player_id: int,
+    screenshot_url: Optional[str] = None
+) -> ClaimInsert:
+    """
+    Create a PENDING_APPROVAL claim unless the player already has one.
+
+    Returns:
+        ClaimInsert with the claim id, or with the existing claim's status
+        if the player already has a pending or approved claim
+    """
+    PC = models.PromotionClaim
+    table = PC.__table__
+    values = {
+        "promotion_id": promotion.id,
+        "player_id": player_id,
+        "client_id": promotion.client_id,
+        "claimed_value": promotion.value,
+        "status": ClaimStatus.PENDING_APPROVAL,
+        "screenshot_url": screenshot_url,
+        "wagering_required": promotion.value * promotion.wagering_requirement,
+    }
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values(**values).on_conflict_do_nothing(
+            index_elements=["promotion_id", "player_id"]
+        )
+        claim_id = db.execute(stmt.returning(table.c.id)).scalar()
+    else:  # pragma: no cover - generic backends rely on the unique constraint raising
+        claim_id = db.execute(insert(table).values(**values).returning(table.c.id)).scalar()
+
+    if claim_id is None:
+        # Re-open a rejected claim in place
+        claim_id = db.execute(
+            update(PC)
+            .where(
+                PC.promotion_id == promotion.id,
+                PC.player_id == player_id,
+                PC.status == ClaimStatus.REJECTED
+            )
+            .values(
+                **{k: v for k, v in values.items() if k not in ("promotion_id", "player_id")},
+                claimed_at=func.now(),
+                rejection_reason=None,
+                approved_at=None,
+                approved_by_id=None,
+                approval_message_id=None
+            )
+            .returning(PC.id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+
+    if claim_id is None:
+        existing_status = db.execute(
+            select(PC.status).where(PC.promotion_id == promotion.id, PC.player_id == player_id)
+        ).scalar()
+        return ClaimInsert(existing_status=existing_status)
+
+    # Core inserts bypass the rollup flush listener
+    increment_counters(db.connection(), promotion.client_id, claims=1)
+    return ClaimInsert(claim_id=claim_id)
+
+
+def decide_claim(db: Session, claim: models.PromotionClaim, status: ClaimStatus, **values) -> bool:
+    """
+    Move a pending claim to ``status`` with one conditional UPDATE, so of an
+    approve and a reject racing on the same claim only one can win. Call it
+    before touching the budget or the ledger.
+
+    Returns:
+        False if the claim is no longer pending
+    """
+    PC = models.PromotionClaim
+    decided = db.execute(
+        update(PC)
+        .where(PC.id == claim.id, PC.status == ClaimStatus.PENDING_APPROVAL)
+        .values(status=status, **values)
+        .returning(PC.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.expire(claim, ["status", *values])
+    return decided is not None
+
+
+def claim_counts(
+    db: Session,
+    promotion_ids: Sequence[int],
+    player_id: Optional[int] = None
+) -> Dict[int, Tuple[int, int]]:
+    """
+    Claim counts for many promotions in one grouped query
+
+    Returns:
+        promotion_id -> (total claims, claims by ``player_id``); promotions
+        without claims are omitted
+    """
+    if not promotion_ids:
+        return {}
+    PC = models.PromotionClaim
+    rows = db.execute(
+        select(
+            PC.promotion_id,
+            func.count(PC.id),
+            func.sum(case((PC.player_id == player_id, 1), else_=0))
+        )
+        .where(PC.promotion_id.in_(promotion_ids))
+        .group_by(PC.promotion_id)
+    )
+    return {promotion_id: (total, int(mine or 0)) for promotion_id, total, mine in rows}
+
+
+# ============= Budget =============
+
+def reserve_budget(db: Session, promotion_id: int, amount: int) -> bool:
+    """
+    Reserve ``amount`` of an active promotion's budget.
+
+    Returns:
+        False if the promotion is no longer active or the budget cannot
+        cover the reservation
+    """
+    P = models.Promotion
+    reserved = db.execute(
+        update(P)
+        .where(
+            P.id == promotion_id,
+            P.status == PromotionStatus.ACTIVE,
+            or_(
+                _unlimited(),
+                func.coalesce(P.used_budget, 0) + P.reserved_budget + amount <= P.total_budget
+            )
+        )
+        .values(reserved_budget=P.reserved_budget + amount)
+        .returning(P.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    _expire_promotion(db, promotion_id)
+    return reserved is not None
+
+
+def _release_expr(amount: int):
+    P = models.Promotion
+    return case((P.reserved_budget >= amount, P.reserved_budget - amount), else_=0)
+
+
+def commit_reservation(db: Session, promotion_id: int, amount: int) -> bool:
+    """
+    Move an approved claim's reservation into ``used_budget`` and mark the
+    promotion depleted once it is fully used.
+
+    Returns:
+        False if the budget cannot cover the claim (e.g. the total was lowered)
+    """
+    P = models.Promotion
+    used = db.execute(
+        update(P)
+        .where(
+            P.id == promotion_id,
+            or_(_unlimited(), func.coalesce(P.used_budget, 0) + amount <= P.total_budget)
+        )
+        .values(
+            used_budget=func.coalesce(P.used_budget, 0) + amount,
+            reserved_budget=_release_expr(amount)
+        )
+        .returning(P.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if used is None:
+        _expire_promotion(db, promotion_id)
+        return False
+
+    mark_depleted_if_exhausted(db, promotion_id)
+    return True
+
+
+def release_reservation(db: Session, promotion_id: int, amount: int):
+    """Return a rejected claim's reservation to the budget"""
+    P = models.Promotion
+    db.execute(
+        update(P)
+        .where(P.id == promotion_id)
+        .values(reserved_budget=_release_expr(amount))
+        .execution_options(synchronize_session=False)
+    )
+    _expire_promotion(db, promotion_id)
+
+
+def mark_depleted_if_exhausted(db: Session, promotion_id: int) -> bool:
+    """Flip an active promotion to DEPLETED once its budget is fully used"""
+    P = models.Promotion
+    depleted = db.execute(
+        update(P)
+        .where(
+            P.id == promotion_id,
+            P.status == PromotionStatus.ACTIVE,
+            P.total_budget > 0,
+            func.coalesce(P.used_budget, 0) >= P.total_budget
+        )
+        .values(status=PromotionStatus.DEPLETED)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    _expire_promotion(db, promotion_id)
+    return bool(depleted)
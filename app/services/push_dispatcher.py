@@ -0,0 +1,198 @@
+"""
+Expo Push Dispatcher
+
+All traffic to Expo goes through one long-lived ``httpx.AsyncClient`` with
+a small connection pool (HTTP/2 when the ``h2`` package is installed), so
+sends reuse warm connections instead of paying a TCP+TLS handshake each.
+
+Messages submitted by concurrent callers are queued and coalesced into
+Expo's 100-message batches. A batch is posted as soon as it is full, and
+a partial batch after ``PUSH_FLUSH_SECONDS``. Callers still await their
+own results:
+
+    tickets = await push_dispatcher.submit(messages)
+
+Each entry is either the Expo push ticket for that message or a
+``PushTransportError`` when its batch could not be posted.
+
+The client and queue belong to the event loop that first uses them; a new
+loop (e.g. a script calling ``asyncio.run`` twice) starts a fresh pool.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import httpx
+
+from app.config import settings
+from app.core import get_logger
+
+try:
+    import h2  # noqa: F401 - enables httpx's HTTP/2 support
+except ImportError:  # pragma: no cover - HTTP/2 is optional
+    h2 = None
+
+HTTP2_AVAILABLE = h2 is not None
+
+logger = get_logger(__name__)
+
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_MAX_BATCH = 100  # Expo rejects larger requests
+
+EXPO_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Content-Type": "application/json",
+}
+
+
+class PushTransportError(Exception):
+    """A batch could not be delivered to Expo (network error or non-200 response)"""
+
+
+PushResult = Union[Dict[str, Any], PushTransportError]
+
+
+class PushDispatcher:
+    """Pooled, coalescing sender for Expo push messages"""
+
+    def __init__(
+        self,
+        url: str = EXPO_PUSH_URL,
+        batch_size: int = settings.PUSH_BATCH_SIZE,
+        flush_seconds: float = settings.PUSH_FLUSH_SECONDS,
+        max_connections: int = settings.PUSH_MAX_CONNECTIONS,
+        timeout: float = 30.0,
+        http2: bool = HTTP2_AVAILABLE,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.url = url
+        self.batch_size = min(batch_size, EXPO_MAX_BATCH)
+        self.flush_seconds = flush_seconds
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.http2 = http2
+        self.transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.messages_sent = 0
+        self.transport_errors = 0
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Anything owned by a previous loop is unusable here
+            self._loop = loop
+            self._client = None
+            self._pending = []
+            self._timer = None
+            self._in_flight = set()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                headers=EXPO_HEADERS,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self.transport
+            )
+        return self._client
+
+    async def submit(self, messages: List[Dict[str, Any]]) -> List[PushResult]:
+        """
+        Queue messages for the next batch and wait for their results
+
+        Returns:
+            One Expo ticket (or PushTransportError) per message, in order
+        """
+        if not messages:
+            return []
+        self._bind_loop()
+        futures = []
+        for message in messages:
+            future = self._loop.create_future()
+            self._pending.append((message, future))
+            futures.append(future)
+            if len(self._pending) >= self.batch_size:
+                self._send_pending(full_only=True)
+        if self._pending and self._timer is None:
+            self._timer = self._loop.create_task(self._flush_later())
+        return list(await asyncio.gather(*futures, return_exceptions=True))
+
+    def _send_pending(self, full_only: bool = False):
+        while len(self._pending) >= (self.batch_size if full_only else 1):
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            task = self._loop.create_task(self._post(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_seconds)
+        finally:
+            self._timer = None
+        self._send_pending()
+
+    async def _post(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            response = await self.client.post(self.url, json=[message for message, _ in batch])
+            if response.status_code != 200:
+                raise PushTransportError(f"Expo responded with status {response.status_code}")
+            tickets = response.json().get("data", [])
+            if len(tickets) != len(batch):
+                raise PushTransportError(f"Expo returned {len(tickets)} tickets for {len(batch)} messages")
+        except Exception as e:
+            error = e if isinstance(e, PushTransportError) else PushTransportError(str(e) or type(e).__name__)
+            self.transport_errors += 1
+            logger.error(f"Push batch of {len(batch)} failed: {error}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(error)
+            return
+
+        self.batches_sent += 1
+        self.messages_sent += len(batch)
+        for (_, future), ticket in zip(batch, tickets):
+            if not future.done():
+                future.set_result(ticket)
+
+    async def flush(self):
+        """Send everything queued now and wait for in-flight batches"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._send_pending()
+        if self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+
+    async def stop(self):
+        """Flush and close the connection pool (app shutdown)"""
+        await self.flush()
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "queued": len(self._pending),
+            "in_flight_batches": len(self._in_flight),
+            "batches_sent": self.batches_sent,
+            "messages_sent": self.messages_sent,
+            "transport_errors": self.transport_errors,
+        }
+
+
+push_dispatcher = PushDispatcher()
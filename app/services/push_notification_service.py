@@ -1,18 +1,49 @@
 """
 Expo Push Notification Service
 Handles sending push notifications to mobile devices via Expo's push notification API.
+
+Requests go through the pooled, batching dispatcher in push_dispatcher.py.
 """
-import httpx
 import logging
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from app import models
-from app.models.push_token import DevicePlatform
 from app.database import SessionLocal
+from app.services.push_dispatcher import PushTransportError, push_dispatcher
+from app.services.push_tokens import active_tokens, record_tickets
 
 logger = logging.getLogger(__name__)
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+
+def build_message(
+    token: str,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, Any]] = None,
+    category: str = "default",
+    sound: str = "default",
+    badge: Optional[int] = None,
+    channel_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Expo message for one device"""
+    message = {
+        "to": token,
+        "title": title,
+        "body": body,
+        "sound": sound,
+        "data": {
+            **(data or {}),
+            "category": category,
+        },
+    }
+    if badge is not None:
+        message["badge"] = badge
+    if channel_id:
+        message["channelId"] = channel_id
+    return message
+
+
+def is_expo_token(token: Optional[str]) -> bool:
+    return bool(token) and token.startswith("ExponentPushToken")
 
 
 class PushNotificationService:
@@ -45,56 +76,21 @@ class PushNotificationService:
         Returns:
             True if sent successfully, False otherwise
         """
-        if not token or not token.startswith("ExponentPushToken"):
+        if not is_expo_token(token):
             logger.warning(f"Invalid push token format: {token[:20] if token else 'None'}...")
             return False
 
-        message = {
-            "to": token,
-            "title": title,
-            "body": body,
-            "sound": sound,
-            "data": {
-                **(data or {}),
-                "category": category,
-            },
-        }
-
-        if badge is not None:
-            message["badge"] = badge
-
-        if channel_id:
-            message["channelId"] = channel_id
-
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    EXPO_PUSH_URL,
-                    json=message,
-                    headers={
-                        "Accept": "application/json",
-                        "Accept-Encoding": "gzip, deflate",
-                        "Content-Type": "application/json",
-                    },
-                    timeout=10.0,
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    # Check for errors in the response
-                    if result.get("data", {}).get("status") == "error":
-                        error_message = result.get("data", {}).get("message", "Unknown error")
-                        logger.error(f"Push notification error: {error_message}")
-                        return False
-                    logger.info(f"Push notification sent successfully to {token[:30]}...")
-                    return True
-                else:
-                    logger.error(f"Push notification failed with status {response.status_code}")
-                    return False
-
-        except Exception as e:
-            logger.error(f"Error sending push notification: {e}")
+        [result] = await push_dispatcher.submit([
+            build_message(token, title, body, data, category, sound, badge, channel_id)
+        ])
+        if isinstance(result, PushTransportError):
+            logger.error(f"Error sending push notification: {result}")
             return False
+        if result.get("status") == "error":
+            logger.error(f"Push notification error: {result.get('message', 'Unknown error')}")
+            return False
+        logger.info(f"Push notification sent successfully to {token[:30]}...")
+        return True
 
     @staticmethod
     async def send_notifications_bulk(
@@ -105,10 +101,13 @@ class PushNotificationService:
         category: str = "default",
         sound: str = "default",
         channel_id: Optional[str] = None,
+        db: Optional[Session] = None,
     ) -> Dict[str, Any]:
         """
         Send push notifications to multiple devices.
-        Expo recommends sending in batches of 100.
+        The dispatcher batches them (with other callers' messages) 100 per request.
+        With ``db``, tickets are recorded for receipt polling and tokens Expo
+        rejects as dead are deactivated.
 
         Returns:
             Dict with success_count and failed_count
@@ -117,74 +116,166 @@ class PushNotificationService:
             return {"success_count": 0, "failed_count": 0}
 
         # Filter valid tokens
-        valid_tokens = [t for t in tokens if t and t.startswith("ExponentPushToken")]
+        valid_tokens = [t for t in tokens if is_expo_token(t)]
 
         if not valid_tokens:
             return {"success_count": 0, "failed_count": len(tokens)}
 
-        # Build messages
-        messages = []
-        for token in valid_tokens:
-            message = {
-                "to": token,
-                "title": title,
-                "body": body,
-                "sound": sound,
-                "data": {
-                    **(data or {}),
-                    "category": category,
-                },
-            }
-            if channel_id:
-                message["channelId"] = channel_id
-            messages.append(message)
-
-        # Send in batches of 100
-        batch_size = 100
+        results = await push_dispatcher.submit([
+            build_message(token, title, body, data, category, sound, channel_id=channel_id)
+            for token in valid_tokens
+        ])
+
         success_count = 0
         failed_count = 0
-
-        try:
-            async with httpx.AsyncClient() as client:
-                for i in range(0, len(messages), batch_size):
-                    batch = messages[i:i + batch_size]
-
-                    response = await client.post(
-                        EXPO_PUSH_URL,
-                        json=batch,
-                        headers={
-                            "Accept": "application/json",
-                            "Accept-Encoding": "gzip, deflate",
-                            "Content-Type": "application/json",
-                        },
-                        timeout=30.0,
-                    )
-
-                    if response.status_code == 200:
-                        result = response.json()
-                        # Count successes and failures
-                        for ticket in result.get("data", []):
-                            if ticket.get("status") == "ok":
-                                success_count += 1
-                            else:
-                                failed_count += 1
-                                logger.warning(f"Push notification failed: {ticket.get('message', 'Unknown error')}")
-                    else:
-                        failed_count += len(batch)
-                        logger.error(f"Batch push notification failed with status {response.status_code}")
-
-        except Exception as e:
-            logger.error(f"Error sending bulk push notifications: {e}")
-            failed_count += len(messages) - success_count
+        error = None
+        for result in results:
+            if isinstance(result, PushTransportError):
+                failed_count += 1
+                error = str(result)
+            elif result.get("status") == "ok":
+                success_count += 1
+            else:
+                failed_count += 1
+                logger.warning(f"Push notification failed: {result.get('message', 'Unknown error')}")
+
+        if db is not None:
+            try:
+                record_tickets(db, valid_tokens, results)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not record push tickets: {e}")
 
         logger.info(f"Bulk push: {success_count} sent, {failed_count} failed")
-        return {"success_count": success_count, "failed_count": failed_count}
+        result = {"success_count": success_count, "failed_count": failed_count}
+        if error:
+            # Transport-level failure (as opposed to per-token errors); worth retrying
+            result["error"] = error
+        return result
 
 
 # Singleton instance
 push_service = PushNotificationService()
 
 
+# Notification content for common notification types. Each builder returns
+# the keyword arguments for ``send_notifications_bulk`` minus the tokens, so
+# the same content can be sent inline or queued through the outbox.
+
+def promotion_push(promotion_title: str, promotion_value: float, client_name: str, promotion_id: int) -> Dict[str, Any]:
+    return {
+        "title": f"New Promotion from {client_name}!",
+        "body": f"{promotion_title} - Get {promotion_value} credits!",
+        "data": {
+            "promotion_id": promotion_id,
+            "client_name": client_name,
+            "value": promotion_value,
+            "action": "view_promotion",
+        },
+        "category": "promotion",
+        "channel_id": "promotions",
+    }
+
+
+def message_push(sender_name: str, message_preview: str, sender_id: int) -> Dict[str, Any]:
+    return {
+        "title": f"Message from {sender_name}",
+        "body": message_preview[:100] + ("..." if len(message_preview) > 100 else ""),
+        "data": {
+            "sender_id": sender_id,
+            "sender_name": sender_name,
+            "action": "open_chat",
+        },
+        "category": "message",
+        "channel_id": "messages",
+    }
+
+
+def credit_push(amount: float, reason: str, sender_name: Optional[str] = None) -> Dict[str, Any]:
+    body = f"You received {abs(amount)} credits"
+    if sender_name:
+        body += f" from {sender_name}"
+    if reason:
+        body += f" ({reason})"
+    return {
+        "title": "Credits Received!" if amount > 0 else "Credits Deducted",
+        "body": body,
+        "data": {
+            "amount": amount,
+            "reason": reason,
+            "action": "view_wallet",
+        },
+        "category": "credit_transfer",
+        "channel_id": "credits",
+    }
+
+
+def claim_push(promotion_title: str, status: str, value: float, client_name: str) -> Dict[str, Any]:
+    if status == "approved":
+        title = "Claim Approved!"
+        body = f"Your claim for '{promotion_title}' was approved! {value} credits added."
+    else:
+        title = "Claim Rejected"
+        body = f"Your claim for '{promotion_title}' was rejected."
+    return {
+        "title": title,
+        "body": body,
+        "data": {
+            "promotion_title": promotion_title,
+            "status": status,
+            "value": value,
+            "client_name": client_name,
+            "action": "view_claims",
+        },
+        "category": "claim",
+        "channel_id": "promotions",
+    }
+
+
+def friend_request_push(sender_id: int, sender_name: str, sender_username: str, sender_type: str) -> Dict[str, Any]:
+    display_name = sender_name or sender_username
+    sender_label = "Client" if sender_type == "client" else "Player"
+    return {
+        "title": "New Friend Request",
+        "body": f"{display_name} ({sender_label}) wants to connect with you",
+        "data": {
+            "sender_id": sender_id,
+            "sender_name": display_name,
+            "sender_username": sender_username,
+            "sender_type": sender_type,
+            "action": "view_friend_requests",
+        },
+        "category": "friend_request",
+        "channel_id": "friends",
+    }
+
+
+def friend_accepted_push(accepter_id: int, accepter_name: str, accepter_username: str, accepter_type: str) -> Dict[str, Any]:
+    display_name = accepter_name or accepter_username
+    accepter_label = "Client" if accepter_type == "client" else "Player"
+    return {
+        "title": "Friend Request Accepted!",
+        "body": f"{display_name} ({accepter_label}) accepted your friend request",
+        "data": {
+            "accepter_id": accepter_id,
+            "accepter_name": display_name,
+            "accepter_username": accepter_username,
+            "accepter_type": accepter_type,
+            "action": "view_profile",
+        },
+        "category": "friend_accepted",
+        "channel_id": "friends",
+    }
+
+
+async def send_to_users(db: Session, user_ids: List[int], content: Dict[str, Any]) -> Dict[str, Any]:
+    """Send built notification content to every active device of the users"""
+    tokens = active_tokens(db, user_ids)
+    if not tokens:
+        return {"success_count": 0, "failed_count": 0, "no_tokens": True}
+    return await push_service.send_notifications_bulk(tokens=tokens, db=db, **content)
+
+
 # Helper functions for common notification types
 async def send_promotion_notification(
     db: Session,
@@ -197,31 +288,12 @@ async def send_promotion_notification(
     """
     Send push notifications to users about a new promotion.
     """
-    # Get all active push tokens for the specified users
-    tokens = db.query(models.PushToken.token).filter(
-        models.PushToken.user_id.in_(user_ids),
-        models.PushToken.is_active == True
-    ).all()
-
-    token_list = [t[0] for t in tokens]
-
-    if not token_list:
-        logger.info(f"No push tokens found for promotion notification (users: {len(user_ids)})")
-        return {"success_count": 0, "failed_count": 0, "no_tokens": True}
-
-    return await push_service.send_notifications_bulk(
-        tokens=token_list,
-        title=f"New Promotion from {client_name}!",
-        body=f"{promotion_title} - Get {promotion_value} credits!",
-        data={
-            "promotion_id": promotion_id,
-            "client_name": client_name,
-            "value": promotion_value,
-            "action": "view_promotion",
-        },
-        category="promotion",
-        channel_id="promotions",
+    result = await send_to_users(
+        db, user_ids, promotion_push(promotion_title, promotion_value, client_name, promotion_id)
     )
+    if result.get("no_tokens"):
+        logger.info(f"No push tokens found for promotion notification (users: {len(user_ids)})")
+    return result
 
 
 async def send_message_notification(
@@ -234,30 +306,8 @@ async def send_message_notification(
     """
     Send push notification for a new message.
     """
-    tokens = db.query(models.PushToken.token).filter(
-        models.PushToken.user_id == receiver_id,
-        models.PushToken.is_active == True
-    ).all()
-
-    if not tokens:
-        return False
-
-    # Send to all user's devices
-    for (token,) in tokens:
-        await push_service.send_notification(
-            token=token,
-            title=f"Message from {sender_name}",
-            body=message_preview[:100] + ("..." if len(message_preview) > 100 else ""),
-            data={
-                "sender_id": sender_id,
-                "sender_name": sender_name,
-                "action": "open_chat",
-            },
-            category="message",
-            channel_id="messages",
-        )
-
-    return True
+    result = await send_to_users(db, [receiver_id], message_push(sender_name, message_preview, sender_id))
+    return not result.get("no_tokens")
 
 
 async def send_credit_notification(
@@ -270,36 +320,8 @@ async def send_credit_notification(
     """
     Send push notification for credit transfer.
     """
-    tokens = db.query(models.PushToken.token).filter(
-        models.PushToken.user_id == user_id,
-        models.PushToken.is_active == True
-    ).all()
-
-    if not tokens:
-        return False
-
-    title = "Credits Received!" if amount > 0 else "Credits Deducted"
-    body = f"You received {abs(amount)} credits"
-    if sender_name:
-        body += f" from {sender_name}"
-    if reason:
-        body += f" ({reason})"
-
-    for (token,) in tokens:
-        await push_service.send_notification(
-            token=token,
-            title=title,
-            body=body,
-            data={
-                "amount": amount,
-                "reason": reason,
-                "action": "view_wallet",
-            },
-            category="credit_transfer",
-            channel_id="credits",
-        )
-
-    return True
+    result = await send_to_users(db, [user_id], credit_push(amount, reason, sender_name))
+    return not result.get("no_tokens")
 
 
 async def send_claim_notification(
@@ -313,38 +335,8 @@ async def send_claim_notification(
     """
     Send push notification when promotion claim is approved/rejected.
     """
-    tokens = db.query(models.PushToken.token).filter(
-        models.PushToken.user_id == player_id,
-        models.PushToken.is_active == True
-    ).all()
-
-    if not tokens:
-        return False
-
-    if status == "approved":
-        title = "Claim Approved!"
-        body = f"Your claim for '{promotion_title}' was approved! {value} credits added."
-    else:
-        title = "Claim Rejected"
-        body = f"Your claim for '{promotion_title}' was rejected."
-
-    for (token,) in tokens:
-        await push_service.send_notification(
-            token=token,
-            title=title,
-            body=body,
-            data={
-                "promotion_title": promotion_title,
-                "status": status,
-                "value": value,
-                "client_name": client_name,
-                "action": "view_claims",
-            },
-            category="claim",
-            channel_id="promotions",
-        )
-
-    return True
+    result = await send_to_users(db, [player_id], claim_push(promotion_title, status, value, client_name))
+    return not result.get("no_tokens")
 
 
 async def send_friend_request_notification(
@@ -360,34 +352,10 @@ async def send_friend_request_notification(
     """
     db = SessionLocal()
     try:
-        tokens = db.query(models.PushToken.token).filter(
-            models.PushToken.user_id == receiver_id,
-            models.PushToken.is_active == True
-        ).all()
-
-        if not tokens:
-            return False
-
-        display_name = sender_name or sender_username
-        sender_label = "Client" if sender_type == "client" else "Player"
-
-        for (token,) in tokens:
-            await push_service.send_notification(
-                token=token,
-                title="New Friend Request",
-                body=f"{display_name} ({sender_label}) wants to connect with you",
-                data={
-                    "sender_id": sender_id,
-                    "sender_name": display_name,
-                    "sender_username": sender_username,
-                    "sender_type": sender_type,
-                    "action": "view_friend_requests",
-                },
-                category="friend_request",
-                channel_id="friends",
-            )
-
-        return True
+        result = await send_to_users(
+            db, [receiver_id], friend_request_push(sender_id, sender_name, sender_username, sender_type)
+        )
+        return not result.get("no_tokens")
     finally:
         db.close()
 
@@ -405,33 +373,9 @@ async def send_friend_request_accepted_notification(
     """
     db = SessionLocal()
     try:
-        tokens = db.query(models.PushToken.token).filter(
-            models.PushToken.user_id == sender_id,
-            models.PushToken.is_active == True
-        ).all()
-
-        if not tokens:
-            return False
-
-        display_name = accepter_name or accepter_username
-        accepter_label = "Client" if accepter_type == "client" else "Player"
-
-        for (token,) in tokens:
-            await push_service.send_notification(
-                token=token,
-                title="Friend Request Accepted!",
-                body=f"{display_name} ({accepter_label}) accepted your friend request",
-                data={
-                    "accepter_id": accepter_id,
-                    "accepter_name": display_name,
-                    "accepter_username": accepter_username,
-                    "accepter_type": accepter_type,
-                    "action": "view_profile",
-                },
-                category="friend_accepted",
-                channel_id="friends",
-            )
-
-        return True
+        result = await send_to_users(
+            db, [sender_id], friend_accepted_push(accepter_id, accepter_name, accepter_username, accepter_type)
+        )
+        return not result.get("no_tokens")
     finally:
         db.close()
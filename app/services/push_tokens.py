@@ -0,0 +1,268 @@
+"""
+Push token bookkeeping
+
+- ``token_cache``: active tokens per user, so sends skip the PushToken query
+- ``record_tickets``: stores accepted Expo tickets for receipt polling and
+  applies errors Expo reports immediately
+- ``poll_receipts``: scheduler job that fetches receipts in batches and
+  updates per-token delivery stats
+
+Expo reports an uninstalled app as ``DeviceNotRegistered``, either on the
+ticket or, more often, on the receipt a few minutes later. Such tokens are
+deactivated in bulk, as are tokens that failed
+``PUSH_MAX_CONSECUTIVE_FAILURES`` times in a row. Sends only use active
+tokens, so dead devices stop costing a request slot.
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import insert, or_, select, delete, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.core import get_logger
+from app.models import PushReceipt, PushToken
+from app.services.push_dispatcher import EXPO_HEADERS
+
+logger = get_logger(__name__)
+
+EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
+EXPO_MAX_RECEIPT_IDS = 1000  # Expo's per-request maximum
+RECEIPT_RETENTION = timedelta(hours=24)  # Expo forgets receipts after a day
+
+# Errors that mean the token will never work again
+DEAD_TOKEN_ERRORS = {"DeviceNotRegistered"}
+
+
+# ============= Token Cache =============
+
+class PushTokenCache:
+    """
+    Active push tokens per user, cached for ``PUSH_TOKEN_CACHE_SECONDS``
+
+    notifications.register_push_token/unregister_push_token and token
+    deactivation invalidate the user on this worker; other workers pick the
+    change up when the entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float = settings.PUSH_TOKEN_CACHE_SECONDS, max_users: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: Dict[int, Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, db: Session, user_ids: List[int]) -> List[str]:
+        """Tokens of all the users; cache misses are loaded in one query"""
+        now = time.monotonic()
+        tokens: List[str] = []
+        missing = set()
+        with self._lock:
+            for user_id in set(user_ids):
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[0] > now:
+                    tokens.extend(entry[1])
+                else:
+                    missing.add(user_id)
+        if not missing:
+            return tokens
+
+        loaded: Dict[int, List[str]] = {user_id: [] for user_id in missing}
+        for user_id, token in db.query(models.PushToken.user_id, models.PushToken.token).filter(
+            models.PushToken.user_id.in_(missing),
+            models.PushToken.is_active == True
+        ):
+            loaded[user_id].append(token)
+
+        expires = now + self.ttl_seconds
+        with self._lock:
+            if len(self._entries) + len(loaded) > self.max_users:
+                self._entries.clear()
+            for user_id, user_tokens in loaded.items():
+                self._entries[user_id] = (expires, user_tokens)
+                tokens.extend(user_tokens)
+        return tokens
+
+    def invalidate(self, *user_ids: int):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = PushTokenCache()
+
+
+def active_tokens(db: Session, user_ids: List[int]) -> List[str]:
+    """Active push tokens of the given users"""
+    return token_cache.get_many(db, user_ids)
+
+
+# ============= Delivery Outcomes =============
+
+def _error_code(result: Dict[str, Any]) -> str:
+    return ((result.get("details") or {}).get("error") or result.get("message") or "unknown")[:100]
+
+
+def apply_outcomes(db: Session, delivered: Iterable[str], failed: Iterable[Tuple[str, str]]) -> int:
+    """
+    Update per-token stats for delivered tokens and (token, error code) failures
+
+    Tokens with a dead-token error, or too many consecutive failures, are
+    deactivated. Does not commit.
+
+    Returns:
+        Number of tokens deactivated
+    """
+    T = PushToken
+    # One UPDATE per distinct increment rather than per token
+    by_count: Dict[int, List[str]] = {}
+    for token, count in Counter(delivered).items():
+        by_count.setdefault(count, []).append(token)
+    for count, tokens in by_count.items():
+        db.execute(
+            update(T).where(T.token.in_(tokens))
+            .values(receipt_count=T.receipt_count + count, consecutive_failures=0)
+            .execution_options(synchronize_session=False)
+        )
+
+    failures = Counter(failed)
+    by_outcome: Dict[Tuple[str, int], List[str]] = {}
+    for (token, code), count in failures.items():
+        by_outcome.setdefault((code, count), []).append(token)
+    for (code, count), tokens in by_outcome.items():
+        db.execute(
+            update(T).where(T.token.in_(tokens))
+            .values(
+                receipt_count=T.receipt_count + count,
+                failure_count=T.failure_count + count,
+                consecutive_failures=T.consecutive_failures + count,
+                last_error=code
+            )
+            .execution_options(synchronize_session=False)
+        )
+    if not failures:
+        return 0
+
+    failed_tokens = {token for token, _ in failures}
+    dead = {token for token, code in failures if code in DEAD_TOKEN_ERRORS}
+    deactivated = db.execute(
+        update(T)
+        .where(
+            T.token.in_(failed_tokens),
+            T.is_active == True,
+            or_(T.token.in_(dead), T.consecutive_failures >= settings.PUSH_MAX_CONSECUTIVE_FAILURES)
+        )
+        .values(is_active=False)
+        .returning(T.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if deactivated:
+        token_cache.invalidate(*deactivated)
+        logger.info(f"Deactivated {len(deactivated)} dead push tokens")
+    return len(deactivated)
+
+
+def record_tickets(db: Session, tokens: List[str], tickets: List[Any]):
+    """
+    Store accepted tickets for receipt polling and apply immediate errors
+
+    ``tickets`` holds one Expo ticket per token (transport failures, which
+    say nothing about the token, are skipped). Commits.
+    """
+    now = datetime.now(timezone.utc)
+    pending = []
+    failed = []
+    for token, ticket in zip(tokens, tickets):
+        if not isinstance(ticket, dict):
+            continue
+        if ticket.get("status") == "ok":
+            if ticket.get("id"):
+                pending.append({"ticket_id": ticket["id"], "token": token, "created_at": now})
+        else:
+            failed.append((token, _error_code(ticket)))
+    if pending:
+        db.execute(insert(PushReceipt), pending)
+    apply_outcomes(db, [], failed)
+    db.commit()
+
+
+def poll_receipts(
+    db: Session,
+    url: str = EXPO_RECEIPTS_URL,
+    min_age_seconds: Optional[float] = None,
+    chunk_size: int = EXPO_MAX_RECEIPT_IDS,
+    transport: Optional[httpx.BaseTransport] = None
+) -> Dict[str, int]:
+    """
+    Fetch receipts for tickets older than ``PUSH_RECEIPT_DELAY_SECONDS``
+
+    Tickets are read in ``chunk_size`` batches (one Expo request and one
+    transaction each). Tickets without a receipt are kept for the next run
+    until Expo's 24 hour retention has passed.
+    """
+    R = PushReceipt
+    if min_age_seconds is None:
+        min_age_seconds = settings.PUSH_RECEIPT_DELAY_SECONDS
+    now = datetime.now(timezone.utc)
+    ready_before = now - timedelta(seconds=min_age_seconds)
+    stats = {"checked": 0, "delivered": 0, "failed": 0, "deactivated": 0, "expired": 0}
+
+    with httpx.Client(timeout=30.0, headers=EXPO_HEADERS, transport=transport) as client:
+        last_id = ""
+        while True:
+            rows = db.execute(
+                select(R.ticket_id, R.token)
+                .where(R.created_at <= ready_before, R.ticket_id > last_id)
+                .order_by(R.ticket_id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].ticket_id
+            tokens = {row.ticket_id: row.token for row in rows}
+
+            try:
+                response = client.post(url, json={"ids": list(tokens)})
+                response.raise_for_status()
+                receipts = response.json().get("data", {})
+            except (httpx.HTTPError, ValueError) as e:
+                # Try again on the next run
+                logger.warning(f"Push receipt request failed: {e}")
+                break
+
+            delivered, failed = [], []
+            for ticket_id, receipt in receipts.items():
+                token = tokens.get(ticket_id)
+                if token is None:
+                    continue
+                if receipt.get("status") == "ok":
+                    delivered.append(token)
+                else:
+                    failed.append((token, _error_code(receipt)))
+            stats["checked"] += len(rows)
+            stats["delivered"] += len(delivered)
+            stats["failed"] += len(failed)
+            stats["deactivated"] += apply_outcomes(db, delivered, failed)
+
+            answered = [ticket_id for ticket_id in receipts if ticket_id in tokens]
+            if answered:
+                db.execute(
+                    delete(R).where(R.ticket_id.in_(answered)).execution_options(synchronize_session=False)
+                )
+            db.commit()
+
+    # Receipts Expo no longer has
+    stats["expired"] = db.execute(
+        delete(R).where(R.created_at < now - RECEIPT_RETENTION).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return stats
@@ -0,0 +1,411 @@
+"""
+RTP Simulator
+Vectorized Monte Carlo simulation of the mini-game payout tables
+
+The live engine resolves one bet at a time through ``resolve_dice`` /
+``resolve_slots``. Both games have a small, finite outcome space (36 dice
+rolls, ``len(SLOTS_SYMBOLS) ** 3`` reel combinations), so the simulator
+builds a win-amount lookup table by calling those same functions once per
+outcome, then draws millions of outcomes with NumPy and indexes the table.
+Any change to the payout logic or config tables is picked up automatically.
+
+Besides the Monte Carlo estimate, the lookup tables give the exact
+RTP/variance by enumeration, which the simulation is checked against.
+
+``compare_with_transactions`` re-resolves recorded ``bet_transactions`` and
+tests their aggregate RTP against the expected value.
+
+Requires numpy (tooling only, not imported by the API; see requirements-dev.txt).
+
+Usage:
+    python scripts/simulate_rtp.py --game slots --spins 10000000
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    DICE_MIN_PREDICTION,
+    DICE_MAX_PREDICTION,
+    MIN_BET_AMOUNT,
+    SLOTS_SYMBOLS
+)
+from app.models.enums import GameType
+from app.services.bet_engine import resolve_dice, resolve_slots
+
+# Outcomes drawn per batch; bounds memory for very large runs
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# One-sided z-score used for the bankroll risk estimate (99%)
+Z_99 = 2.326
+
+
+@dataclass
+class SimulationResult:
+    """Summary statistics for one simulated game configuration"""
+    game: str
+    label: str
+    spins: int
+    bet_amount: int
+    rtp: float
+    hit_rate: float
+    variance: float
+    expected_rtp: float
+    expected_hit_rate: float
+    expected_variance: float
+    max_win: int
+    elapsed_seconds: float = 0.0
+
+    @property
+    def house_edge(self) -> float:
+        return 1 - self.rtp
+
+    @property
+    def std_error(self) -> float:
+        """Standard error of the simulated RTP"""
+        return math.sqrt(self.expected_variance / self.spins) if self.spins else 0.0
+
+    @property
+    def z_score(self) -> float:
+        """Distance of the simulated RTP from the exact RTP in standard errors"""
+        return (self.rtp - self.expected_rtp) / self.std_error if self.std_error else 0.0
+
+    def house_loss_p99(self, rounds: int) -> float:
+        """
+        House loss (in bets) not exceeded with 99% probability over a number
+        of rounds, by normal approximation. 0 when the edge covers the swing.
+        """
+        edge = (1 - self.expected_rtp) * rounds
+        swing = Z_99 * math.sqrt(self.expected_variance * rounds)
+        return max(0.0, swing - edge)
+
+    def to_dict(self) -> Dict:
+        return {
+            "game": self.game,
+            "label": self.label,
+            "spins": self.spins,
+            "bet_amount": self.bet_amount,
+            "rtp": self.rtp,
+            "expected_rtp": self.expected_rtp,
+            "house_edge": self.house_edge,
+            "hit_rate": self.hit_rate,
+            "expected_hit_rate": self.expected_hit_rate,
+            "variance": self.variance,
+            "expected_variance": self.expected_variance,
+            "z_score": self.z_score,
+            "max_win": self.max_win,
+            "elapsed_seconds": self.elapsed_seconds,
+        }
+
+
+@dataclass
+class TransactionComparison:
+    """Observed bet_transactions checked against the payout tables"""
+    game: str
+    count: int
+    total_bet: int
+    total_won: int
+    expected_won: float
+    expected_std: float
+    payout_mismatches: int
+    mismatch_ids: List[int] = field(default_factory=list)
+    # Rows whose game_data cannot be re-resolved; left out of every total
+    unparseable: int = 0
+    unparseable_ids: List[int] = field(default_factory=list)
+
+    @property
+    def observed_rtp(self) -> float:
+        return self.total_won / self.total_bet if self.total_bet else 0.0
+
+    @property
+    def z_score(self) -> float:
+        if not self.expected_std:
+            return 0.0
+        return (self.total_won - self.expected_won) / self.expected_std
+
+    def to_dict(self) -> Dict:
+        return {
+            "game": self.game,
+            "count": self.count,
+            "total_bet": self.total_bet,
+            "total_won": self.total_won,
+            "observed_rtp": self.observed_rtp,
+            "expected_won": self.expected_won,
+            "z_score": self.z_score,
+            "payout_mismatches": self.payout_mismatches,
+            "mismatch_ids": self.mismatch_ids,
+            "unparseable": self.unparseable,
+            "unparseable_ids": self.unparseable_ids,
+        }
+
+
+# ============= Payout tables =============
+
+def dice_win_table(bet_amount: int, prediction: int) -> np.ndarray:
+    """
+    Win amounts for every (dice1, dice2) roll, indexed [dice1 - 1, dice2 - 1]
+
+    Built with ``resolve_dice`` so the table is the live payout logic.
+    """
+    table = np.zeros((6, 6), dtype=np.int64)
+    for d1 in range(1, 7):
+        for d2 in range(1, 7):
+            table[d1 - 1, d2 - 1] = resolve_dice(bet_amount, prediction, d1, d2).win_amount
+    return table
+
+
+def slots_win_table(bet_amount: int) -> np.ndarray:
+    """
+    Win amounts for every reel combination, indexed by symbol position
+    in ``SLOTS_SYMBOLS``
+
+    Built with ``resolve_slots`` so the table is the live payout logic.
+    """
+    n = len(SLOTS_SYMBOLS)
+    table = np.zeros((n, n, n), dtype=np.int64)
+    for i, a in enumerate(SLOTS_SYMBOLS):
+        for j, b in enumerate(SLOTS_SYMBOLS):
+            for k, c in enumerate(SLOTS_SYMBOLS):
+                table[i, j, k] = resolve_slots(bet_amount, (a, b, c)).win_amount
+    return table
+
+
+def exact_stats(table: np.ndarray, bet_amount: int) -> Dict[str, float]:
+    """
+    Exact RTP, hit rate and per-bet variance of a uniformly drawn table
+
+    Returns:
+        Dict with rtp, hit_rate and variance (of win / bet)
+    """
+    returns = table.astype(np.float64).ravel() / bet_amount
+    rtp = float(returns.mean())
+    return {
+        "rtp": rtp,
+        "hit_rate": float((returns > 0).mean()),
+        "variance": float(((returns - rtp) ** 2).mean()),
+    }
+
+
+# ============= Simulation =============
+
+def _simulate(
+    game: str,
+    label: str,
+    table: np.ndarray,
+    bet_amount: int,
+    spins: int,
+    rng: np.random.Generator,
+    chunk_size: int
+) -> SimulationResult:
+    start = time.perf_counter()
+    flat = table.ravel()
+    total_won = 0
+    total_sq = 0.0
+    hits = 0
+    remaining = spins
+
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        # Each outcome is a uniform index into the flattened table. Drawing
+        # the reels / dice separately and combining them is equivalent,
+        # since every outcome dimension is uniform and independent.
+        wins = flat[rng.integers(0, flat.size, size=size)]
+        total_won += int(wins.sum())
+        total_sq += float(np.square(wins, dtype=np.float64).sum())
+        hits += int(np.count_nonzero(wins))
+        remaining -= size
+
+    rtp = total_won / (spins * bet_amount) if spins else 0.0
+    mean_sq = total_sq / (spins * bet_amount ** 2) if spins else 0.0
+    exact = exact_stats(table, bet_amount)
+
+    return SimulationResult(
+        game=game,
+        label=label,
+        spins=spins,
+        bet_amount=bet_amount,
+        rtp=rtp,
+        hit_rate=hits / spins if spins else 0.0,
+        variance=mean_sq - rtp ** 2,
+        expected_rtp=exact["rtp"],
+        expected_hit_rate=exact["hit_rate"],
+        expected_variance=exact["variance"],
+        max_win=int(flat.max()),
+        elapsed_seconds=time.perf_counter() - start,
+    )
+
+
+def simulate_dice(
+    spins: int,
+    prediction: int,
+    bet_amount: int = MIN_BET_AMOUNT,
+    seed: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> SimulationResult:
+    """
+    Simulate dice bets on a fixed prediction
+
+    Args:
+        spins: Number of rolls
+        prediction: Predicted total (DICE_MIN_PREDICTION..DICE_MAX_PREDICTION)
+        bet_amount: Stake per roll (affects integer truncation of winnings)
+        seed: RNG seed for reproducible runs
+        chunk_size: Rolls drawn per batch
+    """
+    table = dice_win_table(bet_amount, prediction)
+    return _simulate(
+        "dice", f"prediction={prediction}", table, bet_amount, spins,
+        np.random.default_rng(seed), chunk_size
+    )
+
+
+def simulate_slots(
+    spins: int,
+    bet_amount: int = MIN_BET_AMOUNT,
+    seed: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> SimulationResult:
+    """
+    Simulate slot spins
+
+    Args:
+        spins: Number of spins
+        bet_amount: Stake per spin (affects integer truncation of winnings)
+        seed: RNG seed for reproducible runs
+        chunk_size: Spins drawn per batch
+    """
+    table = slots_win_table(bet_amount)
+    return _simulate(
+        "slots", "all", table, bet_amount, spins,
+        np.random.default_rng(seed), chunk_size
+    )
+
+
+def simulate_all(
+    spins: int,
+    bet_amount: int = MIN_BET_AMOUNT,
+    seed: Optional[int] = None,
+    games: tuple = ("dice", "slots")
+) -> List[SimulationResult]:
+    """Simulate slots and every dice prediction with the same spin count"""
+    rng_seed = np.random.SeedSequence(seed)
+    children = iter(rng_seed.spawn(DICE_MAX_PREDICTION + 1))
+    results = []
+
+    if "dice" in games:
+        for prediction in range(DICE_MIN_PREDICTION, DICE_MAX_PREDICTION + 1):
+            results.append(simulate_dice(spins, prediction, bet_amount, next(children)))
+    if "slots" in games:
+        results.append(simulate_slots(spins, bet_amount, next(children)))
+    return results
+
+
+# ============= Observed transactions =============
+
+def _recorded_win(game_type: GameType, bet_amount: int, game_data: Dict) -> Optional[int]:
+    """Win amount the payout logic gives for a recorded outcome"""
+    if game_type == GameType.LUCKY_DICE:
+        return resolve_dice(
+            bet_amount, game_data["prediction"], game_data["dice1"], game_data["dice2"]
+        ).win_amount
+    if game_type == GameType.LUCKY_SLOTS:
+        return resolve_slots(bet_amount, game_data["symbols"]).win_amount
+    return None
+
+
+def compare_with_transactions(
+    db: Session,
+    game_type: GameType,
+    batch_size: int = 5000,
+    max_mismatch_ids: int = 20
+) -> TransactionComparison:
+    """
+    Check recorded bets against the current payout tables.
+
+    Every row is re-resolved from its stored outcome (``game_data``); any
+    row whose ``win_amount`` differs is counted as a payout mismatch. The
+    aggregate winnings are compared with the expected winnings for the
+    same stakes (and, for dice, the same predictions) as a z-score. Rows
+    whose ``game_data`` is malformed are reported as unparseable and left
+    out of the totals, rather than scored against the wrong table.
+
+    Note: rows recorded before a payout table change will show up as
+    mismatches - filter by date in that case.
+    """
+    expected_cache: Dict[tuple, Dict[str, float]] = {}
+    expected_won = 0.0
+    expected_var = 0.0
+    mismatches = 0
+    mismatch_ids: List[int] = []
+    unparseable = skipped_bet = skipped_won = 0
+    unparseable_ids: List[int] = []
+
+    rows = (
+        db.query(
+            models.BetTransaction.id,
+            models.BetTransaction.bet_amount,
+            models.BetTransaction.win_amount,
+            models.BetTransaction.game_data
+        )
+        .filter(models.BetTransaction.game_type == game_type)
+        .order_by(models.BetTransaction.id)
+        .yield_per(batch_size)
+    )
+
+    for row in rows:
+        try:
+            game_data = json.loads(row.game_data) if row.game_data else {}
+            recorded = _recorded_win(game_type, row.bet_amount, game_data)
+        except (ValueError, KeyError, TypeError):
+            unparseable += 1
+            if len(unparseable_ids) < max_mismatch_ids:
+                unparseable_ids.append(row.id)
+            skipped_bet += row.bet_amount
+            skipped_won += row.win_amount
+            continue
+
+        if recorded != row.win_amount:
+            mismatches += 1
+            if len(mismatch_ids) < max_mismatch_ids:
+                mismatch_ids.append(row.id)
+
+        prediction = game_data.get("prediction") if game_type == GameType.LUCKY_DICE else None
+        key = (row.bet_amount, prediction)
+        stats = expected_cache.get(key)
+        if stats is None:
+            if game_type == GameType.LUCKY_DICE and prediction is not None:
+                table = dice_win_table(row.bet_amount, prediction)
+            else:
+                table = slots_win_table(row.bet_amount)
+            stats = exact_stats(table, row.bet_amount)
+            expected_cache[key] = stats
+
+        expected_won += stats["rtp"] * row.bet_amount
+        expected_var += stats["variance"] * row.bet_amount ** 2
+
+    totals = db.query(
+        func.count(models.BetTransaction.id),
+        func.coalesce(func.sum(models.BetTransaction.bet_amount), 0),
+        func.coalesce(func.sum(models.BetTransaction.win_amount), 0)
+    ).filter(models.BetTransaction.game_type == game_type).one()
+
+    return TransactionComparison(
+        game="dice" if game_type == GameType.LUCKY_DICE else "slots",
+        count=totals[0] - unparseable,
+        total_bet=int(totals[1]) - skipped_bet,
+        total_won=int(totals[2]) - skipped_won,
+        expected_won=expected_won,
+        expected_std=math.sqrt(expected_var),
+        payout_mismatches=mismatches,
+        mismatch_ids=mismatch_ids,
+        unparseable=unparseable,
+        unparseable_ids=unparseable_ids,
+    )
@@ -0,0 +1,392 @@
+"""
+Background Job Scheduler
+
+Runs time-based state changes on a schedule instead of waiting for a user
+or an admin to trigger them:
+
+- expire_promotions         ACTIVE promotions past ``end_date`` -> EXPIRED
+- expire_report_warnings    WARNING reports past ``warning_deadline`` -> VALID
+- clear_expired_otps        email OTP codes past ``email_otp_expires_at`` are cleared
+- lift_expired_suspensions  suspensions past ``suspended_until`` are lifted
+- expire_pending_referrals  PENDING referrals older than
+                            ``REFERRAL_PENDING_EXPIRY_DAYS`` -> EXPIRED
+- compact_client_analytics  ``client_analytics.compact``
+- reconcile_ledger          ``ledger.reconcile`` (logs any mismatch)
+- purge_outbox              delivered outbox messages past ``OUTBOX_RETENTION_DAYS``
+- poll_push_receipts        ``push_tokens.poll_receipts`` (deactivates dead tokens)
+- purge_accounts            ``account_purge.purge_accounts`` (deleted accounts'
+                            data, in bounded batches)
+
+Transitions are chunked bulk UPDATEs: ids are selected
+``SCHEDULER_CHUNK_SIZE`` at a time and updated with the condition
+re-checked, committing per chunk, so locks stay short and a row changed in
+the meantime is left alone.
+
+Every worker runs a scheduler, but only the holder of the
+``scheduler_leases`` row runs jobs. The leader renews its lease on every
+tick; if it dies, another worker takes over once the lease expires. All
+jobs are idempotent, so a brief overlap during a takeover is harmless.
+
+Job timings and last-run status are served by GET /monitoring/scheduler.
+"""
+
+import asyncio
+import os
+import secrets
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.core import get_logger
+from app.database import SessionLocal
+from app.models import PromotionStatus, ReferralStatus, ReportStatus, SchedulerLease
+
+logger = get_logger(__name__)
+
+LEASE_NAME = "scheduler"
+
+AUTO_VALIDATED_NOTE = " | Auto-validated: User did not resolve within deadline"
+
+
+# ============= Transitions =============
+
+def update_in_chunks(db: Session, model, conditions: List, values: Dict, chunk_size: Optional[int] = None) -> int:
+    """
+    Apply ``values`` to every row matching ``conditions``, ``chunk_size``
+    rows per UPDATE, committing after each chunk. ``values`` must make the
+    conditions false, otherwise the loop would revisit the same rows.
+
+    Returns:
+        Number of rows updated
+    """
+    chunk_size = chunk_size or settings.SCHEDULER_CHUNK_SIZE
+    total = 0
+    while True:
+        ids = db.execute(
+            select(model.id).where(*conditions).order_by(model.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        total += db.execute(
+            update(model)
+            .where(model.id.in_(ids), *conditions)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if len(ids) < chunk_size:
+            break
+    return total
+
+
+def expire_promotions(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Mark active promotions past their end date as expired"""
+    P = models.Promotion
+    return update_in_chunks(
+        db, P,
+        [P.status == PromotionStatus.ACTIVE, P.end_date < datetime.now(timezone.utc)],
+        {"status": PromotionStatus.EXPIRED},
+        chunk_size
+    )
+
+
+def expire_report_warnings(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Auto-validate reports whose warning period ended without a resolution"""
+    R = models.Report
+    return update_in_chunks(
+        db, R,
+        [R.status == ReportStatus.WARNING, R.warning_deadline < datetime.now(timezone.utc)],
+        {
+            "status": ReportStatus.VALID,
+            "auto_validated": 1,
+            "action_taken": func.coalesce(R.action_taken, "") + AUTO_VALIDATED_NOTE,
+        },
+        chunk_size
+    )
+
+
+def clear_expired_otps(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Clear email OTP codes that can no longer be used"""
+    U = models.User
+    return update_in_chunks(
+        db, U,
+        [U.email_otp.isnot(None), U.email_otp_expires_at < datetime.now(timezone.utc)],
+        {"email_otp": None, "email_otp_expires_at": None},
+        chunk_size
+    )
+
+
+def lift_expired_suspensions(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Lift temporary suspensions whose end date has passed"""
+    U = models.User
+    return update_in_chunks(
+        db, U,
+        [U.is_suspended == True, U.suspended_until < datetime.now(timezone.utc)],
+        {"is_suspended": False, "suspension_reason": None, "suspended_until": None},
+        chunk_size
+    )
+
+
+def expire_pending_referrals(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Expire referrals whose referred user never completed registration"""
+    R = models.Referral
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.REFERRAL_PENDING_EXPIRY_DAYS)
+    return update_in_chunks(
+        db, R,
+        [R.status == ReferralStatus.PENDING, R.created_at < cutoff],
+        {"status": ReferralStatus.EXPIRED},
+        chunk_size
+    )
+
+
+def compact_client_analytics(db: Session) -> int:
+    from app.services.client_analytics import compact
+    return compact(db)
+
+
+def reconcile_ledger(db: Session) -> Dict[str, int]:
+    from app.services.ledger import reconcile
+    report = reconcile(db)
+    return {
+        "users_checked": report.users_checked,
+        "balance_mismatches": len(report.balance_mismatches),
+        "unbalanced_transactions": len(report.unbalanced_transactions),
+    }
+
+
+def purge_outbox(db: Session) -> int:
+    from app.services.outbox import purge_delivered
+    return purge_delivered(db)
+
+
+def poll_push_receipts(db: Session) -> Dict[str, int]:
+    from app.services.push_tokens import poll_receipts
+    return poll_receipts(db)
+
+
+def purge_accounts(db: Session) -> Dict[str, int]:
+    from app.services.account_purge import purge_accounts as run
+    return run(db)
+
+
+# ============= Scheduler =============
+
+@dataclass
+class Job:
+    """A registered job and its run history"""
+    name: str
+    interval_seconds: float
+    func: Callable[[Session], Any]
+    runs: int = 0
+    failures: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    total_duration_ms: float = 0.0
+    last_status: Optional[str] = None  # "ok" or "error"
+    last_error: Optional[str] = None
+    last_result: Any = None
+    next_run_at: float = field(default=0.0, repr=False)  # time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_ms": self.last_duration_ms,
+            "avg_duration_ms": round(self.total_duration_ms / self.runs, 2) if self.runs else None,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+        }
+
+
+class JobScheduler:
+    """Interval scheduler whose jobs run only on the lease-holding worker"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        tick_seconds: float = settings.SCHEDULER_TICK_SECONDS,
+        lease_seconds: float = settings.SCHEDULER_LEASE_SECONDS,
+        lease_name: str = LEASE_NAME
+    ):
+        self.session_factory = session_factory
+        self.tick_seconds = tick_seconds
+        self.lease_seconds = lease_seconds
+        self.lease_name = lease_name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self.jobs: Dict[str, Job] = {}
+        self.is_leader = False
+        self._run_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, interval_seconds: float, func: Callable[[Session], Any]):
+        """Run ``func(db)`` every ``interval_seconds``; the first run is on the first leader tick"""
+        self.jobs[name] = Job(name=name, interval_seconds=interval_seconds, func=func)
+
+    # ============= Leadership =============
+
+    def try_acquire_lease(self) -> bool:
+        """Take or renew the lease; False if another worker holds it"""
+        L = SchedulerLease
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        db = self.session_factory()
+        try:
+            renewed = db.execute(
+                update(L)
+                .where(L.name == self.lease_name, or_(L.holder == self.holder, L.expires_at < now))
+                .values(holder=self.holder, expires_at=expires_at)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not renewed:
+                db.execute(insert(L).values(name=self.lease_name, holder=self.holder, expires_at=expires_at))
+            db.commit()
+            acquired = True
+        except IntegrityError:
+            # The lease row exists and belongs to a live worker
+            db.rollback()
+            acquired = False
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Scheduler lease check failed: {e}")
+            acquired = False
+        finally:
+            db.close()
+
+        if acquired != self.is_leader:
+            logger.info(f"Scheduler {self.holder} {'became' if acquired else 'is no longer'} leader")
+        self.is_leader = acquired
+        return acquired
+
+    def release_lease(self):
+        """Let another worker take over immediately"""
+        if not self.is_leader:
+            return
+        L = SchedulerLease
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(L)
+                .where(L.name == self.lease_name, L.holder == self.holder)
+                .values(expires_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Scheduler lease release failed: {e}")
+        finally:
+            db.close()
+            self.is_leader = False
+
+    # ============= Running =============
+
+    def run_job(self, name: str) -> Job:
+        """
+        Run one job now in its own session, recording timing and outcome
+
+        Raises:
+            KeyError: if no job has that name
+        """
+        job = self.jobs[name]
+        with self._run_lock:
+            job.last_started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                job.last_result = job.func(db)
+                job.last_status = "ok"
+                job.last_error = None
+            except Exception as e:
+                db.rollback()
+                job.failures += 1
+                job.last_status = "error"
+                job.last_error = str(e)
+                logger.error(f"Scheduled job {name} failed: {e}")
+            finally:
+                db.close()
+                job.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+                job.total_duration_ms += job.last_duration_ms
+                job.runs += 1
+                job.next_run_at = time.monotonic() + job.interval_seconds
+        return job
+
+    def run_due_jobs(self) -> List[str]:
+        """
+        One scheduler tick: renew the lease and, if leader, run every due job
+
+        Returns:
+            Names of the jobs that ran
+        """
+        if not self.try_acquire_lease():
+            return []
+        ran = []
+        for job in list(self.jobs.values()):
+            if time.monotonic() >= job.next_run_at:
+                self.run_job(job.name)
+                ran.append(job.name)
+        return ran
+
+    async def _run_loop(self):
+        logger.info(f"Scheduler {self.holder} started with {len(self.jobs)} jobs")
+        try:
+            while True:
+                try:
+                    await asyncio.to_thread(self.run_due_jobs)
+                except Exception as e:
+                    logger.warning(f"Scheduler tick failed: {e}")
+                await asyncio.sleep(self.tick_seconds)
+        finally:
+            logger.info(f"Scheduler {self.holder} stopped")
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await asyncio.to_thread(self.release_lease)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "is_leader": self.is_leader,
+            "holder": self.holder,
+            "tick_seconds": self.tick_seconds,
+            "jobs": [job.as_dict() for job in self.jobs.values()],
+        }
+
+
+def register_default_jobs(target: JobScheduler):
+    target.register("expire_promotions", 60, expire_promotions)
+    target.register("expire_report_warnings", 300, expire_report_warnings)
+    target.register("clear_expired_otps", 300, clear_expired_otps)
+    target.register("lift_expired_suspensions", 300, lift_expired_suspensions)
+    target.register("expire_pending_referrals", 3600, expire_pending_referrals)
+    target.register("compact_client_analytics", 900, compact_client_analytics)
+    target.register("reconcile_ledger", 3600, reconcile_ledger)
+    target.register("purge_outbox", 3600, purge_outbox)
+    target.register("poll_push_receipts", 300, poll_push_receipts)
+    target.register("purge_accounts", 15, purge_accounts)
+
+
+scheduler = JobScheduler()
+register_default_jobs(scheduler)
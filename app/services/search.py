@@ -0,0 +1,147 @@
+"""
+Full-Text Search
+
+Ranked search over chat messages, ticket messages and community posts.
+Each database has a backend that turns the user's text into a subquery of
+``(id, rank)`` hits against one of ``SEARCH_INDEXES``
+(see app/models/search_index.py):
+
+- ``PostgresSearchBackend``: ``websearch_to_tsquery`` matched against the
+  GIN-indexed ``to_tsvector`` expression, ranked by ``ts_rank_cd``
+- ``SQLiteSearchBackend``: an FTS5 ``MATCH`` ranked by ``bm25``
+- ``LikeSearchBackend``: unindexed ``ILIKE`` fallback for other databases
+
+Higher rank is better for every backend. Callers join the hits to the
+source table, add their permission filters and page with
+``search_keys`` — rank descending, then id — through the keyset
+paginator in app/pagination.py.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Float, column, func, literal, literal_column, select, table
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.selectable import Subquery
+
+from app.core import get_logger
+from app.models import SEARCH_CONFIG, SEARCH_INDEXES, SearchIndex
+from app.pagination import SortKey
+
+logger = get_logger(__name__)
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+# ============= Backends =============
+
+class SearchBackend:
+    """Matches and ranks rows of one search index"""
+    name = ""
+
+    def hits(self, index: SearchIndex, text: str) -> Optional[Subquery]:
+        """
+        Subquery of matching rows
+
+        Returns:
+            Subquery with ``id`` and ``rank`` columns, or None if ``text``
+            has nothing to search for
+        """
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    name = "postgresql"
+
+    def hits(self, index: SearchIndex, text: str) -> Optional[Subquery]:
+        if not _TERM.search(text):
+            return None
+        # Must match the indexed expression exactly for the GIN index to be used
+        config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        vector = func.to_tsvector(config, index.table.c[index.column])
+        query = func.websearch_to_tsquery(config, text)
+        return select(
+            index.table.c.id.label("id"),
+            func.ts_rank_cd(vector, query, type_=Float).label("rank")
+        ).where(vector.op("@@")(query)).subquery("hits")
+
+
+class SQLiteSearchBackend(SearchBackend):
+    name = "sqlite"
+
+    @staticmethod
+    def match_expression(text: str) -> str:
+        """Every word of ``text`` as a quoted FTS5 term (implicit AND), so
+        user input can never be parsed as FTS5 query syntax"""
+        return " ".join(f'"{term}"' for term in _TERM.findall(text))
+
+    def hits(self, index: SearchIndex, text: str) -> Optional[Subquery]:
+        expression = self.match_expression(text)
+        if not expression:
+            return None
+        fts = table(index.fts_table, column("rowid"))
+        fts_name = literal_column(index.fts_table)
+        return select(
+            fts.c.rowid.label("id"),
+            # bm25 is lower for better matches
+            (-func.bm25(fts_name, type_=Float)).label("rank")
+        ).where(fts_name.op("MATCH")(expression)).subquery("hits")
+
+
+class LikeSearchBackend(SearchBackend):
+    name = "like"
+
+    def hits(self, index: SearchIndex, text: str) -> Optional[Subquery]:
+        text = text.strip()
+        if not text:
+            return None
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", text) + "%"
+        return select(
+            index.table.c.id.label("id"),
+            literal(0.0, Float).label("rank")
+        ).where(index.table.c[index.column].ilike(pattern, escape="\\")).subquery("hits")
+
+
+# Backend per SQLAlchemy dialect name
+BACKENDS: Dict[str, SearchBackend] = {
+    PostgresSearchBackend.name: PostgresSearchBackend(),
+    SQLiteSearchBackend.name: SQLiteSearchBackend(),
+}
+
+
+def get_backend(db: Session) -> SearchBackend:
+    dialect = db.get_bind().dialect.name
+    return BACKENDS.get(dialect) or LikeSearchBackend()
+
+
+# ============= Queries =============
+
+def search(db: Session, index_name: str, text: str, *entities) -> Optional[Tuple[Query, Subquery]]:
+    """
+    Rows of ``SEARCH_INDEXES[index_name]`` matching ``text``
+
+    Args:
+        db: Database session
+        index_name: Key of ``SEARCH_INDEXES``
+        text: The user's search text
+        entities: Extra columns/entities to select after the model and rank
+
+    Returns:
+        (query, hits) - the query selects ``(model, rank, *entities)`` and
+        still needs permission filters; None if ``text`` has no terms
+    """
+    index = SEARCH_INDEXES[index_name]
+    hits = get_backend(db).hits(index, text)
+    if hits is None:
+        return None
+    query = db.query(index.model, hits.c.rank, *entities).join(hits, hits.c.id == index.model.id)
+    return query, hits
+
+
+def search_keys(index_name: str, hits: Subquery) -> Tuple[SortKey, SortKey]:
+    """Best match first, newest first among equal ranks"""
+    model = SEARCH_INDEXES[index_name].model
+    return (
+        SortKey(hits.c.rank, descending=True, value=lambda row: row.rank),
+        SortKey(model.id, descending=True, value=lambda row: row[0].id),
+    )
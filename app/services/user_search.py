@@ -0,0 +1,121 @@
+"""
+User Search
+
+Finds users by username, full name, public user_id or email with ranking:
+an exact match beats a prefix match, which beats a substring match. The
+indexes are declared in app/models/search_index.py.
+
+- ``PostgresUserSearch``: substring matching with ``ILIKE '%q%'``, served
+  by ``pg_trgm`` GIN indexes; ties within a tier are broken by trigram
+  similarity of the username
+- ``PrefixUserSearch`` (SQLite and anything else): prefix matching only,
+  as ``lower(column)`` range scans over expression indexes
+
+Callers get a ``UserMatch`` holding the WHERE condition and the rank
+expression and add their own filters (user types, friend exclusion) in
+the same query.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import Float, case, func, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app import models
+
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+# Columns each search looks at
+FRIEND_SEARCH_COLUMNS = ("username", "full_name")
+DIRECTORY_SEARCH_COLUMNS = ("username", "user_id")
+ADMIN_SEARCH_COLUMNS = ("username", "email", "full_name", "user_id")
+
+
+@dataclass(frozen=True)
+class UserMatch:
+    """Filter and ranking for one search"""
+    condition: ColumnElement
+    # Higher is better; label it to select and keyset-paginate on it
+    rank: ColumnElement
+
+
+def _like_escape(text: str) -> str:
+    return re.sub(r"([\\%_])", r"\\\1", text)
+
+
+def _columns(names: Sequence[str]):
+    return [getattr(models.User, name) for name in names]
+
+
+def _tier(columns, term: str):
+    """``EXACT``/``PREFIX``/``SUBSTRING`` for the best-matching column"""
+    prefix = _like_escape(term) + "%"
+    whens = [
+        (or_(*(func.lower(c) == term for c in columns)), EXACT),
+        (or_(*(func.lower(c).like(prefix, escape="\\") for c in columns)), PREFIX),
+    ]
+    return case(*whens, else_=SUBSTRING)
+
+
+# ============= Backends =============
+
+class UserSearchBackend:
+    name = ""
+
+    def match(self, columns, term: str) -> UserMatch:
+        raise NotImplementedError
+
+
+class PostgresUserSearch(UserSearchBackend):
+    name = "postgresql"
+
+    def match(self, columns, term: str) -> UserMatch:
+        pattern = "%" + _like_escape(term) + "%"
+        condition = or_(*(c.ilike(pattern, escape="\\") for c in columns))
+        # similarity() is in [0, 1]; halved so it never lifts a row into the next tier
+        rank = _tier(columns, term) + func.similarity(models.User.username, term, type_=Float) * 0.5
+        return UserMatch(condition, rank)
+
+
+class PrefixUserSearch(UserSearchBackend):
+    name = "prefix"
+
+    def match(self, columns, term: str) -> UserMatch:
+        # lower(c) >= 'ab' AND lower(c) < 'ac' walks the lower(c) index
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        condition = or_(*(
+            (func.lower(c) >= term) & (func.lower(c) < upper) for c in columns
+        ))
+        return UserMatch(condition, _tier(columns, term))
+
+
+BACKENDS: Dict[str, UserSearchBackend] = {
+    PostgresUserSearch.name: PostgresUserSearch(),
+}
+
+
+def match_users(db: Session, text: str, columns: Sequence[str] = FRIEND_SEARCH_COLUMNS) -> Optional[UserMatch]:
+    """
+    Condition and rank for users matching ``text`` in ``columns``
+
+    Returns:
+        UserMatch, or None if ``text`` is blank
+    """
+    term = text.strip().lower()
+    if not term:
+        return None
+    backend = BACKENDS.get(db.get_bind().dialect.name) or PrefixUserSearch()
+    return backend.match(_columns(columns), term)
+
+
+def not_friends_of(user_id: int) -> ColumnElement:
+    """Users who are not ``user_id`` and not already their friend"""
+    friends = models.friends_association
+    return (models.User.id != user_id) & ~(
+        friends.select()
+        .where(friends.c.user_id == user_id, friends.c.friend_id == models.User.id)
+        .exists()
+    )
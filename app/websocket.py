@@ -17,9 +17,10 @@ import json
 import asyncio
 from datetime import datetime, timezone
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from app.database import get_db, SessionLocal
 from app import models
+from app.core.serialization import dumps_str, loads
 from jose import JWTError, jwt
 from app.config import settings
 import logging
@@ -69,6 +70,16 @@ class WSMessageType(str, Enum):
     # Conversations
     CONVERSATION_UPDATE = "conversation:update"
 
+    # Winners ticker / leaderboards
+    LEADERBOARD_WIN = "leaderboard:win"
+    LEADERBOARD_UPDATE = "leaderboard:update"
+
+    # Admin dashboard
+    ADMIN_STATS = "admin:stats"
+
+    # Activity feed
+    ACTIVITY_NEW = "activity:new"
+
 
 @dataclass
 class WSMessage:
@@ -82,11 +93,16 @@ class WSMessage:
             self.timestamp = datetime.now(timezone.utc).isoformat()
 
     def to_json(self) -> str:
-        return json.dumps(asdict(self))
+        # Build the frame directly instead of asdict(), which deep-copies data
+        return dumps_str({
+            "type": self.type,
+            "data": self.data,
+            "timestamp": self.timestamp
+        })
 
     @classmethod
     def from_json(cls, json_str: str) -> 'WSMessage':
-        data = json.loads(json_str)
+        data = loads(json_str)
         return cls(
             type=data.get('type', 'unknown'),
             data=data.get('data', {}),
@@ -116,6 +132,8 @@ class ConnectionManager:
         self.user_rooms: Dict[int, Set[str]] = {}
         # Lock for thread-safe operations
         self._lock = asyncio.Lock()
+        # Event loop serving the sockets (for sends from sync/threadpool code)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def connect(self, websocket: WebSocket, user_id: int, db: Session) -> bool:
         """
@@ -131,6 +149,7 @@ class ConnectionManager:
         """
         try:
             await websocket.accept()
+            self.loop = asyncio.get_running_loop()
 
             async with self._lock:
                 # Add connection to user's connection list
@@ -283,12 +302,19 @@ class ConnectionManager:
         if user_id not in self.active_connections:
             return False
 
+        return await self._send_frame(user_id, message.to_json())
+
+    async def _send_frame(self, user_id: int, frame: str) -> bool:
+        """Send an already-serialized frame to all of a user's connections"""
+        if user_id not in self.active_connections:
+            return False
+
         sent = False
         dead_connections = []
 
-        for connection in self.active_connections[user_id]:
+        for connection in list(self.active_connections[user_id]):
             try:
-                await connection.send_text(message.to_json())
+                await connection.send_text(frame)
                 sent = True
             except Exception as e:
                 logger.warning(f"Failed to send to user {user_id}: {e}")
@@ -313,10 +339,12 @@ class ConnectionManager:
         if room_id not in self.rooms:
             return
 
-        for user_id in self.rooms[room_id]:
+        # Serialize once for the whole room
+        frame = message.to_json()
+        for user_id in list(self.rooms.get(room_id, ())):
             if exclude_user and user_id == exclude_user:
                 continue
-            await self.send_to_user(user_id, message)
+            await self._send_frame(user_id, frame)
 
     async def broadcast_to_all(self, message: WSMessage, user_type: str = None):
         """
@@ -329,12 +357,13 @@ class ConnectionManager:
         # Get a fresh database session for this operation
         db = SessionLocal()
         try:
+            frame = message.to_json()
             for user_id in list(self.active_connections.keys()):
                 if user_type:
                     user = db.query(models.User).filter(models.User.id == user_id).first()
                     if not user or user.user_type.value != user_type:
                         continue
-                await self.send_to_user(user_id, message)
+                await self._send_frame(user_id, frame)
         finally:
             db.close()
 
@@ -408,6 +437,24 @@ class ConnectionManager:
 
         logger.info(f"User {user_id} left room {room_id}")
 
+    def send_to_user_threadsafe(self, user_id: int, message: WSMessage) -> bool:
+        """
+        Schedule a send from code that may not run on the socket event loop
+        (sync endpoints run in a threadpool). Returns False if the user has
+        no open connection.
+        """
+        if self.loop is None or self.loop.is_closed() or not self.is_user_online(user_id):
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.loop.create_task(self.send_to_user(user_id, message))
+        else:
+            asyncio.run_coroutine_threadsafe(self.send_to_user(user_id, message), self.loop)
+        return True
+
     def is_user_online(self, user_id: int) -> bool:
         """Check if a user is currently online"""
         return user_id in self.active_connections and len(self.active_connections[user_id]) > 0
@@ -699,8 +746,16 @@ async def websocket_endpoint(
             elif msg_type == WSMessageType.ROOM_JOIN or msg_type == "room:join":
                 # Join room
                 room_id = data.get("room_id")
-                if room_id:
+                if room_id and room_id.startswith("admin:") and user.user_type != models.UserType.ADMIN:
+                    await manager.send_to_user(user.id, WSMessage(
+                        type=WSMessageType.ERROR,
+                        data={"error": "Admin access required", "room_id": room_id}
+                    ))
+                elif room_id:
                     await manager.join_room(user.id, room_id)
+                    if room_id == "admin:dashboard":
+                        from app.services.dashboard_stats import dashboard_stats
+                        await dashboard_stats.subscribe(user.id)
 
             elif msg_type == WSMessageType.ROOM_LEAVE or msg_type == "room:leave":
                 # Leave room
@@ -738,17 +793,40 @@ async def send_notification(user_id: int, notification_type: str, data: dict):
     ))
 
 
+def friend_request_data(from_user: models.User) -> dict:
+    return {
+        "from_user_id": from_user.id,
+        "from_username": from_user.username,
+        "from_full_name": from_user.full_name,
+        "from_user_type": from_user.user_type.value,
+        "from_profile_picture": from_user.profile_picture
+    }
+
+
+def friend_accepted_data(friend: models.User) -> dict:
+    return {
+        "friend_id": friend.id,
+        "friend_username": friend.username,
+        "friend_full_name": friend.full_name,
+        "friend_user_type": friend.user_type.value,
+        "friend_profile_picture": friend.profile_picture
+    }
+
+
+def credit_update_data(new_balance: int, change_amount: int, reason: str = None) -> dict:
+    return {
+        "credits": new_balance,
+        "change_amount": change_amount,
+        "reason": reason,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+
 async def send_friend_request_notification(to_user_id: int, from_user: models.User):
     """Send friend request notification"""
     await manager.send_to_user(to_user_id, WSMessage(
         type=WSMessageType.FRIEND_REQUEST,
-        data={
-            "from_user_id": from_user.id,
-            "from_username": from_user.username,
-            "from_full_name": from_user.full_name,
-            "from_user_type": from_user.user_type.value,
-            "from_profile_picture": from_user.profile_picture
-        }
+        data=friend_request_data(from_user)
     ))
 
 
@@ -756,13 +834,7 @@ async def send_friend_accepted_notification(to_user_id: int, friend: models.User
     """Send friend accepted notification"""
     await manager.send_to_user(to_user_id, WSMessage(
         type=WSMessageType.FRIEND_ACCEPTED,
-        data={
-            "friend_id": friend.id,
-            "friend_username": friend.username,
-            "friend_full_name": friend.full_name,
-            "friend_user_type": friend.user_type.value,
-            "friend_profile_picture": friend.profile_picture
-        }
+        data=friend_accepted_data(friend)
     ))
 
 
@@ -778,12 +850,7 @@ async def send_credit_update(user_id: int, new_balance: int, change_amount: int,
     """
     await manager.send_to_user(user_id, WSMessage(
         type=WSMessageType.CREDIT_UPDATE,
-        data={
-            "credits": new_balance,
-            "change_amount": change_amount,
-            "reason": reason,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        data=credit_update_data(new_balance, change_amount, reason)
     ))
 
 
@@ -0,0 +1,145 @@
+"""
+Concurrency benchmark for the mini-game bet engine
+
+Fires parallel bets at a single account from several threads and reports
+throughput plus a correctness check: the final balance must equal the
+starting balance plus the sum of net results of all audit rows, and every
+settled bet must have exactly one audit row.
+
+The "legacy" mode reproduces the previous flow (SELECT ... FOR UPDATE,
+commit balance, refresh, insert audit row, commit again) for comparison.
+
+Usage:
+    python -m benchmarks.bench_bet_engine [--url postgresql://...] [--threads 8] [--bets 2000]
+
+Without --url a temporary SQLite file is used (SQLite serializes writers,
+so run against Postgres for representative numbers).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import models  # noqa: E402
+from app.models import Base, UserType  # noqa: E402
+from app.services.bet_engine import InsufficientCreditsError, settle_bet, spin_slots  # noqa: E402
+
+START_BALANCE = 1_000_000
+BET = 10
+
+
+def _legacy_bet(db, user_id, outcome):
+    """Previous flow: row lock, two commits"""
+    user = db.query(models.User).filter(models.User.id == user_id).with_for_update().first()
+    if user.credits < BET:
+        db.rollback()
+        raise InsufficientCreditsError()
+    before = user.credits
+    user.credits += outcome.win_amount - BET
+    db.commit()
+    db.refresh(user)
+    db.add(models.BetTransaction(
+        user_id=user_id, game_type=outcome.game_type, bet_amount=BET,
+        win_amount=outcome.win_amount, result=outcome.result,
+        balance_before=before, balance_after=user.credits,
+        game_data=json.dumps(outcome.game_data)
+    ))
+    db.commit()
+
+
+def run(session_factory, user_id, mode, threads, bets):
+    per_thread = bets // threads
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        db = session_factory()
+        try:
+            for _ in range(per_thread):
+                outcome = spin_slots(BET, rng)
+                for attempt in range(50):
+                    try:
+                        if mode == "engine":
+                            settle_bet(db, user_id, BET, outcome)
+                        else:
+                            _legacy_bet(db, user_id, outcome)
+                        break
+                    except InsufficientCreditsError:
+                        break
+                    except Exception as e:  # SQLite "database is locked"
+                        db.rollback()
+                        if attempt == 49:
+                            errors.append(e)
+                        time.sleep(0.001)
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, errors
+
+
+def check(session_factory, user_id):
+    db = session_factory()
+    try:
+        balance = db.query(models.User.credits).filter(models.User.id == user_id).scalar()
+        count, net = db.query(
+            func.count(models.BetTransaction.id),
+            func.coalesce(func.sum(models.BetTransaction.win_amount - models.BetTransaction.bet_amount), 0)
+        ).filter(models.BetTransaction.user_id == user_id).one()
+        return balance, count, START_BALANCE + net == balance
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--bets", type=int, default=2000)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    connect_args = {"check_same_thread": False, "timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=args.threads + 2)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    for mode in ("legacy", "engine"):
+        db = session_factory()
+        user = models.User(
+            username=f"bench_{mode}_{time.time_ns()}", user_id=f"B{time.time_ns() % 10**10}",
+            hashed_password="x", user_type=UserType.PLAYER, credits=START_BALANCE
+        )
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        elapsed, errors = run(session_factory, user_id, mode, args.threads, args.bets)
+        balance, count, consistent = check(session_factory, user_id)
+        print(
+            f"{mode:7} {count:>6} bets in {elapsed:6.2f}s = {count / elapsed:8.1f} bets/s | "
+            f"balance={balance} ledger_consistent={consistent} failed={len(errors)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
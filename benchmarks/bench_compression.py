@@ -0,0 +1,81 @@
+"""
+Compression benchmark: CPU time versus bytes on the wire
+
+Runs representative API payloads through gzip (levels 1/4/6/9), brotli
+(qualities 1/4/6/11, if installed) and WebSocket permessage-deflate
+settings (memLevel / window bits), printing the compressed size, ratio and
+per-payload CPU cost so COMPRESSION_* and WS_DEFLATE_* settings can be
+chosen deliberately.
+
+Usage:
+    python -m benchmarks.bench_compression [--iterations 200]
+"""
+import argparse
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import BROTLI_AVAILABLE  # noqa: E402
+from app.core.serialization import dumps  # noqa: E402
+from benchmarks.bench_serialization import build_payloads  # noqa: E402
+
+
+def _time(fn, data: bytes, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        out = fn(data)
+    return len(out), (time.perf_counter() - start) / iterations * 1e6
+
+
+def _gzip(level):
+    def compress(data):
+        c = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return c.compress(data) + c.flush()
+    return compress
+
+
+def _brotli(quality):
+    import brotli
+
+    def compress(data):
+        return brotli.compress(data, quality=quality)
+    return compress
+
+
+def _deflate(level, mem_level, window_bits):
+    # permessage-deflate: raw deflate, sync flush per message
+    def compress(data):
+        c = zlib.compressobj(level, zlib.DEFLATED, -window_bits, mem_level)
+        return c.compress(data) + c.flush(zlib.Z_SYNC_FLUSH)
+    return compress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    codecs = {f"gzip-{lvl}": _gzip(lvl) for lvl in (1, 4, 6, 9)}
+    if BROTLI_AVAILABLE:
+        codecs.update({f"br-{q}": _brotli(q) for q in (1, 4, 6, 11)})
+
+    ws_codecs = {
+        f"deflate l{lvl} mem{mem} w{bits}": _deflate(lvl, mem, bits)
+        for lvl, mem, bits in ((1, 1, 9), (6, 5, 12), (6, 8, 15), (9, 9, 15))
+    }
+
+    for name, payload in build_payloads().items():
+        data = dumps(payload)
+        is_ws = name.startswith("ws ")
+        print(f"\n{name} ({len(data)} bytes)")
+        print(f"  {'codec':26} {'bytes':>8} {'ratio':>7} {'cpu us':>9}")
+        for codec_name, fn in (ws_codecs if is_ws else codecs).items():
+            size, cpu = _time(fn, data, args.iterations)
+            print(f"  {codec_name:26} {size:>8} {len(data) / size:>6.2f}x {cpu:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Serialization microbenchmark
+
+Compares the previous encoding path (jsonable_encoder + json.dumps, and
+json.dumps(asdict(msg)) for WebSocket frames) against app.core.serialization
+for the ten largest / most frequent payloads the API emits.
+
+Usage:
+    python -m benchmarks.bench_serialization [--iterations 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from app.config.game_config import get_frontend_config  # noqa: E402
+from app.core.serialization import dumps  # noqa: E402
+from app.models.enums import MessageType, UserType  # noqa: E402
+
+
+def _now(offset: int = 0) -> datetime:
+    return datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=offset)
+
+
+def _user(i: int) -> dict:
+    return {
+        "id": i,
+        "user_id": f"U{i:07d}",
+        "email": f"user{i}@example.com",
+        "username": f"user_{i}",
+        "full_name": f"User Number {i}",
+        "user_type": UserType.PLAYER,
+        "is_active": True,
+        "is_approved": True,
+        "created_at": _now(i),
+        "company_name": None,
+        "player_level": 1 + i % 10,
+        "credits": 1000 + i,
+        "profile_picture": f"https://cdn.example.com/avatars/{i}.png",
+        "is_online": i % 3 == 0,
+        "last_seen": _now(i + 60),
+        "last_activity": _now(i + 120),
+        "is_email_verified": True,
+    }
+
+
+def _message(i: int, a: dict, b: dict) -> dict:
+    return {
+        "id": i,
+        "sender_id": a["id"],
+        "receiver_id": b["id"],
+        "message_type": MessageType.TEXT,
+        "content": "Hey! Are you joining the weekend tournament? " * 2,
+        "file_url": None,
+        "file_name": None,
+        "duration": None,
+        "is_read": bool(i % 2),
+        "created_at": _now(i),
+        "sender": a,
+        "receiver": b,
+    }
+
+
+def build_payloads() -> dict:
+    """Representative payloads, roughly ordered by traffic"""
+    a, b = _user(1), _user(2)
+    users = [_user(i) for i in range(100)]
+    return {
+        "ws message:new": {"type": "message:new", "data": jsonable_encoder({k: v for k, v in _message(1, a, b).items() if k not in ("sender", "receiver")})},
+        "ws conversation:update": {"type": "conversation:update", "data": {"friend_id": 2, "friend_name": "user_2", "last_message": {"id": 9, "content": "hi", "created_at": _now().isoformat()}, "unread_count": 3}},
+        "ws credit:update": {"type": "credit:update", "data": {"credits": 1200, "change_amount": 200, "reason": "admin", "timestamp": _now().isoformat()}},
+        "ws user:online": {"type": "user:online", "data": {"user_id": 1, "username": "user_1", "user_type": "player", "profile_picture": None}},
+        "GET /chat/messages (50)": {"messages": [_message(i, a, b) for i in range(50)], "unread_count": 0},
+        "GET /chat/conversations (30)": [{"friend": _user(i), "last_message": _message(i, a, b), "unread_count": i % 4, "is_friend": True} for i in range(30)],
+        "GET /admin/users (100)": {"users": users, "total": 5000, "skip": 0, "limit": 100},
+        "GET /admin/messages (100)": {"messages": [{**_message(i, a, b), "sender": {"id": 1, "username": "user_1", "full_name": "U", "user_type": UserType.PLAYER}, "receiver": {"id": 2, "username": "user_2", "full_name": "V", "user_type": UserType.CLIENT}} for i in range(100)], "total": 90000, "skip": 0, "limit": 100},
+        "GET /admin/dashboard-stats": {"users": {"total": 5000, "clients": 40, "players": 4950, "active": 4800, "online": 310, "recent_registrations": 120, "pending_approvals": 4}, "messages": {"total": 90000, "today": 1200}, "promotions": {"active": 12, "total_claims": 3400}, "reviews": {"total": 800, "average_rating": 4.31}, "reports": {"pending": 7}},
+        "GET /games/config": get_frontend_config(),
+    }
+
+
+def _bench(fn, payload, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(payload)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _baseline(payload):
+    if isinstance(payload, dict) and set(payload) == {"type", "data"}:
+        # WSMessage.to_json used json.dumps(asdict(self))
+        from app.websocket import WSMessage
+        return json.dumps(asdict(WSMessage(type=payload["type"], data=payload["data"], timestamp="x")))
+    return json.dumps(jsonable_encoder(payload)).encode()
+
+
+def _fast(payload):
+    if isinstance(payload, dict) and set(payload) == {"type", "data"}:
+        from app.websocket import WSMessage
+        return WSMessage(type=payload["type"], data=payload["data"], timestamp="x").to_json()
+    return dumps(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = build_payloads()
+    print(f"{'payload':32} {'bytes':>8} {'baseline us':>12} {'fast us':>10} {'speedup':>8}")
+    for name, payload in payloads.items():
+        size = len(_fast(payload))
+        base = _bench(_baseline, payload, args.iterations)
+        fast = _bench(_fast, payload, args.iterations)
+        print(f"{name:32} {size:>8} {base:>12.1f} {fast:>10.1f} {base / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
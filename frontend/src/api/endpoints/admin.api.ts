@@ -50,6 +50,7 @@ export interface UsersResponse {
   total: number;
   skip: number;
   limit: number;
+  next_cursor?: string | null;
 }
 
 export interface PendingApprovalsResponse {
@@ -152,6 +153,7 @@ export interface ReviewModerationResponse {
   approved_count: number;
   rejected_count: number;
   disputed_count: number;
+  next_cursor?: string | null;
 }
 
 export type ReportStatus = 'pending' | 'investigating' | 'valid' | 'invalid' | 'malicious';
@@ -211,6 +213,7 @@ export interface MessagesResponse {
   total: number;
   skip: number;
   limit: number;
+  next_cursor?: string | null;
 }
 
 export const adminApi = {
@@ -49,6 +49,7 @@ export interface ReviewListResponse {
   reviews: Review[];
   total_count: number;
   average_rating: number | null;
+  next_cursor?: string | null;
 }
 
 export interface ReviewStats {
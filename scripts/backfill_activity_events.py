@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Rebuild the activity_events feed from existing messages, friend requests
+and client-created players.
+
+Usage:
+    python scripts/backfill_activity_events.py
+
+Run once after applying the activity_events migration. Re-running replaces
+the whole feed, so friend request accept/reject events recorded since then
+are collapsed into their request's current status.
+"""
+import sys
+import os
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+
+from app.database import SessionLocal
+from app.services.activity_feed import rebuild_events
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        written = rebuild_events(db)
+        logger.info(f"Backfill complete: {written} activity events")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Build or refresh the client_daily_stats rollup table.
+
+Usage:
+    python scripts/backfill_client_stats.py                 # full history
+    python scripts/backfill_client_stats.py --days 90       # last 90 days
+    python scripts/backfill_client_stats.py --compact       # last 2 days + player gauges
+
+Safe to re-run: counters in the processed range are recomputed from the
+source tables, not added to. Run --compact periodically (e.g. every 15
+minutes) to repair drift and refresh the player gauges.
+"""
+import sys
+import os
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from datetime import timedelta
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app import models
+from app.services.client_analytics import (
+    compact,
+    rebuild_daily_stats,
+    snapshot_player_gauges,
+    utc_today
+)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def earliest_day(db):
+    """First day with any source data"""
+    candidates = [
+        db.query(func.min(models.Message.created_at)).scalar(),
+        db.query(func.min(models.User.created_at)).filter(models.User.created_by_client_id.isnot(None)).scalar(),
+        db.query(func.min(models.PromotionClaim.claimed_at)).scalar(),
+    ]
+    candidates = [c for c in candidates if c is not None]
+    return min(candidates).date() if candidates else utc_today()
+
+
+def backfill(days: int = None, chunk_days: int = 30):
+    """
+    Rebuild rollups in chunks of ``chunk_days`` days, oldest first.
+
+    Args:
+        days: Only rebuild the last N days (default: full history)
+        chunk_days: Days per transaction
+    """
+    db = SessionLocal()
+    try:
+        end = utc_today() + timedelta(days=1)
+        start = end - timedelta(days=days) if days else earliest_day(db)
+        logger.info(f"Backfilling client_daily_stats from {start} to {end - timedelta(days=1)}")
+
+        total = 0
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+            written = rebuild_daily_stats(db, chunk_start, chunk_end)
+            total += written
+            logger.info(f"  {chunk_start} .. {chunk_end - timedelta(days=1)}: {written} rows")
+            chunk_start = chunk_end
+
+        gauges = snapshot_player_gauges(db)
+        logger.info(f"Backfill complete: {total} rows, gauges for {len(gauges)} clients")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build client analytics rollups")
+    parser.add_argument("--days", type=int, help="Only rebuild the last N days")
+    parser.add_argument("--chunk-days", type=int, default=30, help="Days per transaction")
+    parser.add_argument("--compact", action="store_true", help="Rebuild the last 2 days and refresh gauges")
+    args = parser.parse_args()
+
+    if args.compact:
+        db = SessionLocal()
+        try:
+            written = compact(db)
+            logger.info(f"Compaction complete: {written} rows")
+        finally:
+            db.close()
+        return
+
+    backfill(args.days, args.chunk_days)
+
+
+if __name__ == "__main__":
+    main()
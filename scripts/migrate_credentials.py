@@ -1,14 +1,27 @@
 #!/usr/bin/env python
 """
-Script to migrate existing game credentials from plaintext to encrypted format.
-This script can be run multiple times safely (idempotent).
+Script to migrate existing game credentials from plaintext to encrypted format,
+and to re-encrypt them after an encryption key rotation.
+Both modes can be run multiple times safely (idempotent) and pick up where an
+interrupted run stopped.
 
-Usage: python scripts/migrate_credentials.py
+Usage:
+    python scripts/migrate_credentials.py             # encrypt plaintext credentials
+    python scripts/migrate_credentials.py --rotate    # re-encrypt with the current key
+    python scripts/migrate_credentials.py --verify-only
 
-The script will:
+Encrypting will:
 1. Find all credentials without encryption
-2. Encrypt them in batches
+2. Encrypt them in batches, committing each batch
 3. Report progress
+Afterwards the plaintext columns can be dropped (alembic upgrade head).
+
+Rotating: put the new key first in CREDENTIAL_ENCRYPTION_KEY, keeping the old
+one after it (e.g. ``new,old``), deploy, then run with --rotate. Credentials
+are walked in id order and values not yet under the new key are re-encrypted,
+one committed batch at a time. Each batch logs the last id it committed; pass
+it to --start-after to skip ahead after an interruption. Once the run reports
+no failures, the old key can be removed.
 """
 import sys
 import os
@@ -19,7 +32,10 @@ from app.database import SessionLocal
 from app.models import GameCredentials
 from app.encryption import encrypt_credential, credential_encryption
 import logging
-from sqlalchemy import and_
+from typing import Dict
+import sqlalchemy as sa
+from sqlalchemy import inspect, select, update
+from sqlalchemy.orm import Session
 
 # Setup logging
 logging.basicConfig(
@@ -28,6 +44,160 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The plaintext columns are no longer mapped on the model
+credentials_table = sa.table(
+    "game_credentials",
+    sa.column("id", sa.Integer),
+    sa.column("game_username", sa.String),
+    sa.column("game_password", sa.String),
+    sa.column("game_username_encrypted", sa.Text),
+    sa.column("game_password_encrypted", sa.Text),
+)
+
+
+def has_plaintext_columns(db: Session) -> bool:
+    columns = {c["name"] for c in inspect(db.get_bind()).get_columns("game_credentials")}
+    return "game_username" in columns
+
+
+def encrypt_plaintext(db: Session, batch_size: int = 100) -> Dict[str, int]:
+    """
+    Encrypt credentials that only have plaintext values, one committed batch at a time
+
+    Returns:
+        Counts of migrated and failed credentials
+    """
+    t = credentials_table
+    stats = {"migrated": 0, "failed": 0}
+    if not has_plaintext_columns(db):
+        logger.info("Plaintext columns already dropped; nothing to encrypt")
+        return stats
+
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(t.c.id, t.c.game_username, t.c.game_password)
+            .where(
+                t.c.id > last_id,
+                sa.or_(t.c.game_username_encrypted.is_(None), t.c.game_password_encrypted.is_(None))
+            )
+            .order_by(t.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        values = []
+        for row in rows:
+            username = encrypt_credential(row.game_username)
+            password = encrypt_credential(row.game_password)
+            if not username or not password:
+                logger.warning(f"Failed to encrypt credential ID {row.id} - encryption returned None")
+                stats["failed"] += 1
+                continue
+            values.append({"row_id": row.id, "username": username, "password": password})
+
+        if values:
+            db.execute(
+                update(t)
+                .where(t.c.id == sa.bindparam("row_id"))
+                .values(
+                    game_username_encrypted=sa.bindparam("username"),
+                    game_password_encrypted=sa.bindparam("password")
+                ),
+                values
+            )
+        db.commit()
+        stats["migrated"] += len(values)
+        logger.info(f"Committed batch up to ID {last_id}. Total migrated: {stats['migrated']}")
+
+    return stats
+
+
+def rotate_keys(db: Session, batch_size: int = 500, start_after: int = 0) -> Dict[str, int]:
+    """
+    Re-encrypt credentials with the first key, one committed batch at a time
+
+    Values already encrypted with the first key are left as they are, so a
+    rerun only touches what an earlier run did not finish. Each row is only
+    updated if it still holds the ciphertext that was read; a credential
+    changed through the API in the meantime (already under the current key)
+    is skipped rather than overwritten with its old value.
+
+    Returns:
+        Counts of checked, rotated, skipped and failed credentials, and the last id committed
+    """
+    C = GameCredentials
+    stats = {"checked": 0, "rotated": 0, "skipped": 0, "failed": 0, "last_id": start_after}
+    last_id = start_after
+    while True:
+        rows = db.execute(
+            select(C.id, C.game_username_encrypted, C.game_password_encrypted)
+            .where(C.id > last_id)
+            .order_by(C.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        values = []
+        for row in rows:
+            current = [row.game_username_encrypted, row.game_password_encrypted]
+            if not any(credential_encryption.needs_rotation(value) for value in current):
+                continue
+            username, password = (credential_encryption.rotate(value) for value in current)
+            if not username or not password:
+                logger.error(f"Failed to rotate credential ID {row.id}: no configured key decrypts it")
+                stats["failed"] += 1
+                continue
+            values.append({
+                "row_id": row.id,
+                "old_username": row.game_username_encrypted,
+                "old_password": row.game_password_encrypted,
+                "username": username,
+                "password": password,
+            })
+
+        rotated = 0
+        if values:
+            # One executemany per batch, compare-and-set on the ciphertext that was read
+            t = C.__table__
+            db.execute(
+                update(t)
+                .where(
+                    t.c.id == sa.bindparam("row_id"),
+                    t.c.game_username_encrypted == sa.bindparam("old_username"),
+                    t.c.game_password_encrypted == sa.bindparam("old_password")
+                )
+                .values(
+                    game_username_encrypted=sa.bindparam("username"),
+                    game_password_encrypted=sa.bindparam("password")
+                ),
+                values
+            )
+            # executemany rowcount is not reliable on every driver (psycopg2);
+            # fresh Fernet tokens are unique, so look for the values just written
+            rotated = db.scalar(
+                select(sa.func.count()).select_from(C)
+                .where(sa.tuple_(C.id, C.game_username_encrypted).in_(
+                    [(value["row_id"], value["username"]) for value in values]
+                ))
+            )
+        db.commit()
+        if rotated < len(values):
+            logger.warning(f"{len(values) - rotated} credential(s) up to ID {last_id} changed during "
+                           f"rotation and were left as written")
+        stats["checked"] += len(rows)
+        stats["rotated"] += rotated
+        stats["skipped"] += len(values) - rotated
+        stats["last_id"] = last_id
+        logger.info(f"Committed batch up to ID {last_id} (resume with --start-after {last_id}). "
+                    f"Rotated {stats['rotated']}/{stats['checked']}")
+
+    return stats
+
 
 def migrate_credentials(batch_size: int = 100):
     """
@@ -40,95 +210,59 @@ def migrate_credentials(batch_size: int = 100):
 
     try:
         # Check if encryption is enabled
-        if not credential_encryption.cipher:
+        if not credential_encryption.enabled:
             logger.error("Encryption is not enabled. Please set CREDENTIAL_ENCRYPTION_KEY environment variable.")
             return False
 
         total_count = db.query(GameCredentials).count()
         logger.info(f"Total credentials in database: {total_count}")
 
-        # Find credentials not yet encrypted
-        unencrypted_count = db.query(GameCredentials).filter(
-            GameCredentials.game_username_encrypted == None
-        ).count()
-
-        if unencrypted_count == 0:
-            logger.info("All credentials are already encrypted!")
-            return True
-
-        logger.info(f"Found {unencrypted_count} credentials to encrypt")
-
-        migrated = 0
-        failed = 0
+        stats = encrypt_plaintext(db, batch_size=batch_size)
 
-        while True:
-            # Get batch of unencrypted credentials
-            credentials = db.query(GameCredentials).filter(
-                GameCredentials.game_username_encrypted == None
-            ).limit(batch_size).all()
-
-            if not credentials:
-                break
+        # Final statistics
+        logger.info("=" * 50)
+        logger.info(f"Migration complete!")
+        logger.info(f"Successfully encrypted: {stats['migrated']} credentials")
+        logger.info(f"Failed: {stats['failed']} credentials")
 
-            logger.info(f"Processing batch of {len(credentials)} credentials...")
+        return stats["failed"] == 0
 
-            for credential in credentials:
-                try:
-                    # Encrypt the credentials
-                    credential.game_username_encrypted = encrypt_credential(credential.game_username)
-                    credential.game_password_encrypted = encrypt_credential(credential.game_password)
+    except Exception as e:
+        logger.error(f"Migration failed with error: {e}")
+        return False
 
-                    if not credential.game_username_encrypted or not credential.game_password_encrypted:
-                        logger.warning(f"Failed to encrypt credential ID {credential.id} - encryption returned None")
-                        failed += 1
-                        continue
+    finally:
+        db.close()
 
-                    migrated += 1
 
-                    if migrated % 10 == 0:
-                        logger.info(f"Progress: {migrated}/{unencrypted_count} encrypted")
+def rotate_credentials(batch_size: int = 500, start_after: int = 0):
+    """Re-encrypt all credentials with the first configured key"""
+    db = SessionLocal()
 
-                except Exception as e:
-                    logger.error(f"Error encrypting credential ID {credential.id}: {e}")
-                    failed += 1
-                    continue
+    try:
+        if not credential_encryption.enabled:
+            logger.error("Encryption is not enabled. Please set CREDENTIAL_ENCRYPTION_KEY environment variable.")
+            return False
 
-            # Commit the batch
-            try:
-                db.commit()
-                logger.info(f"Committed batch. Total migrated: {migrated}")
-            except Exception as e:
-                logger.error(f"Failed to commit batch: {e}")
-                db.rollback()
-                break
+        stats = rotate_keys(db, batch_size=batch_size, start_after=start_after)
 
-        # Final statistics
         logger.info("=" * 50)
-        logger.info(f"Migration complete!")
-        logger.info(f"Successfully encrypted: {migrated} credentials")
-        logger.info(f"Failed: {failed} credentials")
+        logger.info(f"Rotation complete! Checked {stats['checked']}, re-encrypted {stats['rotated']}, "
+                    f"skipped {stats['skipped']} changed meanwhile, failed {stats['failed']}")
+        if stats["failed"]:
+            logger.warning("Keep the old key(s) configured until the failed credentials are fixed")
 
-        # Verify migration
-        remaining = db.query(GameCredentials).filter(
-            GameCredentials.game_username_encrypted == None
-        ).count()
-
-        if remaining > 0:
-            logger.warning(f"Still {remaining} unencrypted credentials remaining")
-        else:
-            logger.info("All credentials are now encrypted!")
-
-        return failed == 0
+        return stats["failed"] == 0
 
     except Exception as e:
-        logger.error(f"Migration failed with error: {e}")
+        logger.error(f"Rotation failed with error: {e}")
         return False
 
     finally:
         db.close()
 
 
-def verify_encryption():
+def verify_encryption(sample_size: int = 5):
     """Verify that encrypted credentials can be decrypted"""
     db = SessionLocal()
 
@@ -136,7 +270,7 @@ def verify_encryption():
         # Get a sample of encrypted credentials
         sample = db.query(GameCredentials).filter(
             GameCredentials.game_username_encrypted != None
-        ).limit(5).all()
+        ).limit(sample_size).all()
 
         if not sample:
             logger.info("No encrypted credentials found to verify")
@@ -144,27 +278,16 @@ def verify_encryption():
 
         logger.info(f"Verifying {len(sample)} encrypted credentials...")
 
+        encrypted = []
         for credential in sample:
-            try:
-                from app.encryption import decrypt_credential
-
-                username = decrypt_credential(credential.game_username_encrypted)
-                password = decrypt_credential(credential.game_password_encrypted)
-
-                if not username or not password:
-                    logger.error(f"Failed to decrypt credential ID {credential.id}")
-                    return False
+            encrypted += [credential.game_username_encrypted, credential.game_password_encrypted]
+        decrypted = credential_encryption.decrypt_many(encrypted)
 
-                # Verify decrypted matches original (if still present)
-                if credential.game_username and username != credential.game_username:
-                    logger.error(f"Decrypted username doesn't match original for ID {credential.id}")
-                    return False
-
-                logger.info(f"✓ Credential ID {credential.id} verified")
-
-            except Exception as e:
-                logger.error(f"Failed to verify credential ID {credential.id}: {e}")
+        for i, credential in enumerate(sample):
+            if not decrypted[2 * i] or not decrypted[2 * i + 1]:
+                logger.error(f"Failed to decrypt credential ID {credential.id}")
                 return False
+            logger.info(f"✓ Credential ID {credential.id} verified")
 
         logger.info("All sampled credentials verified successfully!")
         return True
@@ -181,6 +304,10 @@ if __name__ == "__main__":
                        help="Number of credentials to process in each batch")
     parser.add_argument("--verify-only", action="store_true",
                        help="Only verify existing encrypted credentials")
+    parser.add_argument("--rotate", action="store_true",
+                       help="Re-encrypt credentials with the first key in CREDENTIAL_ENCRYPTION_KEY")
+    parser.add_argument("--start-after", type=int, default=0,
+                       help="With --rotate, skip credentials up to this id (resume an interrupted run)")
 
     args = parser.parse_args()
 
@@ -196,10 +323,13 @@ if __name__ == "__main__":
         logger.error("Generate a key using: python -m app.encryption")
         sys.exit(1)
 
-    logger.info("Starting credential migration...")
-    logger.info(f"Batch size: {args.batch_size}")
-
-    success = migrate_credentials(batch_size=args.batch_size)
+    if args.rotate:
+        logger.info("Starting credential key rotation...")
+        success = rotate_credentials(batch_size=args.batch_size, start_after=args.start_after)
+    else:
+        logger.info("Starting credential migration...")
+        logger.info(f"Batch size: {args.batch_size}")
+        success = migrate_credentials(batch_size=args.batch_size)
 
     if success:
         logger.info("\n✅ Migration completed successfully!")
@@ -211,4 +341,4 @@ if __name__ == "__main__":
             sys.exit(1)
     else:
         logger.error("\n❌ Migration failed!")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
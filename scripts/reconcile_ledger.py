@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Reconcile user balances against the credit ledger.
+
+Usage:
+    python scripts/reconcile_ledger.py
+
+Exits with status 1 if any user's balance differs from their ledger chain
+or any journal transaction does not balance. Safe to run at any time; it
+only reads.
+"""
+import sys
+import os
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+
+from app.database import SessionLocal
+from app.services.ledger import reconcile
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        report = reconcile(db)
+    finally:
+        db.close()
+
+    logger.info(f"Checked {report.users_checked} accounts")
+    for account, balance in sorted(report.system_balances.items()):
+        logger.info(f"  system account {account}: {balance}")
+    for mismatch in report.balance_mismatches:
+        logger.error(
+            f"  user {mismatch['user_id']}: credits={mismatch['credits']} "
+            f"ledger={mismatch['ledger_balance']} from_entries={mismatch['expected_from_entries']}"
+        )
+    for transaction_id in report.unbalanced_transactions:
+        logger.error(f"  transaction {transaction_id} does not balance")
+
+    if not report.ok:
+        return 1
+    logger.info("Ledger reconciled")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Simulate return-to-player for the mini-games.
+
+Usage:
+    python scripts/simulate_rtp.py                         # all games, 1M spins each
+    python scripts/simulate_rtp.py --game slots --spins 10000000
+    python scripts/simulate_rtp.py --game dice --prediction 7 --bet 25
+    python scripts/simulate_rtp.py --compare-db            # check bet_transactions too
+    python scripts/simulate_rtp.py --json
+
+Reports RTP, hit rate and variance from the simulation next to the exact
+values, plus a 99% house-loss estimate over --rounds rounds.
+"""
+import sys
+import os
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+
+from app.config import DICE_MIN_PREDICTION, DICE_MAX_PREDICTION, MIN_BET_AMOUNT
+from app.models.enums import GameType
+from app.services.rtp_simulator import (
+    simulate_all,
+    simulate_dice,
+    simulate_slots,
+    compare_with_transactions
+)
+
+
+def print_results(results, rounds):
+    print(f"{'game':<6} {'config':<14} {'spins':>11} {'rtp':>9} {'exact':>9} "
+          f"{'z':>6} {'hit rate':>9} {'variance':>9} {'p99 loss':>10} {'secs':>6}")
+    for r in results:
+        print(
+            f"{r.game:<6} {r.label:<14} {r.spins:>11,} {r.rtp:>9.4%} {r.expected_rtp:>9.4%} "
+            f"{r.z_score:>6.2f} {r.hit_rate:>9.4%} {r.variance:>9.3f} "
+            f"{r.house_loss_p99(rounds):>10.1f} {r.elapsed_seconds:>6.2f}"
+        )
+    print(f"\np99 loss: house loss in bets not exceeded with 99% probability over {rounds:,} rounds")
+
+
+def print_comparison(comparison):
+    print(
+        f"{comparison.game:<6} {comparison.count:>9,} bets | observed RTP {comparison.observed_rtp:.4%} | "
+        f"won {comparison.total_won:,} vs expected {comparison.expected_won:,.0f} "
+        f"(z={comparison.z_score:.2f}) | payout mismatches: {comparison.payout_mismatches}"
+    )
+    if comparison.mismatch_ids:
+        print(f"       first mismatching transaction ids: {comparison.mismatch_ids}")
+    if comparison.unparseable:
+        print(f"       {comparison.unparseable} unparseable rows left out, first ids: {comparison.unparseable_ids}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate mini-game RTP")
+    parser.add_argument("--game", choices=["dice", "slots", "all"], default="all")
+    parser.add_argument("--spins", type=int, default=1_000_000, help="Spins per configuration")
+    parser.add_argument("--prediction", type=int, help="Dice prediction (default: every prediction)")
+    parser.add_argument("--bet", type=int, default=MIN_BET_AMOUNT, help="Stake per spin")
+    parser.add_argument("--seed", type=int, help="RNG seed for reproducible runs")
+    parser.add_argument("--rounds", type=int, default=100_000, help="Rounds for the bankroll risk estimate")
+    parser.add_argument("--compare-db", action="store_true", help="Compare against bet_transactions")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    if args.prediction is not None:
+        if not DICE_MIN_PREDICTION <= args.prediction <= DICE_MAX_PREDICTION:
+            parser.error(f"--prediction must be between {DICE_MIN_PREDICTION} and {DICE_MAX_PREDICTION}")
+        results = [simulate_dice(args.spins, args.prediction, args.bet, args.seed)]
+        if args.game == "all":
+            results.append(simulate_slots(args.spins, args.bet, args.seed))
+    elif args.game == "slots":
+        results = [simulate_slots(args.spins, args.bet, args.seed)]
+    else:
+        games = ("dice",) if args.game == "dice" else ("dice", "slots")
+        results = simulate_all(args.spins, args.bet, args.seed, games)
+
+    comparisons = []
+    if args.compare_db:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            game_types = {"dice": [GameType.LUCKY_DICE], "slots": [GameType.LUCKY_SLOTS]}.get(
+                args.game, [GameType.LUCKY_DICE, GameType.LUCKY_SLOTS]
+            )
+            comparisons = [compare_with_transactions(db, game_type) for game_type in game_types]
+        finally:
+            db.close()
+
+    if args.json:
+        print(json.dumps({
+            "simulations": [r.to_dict() for r in results],
+            "transactions": [c.to_dict() for c in comparisons],
+        }, indent=2))
+        return
+
+    print_results(results, args.rounds)
+    if comparisons:
+        print("\nObserved bet_transactions:")
+        for comparison in comparisons:
+            print_comparison(comparison)
+
+
+if __name__ == "__main__":
+    main()
@@ -74,4 +74,4 @@ echo "Starting application..."
 echo "=========================================="
 
 # Start uvicorn
-exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
+exec uvicorn app.main:app --host 0.0.0.0 --port $PORT --ws app.core.ws_protocol:DeflateWebSocketProtocol
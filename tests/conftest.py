@@ -3,8 +3,11 @@ Pytest configuration and fixtures for the test suite
 """
 import pytest
 import asyncio
+import json
 import os
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Generator
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -194,6 +197,22 @@ def auth_headers_admin(client, test_admin, test_password):
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture
+def token_headers():
+    """Factory fixture that mints auth headers for any user without a login round trip"""
+    from app.auth import create_access_token
+
+    def _token_headers(user: User):
+        token = create_access_token({
+            "sub": user.username,
+            "user_id": user.id,
+            "user_type": user.user_type.value
+        })
+        return {"Authorization": f"Bearer {token}"}
+
+    return _token_headers
+
+
 # ============= Game Fixtures =============
 
 @pytest.fixture
@@ -273,6 +292,226 @@ def async_client(client):
     return httpx.AsyncClient(app=app, base_url="http://testserver")
 
 
+# ============= Push Fixtures =============
+
+class StubExpo:
+    """
+    Local stand-in for Expo's push API
+
+    /push/send answers every message with an ok ticket, except tokens
+    containing "dead" which get DeviceNotRegistered. /getReceipts answers
+    from ``receipts`` (ticket id -> receipt).
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.receipt_requests = []
+        self.receipts = {}
+        self.connections = 0
+        self.status_code = 200
+        self._lock = threading.Lock()
+
+    def tickets(self, batch):
+        return [
+            {"status": "error", "message": "not registered", "details": {"error": "DeviceNotRegistered"}}
+            if "dead" in message["to"] else {"status": "ok", "id": f"ticket-{message['to']}"}
+            for message in batch
+        ]
+
+    def answer(self, path, body):
+        with self._lock:
+            if path.endswith("/getReceipts"):
+                self.receipt_requests.append(body["ids"])
+                return {"data": {i: self.receipts[i] for i in body["ids"] if i in self.receipts}}
+            self.batches.append(body)
+            return {"data": self.tickets(body)}
+
+
+@pytest.fixture
+def stub_expo():
+    """Run a StubExpo on a local port; ``push_url``/``receipts_url`` point at it"""
+    stub = StubExpo()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+        def setup(self):
+            super().setup()
+            with stub._lock:
+                stub.connections += 1
+
+        def do_POST(self):
+            request_body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            body = json.dumps(stub.answer(self.path, request_body)).encode()
+            self.send_response(stub.status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/--/api/v2"
+    stub.push_url = f"{base}/push/send"
+    stub.receipts_url = f"{base}/push/getReceipts"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+# ============= Email Fixtures =============
+
+class StubResend:
+    """
+    Local stand-in for Resend's API
+
+    Records each POST to /emails and /emails/batch as a list of emails in
+    ``requests``. The first ``fail_next`` requests get a 500.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def answer(self, path, body):
+        with self._lock:
+            if self.fail_next:
+                self.fail_next -= 1
+                return 500, {"statusCode": 500, "name": "internal_server_error", "message": "unavailable"}
+            emails = body if path.endswith("/batch") else [body]
+            self.requests.append(emails)
+            ids = [{"id": f"email-{len(self.requests)}-{n}"} for n in range(len(emails))]
+            return 200, ({"data": ids} if path.endswith("/batch") else ids[0])
+
+    @property
+    def emails(self):
+        return [email for request in self.requests for email in request]
+
+
+@pytest.fixture
+def stub_resend(monkeypatch):
+    """Run a StubResend on a local port and point the resend client and settings at it"""
+    import resend
+
+    stub = StubResend()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request_body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status_code, answer = stub.answer(self.path, request_body)
+            body = json.dumps(answer).encode()
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(resend, "api_url", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(resend, "api_key", "re_test")
+    monkeypatch.setattr(settings, "RESEND_API_KEY", "re_test")
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+class StubSMTP:
+    """Messages received by the local SMTP stand-in, and connections made"""
+
+    def __init__(self):
+        self.messages = []  # (mail from, [rcpt to], raw message)
+        self.connections = 0
+        self._lock = threading.Lock()
+
+
+@pytest.fixture
+def stub_smtp(monkeypatch):
+    """Run a minimal SMTP server on a local port and point the SMTP settings at it"""
+    import socketserver
+
+    stub = StubSMTP()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self):
+            with stub._lock:
+                stub.connections += 1
+            self.reply("220 stub ESMTP")
+            sender, recipients = None, []
+            while True:
+                line = self.rfile.readline().decode().rstrip("\r\n")
+                command = line[:4].upper()
+                if not line or command == "QUIT":
+                    self.reply("221 bye")
+                    return
+                if command == "EHLO":
+                    self.reply("250-stub")
+                    self.reply("250 AUTH PLAIN")
+                elif command == "AUTH":
+                    self.reply("235 authenticated")
+                elif command == "MAIL":
+                    sender, recipients = line.split(":", 1)[1].strip(" <>"), []
+                    self.reply("250 ok")
+                elif command == "RCPT":
+                    recipients.append(line.split(":", 1)[1].strip(" <>"))
+                    self.reply("250 ok")
+                elif command == "DATA":
+                    self.reply("354 go ahead")
+                    data = []
+                    while (chunk := self.rfile.readline().decode()) != ".\r\n":
+                        data.append(chunk)
+                    with stub._lock:
+                        stub.messages.append((sender, recipients, "".join(data)))
+                    self.reply("250 queued")
+                else:
+                    self.reply("250 ok")
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for name, value in {
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": server.server_address[1],
+        "SMTP_USERNAME": "support@example.com",
+        "SMTP_PASSWORD": "secret",
+        "SMTP_FROM_EMAIL": "support@example.com",
+        "SMTP_USE_TLS": False,
+        "CONTACT_EMAIL": "inbox@example.com",
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+# ============= Encryption Fixtures =============
+
+@pytest.fixture
+def encryption_keys():
+    """Point the app's credential encryption at the given comma-separated keys for one test"""
+    from app.encryption import credential_encryption
+
+    saved = credential_encryption.cipher, credential_encryption.primary
+
+    def _keys(value):
+        credential_encryption.initialize_cipher(value)
+    yield _keys
+    credential_encryption.cipher, credential_encryption.primary = saved
+
+
 # ============= Environment Fixtures =============
 
 @pytest.fixture(autouse=True)
@@ -285,6 +524,47 @@ def test_environment(monkeypatch):
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_bet_throttle():
+    """Clear per-user bet throttle state between tests"""
+    from app.services.bet_throttle import bet_throttle
+    bet_throttle.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_leaderboard():
+    """Clear in-memory leaderboard state between tests"""
+    from app.services.leaderboard import leaderboard
+    leaderboard.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_dashboard_stats():
+    """Drop the cached admin dashboard snapshot between tests"""
+    from app.services.dashboard_stats import dashboard_stats
+    dashboard_stats.reset()
+    yield
+    dashboard_stats.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_push_token_cache():
+    """Forget cached push tokens between tests"""
+    from app.services.push_tokens import token_cache
+    token_cache.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def disable_scheduler(monkeypatch):
+    """Keep background workers from starting with the test app"""
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", False)
+    monkeypatch.setattr(settings, "OUTBOX_DISPATCHER_ENABLED", False)
+    yield
+
+
 # ============= Cleanup Fixtures =============
 
 @pytest.fixture(autouse=True)
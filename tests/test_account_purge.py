@@ -0,0 +1,211 @@
+"""
+Test suite for background account deletion
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import event, func, select, text
+from app.models import (
+    AccountPurge, AccountPurgeStatus, BetResult, BetTransaction, CommunityPost, FriendRequest, LedgerEntry,
+    LedgerTransactionType, Message, OfferType, PlatformOffer, PostComment, PostVisibility, Report, Ticket,
+    TicketMessage, User
+)
+from app.services import account_purge, ledger
+from app.services.account_purge import purge_accounts, request_purge
+
+
+@pytest.fixture
+def foreign_keys(db):
+    """Enforce foreign keys on the shared SQLite connection for one test"""
+    db.execute(text("PRAGMA foreign_keys=ON"))
+    assert db.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    yield
+    db.execute(text("PRAGMA foreign_keys=OFF"))
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """Run in a scratch directory with an uploads/ folder"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "uploads" / "community").mkdir(parents=True)
+    return tmp_path / "uploads"
+
+
+def populate(db, user, other, admin, make_friends):
+    """Give ``user`` rows in most tables that reference users"""
+    make_friends(user, other)
+    db.add_all([
+        Message(sender_id=user.id, receiver_id=other.id, content="hi"),
+        Message(sender_id=other.id, receiver_id=user.id, content="hello"),
+        FriendRequest(sender_id=other.id, receiver_id=user.id),
+        BetTransaction(user_id=user.id, game_type="lucky_dice", bet_amount=5, win_amount=0,
+                       result=BetResult.LOSE, balance_before=100, balance_after=95),
+        Report(reporter_id=other.id, reported_user_id=user.id, reason="spam", reviewed_by=admin.id),
+    ])
+    post = CommunityPost(author_id=user.id, content="post", visibility=PostVisibility.PLAYERS,
+                         image_url="/uploads/community/post.png")
+    ticket = Ticket(ticket_number="T-1", user_id=user.id, subject="help", assigned_admin_id=admin.id)
+    db.add_all([post, ticket])
+    db.flush()
+    db.add_all([
+        PostComment(post_id=post.id, author_id=other.id, content="nice"),
+        TicketMessage(ticket_id=ticket.id, sender_id=admin.id, content="on it"),
+        Report(reporter_id=other.id, reported_user_id=admin.id, reason="x", appeal_ticket_id=ticket.id),
+    ])
+    db.commit()
+    ledger.credit_user(db, user.id, 50, LedgerTransactionType.ADMIN_ADJUSTMENT)
+    db.commit()
+
+
+class TestRequestPurge:
+    """Test the DELETE endpoints"""
+
+    def test_delete_my_account_disables_immediately(self, client, db, test_player, token_headers, test_password):
+        headers = token_headers(test_player)
+        response = client.request("DELETE", "/api/v1/users/me", json={"password": test_password}, headers=headers)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        db.refresh(test_player)
+        assert test_player.is_active is False
+        purge = db.query(AccountPurge).filter(AccountPurge.user_id == test_player.id).one()
+        assert purge.status == AccountPurgeStatus.PENDING
+
+        response = client.get("/api/v1/users/online-status", headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_wrong_password(self, client, db, test_player, token_headers):
+        response = client.request("DELETE", "/api/v1/users/me", json={"password": "nope"},
+                                  headers=token_headers(test_player))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert db.query(AccountPurge).count() == 0
+
+    def test_admin_delete_and_progress(self, client, db, test_admin, test_player, token_headers):
+        headers = token_headers(test_admin)
+        user_id = test_player.id
+        response = client.delete(f"/api/v1/admin/users/{user_id}", headers=headers)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["purge"]["status"] == "pending"
+
+        toggle = client.patch(f"/api/v1/admin/users/{user_id}/toggle-status", headers=headers)
+        assert toggle.status_code == status.HTTP_409_CONFLICT
+
+        purge_accounts(db)
+        progress = client.get(f"/api/v1/admin/users/{user_id}/purge", headers=headers).json()
+        assert progress["status"] == "completed"
+        assert progress["steps_done"] == progress["steps_total"]
+        db.expire_all()
+        assert db.get(User, user_id) is None
+
+    def test_unfriended_immediately(self, client, db, test_player, test_client_user, make_friends, token_headers):
+        make_friends(test_player, test_client_user)
+        db.add(FriendRequest(sender_id=test_client_user.id, receiver_id=test_player.id))
+        db.commit()
+        request_purge(db, test_player)
+
+        headers = token_headers(test_client_user)
+        response = client.post("/api/v1/chat/send/text", data={"receiver_id": test_player.id, "content": "hi"},
+                               headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = client.post(f"/api/v1/friends/send/{test_player.id}", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["error"]["message"] == "User not found"
+        assert db.query(FriendRequest).count() == 0
+
+
+class TestPurgeJob:
+    """Test the batched, resumable purge"""
+
+    def test_purges_all_references(self, db, foreign_keys, uploads, monkeypatch, test_player,
+                                   test_client_user, test_admin, make_friends):
+        (uploads / "community" / "post.png").write_bytes(b"png")
+        populate(db, test_player, test_client_user, test_admin, make_friends)
+        monkeypatch.setattr(account_purge.settings, "ACCOUNT_PURGE_BATCH_SIZE", 1)
+
+        user_id = test_player.id
+        purge = request_purge(db, test_player, requested_by=test_admin)
+        result = purge_accounts(db, max_batches=1000)
+
+        assert result["completed"] == 1
+        db.refresh(purge)
+        assert purge.status == AccountPurgeStatus.COMPLETED
+        assert purge.files_deleted == 1
+        assert not (uploads / "community" / "post.png").exists()
+        db.expire_all()
+        assert db.get(User, user_id) is None
+        assert db.query(Message).count() == 0
+        assert db.query(Ticket).count() == 0
+        assert db.query(Report).one().appeal_ticket_id is None
+        # The ledger is kept, detached from the deleted account
+        assert db.query(LedgerEntry).count() == 2
+        assert db.query(LedgerEntry).filter(LedgerEntry.user_id == user_id).count() == 0
+        assert db.get(User, test_client_user.id).friends == []
+
+    def test_batches_are_bounded_and_resumable(self, db, monkeypatch, test_player, test_client_user):
+        db.add_all([Message(sender_id=test_player.id, receiver_id=test_client_user.id, content=str(i))
+                    for i in range(5)])
+        db.commit()
+        monkeypatch.setattr(account_purge.settings, "ACCOUNT_PURGE_BATCH_SIZE", 2)
+        purge = request_purge(db, test_player)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            purge_accounts(db, max_batches=13)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        db.refresh(purge)
+        assert purge.status == AccountPurgeStatus.RUNNING
+        assert purge.current_step == "messages"
+        assert db.scalar(select(func.count(Message.id))) == 1
+        assert not any("DELETE FROM users" in s for s in statements)
+
+        # A crash mid-batch rolls the batch back and is retried
+        original = account_purge._run_batch
+
+        def crash(*args):
+            raise RuntimeError("connection lost")
+
+        monkeypatch.setattr(account_purge, "_run_batch", crash)
+        assert purge_accounts(db)["failed"] == 0
+        db.refresh(purge)
+        assert (purge.attempts, purge.last_error) == (1, "connection lost")
+
+        monkeypatch.setattr(account_purge, "_run_batch", original)
+        assert purge_accounts(db)["completed"] == 1
+        db.refresh(purge)
+        assert purge.status == AccountPurgeStatus.COMPLETED
+        assert db.scalar(select(func.count(Message.id))) == 0
+
+    def test_gives_up_after_max_attempts(self, db, monkeypatch, test_player):
+        purge = request_purge(db, test_player)
+        monkeypatch.setattr(account_purge.settings, "ACCOUNT_PURGE_MAX_ATTEMPTS", 2)
+        monkeypatch.setattr(account_purge, "_run_batch", lambda *args: 1 / 0)
+
+        purge_accounts(db)
+        assert purge_accounts(db)["failed"] == 1
+        db.refresh(purge)
+        assert purge.status == AccountPurgeStatus.FAILED
+
+        # Deleting the account again restarts it from the first step
+        request_purge(db, test_player)
+        db.refresh(purge)
+        assert (purge.status, purge.attempts, purge.current_step) == (AccountPurgeStatus.PENDING, 0, None)
+
+    def test_offers_outlive_their_admin(self, db, foreign_keys, create_test_user, test_admin):
+        admin_id = create_test_user(user_type=test_admin.user_type).id
+        offer = PlatformOffer(title="Welcome", description="d", offer_type=OfferType.LOYALTY, bonus_amount=5,
+                              created_by=admin_id)
+        db.add(offer)
+        db.commit()
+
+        request_purge(db, db.get(User, admin_id))
+        assert purge_accounts(db)["completed"] == 1
+        db.refresh(offer)
+        assert offer.created_by is None
+
+    def test_media_outside_uploads_is_left_alone(self, uploads):
+        outside = uploads.parent / "secret.txt"
+        outside.write_text("keep")
+        assert account_purge.delete_media("/uploads/../secret.txt") is False
+        assert account_purge.delete_media("https://example.com/a.png") is False
+        assert outside.exists()
@@ -0,0 +1,144 @@
+"""
+Test suite for the activity_events feed
+"""
+import pytest
+from fastapi import status
+from app.models import (
+    ActivityEvent, FriendRequest, FriendRequestStatus, Message, User, UserType
+)
+from app.services.activity_feed import get_feed, rebuild_events
+
+
+def events(db, owner_id):
+    db.expire_all()
+    return db.query(ActivityEvent).filter(
+        ActivityEvent.owner_id == owner_id
+    ).order_by(ActivityEvent.id).all()
+
+
+def send(db, sender, receiver, count=1):
+    for _ in range(count):
+        db.add(Message(sender_id=sender.id, receiver_id=receiver.id, content="hi"))
+    db.commit()
+
+
+class TestEventRecording:
+    """Test events appended by the flush listener"""
+
+    def test_message_to_client(self, db, test_client_user, test_player):
+        send(db, test_player, test_client_user)
+
+        [event] = events(db, test_client_user.id)
+        assert event.event_type == "message_received"
+        assert event.actor_name == test_player.username
+        assert event.status == "Unread"
+
+    def test_player_owner_not_recorded(self, db, test_client_user, test_player):
+        send(db, test_client_user, test_player)
+        assert db.query(ActivityEvent).count() == 0
+
+    def test_friend_request_lifecycle(self, db, test_client_user, test_player):
+        request = FriendRequest(sender_id=test_client_user.id, receiver_id=test_player.id)
+        db.add(request)
+        db.commit()
+        request.status = FriendRequestStatus.ACCEPTED
+        db.commit()
+
+        assert [(e.event_type, e.status) for e in events(db, test_client_user.id)] == [
+            ("friend_request_sent", "Pending"),
+            ("friend_request_accepted", "Accepted"),
+        ]
+
+    def test_player_registration(self, db, test_client_user):
+        db.add(User(
+            username="new_player",
+            hashed_password="x",
+            user_id="NEWPLAYR",
+            user_type=UserType.PLAYER,
+            created_by_client_id=test_client_user.id
+        ))
+        db.commit()
+
+        [event] = events(db, test_client_user.id)
+        assert (event.event_type, event.actor_name) == ("player_registered", "new_player")
+
+    def test_rollback_discards_events(self, db, test_client_user, test_player):
+        db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content="x"))
+        db.flush()
+        db.rollback()
+        assert events(db, test_client_user.id) == []
+
+
+class TestFeedQuery:
+    """Test keyset pagination"""
+
+    def test_pages_cover_feed_once(self, db, test_client_user, test_player):
+        send(db, test_player, test_client_user, 7)
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = get_feed(db, test_client_user.id, limit=3, cursor=cursor)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+
+        assert len(seen) == 7
+        assert seen == sorted(seen, reverse=True)
+
+    def test_invalid_cursor(self, db, test_client_user):
+        with pytest.raises(ValueError):
+            get_feed(db, test_client_user.id, cursor="not-a-cursor")
+
+    def test_rebuild_matches_incremental(self, db, test_client_user, test_player):
+        send(db, test_player, test_client_user, 2)
+        db.add(FriendRequest(sender_id=test_player.id, receiver_id=test_client_user.id))
+        db.commit()
+        incremental = sorted((e.event_type, e.actor_id) for e in events(db, test_client_user.id))
+
+        assert rebuild_events(db) == 3
+        rebuilt = sorted((e.event_type, e.actor_id) for e in events(db, test_client_user.id))
+        assert rebuilt == incremental
+
+
+class TestActivityEndpoints:
+    """Test the client dashboard endpoints"""
+
+    def test_recent_activity(self, client, db, test_client_user, test_player, token_headers):
+        send(db, test_player, test_client_user, 2)
+
+        response = client.get("/api/v1/client/recent-activity", headers=token_headers(test_client_user))
+
+        assert response.status_code == status.HTTP_200_OK
+        activities = response.json()["activities"]
+        assert len(activities) == 2
+        assert activities[0]["description"] == "Message Received"
+        assert activities[0]["user"] == test_player.username
+
+    def test_activity_feed_pagination(self, client, db, test_client_user, test_player, token_headers):
+        send(db, test_player, test_client_user, 3)
+        headers = token_headers(test_client_user)
+
+        first = client.get("/api/v1/client/activity-feed?limit=2", headers=headers).json()
+        second = client.get(
+            f"/api/v1/client/activity-feed?limit=2&cursor={first['next_cursor']}", headers=headers
+        ).json()
+
+        assert len(first["activities"]) == 2
+        assert len(second["activities"]) == 1
+        assert second["next_cursor"] is None
+
+    def test_activity_feed_bad_cursor(self, client, test_client_user, token_headers):
+        response = client.get(
+            "/api/v1/client/activity-feed?cursor=%%%", headers=token_headers(test_client_user)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_new_event_pushed_over_websocket(self, client, db, test_client_user, test_player, token_headers):
+        token = token_headers(test_client_user)["Authorization"].split()[1]
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            assert ws.receive_json()["type"] == "connected"
+            send(db, test_player, test_client_user)
+
+            message = ws.receive_json()
+            assert message["type"] == "activity:new"
+            assert message["data"]["event_type"] == "message_received"
@@ -0,0 +1,151 @@
+"""
+Test suite for the mini-game bet engine
+"""
+import random
+import threading
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.models import Base, BetTransaction, BetResult, GameType, UserType
+from app.config import DICE_MULTIPLIERS, SLOTS_SYMBOL_MULTIPLIERS, SLOTS_TWO_MATCH_MULTIPLIER
+from app.services.bet_engine import (
+    InsufficientCreditsError,
+    resolve_dice,
+    resolve_slots,
+    settle_bet,
+    spin_slots,
+)
+
+
+class TestPayoutFunctions:
+    """Test the pure payout resolution"""
+
+    def test_dice_win(self):
+        outcome = resolve_dice(100, 7, 3, 4)
+        assert outcome.result == BetResult.WIN
+        assert outcome.win_amount == int(100 * DICE_MULTIPLIERS[7])
+        assert outcome.details == {"dice1": 3, "dice2": 4, "total": 7, "prediction": 7}
+
+    def test_dice_loss_records_zero_multiplier(self):
+        outcome = resolve_dice(100, 12, 1, 1)
+        assert outcome.result == BetResult.LOSE
+        assert outcome.win_amount == 0
+        assert outcome.game_data["multiplier"] == 0
+
+    def test_slots_jackpot(self):
+        outcome = resolve_slots(10, ["seven", "seven", "seven"])
+        assert outcome.result == BetResult.JACKPOT
+        assert outcome.win_amount == 10 * SLOTS_SYMBOL_MULTIPLIERS["seven"]
+
+    def test_slots_two_match(self):
+        outcome = resolve_slots(10, ["cherry", "lemon", "cherry"])
+        assert outcome.result == BetResult.WIN
+        assert outcome.win_amount == 10 * SLOTS_TWO_MATCH_MULTIPLIER
+
+    def test_slots_no_match(self):
+        outcome = resolve_slots(10, ["cherry", "lemon", "star"])
+        assert outcome.result == BetResult.LOSE
+        assert outcome.win_amount == 0
+
+
+class TestSettleBet:
+    """Test balance update and audit row atomicity"""
+
+    def test_settle_writes_balance_and_audit(self, db, test_player):
+        outcome = resolve_dice(100, 7, 3, 4)
+        settled = settle_bet(db, test_player.id, 100, outcome)
+
+        db.refresh(test_player)
+        assert settled.balance_before == 1000
+        assert settled.balance_after == 1000 - 100 + outcome.win_amount
+        assert test_player.credits == settled.balance_after
+
+        audit = db.query(BetTransaction).filter(BetTransaction.user_id == test_player.id).one()
+        assert audit.id == settled.transaction_id
+        assert audit.balance_after == settled.balance_after
+        assert audit.game_type == GameType.LUCKY_DICE
+
+    def test_insufficient_credits_changes_nothing(self, db, test_player):
+        with pytest.raises(InsufficientCreditsError):
+            settle_bet(db, test_player.id, 5000, resolve_dice(5000, 7, 3, 4))
+
+        db.refresh(test_player)
+        assert test_player.credits == 1000
+        assert db.query(BetTransaction).count() == 0
+
+
+class TestBetEndpoint:
+    """Test /games/mini-game/bet"""
+
+    def test_bet_returns_new_balance(self, client, db, test_player, token_headers):
+        response = client.post(
+            "/api/v1/games/mini-game/bet",
+            headers=token_headers(test_player),
+            json={"game_type": "slots", "bet_amount": 10}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        db.refresh(test_player)
+        assert data["new_balance"] == test_player.credits
+        assert db.query(BetTransaction).count() == 1
+
+    def test_bet_insufficient_credits(self, client, test_player, token_headers):
+        response = client.post(
+            "/api/v1/games/mini-game/bet",
+            headers=token_headers(test_player),
+            json={"game_type": "dice", "bet_amount": 5000, "prediction": 7}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestConcurrentBets:
+    """Parallel bets on one account must never lose updates or audit rows"""
+
+    def test_parallel_bets_are_consistent(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path}/bets.db",
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        setup = Session()
+        user = models.User(username="racer", user_id="RACER001", hashed_password="x",
+                           user_type=UserType.PLAYER, credits=500)
+        setup.add(user)
+        setup.commit()
+        user_id = user.id
+        setup.close()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            session = Session()
+            try:
+                for _ in range(40):
+                    try:
+                        settle_bet(session, user_id, 10, spin_slots(10, rng))
+                    except InsufficientCreditsError:
+                        pass
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        check = Session()
+        balance = check.query(models.User.credits).filter(models.User.id == user_id).scalar()
+        net = check.query(
+            func.coalesce(func.sum(BetTransaction.win_amount - BetTransaction.bet_amount), 0)
+        ).scalar()
+        check.close()
+        engine.dispose()
+
+        assert balance >= 0
+        assert balance == 500 + net
@@ -0,0 +1,74 @@
+"""
+Test suite for the server-side bet cooldown and token bucket
+"""
+from fastapi import status
+from app.config import BET_COOLDOWN_MS, BET_COOLDOWN_GRACE_MS, BET_BURST_LIMIT, BET_SUSTAINED_INTERVAL_MS
+from app.services.bet_throttle import evaluate
+
+
+class TestThrottleEvaluation:
+    """Test the pure cooldown/bucket step"""
+
+    def test_first_bet_allowed(self):
+        decision, state = evaluate(None, 0)
+        assert decision.allowed
+        assert state.tokens == BET_BURST_LIMIT - 1
+
+    def test_bet_inside_cooldown_rejected(self):
+        _, state = evaluate(None, 0)
+        decision, _ = evaluate(state, 100)
+
+        assert not decision.allowed
+        assert decision.reason == "cooldown"
+        assert decision.retry_after_ms == BET_COOLDOWN_MS - BET_COOLDOWN_GRACE_MS - 100
+
+    def test_bet_after_cooldown_allowed(self):
+        _, state = evaluate(None, 0)
+        decision, _ = evaluate(state, BET_COOLDOWN_MS)
+        assert decision.allowed
+
+    def test_bucket_exhaustion_rejects_until_refill(self):
+        now, state = 0, None
+        for _ in range(BET_BURST_LIMIT * 3):
+            decision, state = evaluate(state, now)
+            if not decision.allowed:
+                break
+            now += BET_COOLDOWN_MS
+
+        assert not decision.allowed
+        assert decision.reason == "rate"
+
+        decision, _ = evaluate(state, now + decision.retry_after_ms)
+        assert decision.allowed
+
+    def test_sustained_rate_never_throttled(self):
+        now, state = 0, None
+        for _ in range(BET_BURST_LIMIT * 3):
+            decision, state = evaluate(state, now)
+            assert decision.allowed
+            now += BET_SUSTAINED_INTERVAL_MS
+
+
+class TestBetEndpointThrottle:
+    """Test the throttle in front of /games/mini-game/bet"""
+
+    def test_back_to_back_bets_rejected(self, client, test_player, token_headers):
+        headers = token_headers(test_player)
+        bet = {"game_type": "slots", "bet_amount": 10}
+
+        first = client.post("/api/v1/games/mini-game/bet", headers=headers, json=bet)
+        second = client.post("/api/v1/games/mini-game/bet", headers=headers, json=bet)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert second.headers["retry-after"] == "1"
+
+    def test_throttle_is_per_user(self, client, test_player, create_test_user, token_headers):
+        other = create_test_user()
+        bet = {"game_type": "slots", "bet_amount": 10}
+
+        first = client.post("/api/v1/games/mini-game/bet", headers=token_headers(test_player), json=bet)
+        second = client.post("/api/v1/games/mini-game/bet", headers=token_headers(other), json=bet)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_200_OK
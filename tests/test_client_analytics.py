@@ -0,0 +1,115 @@
+"""
+Test suite for the client analytics rollups
+"""
+from datetime import timedelta
+import pytest
+from fastapi import status
+from app.models import ClientDailyStats, Message, User, UserType
+from app.services.client_analytics import (
+    load_client_rollup,
+    rebuild_daily_stats,
+    utc_today,
+)
+
+
+def stats_row(db, client_id):
+    db.expire_all()
+    return db.query(ClientDailyStats).filter(
+        ClientDailyStats.client_id == client_id,
+        ClientDailyStats.day == utc_today()
+    ).first()
+
+
+def send(db, sender, receiver, count=1):
+    for _ in range(count):
+        db.add(Message(sender_id=sender.id, receiver_id=receiver.id, content="hi"))
+    db.commit()
+
+
+@pytest.fixture
+def own_player(db, test_client_user):
+    """A player created by the test client"""
+    player = User(
+        username="own_player",
+        hashed_password="x",
+        user_id="OWNPLAYR",
+        user_type=UserType.PLAYER,
+        created_by_client_id=test_client_user.id,
+        is_active=True
+    )
+    db.add(player)
+    db.commit()
+    return player
+
+
+class TestIncrementalRollups:
+    """Test counters maintained by the flush listener"""
+
+    def test_messages_counted_for_client(self, db, test_client_user, test_player):
+        send(db, test_client_user, test_player, 2)
+        send(db, test_player, test_client_user, 3)
+
+        row = stats_row(db, test_client_user.id)
+        assert (row.messages_sent, row.messages_received) == (2, 3)
+
+    def test_player_only_messages_not_counted(self, db, test_player, create_test_user):
+        other = create_test_user()
+        send(db, test_player, other)
+        assert db.query(ClientDailyStats).count() == 0
+
+    def test_signup_counted(self, db, test_client_user, own_player):
+        assert stats_row(db, test_client_user.id).signups == 1
+
+    def test_rollback_discards_increment(self, db, test_client_user, test_player):
+        db.add(Message(sender_id=test_client_user.id, receiver_id=test_player.id, content="x"))
+        db.flush()
+        db.rollback()
+        assert stats_row(db, test_client_user.id) is None
+
+
+class TestRebuild:
+    """Test the backfill/compaction path"""
+
+    def test_rebuild_matches_incremental(self, db, test_client_user, test_player, own_player):
+        send(db, test_client_user, test_player, 4)
+        send(db, test_player, test_client_user, 1)
+        incremental = stats_row(db, test_client_user.id)
+        expected = (incremental.messages_sent, incremental.messages_received, incremental.signups)
+
+        db.query(ClientDailyStats).delete()
+        db.commit()
+        today = utc_today()
+        rebuild_daily_stats(db, today - timedelta(days=1), today + timedelta(days=1))
+
+        rebuilt = stats_row(db, test_client_user.id)
+        assert (rebuilt.messages_sent, rebuilt.messages_received, rebuilt.signups) == expected
+
+    def test_rebuild_is_idempotent(self, db, test_client_user, test_player):
+        send(db, test_client_user, test_player, 2)
+        today = utc_today()
+        for _ in range(2):
+            rebuild_daily_stats(db, today, today + timedelta(days=1))
+        assert stats_row(db, test_client_user.id).messages_sent == 2
+
+    def test_rollup_gauges_snapshotted_on_read(self, db, test_client_user, own_player):
+        rollup = load_client_rollup(db, test_client_user.id, utc_today())
+        assert rollup["active_players"] == 1
+        assert rollup["total_players"] == 1
+        assert stats_row(db, test_client_user.id).active_players == 1
+
+
+class TestAnalyticsEndpoint:
+    """Test /client/analytics served from rollups"""
+
+    def test_analytics_reads_rollups(self, client, db, test_client_user, test_player, own_player, token_headers):
+        send(db, test_client_user, test_player, 2)
+        send(db, test_player, test_client_user, 1)
+
+        response = client.get("/api/v1/client/analytics", headers=token_headers(test_client_user))
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_messages"] == 3
+        assert data["new_signups"] == 1
+        assert data["active_players"] == 1
+        assert data["messages_trend"] == {"value": "+3", "is_positive": True}
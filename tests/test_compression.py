@@ -0,0 +1,119 @@
+"""
+Test suite for the response compression middleware
+"""
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+from app.core.compression import (
+    CompressionMiddleware,
+    BROTLI_AVAILABLE,
+    parse_accept_encoding,
+    select_encoding,
+)
+
+BIG_PAYLOAD = {"users": [{"id": i, "username": f"user_{i}"} for i in range(500)]}
+
+
+@pytest.fixture
+def compressed_client():
+    """Small app wrapped in the middleware"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return JSONResponse(BIG_PAYLOAD)
+
+    @app.get("/small")
+    def small():
+        return JSONResponse({"ok": True})
+
+    @app.get("/binary")
+    def binary():
+        return Response(b"\x00" * 5000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        def rows():
+            for i in range(200):
+                yield f'{{"id": {i}}}\n'
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("hello " * 500)
+
+    return TestClient(app)
+
+
+class TestAcceptEncoding:
+    """Test Accept-Encoding negotiation"""
+
+    def test_parse_q_values(self):
+        assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0") == {
+            "gzip": 1.0, "br": 0.5, "identity": 0.0
+        }
+
+    def test_gzip_only(self):
+        assert select_encoding("gzip, deflate") == "gzip"
+
+    def test_rejected_coding(self):
+        assert select_encoding("gzip;q=0") is None
+        assert select_encoding("") is None
+
+    def test_brotli_preferred_when_available(self):
+        expected = "br" if BROTLI_AVAILABLE else "gzip"
+        assert select_encoding("gzip, br") == expected
+        assert select_encoding("gzip, br", allow_brotli=False) == "gzip"
+
+
+class TestCompressionMiddleware:
+    """Test which responses get compressed"""
+
+    def test_large_json_is_gzipped(self, compressed_client):
+        response = compressed_client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(str(BIG_PAYLOAD))
+        assert response.json() == BIG_PAYLOAD
+
+    @pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli not installed")
+    def test_large_json_is_brotli_encoded(self, compressed_client):
+        response = compressed_client.get("/big", headers={"Accept-Encoding": "br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.json() == BIG_PAYLOAD
+
+    def test_small_response_untouched(self, compressed_client):
+        response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_non_allowlisted_type_untouched(self, compressed_client):
+        response = compressed_client.get("/binary", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert len(response.content) == 5000
+
+    def test_no_accept_encoding_untouched(self, compressed_client):
+        response = compressed_client.get("/big", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_response_is_compressed(self, compressed_client):
+        response = compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = response.text.strip().split("\n")
+        assert len(lines) == 200
+
+    def test_text_is_compressed(self, compressed_client):
+        with compressed_client.stream("GET", "/text", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert gzip.decompress(raw).decode() == "hello " * 500
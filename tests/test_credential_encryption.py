@@ -0,0 +1,126 @@
+"""
+Test suite for batched credential decryption and encryption key rotation
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import update
+from app.encryption import CredentialEncryption, credential_encryption, generate_encryption_key
+from app.models import GameCredentials
+from scripts.migrate_credentials import rotate_keys
+
+OLD_KEY = generate_encryption_key()
+NEW_KEY = generate_encryption_key()
+
+
+@pytest.fixture
+def add_credentials(db, test_player, test_client_user, populate_games):
+    def _add_credentials():
+        rows = [
+            GameCredentials(
+                player_id=test_player.id,
+                game_id=game.id,
+                game_username=f"user-{game.name}",
+                game_password=f"pass-{game.name}",
+                created_by_client_id=test_client_user.id
+            )
+            for game in populate_games
+        ]
+        db.add_all(rows)
+        db.commit()
+        return rows
+    return _add_credentials
+
+
+class TestCredentialEncryption:
+    """Test MultiFernet keys and batch decryption"""
+
+    def test_old_values_readable_after_new_key_added(self):
+        token = CredentialEncryption(OLD_KEY).encrypt("secret")
+        both = CredentialEncryption(f"{NEW_KEY},{OLD_KEY}")
+
+        assert both.decrypt(token) == "secret"
+        assert both.needs_rotation(token)
+        rotated = both.rotate(token)
+        assert not both.needs_rotation(rotated)
+        assert CredentialEncryption(NEW_KEY).decrypt(rotated) == "secret"
+        assert CredentialEncryption(OLD_KEY).decrypt(rotated) is None
+
+    def test_decrypt_many_in_order_on_thread_pool(self):
+        encryption = CredentialEncryption(NEW_KEY)
+        values = [encryption.encrypt(f"value-{n}") for n in range(200)]
+        values[7] = "not-a-token"
+        values[8] = None
+
+        decrypted = encryption.decrypt_many(values)
+        assert encryption._executor is not None
+        assert decrypted[:7] == [f"value-{n}" for n in range(7)]
+        assert decrypted[7:9] == [None, None]
+        assert decrypted[199] == "value-199"
+
+    def test_unparseable_key_refused_outside_development(self, monkeypatch):
+        with pytest.raises(ValueError):
+            CredentialEncryption("not-a-key")
+
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        assert CredentialEncryption("not-a-key").enabled
+
+
+class TestKeyRotation:
+    """Test the chunked re-encryption job"""
+
+    def test_rotation_resumable_and_idempotent(self, db, encryption_keys, add_credentials):
+        encryption_keys(OLD_KEY)
+        rows = add_credentials()
+        ids = sorted(row.id for row in rows)
+        encryption_keys(f"{NEW_KEY},{OLD_KEY}")
+
+        # An interrupted run: resume after the second credential
+        stats = rotate_keys(db, batch_size=2, start_after=ids[1])
+        assert (stats["checked"], stats["rotated"], stats["last_id"]) == (3, 3, ids[-1])
+        assert rotate_keys(db, batch_size=2)["rotated"] == 2
+        assert rotate_keys(db, batch_size=2)["rotated"] == 0
+
+        encryption_keys(NEW_KEY)
+        db.expire_all()
+        assert sorted(row.game_username for row in db.query(GameCredentials)) == sorted(
+            f"user-{row.game.name}" for row in rows
+        )
+
+    def test_concurrent_change_not_overwritten(self, db, monkeypatch, encryption_keys, add_credentials):
+        encryption_keys(OLD_KEY)
+        changed = add_credentials()[0]
+        encryption_keys(f"{NEW_KEY},{OLD_KEY}")
+        rotate = credential_encryption.rotate
+
+        def edited_meanwhile(value):
+            # The API updates a credential after the batch was read
+            if not db.info.get("edited"):
+                db.info["edited"] = True
+                db.execute(update(GameCredentials).where(GameCredentials.id == changed.id).values(
+                    game_username_encrypted=credential_encryption.encrypt("edited"),
+                    game_password_encrypted=credential_encryption.encrypt("edited-pass")
+                ))
+            return rotate(value)
+
+        monkeypatch.setattr(credential_encryption, "rotate", edited_meanwhile)
+        stats = rotate_keys(db)
+
+        assert (stats["rotated"], stats["skipped"]) == (4, 1)
+        db.expire_all()
+        assert db.get(GameCredentials, changed.id).game_username == "edited"
+
+
+class TestCredentialEndpoints:
+    """Test that lists are decrypted from the encrypted columns"""
+
+    def test_my_credentials(self, client, db, test_player, token_headers, encryption_keys, add_credentials):
+        encryption_keys(NEW_KEY)
+        add_credentials()
+
+        response = client.get("/api/v1/game-credentials/my-credentials", headers=token_headers(test_player))
+        assert response.status_code == status.HTTP_200_OK
+        credentials = response.json()["credentials"]
+        assert len(credentials) == 5
+        assert {(c["game_username"], c["game_password"]) for c in credentials} == {
+            (f"user-{c['game_name']}", f"pass-{c['game_name']}") for c in credentials
+        }
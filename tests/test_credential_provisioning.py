@@ -0,0 +1,89 @@
+"""
+Test suite for bulk game credential provisioning
+"""
+import pytest
+from fastapi import status
+from app.encryption import generate_encryption_key
+from app.models import ClientDailyStats, GameCredentials, Message
+from app.services import credential_provisioning
+
+
+@pytest.fixture(autouse=True)
+def encryption_key(encryption_keys):
+    encryption_keys(generate_encryption_key())
+
+
+def row(player, game, username="user", password="pass"):
+    return {"player_id": player.id, "game_id": game.id, "game_username": username, "game_password": password}
+
+
+def provision(client, token_headers, client_user, rows):
+    return client.post(
+        "/api/v1/game-credentials/bulk",
+        json={"credentials": rows},
+        headers=token_headers(client_user)
+    )
+
+
+class TestBulkProvisioning:
+    """Test validation, upserts and per-row results"""
+
+    def test_creates_updates_and_reports_errors(
+        self, client, db, token_headers, test_client_user, test_player, create_test_user, populate_games
+    ):
+        juwa, kirin = populate_games[:2]
+        other = create_test_user()
+        db.add(GameCredentials(
+            player_id=test_player.id, game_id=juwa.id, game_username="old", game_password="old",
+            created_by_client_id=test_client_user.id
+        ))
+        db.commit()
+
+        response = provision(client, token_headers, test_client_user, [
+            row(test_player, juwa, "new-juwa", "pw1"),      # overwrites
+            row(test_player, kirin, "new-kirin", "pw2"),    # creates
+            row(other, juwa, "other", "pw3"),               # creates
+            {**row(test_player, juwa), "player_id": 999999},
+            {**row(test_player, juwa), "game_id": 999999},
+            row(test_player, kirin, "again", "pw4"),        # duplicate of row 1
+            row(test_player, juwa, "", "pw5"),
+        ])
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert (data["created"], data["updated"], data["failed"]) == (2, 1, 4)
+        assert [r["status"] for r in data["results"]] == [
+            "updated", "created", "created", "error", "error", "error", "error"
+        ]
+        assert [r["error"] for r in data["results"][3:]] == [
+            "Player not found", "Game not found",
+            "Duplicate of an earlier row for this player and game", "Username and password are required"
+        ]
+
+        db.expire_all()
+        stored = {c.id: c for c in db.query(GameCredentials)}
+        assert len(stored) == 3
+        assert stored[data["results"][0]["credential_id"]].game_username == "new-juwa"
+        assert stored[data["results"][1]["credential_id"]].game_password == "pw2"
+        assert db.query(Message).filter(Message.receiver_id == test_player.id).count() == 2
+
+    def test_large_batch_in_chunks(
+        self, client, db, monkeypatch, token_headers, test_client_user, create_test_user, populate_games
+    ):
+        monkeypatch.setattr(credential_provisioning, "UPSERT_CHUNK_SIZE", 20)
+        players = [create_test_user() for _ in range(12)]
+        rows = [row(p, g, f"u{p.id}-{g.id}", f"p{p.id}-{g.id}") for p in players for g in populate_games]
+
+        response = provision(client, token_headers, test_client_user, rows)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["created"] == 60
+
+        # Re-sending the same batch updates in place
+        response = provision(client, token_headers, test_client_user, rows)
+        assert (response.json()["created"], response.json()["updated"]) == (0, 60)
+        assert db.query(GameCredentials).count() == 60
+        stats = db.query(ClientDailyStats).filter_by(client_id=test_client_user.id).one()
+        assert stats.messages_sent == 120
+
+    def test_only_clients(self, client, token_headers, test_player, populate_games):
+        response = provision(client, token_headers, test_player, [row(test_player, populate_games[0])])
+        assert response.status_code == status.HTTP_403_FORBIDDEN
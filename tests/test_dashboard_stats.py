@@ -0,0 +1,126 @@
+"""
+Test suite for the cached admin dashboard statistics
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import event
+from app.models import Message, Report, Review, UserType
+from app.services.dashboard_stats import (
+    DashboardStatsCache,
+    compute_dashboard_stats,
+    diff_stats,
+)
+
+
+@pytest.fixture
+def count_queries(db):
+    """Count SQL statements executed on the test engine"""
+    engine = db.get_bind()
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_execute)
+
+
+@pytest.fixture
+def populated(db, test_admin, test_client_user, test_player, create_test_user):
+    pending = create_test_user(user_type=UserType.CLIENT, is_approved=False)
+    db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content="hi"))
+    db.add(Review(reviewer_id=test_player.id, reviewee_id=test_client_user.id, rating=4, title="Good"))
+    db.add(Review(reviewer_id=pending.id, reviewee_id=test_client_user.id, rating=5, title="Great"))
+    db.add(Report(reporter_id=test_player.id, reported_user_id=test_client_user.id, reason="spam"))
+    db.commit()
+
+
+class TestComputeStats:
+    """Test the aggregate queries"""
+
+    def test_values(self, db, populated):
+        stats = compute_dashboard_stats(db)
+
+        assert stats["users"] == {
+            "total": 4,
+            "clients": 2,
+            "players": 1,
+            "active": 4,
+            "online": 0,
+            "recent_registrations": 4,
+            "pending_approvals": 1
+        }
+        assert stats["messages"] == {"total": 1, "today": 1}
+        assert stats["reviews"] == {"total": 2, "average_rating": 4.5}
+        assert stats["reports"] == {"pending": 1}
+
+    def test_three_statements(self, db, populated, count_queries):
+        compute_dashboard_stats(db)
+        assert len(count_queries) == 3
+
+
+class TestCache:
+    """Test caching and change detection"""
+
+    def test_cached_within_ttl(self, db, populated, count_queries):
+        cache = DashboardStatsCache(ttl_seconds=60, live_interval_seconds=5)
+        first = cache.get(db)
+        executed = len(count_queries)
+
+        assert cache.get(db) is first
+        assert len(count_queries) == executed
+
+    def test_recomputed_after_ttl(self, db, populated):
+        cache = DashboardStatsCache(ttl_seconds=0, live_interval_seconds=5)
+        assert cache.get(db) is not cache.get(db)
+
+    def test_refresh_reports_changes(self, db, populated, test_player, test_client_user):
+        cache = DashboardStatsCache(ttl_seconds=60, live_interval_seconds=5)
+        cache.get(db)
+        db.add(Message(sender_id=test_client_user.id, receiver_id=test_player.id, content="yo"))
+        db.commit()
+
+        assert cache.refresh(db) == {"messages.total": 2, "messages.today": 2}
+
+    def test_diff_stats(self):
+        old = {"users": {"total": 1, "online": 0}}
+        new = {"users": {"total": 1, "online": 2}, "reports": {"pending": 0}}
+        assert diff_stats(old, new) == {"users.online": 2, "reports.pending": 0}
+
+
+class TestDashboardEndpoint:
+    """Test /admin/dashboard-stats and the live room"""
+
+    def test_admin_gets_stats(self, client, populated, test_admin, token_headers):
+        response = client.get("/api/v1/admin/dashboard-stats", headers=token_headers(test_admin))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["users"]["total"] == 4
+
+    def test_non_admin_rejected(self, client, test_player, token_headers):
+        response = client.get("/api/v1/admin/dashboard-stats", headers=token_headers(test_player))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_live_room_sends_snapshot(self, client, populated, test_admin, token_headers):
+        headers = token_headers(test_admin)
+        client.get("/api/v1/admin/dashboard-stats", headers=headers)  # warm cache
+        token = headers["Authorization"].split()[1]
+
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.receive_json()  # connected
+            ws.send_json({"type": "room:join", "data": {"room_id": "admin:dashboard"}})
+            messages = [ws.receive_json() for _ in range(2)]
+
+        stats = next(m for m in messages if m["type"] == "admin:stats")
+        assert stats["data"]["full"] is True
+        assert stats["data"]["stats"]["users"]["total"] == 4
+
+    def test_live_room_requires_admin(self, client, test_player, token_headers):
+        token = token_headers(test_player)["Authorization"].split()[1]
+
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.receive_json()  # connected
+            ws.send_json({"type": "room:join", "data": {"room_id": "admin:dashboard"}})
+            message = ws.receive_json()
+
+        assert message["type"] == "error"
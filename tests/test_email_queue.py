@@ -0,0 +1,117 @@
+"""
+Test suite for email templates and the background email queue, against local
+stand-ins for Resend and SMTP
+"""
+import asyncio
+from fastapi import status
+from app.services.email_queue import EmailQueue, email_queue
+from app.services.email_service import TEMPLATES, EmailTemplate, render_email, send_otp_email
+
+
+def welcome(n):
+    return render_email("welcome", f"user{n}@example.com", username=f"user{n}")
+
+
+class TestTemplates:
+    """Test the precompiled templates"""
+
+    def test_compiled_once_with_brand(self):
+        assert isinstance(TEMPLATES["otp"], EmailTemplate)
+        assert "${brand}" not in TEMPLATES["welcome"].html.template
+        assert render_email("welcome", "a@example.com", username="Ann").subject.startswith("Welcome to ")
+
+    def test_parameters_escaped_in_html_only(self):
+        message = render_email("welcome", "a@example.com", username="<b>Ann</b>")
+        assert "&lt;b&gt;Ann&lt;/b&gt;" in message.html and "<b>Ann</b>" not in message.html
+        assert "<b>Ann</b>" in message.text
+
+    def test_send_otp_email(self, stub_resend):
+        assert send_otp_email("a@example.com", "123456", "Ann") is True
+        [email] = stub_resend.emails
+        assert email["to"] == ["a@example.com"] and "123456" in email["html"]
+
+
+class TestEmailQueue:
+    """Test batching, retries and hand-off from threads"""
+
+    def test_queued_messages_sent_in_one_batch(self, stub_resend):
+        queue = EmailQueue(workers=2)
+
+        async def scenario():
+            for n in range(5):
+                queue.submit(welcome(n))
+            await queue.stop()
+
+        asyncio.run(scenario())
+        assert [len(request) for request in stub_resend.requests] == [5]
+        assert [email["to"] for email in stub_resend.emails] == [[f"user{n}@example.com"] for n in range(5)]
+        assert queue.status()["sent"] == 5
+
+    def test_failure_retried_after_backoff(self, stub_resend):
+        stub_resend.fail_next = 1
+        queue = EmailQueue(retry_base_seconds=30)
+
+        async def scenario():
+            queue.submit(welcome(1))
+            await asyncio.sleep(0.1)
+            waiting = queue.status()["awaiting_retry"]
+            await queue.flush()  # sends due retries now
+            await queue.stop()
+            return waiting
+
+        assert asyncio.run(scenario()) == 1
+        assert len(stub_resend.emails) == 1
+        assert (queue.retried, queue.sent, queue.failed) == (1, 1, 0)
+
+    def test_gives_up_after_max_attempts(self, stub_resend):
+        stub_resend.fail_next = 10
+        queue = EmailQueue(max_attempts=3, retry_base_seconds=0.01)
+
+        async def scenario():
+            queue.submit(welcome(1))
+            await queue.flush()
+            await queue.stop()
+
+        asyncio.run(scenario())
+        assert stub_resend.fail_next == 7
+        assert (queue.retried, queue.sent, queue.failed) == (2, 0, 1)
+
+    def test_submit_from_thread_and_without_loop(self, stub_resend):
+        queue = EmailQueue()
+
+        async def scenario():
+            await queue.start()
+            await asyncio.to_thread(queue.submit, welcome(1))
+            await queue.stop()
+
+        asyncio.run(scenario())
+        # No running loop: sent inline
+        queue.submit(welcome(2))
+        assert [email["to"] for email in stub_resend.emails] == [["user1@example.com"], ["user2@example.com"]]
+
+
+class TestContactForm:
+    """Test the contact form going through the queue over SMTP"""
+
+    def test_contact_email_sent_over_smtp(self, client, stub_smtp):
+        response = client.post("/api/v1/contact", json={
+            "name": "Ann <script>",
+            "email": "ann@example.com",
+            "subject": "Payout",
+            "message": "Where is my payout?"
+        })
+        assert response.status_code == status.HTTP_200_OK
+        client.portal.call(email_queue.flush)
+
+        [(sender, recipients, raw)] = stub_smtp.messages
+        assert (sender, recipients) == ("support@example.com", ["inbox@example.com"])
+        assert "Subject: Contact Form: Payout" in raw and "Reply-To: ann@example.com" in raw
+        assert "Ann &lt;script&gt;" in raw
+
+    def test_unconfigured_smtp_rejected(self, client, monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "SMTP_USERNAME", None)
+        response = client.post("/api/v1/contact", json={
+            "name": "Ann", "email": "ann@example.com", "subject": "Hi", "message": "Hello"
+        })
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,98 @@
+"""
+Test suite for streaming admin exports
+"""
+import csv
+import gzip
+import io
+import json
+from decimal import Decimal
+
+from fastapi import status
+from sqlalchemy import select
+from app.models import AdminCryptoWallet, BetResult, BetTransaction, CreditPurchaseRequest, GameType, Message, User
+from app.services import data_export
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.content.decode().splitlines()]
+
+
+class TestStreaming:
+    """Test batching and encoders"""
+
+    def test_rows_fetched_in_batches(self, db, create_test_user, monkeypatch):
+        for _ in range(5):
+            create_test_user()
+        monkeypatch.setattr(data_export.settings, "EXPORT_BATCH_SIZE", 2)
+
+        batches = list(data_export.iter_rows(db, select(User.id, User.username).order_by(User.id)))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    def test_csv_and_gzip_encoders(self):
+        batches = [[{"id": 1, "name": "a,b"}], [{"id": 2, "name": None}]]
+        raw = b"".join(data_export.encode_csv(batches, ["id", "name"]))
+        assert raw.decode().splitlines() == ["id,name", '1,"a,b"', "2,"]
+        assert gzip.decompress(b"".join(data_export.gzip_chunks([raw[:5], raw[5:]]))) == raw
+
+    def test_csv_formulas_escaped(self):
+        values = ["=HYPERLINK(\"x\")", "+1+1", "-2+3", "@SUM(A1)", "\tx", "-5.00", "a=b"]
+        raw = b"".join(data_export.encode_csv([[{"v": v} for v in values]], ["v"]))
+        cells = [row["v"] for row in csv.DictReader(io.StringIO(raw.decode()))]
+        assert cells == ["'=HYPERLINK(\"x\")", "'+1+1", "'-2+3", "'@SUM(A1)", "'\tx", "-5.00", "a=b"]
+
+
+class TestExportEndpoints:
+    """Test the /admin/exports endpoints"""
+
+    def test_users_ndjson_with_filters(self, client, test_admin, test_player, test_client_user, token_headers):
+        response = client.get("/api/v1/admin/exports/users?user_type=player", headers=token_headers(test_admin))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "attachment" in response.headers["content-disposition"]
+        [row] = ndjson(response)
+        assert row["username"] == test_player.username
+        assert "hashed_password" not in row
+
+        future = client.get(
+            "/api/v1/admin/exports/users?created_from=2999-01-01T00:00:00", headers=token_headers(test_admin)
+        )
+        assert future.content == b""
+
+    def test_messages_csv_gzip(self, client, db, test_admin, test_player, test_client_user, token_headers):
+        for i in range(3):
+            db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content=f"m{i}"))
+        db.commit()
+
+        response = client.get(
+            "/api/v1/admin/exports/messages?format=csv&gzip=true", headers=token_headers(test_admin)
+        )
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"].endswith('.csv.gz"')
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+        assert [r["content"] for r in rows] == ["m0", "m1", "m2"]
+        assert rows[0]["sender_username"] == test_player.username
+
+    def test_bets_and_purchases(self, client, db, test_admin, test_player, test_client_user, token_headers):
+        db.add(BetTransaction(user_id=test_player.id, game_type=GameType.LUCKY_DICE, bet_amount=10,
+                              win_amount=0, result=BetResult.LOSE, balance_before=100, balance_after=90))
+        wallet = AdminCryptoWallet(currency="USDT", network="TRC20", wallet_address="TXYZ")
+        db.add(wallet)
+        db.flush()
+        db.add(CreditPurchaseRequest(client_id=test_client_user.id, wallet_id=wallet.id, credits_amount=5000,
+                                     crypto_amount=Decimal("50.12345678"), currency="USDT", network="TRC20"))
+        db.commit()
+        headers = token_headers(test_admin)
+
+        [bet] = ndjson(client.get("/api/v1/admin/exports/bet-transactions?result=lose", headers=headers))
+        assert (bet["game_type"], bet["balance_after"]) == ("lucky_dice", 90)
+
+        response = client.get("/api/v1/admin/exports/purchases?format=csv", headers=headers)
+        [purchase] = list(csv.DictReader(io.StringIO(response.content.decode())))
+        assert purchase["reference_code"].startswith("CP")
+        assert purchase["crypto_amount"] == "50.12345678"
+        assert purchase["wallet_address"] == "TXYZ"
+
+    def test_admin_only(self, client, test_player, token_headers):
+        response = client.get("/api/v1/admin/exports/users", headers=token_headers(test_player))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -652,7 +652,8 @@ class TestCredentialEncryption:
         ).first()
 
         assert credential is not None
-        # Plaintext should be stored (dual-write pattern)
+        # Only the encrypted values are stored
+        assert credential.game_username_encrypted != "encrypt_user"
         assert credential.game_username == "encrypt_user"
         assert credential.game_password == "encrypt_pass"
 
@@ -0,0 +1,169 @@
+"""
+Test suite for the winners ticker and leaderboards
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import status
+from app.config import LEADERBOARD_RECENT_WINS, LEADERBOARD_BIG_WIN_MULTIPLIER
+from app.services.bet_engine import resolve_slots, settle_bet
+from app.services.leaderboard import (
+    LEADERBOARD_ROOM,
+    LeaderboardService,
+    MemoryLeaderboard,
+    RankedBoard,
+    period_key,
+)
+from app.websocket import manager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, frame):
+        self.frames.append(frame)
+
+
+@pytest.fixture
+def service():
+    return LeaderboardService(MemoryLeaderboard())
+
+
+@pytest.fixture
+def subscriber():
+    """A connected user subscribed to the leaderboard room"""
+    socket = FakeSocket()
+    manager.active_connections[9999] = [socket]
+    manager.rooms[LEADERBOARD_ROOM] = {9999}
+    yield socket
+    manager.active_connections.pop(9999, None)
+    manager.rooms.pop(LEADERBOARD_ROOM, None)
+
+
+class TestRankedBoard:
+    """Test the lazily-invalidated heap"""
+
+    def test_top_orders_by_score(self):
+        board = RankedBoard("k")
+        board.add(1, 50)
+        board.add(2, 200)
+        board.add(3, 100)
+        assert board.top(2) == [(2, 200), (3, 100)]
+
+    def test_updates_replace_stale_entries(self):
+        board = RankedBoard("k")
+        board.add(1, 500)
+        board.add(2, 100)
+        board.add(1, -450)
+        assert board.top(5) == [(2, 100), (1, 50)]
+
+    def test_non_positive_scores_excluded(self):
+        board = RankedBoard("k")
+        board.add(1, -10)
+        board.add(2, 0)
+        assert board.top(5) == []
+
+    def test_heap_is_compacted(self):
+        board = RankedBoard("k")
+        for i in range(1000):
+            board.add(i % 3, 1)
+        assert len(board._heap) < 100
+        assert sorted(board.top(3)) == [(0, 334), (1, 333), (2, 333)]
+
+
+class TestLeaderboardService:
+    """Test recording and snapshots"""
+
+    def test_snapshot_ranks_net_winnings(self, service):
+        run(service.record_bet(1, "alice", "slots", 10, 100, "win"))
+        run(service.record_bet(2, "bob", "slots", 10, 500, "jackpot"))
+        run(service.record_bet(1, "alice", "dice", 10, 0, "lose"))
+
+        snapshot = run(service.snapshot("daily"))
+
+        assert [(e["rank"], e["username"], e["net_winnings"]) for e in snapshot["leaders"]] == [
+            (1, "bob", 490),
+            (2, "alice", 80),
+        ]
+
+    def test_only_big_wins_reach_ticker(self, service):
+        run(service.record_bet(1, "alice", "slots", 10, 20, "win"))
+        run(service.record_bet(1, "alice", "slots", 10, 10 * LEADERBOARD_BIG_WIN_MULTIPLIER, "jackpot"))
+
+        recent = run(service.snapshot())["recent_wins"]
+        assert len(recent) == 1
+        assert recent[0]["win_amount"] == 10 * LEADERBOARD_BIG_WIN_MULTIPLIER
+
+    def test_ticker_is_bounded(self, service):
+        for i in range(LEADERBOARD_RECENT_WINS + 10):
+            run(service.record_bet(1, "alice", "slots", 10, 500 + i, "jackpot"))
+
+        recent = run(service.snapshot())["recent_wins"]
+        assert len(recent) == LEADERBOARD_RECENT_WINS
+        assert recent[0]["win_amount"] == 500 + LEADERBOARD_RECENT_WINS + 9
+
+    def test_daily_board_rolls_over(self, service):
+        today = datetime(2026, 10, 21, 12, tzinfo=timezone.utc)
+        yesterday = today - timedelta(days=1)
+        run(service.record_bet(1, "alice", "slots", 10, 100, "win", at=yesterday))
+        run(service.record_bet(2, "bob", "slots", 10, 50, "win", at=today))
+
+        board = service.backend
+        daily_key, daily = run(board.top("daily", 10, today))
+        _, weekly = run(board.top("weekly", 10, today))
+
+        assert daily_key == period_key("daily", today)
+        assert [e["user_id"] for e in daily] == [2]
+        assert [e["user_id"] for e in weekly] == [1, 2]
+
+    def test_big_win_pushed_to_room(self, service, subscriber):
+        run(service.record_bet(1, "alice", "slots", 10, 500, "jackpot"))
+        assert any('"leaderboard:win"' in frame for frame in subscriber.frames)
+
+    def test_publish_snapshot(self, service, subscriber):
+        run(service.record_bet(1, "alice", "slots", 10, 20, "win"))
+        run(service.publish_snapshot())
+        assert '"leaderboard:update"' in subscriber.frames[-1]
+
+    def test_warm_from_transactions(self, service, db, test_player):
+        for _ in range(3):
+            settle_bet(db, test_player.id, 10, resolve_slots(10, ["diamond"] * 3))
+
+        snapshot = run(service.snapshot("weekly", db=db))
+
+        assert snapshot["leaders"][0]["user_id"] == test_player.id
+        assert snapshot["leaders"][0]["net_winnings"] == 3 * (500 - 10)
+        assert len(snapshot["recent_wins"]) == 3
+
+
+class TestLeaderboardEndpoint:
+    """Test the REST snapshot and the bet engine feed"""
+
+    def test_bets_feed_leaderboard(self, client, test_player, token_headers, monkeypatch):
+        monkeypatch.setattr(random, "choice", lambda seq: seq[-1])
+        headers = token_headers(test_player)
+
+        response = client.post(
+            "/api/v1/games/mini-game/bet", headers=headers,
+            json={"game_type": "slots", "bet_amount": 10}
+        )
+        assert response.json()["result"] == "jackpot"
+
+        snapshot = client.get("/api/v1/games/leaderboard?period=weekly", headers=headers)
+        assert snapshot.status_code == status.HTTP_200_OK
+        data = snapshot.json()
+        assert data["period"] == "weekly"
+        assert data["leaders"][0]["username"] == test_player.username
+        assert data["recent_wins"][0]["win_amount"] == response.json()["win_amount"]
+
+    def test_invalid_period_rejected(self, client, test_player, token_headers):
+        response = client.get(
+            "/api/v1/games/leaderboard?period=monthly", headers=token_headers(test_player)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,161 @@
+"""
+Test suite for the double-entry credit ledger
+"""
+import threading
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.models import Base, LedgerEntry, LedgerTransaction, LedgerTransactionType, UserType
+from app.services import ledger
+from app.services.ledger import InsufficientCreditsError, UnbalancedTransactionError
+
+
+def balance(db, user):
+    db.expire_all()
+    return db.query(models.User.credits).filter(models.User.id == user.id).scalar()
+
+
+class TestPosting:
+    """Test balance application and journal rows"""
+
+    def test_transfer_updates_both_balances(self, db, test_player, test_client_user):
+        posted = ledger.transfer(db, test_player.id, test_client_user.id, 300,
+                                 LedgerTransactionType.CREDIT_TRANSFER)
+        db.commit()
+
+        assert posted.balances == {test_player.id: 700, test_client_user.id: 1300}
+        assert (balance(db, test_player), balance(db, test_client_user)) == (700, 1300)
+        entries = db.query(LedgerEntry).filter(LedgerEntry.transaction_id == posted.transaction_id).all()
+        assert sum(e.amount for e in entries) == 0
+
+    def test_loaded_user_kept_in_sync(self, db, test_player):
+        ledger.credit_user(db, test_player.id, 50, LedgerTransactionType.ADMIN_ADJUSTMENT)
+        assert test_player.credits == 1050
+        assert test_player not in db.dirty
+
+    def test_unbalanced_rejected(self, db, test_player):
+        with pytest.raises(UnbalancedTransactionError):
+            ledger.post(db, LedgerTransactionType.ADMIN_ADJUSTMENT, [
+                ledger.user_posting(test_player.id, 10)
+            ])
+
+    def test_insufficient_credits(self, db, test_player, test_client_user):
+        with pytest.raises(InsufficientCreditsError):
+            ledger.transfer(db, test_player.id, test_client_user.id, 5000,
+                            LedgerTransactionType.CREDIT_TRANSFER)
+        db.rollback()
+        assert balance(db, test_player) == 1000
+        assert db.query(LedgerTransaction).count() == 0
+
+    def test_idempotency_key_replays(self, db, test_player):
+        first = ledger.credit_user(db, test_player.id, 100, LedgerTransactionType.ADMIN_ADJUSTMENT,
+                                   idempotency_key="grant-1")
+        db.commit()
+        second = ledger.credit_user(db, test_player.id, 100, LedgerTransactionType.ADMIN_ADJUSTMENT,
+                                    idempotency_key="grant-1")
+        db.commit()
+
+        assert second.replayed
+        assert second.transaction_id == first.transaction_id
+        assert second.balances == {test_player.id: 1100}
+        assert balance(db, test_player) == 1100
+
+
+class TestReconciliation:
+    """Test the reconciliation job"""
+
+    def test_consistent_ledger(self, db, test_player, test_client_user):
+        ledger.transfer(db, test_player.id, test_client_user.id, 100, LedgerTransactionType.CREDIT_TRANSFER)
+        ledger.credit_user(db, test_player.id, 40, LedgerTransactionType.REFERRAL_BONUS)
+        db.commit()
+
+        report = ledger.reconcile(db)
+        assert report.ok
+        assert report.users_checked == 2
+        assert report.system_balances == {ledger.ISSUANCE: -40}
+
+    def test_detects_balance_changed_outside_ledger(self, db, test_player):
+        ledger.credit_user(db, test_player.id, 40, LedgerTransactionType.REFERRAL_BONUS)
+        db.commit()
+        db.query(models.User).filter(models.User.id == test_player.id).update({"credits": 5})
+        db.commit()
+
+        report = ledger.reconcile(db)
+        assert [m["user_id"] for m in report.balance_mismatches] == [test_player.id]
+
+
+class TestConcurrentTransfers:
+    """Parallel transfers must never lose updates or overdraw"""
+
+    def test_parallel_transfers_are_consistent(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path}/ledger.db",
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        setup = Session()
+        users = [
+            models.User(username=f"acct{i}", user_id=f"ACCT000{i}", hashed_password="x",
+                        user_type=UserType.PLAYER, credits=100)
+            for i in range(3)
+        ]
+        setup.add_all(users)
+        setup.commit()
+        ids = [u.id for u in users]
+        setup.close()
+
+        def worker(offset):
+            session = Session()
+            try:
+                for n in range(30):
+                    src, dst = ids[(offset + n) % 3], ids[(offset + n + 1) % 3]
+                    try:
+                        ledger.transfer(session, src, dst, 7, LedgerTransactionType.CREDIT_TRANSFER)
+                        session.commit()
+                    except InsufficientCreditsError:
+                        session.rollback()
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        check = Session()
+        balances = [b for (b,) in check.query(models.User.credits).filter(models.User.id.in_(ids))]
+        report = ledger.reconcile(check)
+        check.close()
+        engine.dispose()
+
+        assert sum(balances) == 300
+        assert min(balances) >= 0
+        assert report.ok
+
+
+class TestLedgerEndpoints:
+    """Test credit endpoints routed through the ledger"""
+
+    def test_admin_add_credits_idempotent(self, client, db, test_admin, test_player, token_headers):
+        headers = {**token_headers(test_admin), "Idempotency-Key": "retry-1"}
+        url = f"/api/v1/admin/users/{test_player.id}/add-credits?amount=250"
+
+        first = client.post(url, headers=headers)
+        second = client.post(url, headers=headers)
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert second.json()["new_balance"] == first.json()["new_balance"] == 1250
+        assert balance(db, test_player) == 1250
+
+    def test_admin_cannot_overdraw(self, client, db, test_admin, test_player, token_headers):
+        response = client.post(
+            f"/api/v1/admin/users/{test_player.id}/add-credits?amount=-5000",
+            headers=token_headers(test_admin)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert balance(db, test_player) == 1000
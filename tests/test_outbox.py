@@ -0,0 +1,158 @@
+"""
+Test suite for the transactional outbox and its dispatcher
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+from app.models import OutboxMessage, OutboxStatus
+from app.services import outbox
+from app.services.outbox import DeliveryError, OutboxDispatcher, enqueue, enqueue_ws, purge_delivered
+from app.websocket import WSMessageType, credit_update_data
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def session_factory(db):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+
+
+@pytest.fixture
+def delivered(monkeypatch):
+    """Register a "test" handler that records payloads; a payload with "fail" raises"""
+    payloads = []
+
+    async def deliver(db, payload):
+        if payload.get("fail"):
+            raise DeliveryError("provider unavailable")
+        payloads.append(payload)
+
+    monkeypatch.setitem(outbox._HANDLERS, "test", deliver)
+    return payloads
+
+
+def outbox_rows(db):
+    db.expire_all()
+    return db.query(OutboxMessage).order_by(OutboxMessage.id).all()
+
+
+class TestEnqueue:
+    """Test that messages share the caller's transaction"""
+
+    def test_rollback_discards_message(self, db, test_player):
+        enqueue_ws(db, test_player.id, WSMessageType.CREDIT_UPDATE, credit_update_data(10, 10))
+        db.rollback()
+        assert outbox_rows(db) == []
+
+        enqueue_ws(db, test_player.id, WSMessageType.CREDIT_UPDATE, credit_update_data(10, 10))
+        db.commit()
+        [row] = outbox_rows(db)
+        assert (row.kind, row.status, row.attempts) == ("ws", OutboxStatus.PENDING, 0)
+        assert json.loads(row.payload)["data"]["credits"] == 10
+
+    def test_unknown_kind_rejected(self, db):
+        with pytest.raises(ValueError):
+            enqueue(db, "fax", {})
+
+
+class TestDispatcher:
+    """Test claiming, delivery, retries and reclaiming"""
+
+    def test_batch_delivered_in_order(self, db, session_factory, delivered):
+        for n in range(5):
+            enqueue(db, "test", {"n": n})
+        db.commit()
+
+        dispatcher = OutboxDispatcher(session_factory, batch_size=2)
+        assert run(dispatcher.drain()) == 5
+        assert [p["n"] for p in delivered] == [0, 1, 2, 3, 4]
+        assert {row.status for row in outbox_rows(db)} == {OutboxStatus.DELIVERED}
+        assert dispatcher.status()["delivered"] == 5
+        assert run(dispatcher.dispatch_once()) == 0
+
+    def test_failure_retried_with_backoff_then_failed(self, db, session_factory, delivered):
+        enqueue(db, "test", {"fail": True})
+        db.commit()
+        dispatcher = OutboxDispatcher(session_factory, max_attempts=2)
+
+        assert run(dispatcher.dispatch_once()) == 1
+        [row] = outbox_rows(db)
+        assert (row.status, row.attempts) == (OutboxStatus.PENDING, 1)
+        assert "provider unavailable" in row.last_error
+        assert run(dispatcher.dispatch_once()) == 0  # backing off
+
+        row.available_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+        assert run(dispatcher.dispatch_once()) == 1
+        [row] = outbox_rows(db)
+        assert (row.status, row.attempts) == (OutboxStatus.FAILED, 2)
+        assert (dispatcher.retried, dispatcher.failed) == (1, 1)
+
+    def test_stale_claim_reclaimed(self, db, session_factory, delivered):
+        now = datetime.now(timezone.utc)
+        stale = enqueue(db, "test", {"n": "stale"})
+        stale.status, stale.attempts, stale.locked_until = OutboxStatus.PROCESSING, 1, now - timedelta(seconds=5)
+        held = enqueue(db, "test", {"n": "held"})
+        held.status, held.attempts, held.locked_until = OutboxStatus.PROCESSING, 1, now + timedelta(minutes=1)
+        db.commit()
+
+        assert run(OutboxDispatcher(session_factory).dispatch_once()) == 1
+        assert delivered == [{"n": "stale"}]
+        stale, held = outbox_rows(db)
+        assert (stale.status, stale.attempts) == (OutboxStatus.DELIVERED, 2)
+        assert held.status == OutboxStatus.PROCESSING
+
+    def test_purge_delivered(self, db, session_factory, delivered):
+        for n in range(3):
+            enqueue(db, "test", {"n": n})
+        db.commit()
+        run(OutboxDispatcher(session_factory).drain())
+
+        old, recent, _ = outbox_rows(db)
+        old.delivered_at = datetime.now(timezone.utc) - timedelta(days=30)
+        recent.delivered_at = datetime.now(timezone.utc) - timedelta(days=30)
+        db.commit()
+
+        assert purge_delivered(db, chunk_size=1) == 2
+        assert len(outbox_rows(db)) == 1
+
+
+class TestEndpointsUseOutbox:
+    """Test that request side effects are recorded with the change"""
+
+    def test_admin_credit_adjustment(self, client, db, session_factory, test_admin, test_player, token_headers):
+        response = client.post(
+            f"/api/v1/admin/users/{test_player.id}/add-credits?amount=250",
+            headers=token_headers(test_admin)
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        ws, push = outbox_rows(db)
+        assert (ws.kind, push.kind) == ("ws", "push")
+        assert json.loads(ws.payload)["data"]["credits"] == test_player.credits
+        assert json.loads(push.payload)["user_ids"] == [test_player.id]
+
+        # Nobody is connected and there are no push tokens; both still count as delivered
+        assert run(OutboxDispatcher(session_factory).dispatch_once()) == 2
+        assert {row.status for row in outbox_rows(db)} == {OutboxStatus.DELIVERED}
+
+    def test_failed_adjustment_enqueues_nothing(self, client, db, test_admin, test_player, token_headers):
+        response = client.post(
+            f"/api/v1/admin/users/{test_player.id}/add-credits?amount=-999999",
+            headers=token_headers(test_admin)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert outbox_rows(db) == []
+
+    def test_monitoring_counts(self, client, db, test_admin, token_headers, delivered):
+        enqueue(db, "test", {"n": 1})
+        db.commit()
+
+        response = client.get("/api/v1/monitoring/outbox", headers=token_headers(test_admin))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["counts"] == {"pending": 1}
@@ -0,0 +1,172 @@
+"""
+Test suite for keyset pagination and signed cursors
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from app import pagination
+from app.models import CommunityPost, Message, PostVisibility, Ticket, TicketPriority
+from app.pagination import (
+    InvalidCursor, SortKey, count_total, newest_first, paginate_keyset, sign_cursor, unsign_cursor
+)
+
+
+def walk(fetch):
+    """Follow next_cursor until the last page, returning every item seen"""
+    seen, cursor = [], None
+    while True:
+        items, cursor = fetch(cursor)
+        seen.extend(items)
+        if cursor is None:
+            return seen
+
+
+class TestCursors:
+    """Test HMAC-signed cursors"""
+
+    def test_round_trip(self):
+        cursor = sign_cursor({"k": [1, "a"]}, scope="/items")
+        assert unsign_cursor(cursor, scope="/items") == {"k": [1, "a"]}
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "%%%", "", "abc.def"])
+    def test_malformed(self, cursor):
+        with pytest.raises(InvalidCursor):
+            unsign_cursor(cursor)
+
+    def test_tampered_or_other_scope(self):
+        cursor = sign_cursor({"k": [5]}, scope="/items")
+        payload, signature = cursor.split(".")
+        forged = sign_cursor({"k": [500]}, scope="/items").split(".")[0]
+
+        with pytest.raises(InvalidCursor):
+            unsign_cursor(f"{forged}.{signature}", scope="/items")
+        with pytest.raises(InvalidCursor):
+            unsign_cursor(cursor, scope="/other")
+
+
+class TestKeysetQuery:
+    """Test composite keys, ties and mixed directions"""
+
+    def test_ties_on_created_at(self, db, test_player, test_client_user):
+        # Server-default timestamps share a second; Python ones carry microseconds
+        now = datetime.utcnow().replace(microsecond=0)
+        for i in range(7):
+            db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content=f"m{i}"))
+        for i in range(3):
+            db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content=f"p{i}",
+                           created_at=now + timedelta(microseconds=i)))
+        db.commit()
+
+        query = db.query(Message)
+        expected = [m.id for m in query.order_by(Message.created_at.desc(), Message.id.desc())]
+        seen = walk(lambda cursor: paginate_keyset(query, newest_first(Message), 3, cursor))
+
+        assert [m.id for m in seen] == expected
+
+    def test_mixed_directions(self, db, test_player):
+        priorities = [TicketPriority.LOW, TicketPriority.URGENT, TicketPriority.MEDIUM] * 3
+        db.add_all([
+            Ticket(ticket_number=f"T-{i}", user_id=test_player.id, subject="help", priority=priority)
+            for i, priority in enumerate(priorities)
+        ])
+        db.commit()
+
+        keys = (SortKey(Ticket.priority, descending=True), SortKey(Ticket.created_at), SortKey(Ticket.id))
+        query = db.query(Ticket)
+        expected = [t.id for t in query.order_by(Ticket.priority.desc(), Ticket.created_at, Ticket.id)]
+        seen = walk(lambda cursor: paginate_keyset(query, keys, 2, cursor))
+
+        assert [t.id for t in seen] == expected
+
+    def test_cursor_must_match_keys(self, db):
+        cursor = sign_cursor({"k": [1]})
+        with pytest.raises(InvalidCursor):
+            paginate_keyset(db.query(Message), newest_first(Message), 10, cursor)
+
+
+class TestTotals:
+    """Test exact, estimated and skipped totals"""
+
+    def test_modes(self, db, monkeypatch, test_player, test_client_user):
+        pagination.clear_count_cache()
+        db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content="a"))
+        db.commit()
+        query = db.query(Message)
+
+        assert count_total(query, "none") is None
+        assert count_total(query, "estimated") == 1
+
+        db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id, content="b"))
+        db.commit()
+        assert count_total(query, "exact") == 2
+        assert count_total(query, "estimated") == 1  # cached
+
+        monkeypatch.setattr(pagination.settings, "PAGINATION_COUNT_CACHE_SECONDS", 0)
+        pagination.clear_count_cache()
+        assert count_total(query, "estimated") == 2
+
+
+class TestKeysetEndpoints:
+    """Test the list endpoints migrated to cursors"""
+
+    def test_admin_users_pages(self, client, test_admin, create_test_user, token_headers):
+        created = [create_test_user() for _ in range(4)]
+        headers = token_headers(test_admin)
+
+        def fetch(cursor):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = client.get("/api/v1/admin/users", params=params, headers=headers).json()
+            assert data["total"] == 5
+            return data["users"], data["next_cursor"]
+
+        ids = [u["id"] for u in walk(fetch)]
+        assert ids == sorted([test_admin.id] + [u.id for u in created])
+
+    def test_bad_or_foreign_cursor(self, client, test_admin, test_player, token_headers):
+        headers = token_headers(test_admin)
+        response = client.get("/api/v1/admin/users?cursor=%%%", headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        cursor = client.get("/api/v1/admin/users?limit=1", headers=headers).json()["next_cursor"]
+        response = client.get("/api/v1/admin/messages", params={"cursor": cursor}, headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_total_none(self, client, test_admin, token_headers):
+        response = client.get("/api/v1/tickets/admin/all?total=none", headers=token_headers(test_admin))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total_count"] is None
+
+    def test_community_page_numbers_still_work(self, client, db, test_player, token_headers):
+        db.add_all([
+            CommunityPost(author_id=test_player.id, content=f"post {i}", visibility=PostVisibility.PLAYERS)
+            for i in range(5)
+        ])
+        db.commit()
+        headers = token_headers(test_player)
+
+        first = client.get("/api/v1/community/posts?per_page=2", headers=headers).json()
+        by_cursor = client.get(
+            "/api/v1/community/posts", params={"per_page": 2, "cursor": first["next_cursor"]}, headers=headers
+        ).json()
+        by_page = client.get("/api/v1/community/posts?per_page=2&page=2", headers=headers).json()
+
+        assert first["total"] == 5 and first["has_more"]
+        assert [p["id"] for p in by_cursor["posts"]] == [p["id"] for p in by_page["posts"]]
+
+    def test_skip_still_works(self, client, test_admin, create_test_user, token_headers):
+        for _ in range(4):
+            create_test_user()
+        headers = token_headers(test_admin)
+
+        first = client.get("/api/v1/admin/users?limit=2", headers=headers).json()
+        by_cursor = client.get(
+            "/api/v1/admin/users", params={"limit": 2, "cursor": first["next_cursor"]}, headers=headers
+        ).json()
+        by_skip = client.get("/api/v1/admin/users?limit=2&skip=2", headers=headers).json()
+
+        assert (by_skip["skip"], by_skip["limit"]) == (2, 2)
+        assert [u["id"] for u in by_cursor["users"]] == [u["id"] for u in by_skip["users"]]
+
+        response = client.get("/api/v1/reviews/my-reviews?skip=5", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,337 @@
+"""
+Test suite for promotion claims and budget reservation
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.models import Base, ClaimStatus, Promotion, PromotionClaim, PromotionStatus, PromotionType, UserType
+from app.services.promotion_claims import (
+    decide_claim, insert_claim, release_reservation, reserve_budget, set_targets
+)
+
+
+def make_promotion(db, client_id, value=100, total_budget=None):
+    promotion = Promotion(
+        client_id=client_id,
+        title="Flash bonus",
+        promotion_type=PromotionType.GC_BONUS,
+        value=value,
+        total_budget=total_budget,
+        used_budget=0,
+        end_date=datetime.now(timezone.utc) + timedelta(days=1)
+    )
+    db.add(promotion)
+    db.commit()
+    return promotion
+
+
+def claim(db, promotion, player_id):
+    """The claim endpoint's write path: insert, reserve, commit"""
+    inserted = insert_claim(db, promotion, player_id)
+    if inserted.claim_id is None or not reserve_budget(db, promotion.id, promotion.value):
+        db.rollback()
+        return False
+    db.commit()
+    return True
+
+
+class TestClaimInsert:
+    """Test insert-on-conflict claim creation"""
+
+    def test_second_claim_reports_existing(self, db, test_client_user, test_player):
+        promotion = make_promotion(db, test_client_user.id)
+
+        first = insert_claim(db, promotion, test_player.id)
+        second = insert_claim(db, promotion, test_player.id)
+
+        assert first.claim_id is not None
+        assert second.claim_id is None
+        assert second.existing_status == ClaimStatus.PENDING_APPROVAL
+
+    def test_rejected_claim_reopened(self, db, test_client_user, test_player):
+        promotion = make_promotion(db, test_client_user.id)
+        claim_id = insert_claim(db, promotion, test_player.id).claim_id
+        db.query(PromotionClaim).filter(PromotionClaim.id == claim_id).update(
+            {"status": ClaimStatus.REJECTED, "rejection_reason": "blurry"}
+        )
+        db.commit()
+
+        reopened = insert_claim(db, promotion, test_player.id)
+        db.commit()
+
+        assert reopened.claim_id == claim_id
+        row = db.get(PromotionClaim, claim_id)
+        db.refresh(row)
+        assert (row.status, row.rejection_reason) == (ClaimStatus.PENDING_APPROVAL, None)
+
+
+class TestBudgetReservation:
+    """Test conditional budget reservation"""
+
+    def test_reservation_stops_at_budget(self, db, test_client_user):
+        promotion = make_promotion(db, test_client_user.id, value=100, total_budget=250)
+
+        assert reserve_budget(db, promotion.id, 100)
+        assert reserve_budget(db, promotion.id, 100)
+        assert not reserve_budget(db, promotion.id, 100)
+        assert promotion.reserved_budget == 200
+
+    def test_release_returns_budget(self, db, test_client_user):
+        promotion = make_promotion(db, test_client_user.id, value=100, total_budget=100)
+        reserve_budget(db, promotion.id, 100)
+        release_reservation(db, promotion.id, 100)
+
+        assert promotion.reserved_budget == 0
+        assert reserve_budget(db, promotion.id, 100)
+
+    def test_unlimited_budget(self, db, test_client_user):
+        promotion = make_promotion(db, test_client_user.id)
+        assert all(reserve_budget(db, promotion.id, 100) for _ in range(5))
+
+
+class TestClaimDecision:
+    """Test that a pending claim is decided exactly once"""
+
+    def test_approve_and_reject_race(self, db, test_client_user, test_player):
+        promotion = make_promotion(db, test_client_user.id)
+        assert claim(db, promotion, test_player.id)
+        # Both handlers loaded the claim while it was still pending
+        loaded = db.query(PromotionClaim).one()
+
+        assert decide_claim(db, loaded, ClaimStatus.APPROVED, approved_by_id=test_client_user.id)
+        assert not decide_claim(db, loaded, ClaimStatus.REJECTED, rejection_reason="late")
+        db.commit()
+
+        assert (loaded.status, loaded.rejection_reason) == (ClaimStatus.APPROVED, None)
+
+    def test_endpoint_refuses_decided_claim(self, client, db, monkeypatch, test_client_user, test_player,
+                                            token_headers):
+        promotion = make_promotion(db, test_client_user.id, value=100, total_budget=100)
+        assert claim(db, promotion, test_player.id)
+        claim_id = db.query(PromotionClaim.id).scalar()
+
+        # The claim is approved between the handler's read and its write
+        from app.api.v1 import promotions as endpoints
+        original = endpoints.decide_claim
+
+        def approved_meanwhile(session, pending, *args, **kwargs):
+            session.query(PromotionClaim).filter(PromotionClaim.id == pending.id).update(
+                {"status": ClaimStatus.APPROVED}, synchronize_session=False
+            )
+            return original(session, pending, *args, **kwargs)
+
+        monkeypatch.setattr(endpoints, "decide_claim", approved_meanwhile)
+        response = client.post(f"/api/v1/promotions/reject-claim/{claim_id}",
+                               headers=token_headers(test_client_user), json={"reason": "no"})
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        db.expire_all()
+        assert db.get(Promotion, promotion.id).reserved_budget == 100
+
+
+class TestConcurrentClaims:
+    """A flash promotion must never overshoot its budget"""
+
+    def test_thousand_parallel_claims(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path}/claims.db",
+            connect_args={"check_same_thread": False, "timeout": 60}
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        setup = Session()
+        client = models.User(username="flash_client", user_id="FLASHCLT", hashed_password="x",
+                             user_type=UserType.CLIENT)
+        setup.add(client)
+        setup.flush()
+        players = [
+            models.User(username=f"p{i}", user_id=f"P{i:07d}", hashed_password="x",
+                        user_type=UserType.PLAYER)
+            for i in range(500)
+        ]
+        setup.add_all(players)
+        setup.flush()
+        promotion = make_promotion(setup, client.id, value=10, total_budget=3000)
+        promotion_id = promotion.id
+        player_ids = [p.id for p in players]
+        setup.close()
+
+        def attempt(player_id):
+            session = Session()
+            try:
+                promo = session.get(Promotion, promotion_id)
+                return claim(session, promo, player_id)
+            finally:
+                session.close()
+
+        # Every player claims twice: 1,000 claims for 300 budget slots
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(attempt, player_ids * 2))
+
+        check = Session()
+        promo = check.get(Promotion, promotion_id)
+        pending = check.query(func.count(PromotionClaim.id)).filter(
+            PromotionClaim.status == ClaimStatus.PENDING_APPROVAL
+        ).scalar()
+        duplicated = check.query(PromotionClaim.player_id).group_by(
+            PromotionClaim.player_id
+        ).having(func.count() > 1).count()
+        reserved = promo.reserved_budget
+        check.close()
+        engine.dispose()
+
+        assert sum(results) == 300
+        assert pending == 300
+        assert reserved == 3000
+        assert duplicated == 0
+
+
+class TestClaimEndpoints:
+    """Test the claim / approve / reject endpoints"""
+
+    @pytest.fixture
+    def connected(self, test_client_user, test_player, make_friends):
+        make_friends(test_client_user, test_player)
+
+    def test_claim_and_approve(self, client, db, connected, test_client_user, test_player, token_headers):
+        promotion = make_promotion(db, test_client_user.id, value=100, total_budget=100)
+
+        response = client.post("/api/v1/promotions/claim", headers=token_headers(test_player),
+                               json={"promotion_id": promotion.id})
+        assert response.json()["success"] is True
+        claim_id = response.json()["claim_id"]
+
+        again = client.post("/api/v1/promotions/claim", headers=token_headers(test_player),
+                            json={"promotion_id": promotion.id})
+        assert "pending claim" in again.json()["message"]
+
+        approved = client.post(f"/api/v1/promotions/approve-claim/{claim_id}",
+                               headers=token_headers(test_client_user))
+        assert approved.status_code == status.HTTP_200_OK
+
+        db.expire_all()
+        promotion = db.get(Promotion, promotion.id)
+        assert (promotion.used_budget, promotion.reserved_budget) == (100, 0)
+        assert promotion.status == PromotionStatus.DEPLETED
+
+    def test_reject_releases_budget(self, client, db, connected, test_client_user, test_player, token_headers):
+        promotion = make_promotion(db, test_client_user.id, value=100, total_budget=100)
+        claim_id = client.post("/api/v1/promotions/claim", headers=token_headers(test_player),
+                               json={"promotion_id": promotion.id}).json()["claim_id"]
+
+        rejected = client.post(f"/api/v1/promotions/reject-claim/{claim_id}",
+                               headers=token_headers(test_client_user), json={"reason": "no"})
+        assert rejected.status_code == status.HTTP_200_OK
+
+        db.expire_all()
+        assert db.get(Promotion, promotion.id).reserved_budget == 0
+
+
+class TestEligibility:
+    """Test SQL eligibility filtering and promotion targets"""
+
+    def available(self, client, player, token_headers):
+        response = client.get("/api/v1/promotions/available", headers=token_headers(player))
+        assert response.status_code == status.HTTP_200_OK
+        return [p["id"] for p in response.json()]
+
+    def test_targeted_promotion_only_for_targets(self, client, db, test_client_user, create_test_user,
+                                                 make_friends, token_headers):
+        targeted, other = create_test_user(), create_test_user()
+        make_friends(test_client_user, targeted)
+        make_friends(test_client_user, other)
+        promotion = make_promotion(db, test_client_user.id)
+        set_targets(promotion, [targeted.id])
+        db.commit()
+
+        assert self.available(client, targeted, token_headers) == [promotion.id]
+        assert self.available(client, other, token_headers) == []
+
+        response = client.post("/api/v1/promotions/claim", headers=token_headers(other),
+                               json={"promotion_id": promotion.id})
+        assert response.json()["success"] is False
+
+    def test_level_expiry_and_connection_filtered(self, client, db, test_client_user, test_player,
+                                                  create_test_user, make_friends, token_headers):
+        make_friends(test_client_user, test_player)
+        visible = make_promotion(db, test_client_user.id)
+        high_level = make_promotion(db, test_client_user.id)
+        high_level.min_player_level = 5
+        expired = make_promotion(db, test_client_user.id)
+        expired.end_date = datetime.now(timezone.utc) - timedelta(days=1)
+        stranger = create_test_user(user_type=UserType.CLIENT)
+        make_promotion(db, stranger.id)
+        db.commit()
+
+        assert self.available(client, test_player, token_headers) == [visible.id]
+
+
+class TestPromotionListQueries:
+    """Listing promotions runs a fixed number of queries"""
+
+    @pytest.fixture
+    def count_queries(self, db):
+        engine = db.get_bind()
+        statements = []
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_execute)
+        yield statements
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+    def list_available(self, client, player, token_headers, statements):
+        headers = token_headers(player)
+        statements.clear()
+        response = client.get("/api/v1/promotions/available", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json(), len(statements)
+
+    def test_available_query_count_independent_of_size(self, client, db, test_player, create_test_user,
+                                                       make_friends, token_headers, count_queries):
+        first = create_test_user(user_type=UserType.CLIENT)
+        make_friends(first, test_player)
+        make_promotion(db, first.id)
+        _, baseline = self.list_available(client, test_player, token_headers, count_queries)
+
+        others = [create_test_user() for _ in range(3)]
+        for _ in range(4):
+            owner = create_test_user(user_type=UserType.CLIENT)
+            make_friends(owner, test_player)
+            for i in range(3):
+                promotion = make_promotion(db, owner.id)
+                set_targets(promotion, [test_player.id, others[i].id] if i == 0 else None)
+                db.commit()
+                claim(db, promotion, others[i].id)
+        claimed = make_promotion(db, first.id)
+        claim(db, claimed, test_player.id)
+
+        promotions, queries = self.list_available(client, test_player, token_headers, count_queries)
+        assert len(promotions) == 14
+        assert queries == baseline + 1  # the target lookup
+
+        by_id = {p["id"]: p for p in promotions}
+        assert by_id[claimed.id]["already_claimed"] is True
+        assert by_id[claimed.id]["can_claim"] is False
+        assert sum(p["claims_count"] for p in promotions) == 13
+        assert sum(p["can_claim"] for p in promotions) == 13
+
+    def test_my_promotions_counts_claims(self, client, db, test_client_user, create_test_user,
+                                         token_headers, count_queries):
+        promotions = [make_promotion(db, test_client_user.id) for _ in range(5)]
+        for player in [create_test_user() for _ in range(2)]:
+            claim(db, promotions[0], player.id)
+
+        headers = token_headers(test_client_user)
+        count_queries.clear()
+        response = client.get("/api/v1/promotions/my-promotions", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert {p["id"]: p["claims_count"] for p in response.json()}[promotions[0].id] == 2
+        # Current user, promotions, grouped claim counts
+        assert len(count_queries) <= 3
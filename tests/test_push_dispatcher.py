@@ -0,0 +1,153 @@
+"""
+Test suite for the pooled Expo push dispatcher, against a local stub of Expo's API
+"""
+import asyncio
+import pytest
+from fastapi import status
+from app.models import PushToken
+from app.services import push_notification_service
+from app.services.push_dispatcher import PushDispatcher, PushTransportError
+from app.services.push_notification_service import active_tokens, push_service, send_to_users, message_push
+
+
+def token(name):
+    return f"ExponentPushToken[{name}]"
+
+
+@pytest.fixture
+def dispatcher(stub_expo, monkeypatch):
+    """A dispatcher pointed at the stub, also used by push_notification_service"""
+    dispatcher = PushDispatcher(url=stub_expo.push_url, flush_seconds=0.02, http2=False)
+    monkeypatch.setattr(push_notification_service, "push_dispatcher", dispatcher)
+    return dispatcher
+
+
+def messages(prefix, count):
+    return [{"to": token(f"{prefix}{n}"), "title": "t", "body": "b"} for n in range(count)]
+
+
+class TestCoalescing:
+    """Test batching across callers and connection reuse"""
+
+    def test_concurrent_callers_share_batches(self, stub_expo, dispatcher):
+        async def scenario():
+            results = await asyncio.gather(*(dispatcher.submit(messages(f"u{i}-", 50)) for i in range(3)))
+            await dispatcher.stop()
+            return results
+
+        results = asyncio.run(scenario())
+        assert sorted(len(batch) for batch in stub_expo.batches) == [50, 100]
+        for caller, tickets in enumerate(results):
+            assert [t["id"] for t in tickets] == [f"ticket-{token(f'u{caller}-{n}')}" for n in range(50)]
+
+    def test_connection_reused(self, stub_expo, dispatcher):
+        async def scenario():
+            for n in range(5):
+                await dispatcher.submit(messages(f"seq{n}-", 1))
+            await dispatcher.stop()
+
+        asyncio.run(scenario())
+        assert len(stub_expo.batches) == 5
+        assert stub_expo.connections == 1
+        assert dispatcher.status()["messages_sent"] == 5
+
+    def test_transport_error_per_message(self, stub_expo, dispatcher):
+        stub_expo.status_code = 503
+
+        async def scenario():
+            results = await dispatcher.submit(messages("x", 2))
+            await dispatcher.stop()
+            return results
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, PushTransportError) for r in results)
+        assert dispatcher.transport_errors == 1
+
+
+class TestPushService:
+    """Test the service helpers on top of the dispatcher"""
+
+    def test_bulk_counts_ticket_errors(self, stub_expo, dispatcher):
+        async def scenario():
+            result = await push_service.send_notifications_bulk(
+                [token("a"), token("dead"), "not-a-token"], title="t", body="b"
+            )
+            await dispatcher.stop()
+            return result
+
+        assert asyncio.run(scenario()) == {"success_count": 1, "failed_count": 1}
+        assert len(stub_expo.batches) == 1
+
+    def test_bulk_reports_transport_error(self, stub_expo, dispatcher):
+        stub_expo.status_code = 500
+
+        async def scenario():
+            result = await push_service.send_notifications_bulk([token("a")], title="t", body="b")
+            await dispatcher.stop()
+            return result
+
+        result = asyncio.run(scenario())
+        assert result["failed_count"] == 1 and "500" in result["error"]
+
+    def test_send_to_users_one_batch(self, db, stub_expo, dispatcher, test_player, test_client_user):
+        db.add_all([
+            PushToken(user_id=test_player.id, token=token("phone")),
+            PushToken(user_id=test_player.id, token=token("tablet")),
+            PushToken(user_id=test_client_user.id, token=token("desk")),
+        ])
+        db.commit()
+
+        async def scenario():
+            result = await send_to_users(db, [test_player.id, test_client_user.id], message_push("Ann", "hi", 1))
+            await dispatcher.stop()
+            return result
+
+        assert asyncio.run(scenario())["success_count"] == 3
+        [batch] = stub_expo.batches
+        assert {m["to"] for m in batch} == {token("phone"), token("tablet"), token("desk")}
+
+
+class TestTokenCache:
+    """Test cached token lookups and their invalidation"""
+
+    def test_cached_until_invalidated(self, client, db, test_player, token_headers):
+        db.add(PushToken(user_id=test_player.id, token=token("first")))
+        db.commit()
+        assert active_tokens(db, [test_player.id]) == [token("first")]
+
+        # Written behind the cache's back: not seen until invalidated
+        db.add(PushToken(user_id=test_player.id, token=token("second")))
+        db.commit()
+        assert active_tokens(db, [test_player.id]) == [token("first")]
+
+        response = client.post(
+            "/api/v1/notifications/register-token",
+            json={"token": token("third"), "platform": "ios"},
+            headers=token_headers(test_player)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(active_tokens(db, [test_player.id])) == sorted(
+            [token("first"), token("second"), token("third")]
+        )
+
+        response = client.delete(
+            "/api/v1/notifications/unregister-token",
+            params={"token": token("first")},
+            headers=token_headers(test_player)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert token("first") not in active_tokens(db, [test_player.id])
+
+    def test_transferred_token_leaves_previous_owner(self, client, db, test_player, create_test_user, token_headers):
+        other = create_test_user()
+        db.add(PushToken(user_id=test_player.id, token=token("shared")))
+        db.commit()
+        assert active_tokens(db, [test_player.id]) == [token("shared")]
+
+        client.post(
+            "/api/v1/notifications/register-token",
+            json={"token": token("shared"), "platform": "android"},
+            headers=token_headers(other)
+        )
+        assert active_tokens(db, [test_player.id]) == []
+        assert active_tokens(db, [other.id]) == [token("shared")]
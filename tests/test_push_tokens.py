@@ -0,0 +1,127 @@
+"""
+Test suite for push ticket recording, receipt polling and dead-token pruning
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models import PushReceipt, PushToken
+from app.services import push_notification_service
+from app.services.push_dispatcher import PushDispatcher
+from app.services.push_notification_service import message_push, send_to_users
+from app.services.push_tokens import active_tokens, poll_receipts
+
+
+def token(name):
+    return f"ExponentPushToken[{name}]"
+
+
+def ago(**kwargs):
+    return datetime.now(timezone.utc) - timedelta(**kwargs)
+
+
+def receipt_error(code):
+    return {"status": "error", "message": code, "details": {"error": code}}
+
+
+@pytest.fixture
+def add_tokens(db, test_player):
+    def _add_tokens(*names, **values):
+        rows = [PushToken(user_id=test_player.id, token=token(name), **values) for name in names]
+        db.add_all(rows)
+        db.commit()
+        return rows
+    return _add_tokens
+
+
+@pytest.fixture
+def add_receipts(db):
+    def _add_receipts(names, created_at):
+        db.add_all([PushReceipt(ticket_id=f"ticket-{token(n)}", token=token(n), created_at=created_at)
+                    for n in names])
+        db.commit()
+    return _add_receipts
+
+
+def stored(db, name):
+    db.expire_all()
+    return db.query(PushToken).filter(PushToken.token == token(name)).one()
+
+
+class TestTicketRecording:
+    """Test what a send records"""
+
+    def test_dead_ticket_deactivates_and_ok_tickets_await_receipts(
+        self, db, stub_expo, monkeypatch, test_player, add_tokens
+    ):
+        add_tokens("phone", "dead-tablet")
+        dispatcher = PushDispatcher(url=stub_expo.push_url, flush_seconds=0.01, http2=False)
+        monkeypatch.setattr(push_notification_service, "push_dispatcher", dispatcher)
+
+        async def send():
+            result = await send_to_users(db, [test_player.id], message_push("Ann", "hi", 1))
+            await dispatcher.stop()
+            return result
+
+        assert asyncio.run(send()) == {"success_count": 1, "failed_count": 1}
+        dead = stored(db, "dead-tablet")
+        assert (dead.is_active, dead.last_error, dead.failure_count) == (False, "DeviceNotRegistered", 1)
+        assert [r.token for r in db.query(PushReceipt)] == [token("phone")]
+
+        # The next send skips the dead device
+        assert active_tokens(db, [test_player.id]) == [token("phone")]
+
+
+class TestReceiptPolling:
+    """Test the batched receipt poller"""
+
+    def test_receipts_applied_in_batches(self, db, stub_expo, add_tokens, add_receipts):
+        add_tokens("ok", "gone", "throttled", "pending", "fresh")
+        add_receipts(["ok", "gone", "throttled", "pending"], ago(minutes=20))
+        add_receipts(["fresh"], ago(minutes=1))
+        stub_expo.receipts = {
+            f"ticket-{token('ok')}": {"status": "ok"},
+            f"ticket-{token('gone')}": receipt_error("DeviceNotRegistered"),
+            f"ticket-{token('throttled')}": receipt_error("MessageRateExceeded"),
+        }
+
+        stats = poll_receipts(db, url=stub_expo.receipts_url, chunk_size=3)
+
+        assert [len(ids) for ids in stub_expo.receipt_requests] == [3, 1]
+        assert (stats["checked"], stats["delivered"], stats["failed"], stats["deactivated"]) == (4, 1, 2, 1)
+        assert stored(db, "ok").receipt_count == 1
+        assert stored(db, "gone").is_active is False
+        throttled = stored(db, "throttled")
+        assert (throttled.is_active, throttled.last_error, throttled.failure_rate) == (True, "MessageRateExceeded", 1.0)
+        # Unanswered and too-recent tickets wait for the next run
+        assert {r.token for r in db.query(PushReceipt)} == {token("pending"), token("fresh")}
+
+    def test_repeated_failures_deactivate(self, db, stub_expo, add_tokens, add_receipts):
+        add_tokens("flaky", consecutive_failures=4, receipt_count=10, failure_count=4)
+        add_tokens("recovering", consecutive_failures=4)
+        add_receipts(["flaky", "recovering"], ago(minutes=20))
+        stub_expo.receipts = {
+            f"ticket-{token('flaky')}": receipt_error("MessageRateExceeded"),
+            f"ticket-{token('recovering')}": {"status": "ok"},
+        }
+
+        poll_receipts(db, url=stub_expo.receipts_url)
+
+        flaky = stored(db, "flaky")
+        assert (flaky.is_active, flaky.consecutive_failures, flaky.failure_rate) == (False, 5, 5 / 11)
+        recovering = stored(db, "recovering")
+        assert (recovering.is_active, recovering.consecutive_failures) == (True, 0)
+
+    def test_transport_failure_keeps_tickets(self, db, stub_expo, add_tokens, add_receipts):
+        add_tokens("ok")
+        add_receipts(["ok"], ago(minutes=20))
+        stub_expo.status_code = 502
+
+        assert poll_receipts(db, url=stub_expo.receipts_url)["checked"] == 0
+        assert db.query(PushReceipt).count() == 1
+
+    def test_expired_tickets_dropped(self, db, stub_expo, add_tokens, add_receipts):
+        add_tokens("old")
+        add_receipts(["old"], ago(hours=25))
+
+        assert poll_receipts(db, url=stub_expo.receipts_url)["expired"] == 1
+        assert db.query(PushReceipt).count() == 0
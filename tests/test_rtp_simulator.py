@@ -0,0 +1,110 @@
+"""
+Test suite for the vectorized RTP simulator
+"""
+import random
+from fractions import Fraction
+import pytest
+from app.config import DICE_MULTIPLIERS, SLOTS_SYMBOLS
+from app.models import BetResult, BetTransaction, GameType
+from app.services.bet_engine import roll_dice, settle_bet, spin_slots
+
+np = pytest.importorskip("numpy")
+
+from app.services.rtp_simulator import (  # noqa: E402
+    compare_with_transactions,
+    dice_win_table,
+    exact_stats,
+    simulate_dice,
+    simulate_slots,
+    slots_win_table,
+)
+
+
+class TestPayoutTables:
+    """Test the lookup tables built from the live payout functions"""
+
+    def test_dice_table_matches_multipliers(self):
+        table = dice_win_table(100, 7)
+        assert np.count_nonzero(table) == 6
+        assert set(table[table > 0].tolist()) == {int(100 * DICE_MULTIPLIERS[7])}
+
+    def test_dice_table_truncates_like_engine(self):
+        table = dice_win_table(11, 6)
+        assert table.max() == int(11 * DICE_MULTIPLIERS[6])
+
+    def test_slots_table_exact_rtp(self):
+        from app.config import SLOTS_SYMBOL_MULTIPLIERS, SLOTS_TWO_MATCH_MULTIPLIER
+
+        n = len(SLOTS_SYMBOLS)
+        two_match = n ** 3 - n * (n - 1) * (n - 2) - n
+        expected = Fraction(
+            sum(SLOTS_SYMBOL_MULTIPLIERS.values()) + two_match * SLOTS_TWO_MATCH_MULTIPLIER, n ** 3
+        )
+
+        stats = exact_stats(slots_win_table(100), 100)
+        assert stats["rtp"] == pytest.approx(float(expected))
+
+
+class TestSimulation:
+    """Test the Monte Carlo estimates"""
+
+    def test_slots_converges_to_exact(self):
+        result = simulate_slots(2_000_000, seed=42)
+        assert abs(result.z_score) < 5
+        assert result.hit_rate == pytest.approx(result.expected_hit_rate, abs=0.002)
+        assert result.variance == pytest.approx(result.expected_variance, rel=0.02)
+
+    def test_dice_converges_to_exact(self):
+        result = simulate_dice(1_000_000, prediction=7, seed=42)
+        assert abs(result.z_score) < 5
+        assert result.expected_hit_rate == pytest.approx(1 / 6)
+
+    def test_seed_is_reproducible(self):
+        assert simulate_slots(10_000, seed=7).rtp == simulate_slots(10_000, seed=7).rtp
+
+    def test_chunking_covers_all_spins(self):
+        result = simulate_slots(25_001, seed=1, chunk_size=1000)
+        assert result.spins == 25_001
+
+
+class TestTransactionComparison:
+    """Test checking recorded bets against the payout tables"""
+
+    def test_engine_bets_have_no_mismatches(self, db, test_player):
+        rng = random.Random(3)
+        for _ in range(50):
+            settle_bet(db, test_player.id, 10, spin_slots(10, rng))
+            settle_bet(db, test_player.id, 10, roll_dice(10, 7, rng))
+
+        slots = compare_with_transactions(db, GameType.LUCKY_SLOTS)
+        dice = compare_with_transactions(db, GameType.LUCKY_DICE)
+
+        assert slots.count == dice.count == 50
+        assert slots.payout_mismatches == dice.payout_mismatches == 0
+        assert abs(slots.z_score) < 5
+
+    def test_tampered_row_is_reported(self, db, test_player):
+        settled = settle_bet(db, test_player.id, 10, spin_slots(10, random.Random(5)))
+        row = db.query(BetTransaction).get(settled.transaction_id)
+        row.win_amount += 1
+        db.commit()
+
+        comparison = compare_with_transactions(db, GameType.LUCKY_SLOTS)
+        assert comparison.payout_mismatches == 1
+        assert comparison.mismatch_ids == [settled.transaction_id]
+
+    def test_malformed_dice_rows_left_out(self, db, test_player):
+        rng = random.Random(7)
+        for _ in range(5):
+            settle_bet(db, test_player.id, 10, roll_dice(10, 7, rng))
+        clean = compare_with_transactions(db, GameType.LUCKY_DICE)
+        for game_data in ['{"dice1": 3}', "not json"]:
+            db.add(BetTransaction(user_id=test_player.id, game_type=GameType.LUCKY_DICE, bet_amount=1000,
+                                  win_amount=5000, result=BetResult.WIN, balance_before=0, balance_after=0,
+                                  game_data=game_data))
+        db.commit()
+
+        comparison = compare_with_transactions(db, GameType.LUCKY_DICE)
+        assert (comparison.unparseable, comparison.payout_mismatches) == (2, 0)
+        assert (comparison.count, comparison.total_won) == (clean.count, clean.total_won)
+        assert comparison.expected_won == clean.expected_won
@@ -0,0 +1,172 @@
+"""
+Test suite for the background job scheduler and its expiry sweeps
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+from app.models import (
+    Promotion, PromotionStatus, PromotionType, Referral, ReferralStatus, Report, ReportStatus,
+    SchedulerLease
+)
+from app.services.scheduler import (
+    JobScheduler,
+    clear_expired_otps,
+    expire_pending_referrals,
+    expire_promotions,
+    expire_report_warnings,
+    lift_expired_suspensions,
+)
+
+
+def ago(**kwargs):
+    return datetime.now(timezone.utc) - timedelta(**kwargs)
+
+
+def ahead(**kwargs):
+    return datetime.now(timezone.utc) + timedelta(**kwargs)
+
+
+@pytest.fixture
+def session_factory(db):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+
+
+def make_promotion(db, client_id, end_date):
+    promotion = Promotion(client_id=client_id, title="Weekend", promotion_type=PromotionType.GC_BONUS,
+                          value=10, end_date=end_date)
+    db.add(promotion)
+    db.commit()
+    return promotion
+
+
+class TestSweeps:
+    """Test the chunked expiry transitions"""
+
+    def test_expire_promotions_in_chunks(self, db, test_client_user):
+        expired = [make_promotion(db, test_client_user.id, ago(hours=1)) for _ in range(5)]
+        current = make_promotion(db, test_client_user.id, ahead(days=1))
+        cancelled = make_promotion(db, test_client_user.id, ago(hours=1))
+        cancelled.status = PromotionStatus.CANCELLED
+        db.commit()
+
+        assert expire_promotions(db, chunk_size=2) == 5
+        db.expire_all()
+        assert {p.status for p in expired} == {PromotionStatus.EXPIRED}
+        assert current.status == PromotionStatus.ACTIVE
+        assert cancelled.status == PromotionStatus.CANCELLED
+        assert expire_promotions(db) == 0
+
+    def test_expire_report_warnings(self, db, test_player, test_client_user, create_test_user):
+        overdue = Report(reporter_id=test_player.id, reported_user_id=test_client_user.id, reason="x",
+                         status=ReportStatus.WARNING, warning_deadline=ago(minutes=5),
+                         action_taken="Warning issued")
+        pending = Report(reporter_id=create_test_user().id, reported_user_id=test_client_user.id, reason="y",
+                         status=ReportStatus.WARNING, warning_deadline=ahead(days=2))
+        db.add_all([overdue, pending])
+        db.commit()
+
+        assert expire_report_warnings(db) == 1
+        db.expire_all()
+        assert overdue.status == ReportStatus.VALID
+        assert overdue.auto_validated == 1
+        assert overdue.action_taken.startswith("Warning issued | Auto-validated")
+        assert pending.status == ReportStatus.WARNING
+
+    def test_clear_otps_and_lift_suspensions(self, db, create_test_user):
+        stale, fresh, suspended, banned = (create_test_user() for _ in range(4))
+        stale.email_otp, stale.email_otp_expires_at = "123456", ago(minutes=1)
+        fresh.email_otp, fresh.email_otp_expires_at = "654321", ahead(minutes=9)
+        suspended.is_suspended, suspended.suspended_until = True, ago(minutes=1)
+        suspended.suspension_reason = "cooldown"
+        banned.is_suspended, banned.suspension_reason = True, "indefinite"
+        db.commit()
+
+        assert clear_expired_otps(db) == 1
+        assert lift_expired_suspensions(db) == 1
+        db.expire_all()
+        assert stale.email_otp is None and fresh.email_otp == "654321"
+        assert (suspended.is_suspended, suspended.suspension_reason) == (False, None)
+        assert banned.is_suspended is True
+
+    def test_expire_pending_referrals(self, db, test_player, create_test_user):
+        old = Referral(referrer_id=test_player.id, referred_id=create_test_user().id, created_at=ago(days=45))
+        recent = Referral(referrer_id=test_player.id, referred_id=create_test_user().id, created_at=ago(days=1))
+        db.add_all([old, recent])
+        db.commit()
+
+        assert expire_pending_referrals(db) == 1
+        db.expire_all()
+        assert (old.status, recent.status) == (ReferralStatus.EXPIRED, ReferralStatus.PENDING)
+
+
+class TestJobScheduler:
+    """Test leadership and job bookkeeping"""
+
+    def test_single_leader(self, db, session_factory):
+        first = JobScheduler(session_factory, lease_seconds=60)
+        second = JobScheduler(session_factory, lease_seconds=60)
+
+        assert first.try_acquire_lease() is True
+        assert second.try_acquire_lease() is False
+        assert first.try_acquire_lease() is True  # renewal
+
+        first.release_lease()
+        assert second.try_acquire_lease() is True
+        assert db.get(SchedulerLease, "scheduler").holder == second.holder
+
+    def test_expired_lease_taken_over(self, db, session_factory):
+        crashed = JobScheduler(session_factory, lease_seconds=-1)
+        successor = JobScheduler(session_factory, lease_seconds=60)
+
+        assert crashed.try_acquire_lease() is True
+        assert successor.try_acquire_lease() is True
+        assert crashed.try_acquire_lease() is False
+
+    def test_only_leader_runs_due_jobs(self, db, session_factory):
+        calls = []
+        leader = JobScheduler(session_factory)
+        follower = JobScheduler(session_factory)
+        for scheduler in (leader, follower):
+            scheduler.register("count", 3600, lambda session, s=scheduler: calls.append(s) or 7)
+
+        assert leader.run_due_jobs() == ["count"]
+        assert follower.run_due_jobs() == []
+        assert leader.run_due_jobs() == []  # not due again for an hour
+        assert calls == [leader]
+
+        job = leader.status()["jobs"][0]
+        assert (job["runs"], job["last_status"], job["last_result"]) == (1, "ok", 7)
+        assert job["last_duration_ms"] is not None
+
+    def test_failure_recorded(self, db, session_factory):
+        def broken(session):
+            raise RuntimeError("boom")
+
+        scheduler = JobScheduler(session_factory)
+        scheduler.register("broken", 60, broken)
+        job = scheduler.run_job("broken")
+
+        assert (job.failures, job.last_status, job.last_error) == (1, "error", "boom")
+
+
+class TestSchedulerMonitoring:
+    """Test /monitoring/scheduler and the manual warning check"""
+
+    def test_admin_sees_jobs(self, client, test_admin, token_headers):
+        response = client.get("/api/v1/monitoring/scheduler", headers=token_headers(test_admin))
+        assert response.status_code == status.HTTP_200_OK
+        names = {job["name"] for job in response.json()["jobs"]}
+        assert {"expire_promotions", "expire_report_warnings", "expire_pending_referrals"} <= names
+
+    def test_non_admin_rejected(self, client, test_player, token_headers):
+        response = client.get("/api/v1/monitoring/scheduler", headers=token_headers(test_player))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_manual_warning_check(self, client, db, test_admin, test_player, test_client_user, token_headers):
+        db.add(Report(reporter_id=test_player.id, reported_user_id=test_client_user.id, reason="x",
+                      status=ReportStatus.WARNING, warning_deadline=ago(minutes=5)))
+        db.commit()
+
+        response = client.post("/api/v1/reports/admin/check-expired-warnings", headers=token_headers(test_admin))
+        assert response.json()["validated_count"] == 1
@@ -0,0 +1,110 @@
+"""
+Test suite for full-text search
+"""
+from fastapi import status
+from app.models import CommunityPost, Message, PostVisibility, Ticket, TicketMessage
+from app.services.search import SQLiteSearchBackend, search
+
+
+def walk(client, url, headers, **params):
+    """Follow next_cursor through every page, returning all results"""
+    results, cursor = [], None
+    while True:
+        page = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert page.status_code == status.HTTP_200_OK
+        data = page.json()
+        results.extend(data["results"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return results
+
+
+class TestIndex:
+    """Test the FTS5 index and query building"""
+
+    def test_user_text_is_quoted(self):
+        assert SQLiteSearchBackend.match_expression('say "hi" OR x* NEAR(') == '"say" "hi" "OR" "x" "NEAR"'
+        assert SQLiteSearchBackend.match_expression("?!") == ""
+
+    def test_index_follows_writes(self, db, test_player, test_client_user):
+        message = Message(sender_id=test_player.id, receiver_id=test_client_user.id, content="deposit pending")
+        db.add(message)
+        db.commit()
+
+        def found(text):
+            query, _ = search(db, "messages", text)
+            return [row.Message.id for row in query]
+
+        assert found("deposits") == [message.id]  # stemmed
+
+        message.content = "withdrawal pending"
+        db.commit()
+        assert found("deposit") == []
+        assert found("withdrawal") == [message.id]
+
+        db.delete(message)
+        db.commit()
+        assert found("withdrawal") == []
+
+
+class TestSearchEndpoints:
+    """Test ranking, paging and permissions"""
+
+    def test_messages_ranked_and_paged(self, client, db, test_player, test_client_user, create_test_user,
+                                       token_headers):
+        other = create_test_user()
+        db.add_all([
+            Message(sender_id=test_player.id, receiver_id=test_client_user.id, content="where is my bonus?"),
+            Message(sender_id=test_client_user.id, receiver_id=test_player.id, content="bonus bonus bonus"),
+            Message(sender_id=other.id, receiver_id=test_client_user.id, content="my bonus please"),
+        ] + [
+            Message(sender_id=test_player.id, receiver_id=test_client_user.id, content=f"bonus code {i}")
+            for i in range(4)
+        ])
+        db.commit()
+
+        results = walk(client, "/api/v1/search/messages", token_headers(test_player), q="bonus", limit=2)
+
+        assert len(results) == 6  # not the other player's conversation
+        assert results[0]["content"] == "bonus bonus bonus"
+        assert [r["rank"] for r in results] == sorted((r["rank"] for r in results), reverse=True)
+
+        everyone = walk(client, "/api/v1/search/messages", token_headers(test_client_user), q="bonus",
+                        with_user_id=other.id)
+        assert [r["content"] for r in everyone] == ["my bonus please"]
+
+    def test_tickets_hide_internal_notes(self, client, db, test_player, test_admin, token_headers):
+        ticket = Ticket(ticket_number="TKT-1", user_id=test_player.id, subject="Payout")
+        db.add(ticket)
+        db.flush()
+        db.add_all([
+            TicketMessage(ticket_id=ticket.id, sender_id=test_player.id, content="payout missing"),
+            TicketMessage(ticket_id=ticket.id, sender_id=test_admin.id, content="payout fraud check",
+                          is_internal_note=1),
+        ])
+        db.commit()
+
+        mine = client.get("/api/v1/search/tickets?q=payout", headers=token_headers(test_player)).json()
+        assert [r["content"] for r in mine["results"]] == ["payout missing"]
+        assert mine["results"][0]["ticket_number"] == "TKT-1"
+
+        admin = client.get("/api/v1/search/tickets?q=payout", headers=token_headers(test_admin)).json()
+        assert len(admin["results"]) == 2
+
+    def test_posts_of_own_community(self, client, db, test_player, test_client_user, token_headers):
+        db.add_all([
+            CommunityPost(author_id=test_player.id, content="jackpot today", visibility=PostVisibility.PLAYERS),
+            CommunityPost(author_id=test_client_user.id, content="jackpot setup", visibility=PostVisibility.CLIENTS),
+            CommunityPost(author_id=test_player.id, content="jackpot old", visibility=PostVisibility.PLAYERS,
+                          is_active=False),
+        ])
+        db.commit()
+
+        data = client.get("/api/v1/search/posts?q=jackpot&total=exact", headers=token_headers(test_player)).json()
+        assert [r["content"] for r in data["results"]] == ["jackpot today"]
+        assert data["total"] == 1
+        assert data["results"][0]["author_username"] == test_player.username
+
+    def test_no_terms(self, client, test_player, token_headers):
+        response = client.get("/api/v1/search/messages?q=%3F%21", headers=token_headers(test_player))
+        assert response.json() == {"results": [], "total": 0, "next_cursor": None}
@@ -0,0 +1,104 @@
+"""
+Test suite for the orjson serialization path (REST responses and WS frames)
+"""
+import json
+from datetime import datetime, timezone
+from fastapi import status
+from app.core.serialization import dumps, loads, FastJSONResponse, ORJSON_AVAILABLE
+from app.models import Message, MessageType, UserType
+from app.websocket import WSMessage, WSMessageType
+
+
+class TestDumps:
+    """Test the low-level encoder"""
+
+    def test_dumps_native_types(self):
+        """Datetimes, enums and int keys encode without jsonable_encoder"""
+        ts = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        data = loads(dumps({"at": ts, "type": UserType.PLAYER, "mult": {2: 36}}))
+
+        assert data == {"at": ts.isoformat(), "type": "player", "mult": {"2": 36}}
+
+    def test_orjson_is_used(self):
+        """orjson is a declared requirement"""
+        assert ORJSON_AVAILABLE
+
+    def test_response_class_renders_bytes(self):
+        """FastJSONResponse renders compact JSON"""
+        response = FastJSONResponse({"a": [1, 2, 3]})
+        assert response.body == b'{"a":[1,2,3]}'
+        assert response.media_type == "application/json"
+
+
+class TestWSMessageSerialization:
+    """Test WebSocket frame encoding"""
+
+    def test_to_json_matches_previous_shape(self):
+        """Frame keeps the type/data/timestamp layout clients expect"""
+        msg = WSMessage(type=WSMessageType.MESSAGE_NEW, data={"id": 1, "content": "hi"})
+        frame = json.loads(msg.to_json())
+
+        assert frame == {
+            "type": "message:new",
+            "data": {"id": 1, "content": "hi"},
+            "timestamp": msg.timestamp
+        }
+
+    def test_round_trip(self):
+        """from_json parses frames produced by to_json"""
+        msg = WSMessage(type="ping", data={"n": 1})
+        parsed = WSMessage.from_json(msg.to_json())
+
+        assert parsed.type == "ping"
+        assert parsed.data == {"n": 1}
+        assert parsed.timestamp == msg.timestamp
+
+
+class TestFastListEndpoints:
+    """Test the projected fast-path list endpoints"""
+
+    def test_admin_users_does_not_expose_secrets(self, client, test_admin, test_player, token_headers):
+        """Admin user list is projected and never includes password hashes"""
+        response = client.get("/api/v1/admin/users", headers=token_headers(test_admin))
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 2
+        usernames = {u["username"] for u in data["users"]}
+        assert test_player.username in usernames
+        for user in data["users"]:
+            assert "hashed_password" not in user
+            assert "two_factor_secret" not in user
+
+    def test_admin_messages_include_participants(self, client, db, test_admin, test_player, test_client_user, token_headers):
+        """Admin message list embeds sender/receiver summaries"""
+        db.add(Message(sender_id=test_player.id, receiver_id=test_client_user.id,
+                       message_type=MessageType.TEXT, content="hello"))
+        db.commit()
+
+        response = client.get("/api/v1/admin/messages", headers=token_headers(test_admin))
+
+        assert response.status_code == status.HTTP_200_OK
+        message = response.json()["messages"][0]
+        assert message["sender"]["username"] == test_player.username
+        assert message["receiver"]["user_type"] == "client"
+
+    def test_chat_messages_match_response_model(self, client, db, test_player, test_client_user, token_headers):
+        """Fast path output still matches schemas.MessageListResponse"""
+        from app import schemas
+
+        for i in range(3):
+            db.add(Message(sender_id=test_client_user.id, receiver_id=test_player.id,
+                           message_type=MessageType.TEXT, content=f"m{i}"))
+        db.commit()
+
+        response = client.get(
+            f"/api/v1/chat/messages/{test_client_user.id}",
+            headers=token_headers(test_player)
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = schemas.MessageListResponse.model_validate(response.json())
+        assert sorted(m.content for m in data.messages) == ["m0", "m1", "m2"]
+        assert data.messages[0].sender.id == test_client_user.id
+        assert data.unread_count == 0
@@ -0,0 +1,75 @@
+"""
+Test suite for indexed user search
+"""
+from sqlalchemy.dialects import postgresql
+from app.models import UserType
+from app.services.user_search import ADMIN_SEARCH_COLUMNS, PostgresUserSearch, _columns
+
+
+def usernames(response):
+    return [u["username"] for u in response.json()]
+
+
+class TestMatching:
+    """Test ranking and the backends"""
+
+    def test_exact_before_prefix(self, client, create_test_user, test_player, token_headers):
+        for name in ["annette", "xann", "ann", "anna_k"]:
+            create_test_user(username=name, user_type=UserType.CLIENT)
+        create_test_user(username="zed", full_name="Ann Smith", user_type=UserType.CLIENT)
+        create_test_user(username="ann_player", user_type=UserType.PLAYER)
+
+        response = client.get("/api/v1/friends/search?q=ANN", headers=token_headers(test_player))
+
+        # SQLite matches prefixes only; substring matches are a PostgreSQL (pg_trgm) feature
+        assert usernames(response) == ["ann", "annette", "anna_k", "zed"]
+
+    def test_like_wildcards_are_literal(self, client, create_test_user, test_player, token_headers):
+        create_test_user(username="a_b", user_type=UserType.CLIENT)
+        create_test_user(username="axb", user_type=UserType.CLIENT)
+
+        response = client.get("/api/v1/friends/search?q=a_", headers=token_headers(test_player))
+        assert usernames(response) == ["a_b"]
+
+    def test_postgres_uses_trigram_ilike(self):
+        match = PostgresUserSearch().match(_columns(ADMIN_SEARCH_COLUMNS), "jo%")
+        sql = str(match.condition.compile(dialect=postgresql.dialect()))
+        assert sql.count("ILIKE") == 4
+        assert "similarity" in str(match.rank.compile(dialect=postgresql.dialect()))
+
+
+class TestEndpoints:
+    """Test the endpoints using the search"""
+
+    def test_friends_excluded_before_limit(self, client, create_test_user, test_player, make_friends,
+                                           token_headers):
+        clients = [create_test_user(username=f"shop{i:02d}", user_type=UserType.CLIENT) for i in range(25)]
+        for friend in clients[:5]:
+            make_friends(test_player, friend)
+
+        response = client.get("/api/v1/friends/search?q=shop", headers=token_headers(test_player))
+
+        assert usernames(response) == [f"shop{i:02d}" for i in range(5, 25)]
+
+    def test_user_directory(self, client, create_test_user, test_player, token_headers):
+        target = create_test_user(username="marco_polo")
+        create_test_user(username="marc")
+
+        response = client.get("/api/v1/users/search?query=marc", headers=token_headers(test_player))
+        assert [u["username"] for u in response.json()["users"]] == ["marc", "marco_polo"]
+
+        response = client.get(f"/api/v1/users/search?query={target.user_id}", headers=token_headers(test_player))
+        assert [u["username"] for u in response.json()["users"]] == ["marco_polo"]
+
+    def test_admin_search_ranked_and_paged(self, client, create_test_user, test_admin, token_headers):
+        create_test_user(username="kim_b", email="kb@example.com")
+        create_test_user(username="zz", email="kim@example.com")
+        create_test_user(username="kim")
+        headers = token_headers(test_admin)
+
+        first = client.get("/api/v1/admin/users?search=Kim&limit=2", headers=headers).json()
+        rest = client.get("/api/v1/admin/users", params={"search": "Kim", "limit": 2,
+                                                         "cursor": first["next_cursor"]}, headers=headers).json()
+
+        assert [u["username"] for u in first["users"] + rest["users"]] == ["kim", "kim_b", "zz"]
+        assert first["total"] == 3 and rest["next_cursor"] is None